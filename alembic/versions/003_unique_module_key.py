@@ -0,0 +1,38 @@
+"""Unique (technical_name, version, repo_name) on odoo_modules
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+
+# revision identifiers
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Eliminar duplicados previos (conservar la fila más reciente)
+    op.execute(
+        """
+        DELETE FROM odoo_modules a
+        USING odoo_modules b
+        WHERE a.technical_name = b.technical_name
+          AND a.version = b.version
+          AND a.repo_name = b.repo_name
+          AND a.id < b.id
+        """
+    )
+    # Clave natural: destino del INSERT ... ON CONFLICT del writer masivo
+    op.create_unique_constraint(
+        'uq_odoo_modules_name_version_repo',
+        'odoo_modules',
+        ['technical_name', 'version', 'repo_name'],
+    )
+
+
+def downgrade():
+    op.drop_constraint('uq_odoo_modules_name_version_repo', 'odoo_modules', type_='unique')
@@ -0,0 +1,31 @@
+"""Git SHAs and tombstones for incremental ETL
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('odoo_modules', sa.Column('manifest_sha', sa.String(40), nullable=True))
+    op.add_column('odoo_modules', sa.Column('readme_sha', sa.String(40), nullable=True))
+    op.add_column('odoo_modules', sa.Column('source_commit', sa.String(40), nullable=True))
+    op.add_column('odoo_modules', sa.Column('removed_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_odoo_modules_removed_at', 'odoo_modules', ['removed_at'])
+
+
+def downgrade():
+    op.drop_index('ix_odoo_modules_removed_at', table_name='odoo_modules')
+    op.drop_column('odoo_modules', 'removed_at')
+    op.drop_column('odoo_modules', 'source_commit')
+    op.drop_column('odoo_modules', 'readme_sha')
+    op.drop_column('odoo_modules', 'manifest_sha')
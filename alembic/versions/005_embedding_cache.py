@@ -0,0 +1,30 @@
+"""Content-addressed embedding cache
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'embedding_cache',
+        sa.Column('key', sa.String(64), primary_key=True),
+        sa.Column('model', sa.String(), nullable=False),
+        sa.Column('dimensions', sa.Integer(), nullable=False),
+        sa.Column('embedding', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_table('embedding_cache')
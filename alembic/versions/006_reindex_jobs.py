@@ -0,0 +1,47 @@
+"""Reindex job queue fed by GitHub webhooks
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'reindex_jobs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('repo_name', sa.String(), nullable=False),
+        sa.Column('version', sa.String(), nullable=False),
+        sa.Column('technical_name', sa.String(), nullable=False),
+        sa.Column('commit', sa.String(40), nullable=True),
+        sa.Column('status', sa.String(16), nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('locked_at', sa.DateTime(), nullable=True),
+    )
+    # Un solo trabajo pendiente por módulo: los duplicados se fusionan al encolar
+    op.create_index(
+        'uq_reindex_jobs_pending',
+        'reindex_jobs',
+        ['repo_name', 'version', 'technical_name'],
+        unique=True,
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+    op.create_index('ix_reindex_jobs_status_id', 'reindex_jobs', ['status', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_reindex_jobs_status_id', table_name='reindex_jobs')
+    op.drop_index('uq_reindex_jobs_pending', table_name='reindex_jobs')
+    op.drop_table('reindex_jobs')
@@ -0,0 +1,53 @@
+"""ETL run ledger for resumable, shared runs
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'etl_runs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('status', sa.String(16), nullable=False, server_default='running'),
+        sa.Column('options', sa.JSON(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+    )
+    op.create_table(
+        'etl_tasks',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column(
+            'run_id', sa.Integer(),
+            sa.ForeignKey('etl_runs.id', ondelete='CASCADE'), nullable=False,
+        ),
+        sa.Column('repo_name', sa.String(), nullable=False),
+        sa.Column('version', sa.String(), nullable=False),
+        sa.Column('technical_name', sa.String(), nullable=False),
+        sa.Column('status', sa.String(16), nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('locked_by', sa.String(), nullable=True),
+        sa.Column('locked_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.UniqueConstraint(
+            'run_id', 'repo_name', 'version', 'technical_name', name='uq_etl_tasks_run_module'
+        ),
+    )
+    op.create_index('ix_etl_tasks_run_status', 'etl_tasks', ['run_id', 'status'])
+
+
+def downgrade():
+    op.drop_index('ix_etl_tasks_run_status', table_name='etl_tasks')
+    op.drop_table('etl_tasks')
+    op.drop_table('etl_runs')
@@ -0,0 +1,59 @@
+"""Move full descriptions and READMEs to odoo_module_docs
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+EXCERPT_CHARS = 200
+
+
+def upgrade():
+    op.create_table(
+        'odoo_module_docs',
+        sa.Column(
+            'module_id', sa.Integer(),
+            sa.ForeignKey('odoo_modules.id', ondelete='CASCADE'), primary_key=True,
+        ),
+        sa.Column('codec', sa.String(8), nullable=False, server_default='none'),
+        sa.Column('description', sa.LargeBinary(), nullable=True),
+        sa.Column('readme', sa.LargeBinary(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    )
+    op.execute("""
+        INSERT INTO odoo_module_docs (module_id, codec, description, readme, updated_at)
+        SELECT id, 'none', convert_to(description, 'UTF8'), convert_to(readme, 'UTF8'), now()
+        FROM odoo_modules
+        WHERE description IS NOT NULL OR readme IS NOT NULL
+    """)
+    # En odoo_modules queda solo el extracto que devuelve la búsqueda
+    op.execute(f"""
+        UPDATE odoo_modules
+        SET description = left(description, {EXCERPT_CHARS}) || '...'
+        WHERE length(description) > {EXCERPT_CHARS}
+    """)
+    op.drop_column('odoo_modules', 'readme')
+    # Las páginas liberadas se recuperan con VACUUM FULL odoo_modules (o pg_repack),
+    # que no puede ejecutarse dentro de la transacción de la migración
+
+
+def downgrade():
+    op.add_column('odoo_modules', sa.Column('readme', sa.Text(), nullable=True))
+    # Solo se pueden restaurar en SQL los textos sin comprimir
+    op.execute("""
+        UPDATE odoo_modules m
+        SET description = coalesce(convert_from(d.description, 'UTF8'), m.description),
+            readme = convert_from(d.readme, 'UTF8')
+        FROM odoo_module_docs d
+        WHERE d.module_id = m.id AND d.codec = 'none'
+    """)
+    op.drop_table('odoo_module_docs')
@@ -1,10 +1,57 @@
-from fastapi import APIRouter, Header
+import json
+
+from fastapi import APIRouter, Header, HTTPException, Request
+
+from ...core.logging import get_logger
+from ...core.security import verify_github_signature
+from ...database import SessionLocal
+from ...services.reindex_queue import ReindexQueue, parse_push
 
 router = APIRouter(prefix="/webhooks", tags=["webhooks"])
+logger = get_logger(__name__)
+
+queue = ReindexQueue(SessionLocal)
 
 
 @router.post("/github")
-def github_webhook(x_github_event: str = Header(default="")):
-    return {"received": x_github_event}
+async def github_webhook(
+    request: Request,
+    x_github_event: str = Header(default=""),
+    x_hub_signature_256: str = Header(default=""),
+):
+    """
+    Webhook de GitHub: encola el re-indexado de los módulos tocados por un push.
+
+    La firma (``X-Hub-Signature-256``, HMAC-SHA256 con GITHUB_WEBHOOK_SECRET)
+    se verifica sobre el cuerpo exacto recibido.
+    """
+    body = await request.body()
+    if not verify_github_signature(body, x_hub_signature_256):
+        raise HTTPException(status_code=401, detail="Firma inválida")
+
+    if x_github_event == "ping":
+        return {"received": "ping"}
+    if x_github_event != "push":
+        return {"received": x_github_event, "ignored": True}
+
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Payload inválido")
 
+    changes = parse_push(payload)
+    if changes is None:
+        return {"received": "push", "ignored": True}
 
+    queued = queue.enqueue(changes)
+    logger.info(
+        f"Push {changes.repo_name}@{changes.version}: {queued} trabajos encolados"
+        + (" (rama completa)" if changes.full else "")
+    )
+    return {
+        "received": "push",
+        "repo": changes.repo_name,
+        "version": changes.version,
+        "queued": queued,
+        "full": changes.full,
+    }
@@ -24,6 +24,44 @@ class Settings(BaseSettings):
     # Embedding
     embedding_model: str = "qwen/qwen3-embedding-4b"
     embedding_dimensions: int = 2560
+    embedding_batch_max_tokens: int = 16000  # tokens estimados por petición
+    embedding_batch_max_items: int = 64
+    embedding_max_concurrency: int = 4  # peticiones por lotes simultáneas
+    embedding_max_retries: int = 3
+    embedding_cache_enabled: bool = True  # tabla embedding_cache (sha256 modelo + texto)
+
+    # Textos largos de los módulos (odoo_module_docs)
+    module_docs_codec: str = "none"  # none | zstd (requiere zstandard)
+
+    # Cache de manifests parseados (SQLite local, clave SHA de blob)
+    manifest_cache_enabled: bool = True
+    manifest_cache_path: str = "data/cache/manifests.sqlite3"
+
+    # GitHub (ETL)
+    github_max_concurrency: int = 8  # peticiones simultáneas a la API
+    github_rate_limit_reserve: int = 100  # peticiones de la ventana que no se consumen
+    github_cache_enabled: bool = True  # peticiones condicionales (ETag) con cache en disco
+    github_cache_dir: str = "data/cache/github"
+    github_cache_max_bytes: int = 500_000_000
+    github_graphql_batch_size: int = 50  # ficheros por query GraphQL (se adapta)
+    github_webhook_secret: str = ""  # secreto de los webhooks (vacío = se rechazan)
+
+    # Observabilidad
+    tracing_exporter: str = "none"  # none | console | file | otlp
+    tracing_file_path: str = "data/temp/traces.jsonl"
+
+    # Profiler de muestreo (fracción 0-1 de llamadas perfiladas)
+    profiling_sample_rate: float = 0.0
+    profiling_output_dir: str = "data/temp/profiles"
+    profiling_max_files: int = 200  # se borran los más antiguos (0 = sin límite)
+    admin_token: str = ""
+
+    # Log de búsquedas lentas (0 = desactivado)
+    slow_query_threshold_ms: float = 0
+    slow_query_log_path: str = "data/temp/slow_queries.log"
+    slow_query_log_max_bytes: int = 10_000_000
+    slow_query_log_backups: int = 5
+    slow_query_explain: bool = True
 
 
 @lru_cache()
@@ -0,0 +1,126 @@
+"""
+Profiler de muestreo opcional para endpoints calientes.
+
+Una fracción configurable (``PROFILING_SAMPLE_RATE``) de las llamadas a
+``/search`` y al tool MCP se perfila y se guarda en ``PROFILING_OUTPUT_DIR``.
+Con pyinstrument instalado se genera un fichero speedscope
+(https://www.speedscope.app); si no, un volcado de cProfile (``.prof``)
+convertible a flamegraph con flameprof o snakeviz.
+
+El directorio conserva como mucho ``PROFILING_MAX_FILES`` ficheros: al
+guardar uno nuevo se borran los más antiguos.
+"""
+import cProfile
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+from ..config import get_settings
+from .logging import get_logger
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+try:
+    from pyinstrument import Profiler as _PyinstrumentProfiler
+    from pyinstrument.renderers import SpeedscopeRenderer
+except ImportError:  # pragma: no cover - dependencia opcional
+    _PyinstrumentProfiler = None
+
+
+@dataclass
+class ProfileRun:
+    """Resultado de una ejecución perfilada (``path`` se rellena al terminar)."""
+
+    name: str
+    active: bool = False
+    path: Optional[str] = None
+
+
+def should_profile(force: bool = False, sample_rate: Optional[float] = None) -> bool:
+    """Decidir si perfilar esta llamada según el muestreo configurado."""
+    if force:
+        return True
+    rate = settings.profiling_sample_rate if sample_rate is None else sample_rate
+    return rate > 0 and random.random() < rate
+
+
+def _output_path(name: str, suffix: str) -> Path:
+    output_dir = Path(settings.profiling_output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
+    safe_name = "".join(c if c.isalnum() else "_" for c in name).strip("_")
+    return output_dir / f"{safe_name}_{timestamp}_{uuid.uuid4().hex[:8]}{suffix}"
+
+
+def prune_profiles(output_dir: Path, max_files: int) -> int:
+    """
+    Borrar los profiles más antiguos hasta dejar ``max_files`` (0 = sin límite).
+
+    Returns:
+        Ficheros borrados
+    """
+    if max_files <= 0:
+        return 0
+    files = []
+    for path in output_dir.iterdir():
+        try:
+            if path.is_file():
+                files.append((path.stat().st_mtime, path))
+        except OSError:
+            continue
+    files.sort(reverse=True)
+    removed = 0
+    for _, path in files[max_files:]:
+        try:
+            path.unlink()
+            removed += 1
+        except OSError as e:  # otro worker pudo borrarlo antes
+            logger.debug(f"No se pudo borrar el profile {path}: {e}")
+    return removed
+
+
+@contextmanager
+def maybe_profile(name: str, force: bool = False) -> Iterator[ProfileRun]:
+    """
+    Perfilar el bloque si toca por muestreo o si se fuerza.
+
+    Args:
+        name: Nombre de la operación (ej: "search", "mcp_search")
+        force: Perfilar siempre (override ``?profile=1`` de administradores)
+
+    Yields:
+        ProfileRun; tras salir del bloque ``path`` apunta al fichero generado
+    """
+    run = ProfileRun(name=name, active=should_profile(force))
+    if not run.active:
+        yield run
+        return
+
+    if _PyinstrumentProfiler is not None:
+        profiler = _PyinstrumentProfiler(async_mode="disabled")
+        profiler.start()
+        try:
+            yield run
+        finally:
+            profiler.stop()
+            path = _output_path(name, ".speedscope.json")
+            path.write_text(profiler.output(renderer=SpeedscopeRenderer()), encoding="utf-8")
+            run.path = str(path)
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield run
+        finally:
+            profiler.disable()
+            path = _output_path(name, ".prof")
+            profiler.dump_stats(path)
+            run.path = str(path)
+
+    prune_profiles(Path(run.path).parent, settings.profiling_max_files)
+    logger.info(f"🔬 Profile de '{name}' guardado en {run.path}")
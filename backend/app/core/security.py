@@ -1,4 +1,30 @@
+import hashlib
+import hmac
+
+from ..config import get_settings
+
+
 def verify_token(token: str) -> bool:
-    return True
+    """Comprobar un token de administrador contra ADMIN_TOKEN."""
+    expected = get_settings().admin_token
+    if not expected or not token:
+        return False
+    return hmac.compare_digest(token, expected)
+
+
+def compute_signature(secret: str, body: bytes) -> str:
+    """Firma de GitHub para un payload: ``sha256=<hmac-sha256 hex>``."""
+    digest = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+
+def verify_signature(secret: str, body: bytes, signature: str) -> bool:
+    """Comprobar la cabecera ``X-Hub-Signature-256`` de un webhook."""
+    if not secret or not signature:
+        return False
+    return hmac.compare_digest(compute_signature(secret, body), signature)
 
 
+def verify_github_signature(body: bytes, signature: str) -> bool:
+    """Comprobar la firma de un webhook contra GITHUB_WEBHOOK_SECRET."""
+    return verify_signature(get_settings().github_webhook_secret, body, signature)
@@ -0,0 +1,353 @@
+"""
+Instrumentación Prometheus para AI-OdooFinder.
+
+Registro mínimo de métricas (Counter, Gauge, Histogram) que se expone en
+formato de texto de Prometheus (``/metrics``) sin dependencias externas.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .tracing import timed_span
+
+METRIC_PREFIX = "aiodoofinder_"
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = METRIC_PREFIX + name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"Labels inválidas para {self.name}: {sorted(labels)} "
+                f"(esperadas {list(self.labelnames)})"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class _CounterChild:
+    def __init__(self, metric: "Counter", key: LabelValues):
+        self._metric = metric
+        self._key = key
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._metric._inc(self._key, amount)
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name + "_total", documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def labels(self, **labels: str) -> _CounterChild:
+        return _CounterChild(self, self._key(labels))
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._inc((), amount)
+
+    def _inc(self, key: LabelValues, amount: float) -> None:
+        if amount < 0:
+            raise ValueError("Un counter solo puede incrementarse")
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class _GaugeChild:
+    def __init__(self, metric: "Gauge", key: LabelValues):
+        self._metric = metric
+        self._key = key
+
+    def set(self, value: float) -> None:
+        self._metric._set(self._key, value)
+
+
+class Gauge(_Metric):
+    """
+    Gauge con valores fijados explícitamente o calculados en cada scrape.
+
+    ``set_function`` permite registrar un callback que devuelve
+    ``{label_values: valor}`` y se evalúa al renderizar.
+    """
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._callback: Optional[Callable[[], Dict[LabelValues, float]]] = None
+
+    def labels(self, **labels: str) -> _GaugeChild:
+        return _GaugeChild(self, self._key(labels))
+
+    def set(self, value: float) -> None:
+        self._set((), value)
+
+    def _set(self, key: LabelValues, value: float) -> None:
+        with self._lock:
+            self._values[key] = float(value)
+
+    def set_function(self, callback: Callable[[], Dict[LabelValues, float]]) -> None:
+        self._callback = callback
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        if self._callback is not None:
+            try:
+                values.update(self._callback())
+            except Exception:
+                pass
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in values.items()
+        ]
+
+
+class _HistogramChild:
+    def __init__(self, metric: "Histogram", key: LabelValues):
+        self._metric = metric
+        self._key = key
+
+    def observe(self, value: float) -> None:
+        self._metric._observe(self._key, value)
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # key -> [counts por bucket..., sum, count]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def labels(self, **labels: str) -> _HistogramChild:
+        return _HistogramChild(self, self._key(labels))
+
+    def observe(self, value: float) -> None:
+        self._observe((), value)
+
+    def _observe(self, key: LabelValues, value: float) -> None:
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = [0.0] * (len(self.buckets) + 2)
+                self._values[key] = state
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+        lines = []
+        for key, state in items:
+            for i, bound in enumerate(self.buckets):
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {_format_value(state[i])}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(state[-1])}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+# Búsqueda
+SEARCH_PHASE_SECONDS = REGISTRY.register(Histogram(
+    "search_phase_seconds",
+    "Duración de cada fase de SearchService.search (embedding, vector_query "
+    "(incluye los filtros SQL), scoring, serialization)",
+    ["phase", "version", "search_mode"],
+))
+REQUESTS_TOTAL = REGISTRY.register(Counter(
+    "requests",
+    "Peticiones recibidas por transporte (http/mcp) y endpoint",
+    ["transport", "endpoint"],
+))
+
+# Proveedor de embeddings
+EMBEDDING_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "embedding_request_seconds",
+    "Latencia de las llamadas al proveedor de embeddings",
+    ["model"],
+))
+EMBEDDING_ERRORS_TOTAL = REGISTRY.register(Counter(
+    "embedding_errors",
+    "Errores devueltos por el proveedor de embeddings",
+    ["model", "error"],
+))
+
+# Caches
+CACHE_REQUESTS_TOTAL = REGISTRY.register(Counter(
+    "cache_requests",
+    "Consultas a caches internas por resultado (hit/miss)",
+    ["cache", "result"],
+))
+CACHE_HIT_RATIO = REGISTRY.register(Gauge(
+    "cache_hit_ratio",
+    "Ratio de aciertos acumulado por cache",
+    ["cache"],
+))
+
+# Pool de conexiones
+DB_POOL_CONNECTIONS = REGISTRY.register(Gauge(
+    "db_pool_connections",
+    "Estado del pool de conexiones SQLAlchemy (size, checked_out, checked_in, overflow)",
+    ["state"],
+))
+
+
+def _cache_hit_ratios() -> Dict[LabelValues, float]:
+    totals: Dict[str, Dict[str, float]] = {}
+    with CACHE_REQUESTS_TOTAL._lock:
+        items = list(CACHE_REQUESTS_TOTAL._values.items())
+    for (cache, result), value in items:
+        totals.setdefault(cache, {}).setdefault(result, 0.0)
+        totals[cache][result] += value
+    ratios = {}
+    for cache, counts in totals.items():
+        total = counts.get("hit", 0.0) + counts.get("miss", 0.0)
+        if total:
+            ratios[(cache,)] = counts.get("hit", 0.0) / total
+    return ratios
+
+
+CACHE_HIT_RATIO.set_function(_cache_hit_ratios)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    """Registrar un acierto o fallo de cache."""
+    CACHE_REQUESTS_TOTAL.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def register_db_pool(engine) -> None:
+    """Exponer el uso del pool de ``engine`` en cada scrape."""
+
+    def _pool_state() -> Dict[LabelValues, float]:
+        pool = engine.pool
+        state = {}
+        for label, attr in (
+            ("size", "size"),
+            ("checked_out", "checkedout"),
+            ("checked_in", "checkedin"),
+            ("overflow", "overflow"),
+        ):
+            getter = getattr(pool, attr, None)
+            if callable(getter):
+                state[(label,)] = float(getter())
+        return state
+
+    DB_POOL_CONNECTIONS.set_function(_pool_state)
+
+
+@contextmanager
+def observe_phase(
+    timings: Dict[str, float],
+    phase: str,
+    version: str = "",
+    search_mode: str = "",
+) -> Iterator[None]:
+    """
+    Medir una fase de búsqueda.
+
+    Acumula la duración (segundos) en ``timings[phase]``, la emite como span
+    ``search.<phase>`` y la registra en el histograma ``search_phase_seconds``.
+    """
+    start = time.perf_counter()
+    try:
+        with timed_span(
+            timings,
+            phase,
+            span_name=f"search.{phase}",
+            attributes={"odoo.version": version, "search.mode": search_mode},
+        ):
+            yield
+    finally:
+        elapsed = time.perf_counter() - start
+        SEARCH_PHASE_SECONDS.labels(
+            phase=phase, version=version or "unknown", search_mode=search_mode or "unknown"
+        ).observe(elapsed)
+
+
+def render_latest() -> str:
+    """Renderizar todas las métricas en formato de texto Prometheus."""
+    return REGISTRY.render()
@@ -0,0 +1,144 @@
+"""
+Trazas por petición para AI-OdooFinder.
+
+Cada fase medida se registra en un dict de timings (usado para la cabecera
+``Server-Timing``) y, si está configurado, como span de OpenTelemetry.
+OpenTelemetry es opcional: sin el paquete instalado o con
+``TRACING_EXPORTER=none`` los spans son no-ops.
+"""
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    from opentelemetry import trace as otel_trace
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import (
+        BatchSpanProcessor,
+        ConsoleSpanExporter,
+        SimpleSpanProcessor,
+    )
+except ImportError:  # pragma: no cover - dependencia opcional
+    otel_trace = None
+
+SERVICE_NAME = "ai-odoo-finder"
+EXPORTERS = ("none", "console", "file", "otlp")
+
+# Fases internas -> métricas de Server-Timing
+SERVER_TIMING_PHASES: Dict[str, str] = {
+    "embedding": "embed",
+    "vector_query": "db",
+    "db": "db",
+    "scoring": "score",
+    "serialization": "serialize",
+}
+SERVER_TIMING_ORDER = ("embed", "db", "score", "serialize")
+
+_tracer = None
+
+
+def setup_tracing(exporter: str = "none", file_path: Optional[str] = None) -> bool:
+    """
+    Configurar el exportador de trazas.
+
+    Args:
+        exporter: "none", "console", "file" u "otlp"
+        file_path: Fichero destino para el exportador "file" (JSON por span)
+
+    Returns:
+        True si las trazas quedaron activas
+    """
+    global _tracer
+
+    exporter = (exporter or "none").lower()
+    if exporter not in EXPORTERS:
+        logger.warning(f"Exportador de trazas desconocido '{exporter}', trazas desactivadas")
+        return False
+    if exporter == "none":
+        return False
+    if otel_trace is None:
+        logger.warning("opentelemetry-sdk no instalado, trazas desactivadas")
+        return False
+
+    provider = TracerProvider(resource=Resource.create({"service.name": SERVICE_NAME}))
+
+    if exporter == "console":
+        provider.add_span_processor(SimpleSpanProcessor(ConsoleSpanExporter(out=sys.stdout)))
+    elif exporter == "file":
+        path = Path(file_path or "data/temp/traces.jsonl")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        out = open(path, "a", encoding="utf-8")
+        provider.add_span_processor(SimpleSpanProcessor(ConsoleSpanExporter(
+            out=out,
+            formatter=lambda s: s.to_json(indent=None) + "\n",
+        )))
+    else:
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            logger.warning("opentelemetry-exporter-otlp no instalado, trazas desactivadas")
+            return False
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+
+    otel_trace.set_tracer_provider(provider)
+    _tracer = otel_trace.get_tracer(SERVICE_NAME)
+    logger.info(f"✅ Trazas OpenTelemetry activas (exporter={exporter})")
+    return True
+
+
+def span(name: str, attributes: Optional[Dict] = None):
+    """Abrir un span de OpenTelemetry, o un no-op si las trazas están desactivadas."""
+    if _tracer is None:
+        return nullcontext()
+    return _tracer.start_as_current_span(
+        name,
+        attributes={k: v for k, v in (attributes or {}).items() if v is not None},
+    )
+
+
+@contextmanager
+def timed_span(
+    timings: Dict[str, float],
+    phase: str,
+    span_name: Optional[str] = None,
+    attributes: Optional[Dict] = None,
+) -> Iterator[None]:
+    """
+    Medir una fase: acumula su duración (segundos) en ``timings[phase]``
+    y la emite como span (``span_name`` o el nombre de la fase).
+    """
+    start = time.perf_counter()
+    try:
+        with span(span_name or phase, attributes):
+            yield
+    finally:
+        timings[phase] = timings.get(phase, 0.0) + time.perf_counter() - start
+
+
+def format_server_timing(timings: Dict[str, float]) -> str:
+    """
+    Construir la cabecera Server-Timing a partir de los timings de fase.
+
+    Las fases se agrupan en embed, db, score y serialize; las duraciones
+    se expresan en milisegundos.
+
+    Example:
+        >>> format_server_timing({"embedding": 0.120, "vector_query": 0.030})
+        'embed;dur=120.0, db;dur=30.0'
+    """
+    grouped: Dict[str, float] = {}
+    for phase, seconds in timings.items():
+        metric = SERVER_TIMING_PHASES.get(phase, phase)
+        grouped[metric] = grouped.get(metric, 0.0) + seconds
+
+    ordered = [m for m in SERVER_TIMING_ORDER if m in grouped]
+    ordered += sorted(m for m in grouped if m not in SERVER_TIMING_ORDER)
+
+    return ", ".join(f"{metric};dur={grouped[metric] * 1000:.1f}" for metric in ordered)
@@ -1,14 +1,28 @@
-from fastapi import FastAPI, Depends, HTTPException, Query
+from fastapi import FastAPI, Depends, Header, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from contextlib import asynccontextmanager
 import logging
 
-from .database import get_db, init_db
+from .config import get_settings
+from .database import engine, get_db, init_db
 from .services.search_service import get_search_service
-from .models import OdooModule
+from .models import OdooModule, OdooModuleDoc
+from .services.module_docs import decode_doc
 from .mcp_tools import mcp
+from .core.telemetry import (
+    CONTENT_TYPE_LATEST,
+    REQUESTS_TOTAL,
+    observe_phase,
+    register_db_pool,
+    render_latest,
+)
+from .core.tracing import format_server_timing, setup_tracing, span, timed_span
+from .core.profiling import maybe_profile
+from .core.security import verify_token
+from .api.endpoints import webhooks
 
 # Configurar logging
 logging.basicConfig(
@@ -16,6 +30,7 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 # Crear MCP app primero (necesitamos su lifespan)
 mcp_app = mcp.http_app(path="/")  # path="/" porque montaremos en /mcp
@@ -27,6 +42,7 @@ async def lifespan(app: FastAPI):
     logger.info("🚀 Iniciando AI-OdooFinder API...")
     init_db()
     logger.info("✅ Base de datos inicializada")
+    setup_tracing(settings.tracing_exporter, settings.tracing_file_path)
 
     # Inicializar MCP lifespan
     async with mcp_app.lifespan(app):
@@ -59,6 +75,12 @@ app.add_middleware(
 app.mount("/mcp", mcp_app)
 logger.info("✅ MCP server mounted at /mcp")
 
+# Exponer uso del pool de conexiones en /metrics
+register_db_pool(engine)
+
+# Webhooks de GitHub (re-indexado incremental)
+app.include_router(webhooks.router)
+
 @app.get("/")
 async def root():
     """Endpoint raíz"""
@@ -95,6 +117,11 @@ async def health_check(db: Session = Depends(get_db)):
         logger.error(f"Health check failed: {e}")
         raise HTTPException(status_code=503, detail="Service unavailable")
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Métricas en formato Prometheus"""
+    return Response(content=render_latest(), media_type=CONTENT_TYPE_LATEST)
+
 @app.get("/search")
 @app.post("/search")
 async def search_modules(
@@ -103,6 +130,8 @@ async def search_modules(
     dependencies: Optional[List[str]] = Query(None, description="Dependencias requeridas"),
     limit: int = Query(10, ge=1, le=50, description="Número máximo de resultados"),
     min_score: int = Query(0, ge=0, le=100, description="Score mínimo (0-100)"),
+    profile: bool = Query(False, description="Perfilar esta petición (requiere X-Admin-Token)"),
+    x_admin_token: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     """
@@ -134,6 +163,8 @@ async def search_modules(
     }
     ```
     """
+    REQUESTS_TOTAL.labels(transport="http", endpoint="search").inc()
+
     try:
         logger.info(f"Búsqueda: query='{query[:50]}...', version={version}, limit={limit}")
 
@@ -144,25 +175,42 @@ async def search_modules(
                 detail=f"Versión inválida. Use: 12.0, 13.0, 14.0, 15.0, 16.0, 17.0, 18.0 o 19.0"
             )
 
+        # ?profile=1 solo para administradores
+        if profile and not verify_token(x_admin_token or ""):
+            raise HTTPException(status_code=403, detail="profile=1 requiere un X-Admin-Token válido")
+
         # Buscar
         search_service = get_search_service(db)
-        results = search_service.search(
-            query=query,
-            version=version,
-            dependencies=dependencies,
-            limit=limit,
-            min_score=min_score
-        )
+        with maybe_profile("search", force=profile) as profile_run, \
+                span("GET /search", {"odoo.version": version, "search.limit": limit}):
+            results = search_service.search(
+                query=query,
+                version=version,
+                dependencies=dependencies,
+                limit=limit,
+                min_score=min_score
+            )
 
-        logger.info(f"Retornando {len(results)} resultados")
-
-        return {
-            "query": query,
-            "version": version,
-            "dependencies": dependencies,
-            "total_results": len(results),
-            "results": results
-        }
+            logger.info(f"Retornando {len(results)} resultados")
+
+            with observe_phase(
+                search_service.last_timings,
+                "serialization",
+                version=version,
+                search_mode=search_service.search_mode,
+            ):
+                response = JSONResponse(content={
+                    "query": query,
+                    "version": version,
+                    "dependencies": dependencies,
+                    "total_results": len(results),
+                    "results": results
+                })
+
+        response.headers["Server-Timing"] = format_server_timing(search_service.last_timings)
+        if profile and profile_run.path:
+            response.headers["X-Profile-Path"] = profile_run.path
+        return response
 
     except HTTPException:
         raise
@@ -183,31 +231,50 @@ async def get_module_detail(
     GET /modules/123
     ```
     """
-    try:
-        module = db.query(OdooModule).filter(OdooModule.id == module_id).first()
-
-        if not module:
-            raise HTTPException(status_code=404, detail="Módulo no encontrado")
+    REQUESTS_TOTAL.labels(transport="http", endpoint="module_detail").inc()
 
-        return {
-            "id": module.id,
-            "technical_name": module.technical_name,
-            "name": module.name,
-            "version": module.version,
-            "summary": module.summary,
-            "description": module.description,
-            "depends": module.depends,
-            "author": module.author,
-            "license": module.license,
-            "repo_name": module.repo_name,
-            "repo_url": module.repo_url,
-            "module_path": module.module_path,
-            "github_stars": module.github_stars,
-            "github_issues_open": module.github_issues_open,
-            "last_commit_date": module.last_commit_date.isoformat() if module.last_commit_date else None,
-            "created_at": module.created_at.isoformat(),
-            "updated_at": module.updated_at.isoformat()
-        }
+    try:
+        timings = {}
+        with span("GET /modules/{module_id}", {"module.id": module_id}):
+            with timed_span(timings, "db", span_name="module.db"):
+                # Los textos largos viven en odoo_module_docs: un único JOIN
+                row = (
+                    db.query(OdooModule, OdooModuleDoc)
+                    .outerjoin(OdooModuleDoc, OdooModuleDoc.module_id == OdooModule.id)
+                    .filter(OdooModule.id == module_id)
+                    .first()
+                )
+
+            if not row:
+                raise HTTPException(status_code=404, detail="Módulo no encontrado")
+            module, docs = row
+
+            with timed_span(timings, "serialization", span_name="module.serialization"):
+                response = JSONResponse(content={
+                    "id": module.id,
+                    "technical_name": module.technical_name,
+                    "name": module.name,
+                    "version": module.version,
+                    "summary": module.summary,
+                    "description": (
+                        decode_doc(docs.description, docs.codec) if docs else module.description
+                    ),
+                    "readme": decode_doc(docs.readme, docs.codec) if docs else None,
+                    "depends": module.depends,
+                    "author": module.author,
+                    "license": module.license,
+                    "repo_name": module.repo_name,
+                    "repo_url": module.repo_url,
+                    "module_path": module.module_path,
+                    "github_stars": module.github_stars,
+                    "github_issues_open": module.github_issues_open,
+                    "last_commit_date": module.last_commit_date.isoformat() if module.last_commit_date else None,
+                    "created_at": module.created_at.isoformat(),
+                    "updated_at": module.updated_at.isoformat()
+                })
+
+        response.headers["Server-Timing"] = format_server_timing(timings)
+        return response
 
     except HTTPException:
         raise
@@ -226,12 +293,14 @@ async def get_stats(db: Session = Depends(get_db)):
     ```
     """
     try:
-        total = db.query(OdooModule).count()
+        # Solo módulos vivos (los eliminados de su rama quedan como tombstone)
+        active = db.query(OdooModule).filter(OdooModule.removed_at.is_(None))
+        total = active.count()
 
         # Por versión
         by_version = {}
         for version in ["12.0", "13.0", "14.0", "15.0", "16.0", "17.0", "18.0", "19.0"]:
-            count = db.query(OdooModule).filter(OdooModule.version == version).count()
+            count = active.filter(OdooModule.version == version).count()
             if count > 0:
                 by_version[version] = count
 
@@ -240,7 +309,7 @@ async def get_stats(db: Session = Depends(get_db)):
         by_repo = db.query(
             OdooModule.repo_name,
             func.count(OdooModule.id).label('count')
-        ).group_by(OdooModule.repo_name).order_by(func.count(OdooModule.id).desc()).limit(10).all()
+        ).filter(OdooModule.removed_at.is_(None)).group_by(OdooModule.repo_name).order_by(func.count(OdooModule.id).desc()).limit(10).all()
 
         return {
             "total_modules": total,
@@ -15,6 +15,8 @@ from sqlalchemy.orm import Session
 from .database import get_db
 from .services.search_service import get_search_service
 from .core.logging import get_logger
+from .core.telemetry import REQUESTS_TOTAL
+from .core.profiling import maybe_profile
 
 logger = get_logger(__name__)
 
@@ -45,6 +47,8 @@ async def search_odoo_modules(
     A formatted list of matching modules with their technical details,
     GitHub links, and relevance scores.
     """
+    REQUESTS_TOTAL.labels(transport="mcp", endpoint="search").inc()
+
     try:
         # Validaciones
         if not query or not query.strip():
@@ -62,22 +66,23 @@ async def search_odoo_modules(
         db: Session = next(get_db())
 
         try:
-            # Llamar al servicio de búsqueda directamente (NO HTTP)
-            search_service = get_search_service(db)
-            results = search_service.search(
-                query=query,
-                version=version,
-                dependencies=dependencies,
-                limit=limit,
-                min_score=0
-            )
-
-            if not results:
-                return f"🔍 No modules found for query '{query}' in Odoo {version}\n\nTry:\n- Broadening your search terms\n- Checking a different Odoo version\n- Removing dependency filters"
-
-            # Formatear resultados para Claude
-            formatted_output = _format_results_for_claude(results, query, version)
-            return formatted_output
+            with maybe_profile("mcp_search"):
+                # Llamar al servicio de búsqueda directamente (NO HTTP)
+                search_service = get_search_service(db)
+                results = search_service.search(
+                    query=query,
+                    version=version,
+                    dependencies=dependencies,
+                    limit=limit,
+                    min_score=0
+                )
+
+                if not results:
+                    return f"🔍 No modules found for query '{query}' in Odoo {version}\n\nTry:\n- Broadening your search terms\n- Checking a different Odoo version\n- Removing dependency filters"
+
+                # Formatear resultados para Claude
+                formatted_output = _format_results_for_claude(results, query, version)
+                return formatted_output
 
         finally:
             db.close()
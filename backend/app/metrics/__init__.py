@@ -1,6 +1,24 @@
 """
 Módulo de métricas de Information Retrieval para benchmarking.
 """
-from .benchmark_metrics import MetricsCalculator, IRMetrics, ReportAggregator
+from .benchmark_metrics import (
+    MetricsCalculator,
+    IRMetrics,
+    ReportAggregator,
+    load_benchmark_queries,
+)
+from .batch_metrics import BatchMetricsEngine, bootstrap_ci, paired_test
+from .performance import percentile, summarize_latencies, summarize_phases
 
-__all__ = ["MetricsCalculator", "IRMetrics", "ReportAggregator"]
+__all__ = [
+    "MetricsCalculator",
+    "IRMetrics",
+    "ReportAggregator",
+    "load_benchmark_queries",
+    "BatchMetricsEngine",
+    "bootstrap_ci",
+    "paired_test",
+    "percentile",
+    "summarize_latencies",
+    "summarize_phases",
+]
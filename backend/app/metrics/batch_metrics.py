@@ -0,0 +1,282 @@
+"""
+Motor de métricas IR por lotes (NumPy).
+
+Evalúa miles de queries a la vez: los módulos retornados y esperados se
+codifican como matrices de ids enteros y P@k, R@k, MRR y NDCG@k se calculan
+con operaciones vectorizadas en lugar de bucles Python por query.
+
+Incluye además:
+- Intervalos de confianza bootstrap de la media de cada métrica
+- Test pareado de significancia (randomización por cambio de signo) entre
+  dos ejecuciones sobre las mismas queries
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Padding de las matrices de ids: distintos para que nunca coincidan entre sí
+RETRIEVED_PAD = -1
+EXPECTED_PAD = -2
+
+DEFAULT_METRICS = ("precision@3", "precision@5", "recall@10", "mrr", "ndcg@10")
+
+
+class BatchMetricsEngine:
+    """
+    Calcula métricas IR para un lote de queries.
+
+    Args:
+        retrieved: Lista (por query) de módulos retornados, en orden
+        expected: Lista (por query) de módulos relevantes
+
+    Example:
+        >>> engine = BatchMetricsEngine([["A", "B"], ["C"]], [["A"], ["X"]])
+        >>> engine.precision_at_k(1).tolist()
+        [1.0, 0.0]
+    """
+
+    def __init__(self, retrieved: Sequence[Sequence[str]], expected: Sequence[Sequence[str]]):
+        if len(retrieved) != len(expected):
+            raise ValueError(
+                f"retrieved ({len(retrieved)}) y expected ({len(expected)}) deben tener la misma longitud"
+            )
+
+        vocabulary: Dict[str, int] = {}
+        self.retrieved_ids = self._encode(retrieved, vocabulary, RETRIEVED_PAD)
+        self.expected_ids = self._encode(expected, vocabulary, EXPECTED_PAD)
+
+        # Tamaño del conjunto relevante (sin duplicados) y de la lista original
+        self.n_relevant = np.array([len(set(e)) for e in expected], dtype=np.int64)
+        self.n_expected = np.array([len(e) for e in expected], dtype=np.int64)
+
+        # rel[q, i] = el documento en la posición i de la query q es relevante
+        self.relevance = (
+            self.retrieved_ids[:, :, None] == self.expected_ids[:, None, :]
+        ).any(axis=2)
+
+    @staticmethod
+    def _encode(lists: Sequence[Sequence[str]], vocabulary: Dict[str, int], pad: int) -> np.ndarray:
+        """Codifica listas de strings como matriz (n_queries, max_len) de ids."""
+        width = max((len(items) for items in lists), default=0)
+        matrix = np.full((len(lists), max(width, 1)), pad, dtype=np.int64)
+        for row, items in enumerate(lists):
+            for col, item in enumerate(items):
+                matrix[row, col] = vocabulary.setdefault(item, len(vocabulary))
+        return matrix
+
+    def __len__(self) -> int:
+        return len(self.n_expected)
+
+    def _top_k(self, k: int) -> np.ndarray:
+        """Relevancia de las k primeras posiciones (rellena con False si faltan)."""
+        rel = self.relevance[:, :k]
+        if rel.shape[1] < k:
+            rel = np.pad(rel, ((0, 0), (0, k - rel.shape[1])))
+        return rel
+
+    def precision_at_k(self, k: int) -> np.ndarray:
+        """P@k por query (duplicados en retrieved cuentan cada vez)."""
+        if k <= 0:
+            return np.zeros(len(self))
+        return self._top_k(k).sum(axis=1) / k
+
+    def recall_at_k(self, k: int) -> np.ndarray:
+        """R@k por query: fracción de expected encontrados en el top-k."""
+        if k <= 0:
+            return np.zeros(len(self))
+        top_k = self.retrieved_ids[:, :k]
+        found = (self.expected_ids[:, :, None] == top_k[:, None, :]).any(axis=2)
+        found_count = found.sum(axis=1)
+        return np.divide(
+            found_count, self.n_expected,
+            out=np.zeros(len(self)), where=self.n_expected > 0,
+        )
+
+    def mrr(self) -> np.ndarray:
+        """Reciprocal rank por query (0 si no hay relevantes)."""
+        has_relevant = self.relevance.any(axis=1)
+        first = self.relevance.argmax(axis=1) + 1
+        return np.where(has_relevant, 1.0 / first, 0.0)
+
+    def ndcg_at_k(self, k: int) -> np.ndarray:
+        """NDCG@k por query con relevancia binaria."""
+        if k <= 0:
+            return np.zeros(len(self))
+        discounts = 1.0 / np.log2(np.arange(2, k + 2))
+        dcg = self._top_k(k) @ discounts
+
+        ideal_hits = np.minimum(self.n_relevant, k)
+        ideal = np.concatenate(([0.0], np.cumsum(discounts)))[ideal_hits]
+        ndcg = np.divide(dcg, ideal, out=np.zeros(len(self)), where=ideal > 0)
+        return np.minimum(ndcg, 1.0)
+
+    def metric(self, name: str) -> np.ndarray:
+        """
+        Devuelve una métrica por nombre ("precision@3", "recall@10", "mrr", "ndcg@10"...).
+        """
+        if name == "mrr":
+            return self.mrr()
+
+        base, _, k = name.partition("@")
+        functions = {
+            "precision": self.precision_at_k,
+            "recall": self.recall_at_k,
+            "ndcg": self.ndcg_at_k,
+        }
+        if base not in functions or not k.isdigit():
+            raise ValueError(f"Métrica desconocida: {name}")
+        return functions[base](int(k))
+
+    def compute(self, metrics: Sequence[str] = DEFAULT_METRICS) -> Dict[str, np.ndarray]:
+        """Calcula varias métricas por query: {nombre: array (n_queries,)}."""
+        return {name: self.metric(name) for name in metrics}
+
+    @classmethod
+    def from_detailed_results(cls, detailed_results: List[Dict]) -> "BatchMetricsEngine":
+        """Construye el motor desde los detailed_results de un reporte del benchmark."""
+        return cls(
+            [r["returned_modules"] for r in detailed_results],
+            [r["expected_modules"] for r in detailed_results],
+        )
+
+
+def bootstrap_ci(
+    values: Sequence[float],
+    n_resamples: int = 10000,
+    confidence: float = 0.95,
+    seed: Optional[int] = 0,
+) -> Dict[str, float]:
+    """
+    Intervalo de confianza bootstrap (percentil) de la media.
+
+    Args:
+        values: Valor de la métrica por query
+        n_resamples: Número de remuestreos
+        confidence: Nivel de confianza (0-1)
+        seed: Semilla para resultados reproducibles
+
+    Returns:
+        Dict con mean, low y high
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.size == 0:
+        return {"mean": 0.0, "low": 0.0, "high": 0.0}
+
+    rng = np.random.default_rng(seed)
+    means = _resample_means(values, n_resamples, rng)
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(means, [alpha, 1 - alpha])
+    return {"mean": float(values.mean()), "low": float(low), "high": float(high)}
+
+
+def _resample_means(values: np.ndarray, n_resamples: int, rng, chunk: int = 1000) -> np.ndarray:
+    """Medias de remuestreos con reemplazo, por bloques para acotar memoria."""
+    means = np.empty(n_resamples)
+    for start in range(0, n_resamples, chunk):
+        size = min(chunk, n_resamples - start)
+        idx = rng.integers(0, values.size, size=(size, values.size))
+        means[start:start + size] = values[idx].mean(axis=1)
+    return means
+
+
+def paired_test(
+    baseline: Sequence[float],
+    candidate: Sequence[float],
+    n_resamples: int = 10000,
+    confidence: float = 0.95,
+    seed: Optional[int] = 0,
+) -> Dict[str, float]:
+    """
+    Test pareado de randomización (cambio de signo) sobre las diferencias.
+
+    Bajo la hipótesis nula las dos ejecuciones son intercambiables por query,
+    así que el signo de cada diferencia es aleatorio.
+
+    Args:
+        baseline: Métrica por query de la ejecución de referencia
+        candidate: Métrica por query de la ejecución a evaluar (mismo orden)
+
+    Returns:
+        Dict con baseline, candidate, delta, p_value, ci_low y ci_high (del delta)
+    """
+    a = np.asarray(baseline, dtype=np.float64)
+    b = np.asarray(candidate, dtype=np.float64)
+    if a.shape != b.shape:
+        raise ValueError("Las ejecuciones deben tener las mismas queries")
+    if a.size == 0:
+        return {"baseline": 0.0, "candidate": 0.0, "delta": 0.0,
+                "p_value": 1.0, "ci_low": 0.0, "ci_high": 0.0}
+
+    diff = b - a
+    observed = diff.mean()
+
+    rng = np.random.default_rng(seed)
+    extreme = 0
+    for start in range(0, n_resamples, 1000):
+        size = min(1000, n_resamples - start)
+        signs = rng.choice((-1.0, 1.0), size=(size, diff.size))
+        null = (signs * diff).mean(axis=1)
+        extreme += int((np.abs(null) >= abs(observed) - 1e-12).sum())
+    p_value = (extreme + 1) / (n_resamples + 1)
+
+    ci = bootstrap_ci(diff, n_resamples=n_resamples, confidence=confidence, seed=seed)
+    return {
+        "baseline": float(a.mean()),
+        "candidate": float(b.mean()),
+        "delta": float(observed),
+        "p_value": float(p_value),
+        "ci_low": ci["low"],
+        "ci_high": ci["high"],
+    }
+
+
+def align_runs(
+    baseline_results: List[Dict],
+    candidate_results: List[Dict],
+) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Empareja los detailed_results de dos ejecuciones por query_id.
+
+    Solo se conservan las queries válidas (sin error) en ambas ejecuciones.
+    """
+    candidate_by_id = {r["query_id"]: r for r in candidate_results if not r.get("error")}
+    pairs = [
+        (r, candidate_by_id[r["query_id"]])
+        for r in baseline_results
+        if not r.get("error") and r["query_id"] in candidate_by_id
+    ]
+    return [a for a, _ in pairs], [b for _, b in pairs]
+
+
+def compare_reports(
+    baseline_report: Dict,
+    candidate_report: Dict,
+    metrics: Sequence[str] = DEFAULT_METRICS,
+    n_resamples: int = 10000,
+    seed: Optional[int] = 0,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Compara dos reportes del benchmark query a query.
+
+    Las métricas se recalculan desde returned_modules/expected_modules, así que
+    sirve también para reportes antiguos sin ndcg@10.
+
+    Returns:
+        Dict {métrica: resultado de paired_test} (más "queries": n emparejadas)
+    """
+    baseline, candidate = align_runs(
+        baseline_report.get("detailed_results", []),
+        candidate_report.get("detailed_results", []),
+    )
+    baseline_metrics = BatchMetricsEngine.from_detailed_results(baseline).compute(metrics)
+    candidate_metrics = BatchMetricsEngine.from_detailed_results(candidate).compute(metrics)
+
+    comparison: Dict[str, Dict[str, float]] = {
+        name: paired_test(
+            baseline_metrics[name], candidate_metrics[name],
+            n_resamples=n_resamples, seed=seed,
+        )
+        for name in metrics
+    }
+    comparison["queries"] = {"count": len(baseline)}
+    return comparison
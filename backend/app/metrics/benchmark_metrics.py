@@ -6,12 +6,30 @@ de los resultados de búsqueda:
 - Precision@k: Fracción de resultados relevantes en top K
 - Recall@k: Fracción de esperados encontrados en top K
 - MRR: Mean Reciprocal Rank - posición del primer resultado relevante
+- NDCG@k: Normalized Discounted Cumulative Gain (relevancia binaria)
 """
+import json
+import math
 from typing import List, Dict, Optional
 from dataclasses import dataclass
 from statistics import mean, median
 from collections import defaultdict
 
+DEFAULT_QUERIES_PATH = "tests/benchmark_queries.json"
+
+
+def load_benchmark_queries(filepath: str = DEFAULT_QUERIES_PATH) -> List[Dict]:
+    """
+    Carga las queries del benchmark (clave ``benchmark_queries`` del JSON).
+
+    Raises:
+        FileNotFoundError: Si archivo no existe
+        json.JSONDecodeError: Si JSON inválido
+    """
+    with open(filepath, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return data["benchmark_queries"]
+
 
 @dataclass
 class IRMetrics:
@@ -62,8 +80,8 @@ class MetricsCalculator:
         if not retrieved or k == 0:
             return 0.0
 
-        top_k = retrieved[:k]
-        relevant_count = sum(1 for mod in top_k if mod in expected)
+        expected_set = set(expected)
+        relevant_count = sum(1 for mod in retrieved[:k] if mod in expected_set)
 
         return relevant_count / k
 
@@ -99,7 +117,7 @@ class MetricsCalculator:
         if not expected:
             return 0.0
 
-        top_k = retrieved[:k]
+        top_k = set(retrieved[:k])
         found_count = sum(1 for exp in expected if exp in top_k)
 
         return found_count / len(expected)
@@ -127,12 +145,56 @@ class MetricsCalculator:
             ... )
             0.333
         """
+        expected_set = set(expected)
         for i, module in enumerate(retrieved, start=1):
-            if module in expected:
+            if module in expected_set:
                 return 1.0 / i
 
         return 0.0
 
+    @staticmethod
+    def ndcg_at_k(
+        retrieved: List[str],
+        expected: List[str],
+        k: int
+    ) -> float:
+        """
+        Calcula NDCG@k con relevancia binaria.
+
+        Formula: NDCG@k = DCG@k / IDCG@k, con DCG@k = Σ rel_i / log2(i + 1)
+
+        Mide: ¿Están los relevantes en las primeras posiciones?
+
+        Args:
+            retrieved: Documentos retornados (ordenados)
+            expected: Documentos relevantes
+            k: Cutoff para evaluación
+
+        Returns:
+            NDCG en [0, 1]
+
+        Example:
+            >>> MetricsCalculator.ndcg_at_k(
+            ...     retrieved=["B", "A"],
+            ...     expected=["A"],
+            ...     k=10
+            ... )
+            0.631
+        """
+        expected_set = set(expected)
+        if not expected_set or k == 0:
+            return 0.0
+
+        dcg = sum(
+            1.0 / math.log2(i + 1)
+            for i, doc in enumerate(retrieved[:k], start=1)
+            if doc in expected_set
+        )
+        ideal_hits = min(len(expected_set), k)
+        idcg = sum(1.0 / math.log2(i + 1) for i in range(1, ideal_hits + 1))
+
+        return min(1.0, dcg / idcg)
+
     @staticmethod
     def count_hits(retrieved: List[str], expected: List[str]) -> int:
         """
@@ -145,7 +207,8 @@ class MetricsCalculator:
         Returns:
             Número de hits
         """
-        return sum(1 for doc in retrieved if doc in expected)
+        expected_set = set(expected)
+        return sum(1 for doc in retrieved if doc in expected_set)
 
     @staticmethod
     def first_relevant_position(
@@ -162,8 +225,9 @@ class MetricsCalculator:
         Returns:
             Posición (1-based) o None si no hay relevantes
         """
+        expected_set = set(expected)
         for i, doc in enumerate(retrieved, start=1):
-            if doc in expected:
+            if doc in expected_set:
                 return i
         return None
 
@@ -197,6 +261,7 @@ class MetricsCalculator:
             precision_at_5=MetricsCalculator.precision_at_k(retrieved, expected, k=5),
             recall_at_10=MetricsCalculator.recall_at_k(retrieved, expected, k=10),
             mrr=MetricsCalculator.mrr(retrieved, expected),
+            ndcg_at_10=MetricsCalculator.ndcg_at_k(retrieved, expected, k=10),
             hits_in_top_3=MetricsCalculator.count_hits(retrieved[:3], expected),
             hits_in_top_5=MetricsCalculator.count_hits(retrieved[:5], expected),
             first_relevant_position=MetricsCalculator.first_relevant_position(retrieved, expected)
@@ -227,7 +292,7 @@ class ReportAggregator:
                 "median_mrr": 0.0
             }
 
-        return {
+        aggregate = {
             "precision@3": mean(r.precision_at_3 for r in results),
             "precision@5": mean(r.precision_at_5 for r in results),
             "recall@10": mean(r.recall_at_10 for r in results),
@@ -235,6 +300,10 @@ class ReportAggregator:
             "median_precision@3": median(r.precision_at_3 for r in results),
             "median_mrr": median(r.mrr for r in results)
         }
+        if all(r.ndcg_at_10 is not None for r in results):
+            aggregate["ndcg@10"] = mean(r.ndcg_at_10 for r in results)
+
+        return aggregate
 
     @staticmethod
     def group_by_category(
@@ -264,31 +333,51 @@ class ReportAggregator:
         }
 
     @staticmethod
-    def group_by_difficulty(
-        detailed_results: List[Dict]
+    def group_by_field(
+        detailed_results: List[Dict],
+        field: str
     ) -> Dict[str, Dict]:
         """
-        Agrupa métricas por dificultad.
+        Agrupa métricas por un campo de la query (category, difficulty...).
 
         Args:
-            detailed_results: Resultados detallados con campo 'difficulty'
+            detailed_results: Resultados detallados con el campo indicado
+            field: Campo por el que agrupar
 
         Returns:
-            Dict {difficulty: {metrics}}
+            Dict {valor: {count, precision@3, precision@5, recall@10, mrr[, ndcg@10]}}
         """
-        difficulty_results = defaultdict(list)
+        grouped_results = defaultdict(list)
 
         for result in detailed_results:
-            difficulty = result['difficulty']
-            difficulty_results[difficulty].append(result['metrics'])
+            grouped_results[result[field]].append(result['metrics'])
 
-        return {
-            difficulty: {
+        grouped = {}
+        for value, metrics_list in grouped_results.items():
+            summary = {
                 'count': len(metrics_list),
                 'precision@3': mean(m['precision@3'] for m in metrics_list),
                 'precision@5': mean(m['precision@5'] for m in metrics_list),
                 'recall@10': mean(m['recall@10'] for m in metrics_list),
                 'mrr': mean(m['mrr'] for m in metrics_list)
             }
-            for difficulty, metrics_list in difficulty_results.items()
-        }
+            if all('ndcg@10' in m for m in metrics_list):
+                summary['ndcg@10'] = mean(m['ndcg@10'] for m in metrics_list)
+            grouped[value] = summary
+
+        return grouped
+
+    @staticmethod
+    def group_by_difficulty(
+        detailed_results: List[Dict]
+    ) -> Dict[str, Dict]:
+        """
+        Agrupa métricas por dificultad.
+
+        Args:
+            detailed_results: Resultados detallados con campo 'difficulty'
+
+        Returns:
+            Dict {difficulty: {metrics}}
+        """
+        return ReportAggregator.group_by_field(detailed_results, 'difficulty')
@@ -0,0 +1,258 @@
+"""
+Histórico persistente de ejecuciones del benchmark.
+
+Cada ejecución guarda sus métricas agregadas, percentiles de latencia y la
+revisión git en un fichero SQLite (por defecto ``tests/results/history.sqlite``),
+de forma que se pueda comparar una ejecución con las N anteriores y detectar
+regresiones de relevancia o de latencia (SPEC-402).
+"""
+import json
+import sqlite3
+import subprocess
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from statistics import mean, median
+from typing import Dict, Iterator, List, Optional
+
+# Métricas de relevancia: más alto es mejor
+RELEVANCE_METRICS = ("precision@3", "precision@5", "recall@10", "mrr", "ndcg@10")
+# Latencias (ms): más bajo es mejor -> (sección, percentil)
+LATENCY_METRICS = (
+    ("engine", "p50"),
+    ("engine", "p95"),
+    ("execution", "p95"),
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    git_revision TEXT,
+    git_dirty INTEGER NOT NULL DEFAULT 0,
+    search_mode TEXT,
+    embeddings TEXT,
+    workers INTEGER,
+    total_queries INTEGER,
+    failed_queries INTEGER,
+    report_path TEXT,
+    aggregate_metrics TEXT NOT NULL,
+    latency_ms TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS run_metrics (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (run_id, name)
+);
+"""
+
+
+@dataclass
+class Regression:
+    """Una métrica que empeora respecto a las ejecuciones anteriores."""
+
+    metric: str
+    current: float
+    baseline: float
+    threshold: float
+    kind: str  # "relevance" | "latency"
+
+    def describe(self) -> str:
+        if self.kind == "relevance":
+            return (f"{self.metric}: {self.current:.3f} < baseline {self.baseline:.3f} "
+                    f"(tolerancia {self.threshold:.3f})")
+        return (f"{self.metric}: {self.current:.1f}ms > baseline {self.baseline:.1f}ms "
+                f"(+{self.threshold:.0%} permitido)")
+
+
+def get_git_revision(cwd: Optional[str] = None) -> Dict:
+    """
+    Obtiene la revisión git actual.
+
+    Returns:
+        Dict con revision (sha o None) y dirty (cambios sin commitear)
+    """
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=cwd, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=cwd, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        return {"revision": revision, "dirty": bool(status)}
+    except (OSError, subprocess.CalledProcessError):
+        return {"revision": None, "dirty": False}
+
+
+def flatten_report_metrics(report: Dict) -> Dict[str, float]:
+    """
+    Aplana las métricas comparables de un reporte.
+
+    Returns:
+        Dict {nombre: valor}, ej: {"precision@3": 0.4, "latency.engine.p95": 120.0}
+    """
+    flat: Dict[str, float] = {}
+    for name, value in report.get("aggregate_metrics", {}).items():
+        if isinstance(value, (int, float)):
+            flat[name] = float(value)
+    for section, summary in report.get("latency_ms", {}).items():
+        for key, value in summary.items():
+            if key != "count" and isinstance(value, (int, float)):
+                flat[f"latency.{section}.{key}"] = float(value)
+    return flat
+
+
+class BenchmarkHistory:
+    """Almacén SQLite de ejecuciones del benchmark."""
+
+    def __init__(self, path: str = "tests/results/history.sqlite"):
+        self.path = path
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def append(
+        self,
+        report: Dict,
+        git: Optional[Dict] = None,
+        report_path: Optional[str] = None,
+    ) -> int:
+        """
+        Añade una ejecución al histórico.
+
+        Args:
+            report: Reporte generado por BenchmarkRunner
+            git: Resultado de get_git_revision() (se calcula si es None)
+            report_path: Ruta del JSON de la ejecución
+
+        Returns:
+            id de la ejecución
+        """
+        git = git if git is not None else get_git_revision()
+        metadata = report.get("metadata", {})
+
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """
+                INSERT INTO runs (
+                    timestamp, git_revision, git_dirty, search_mode, embeddings, workers,
+                    total_queries, failed_queries, report_path, aggregate_metrics, latency_ms
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    metadata.get("timestamp", datetime.now().isoformat()),
+                    git.get("revision"),
+                    int(bool(git.get("dirty"))),
+                    metadata.get("search_mode"),
+                    metadata.get("embeddings"),
+                    metadata.get("workers"),
+                    metadata.get("total_queries"),
+                    metadata.get("failed_queries"),
+                    report_path,
+                    json.dumps(report.get("aggregate_metrics", {})),
+                    json.dumps(report.get("latency_ms", {})),
+                ),
+            )
+            run_id = cursor.lastrowid
+            conn.executemany(
+                "INSERT INTO run_metrics (run_id, name, value) VALUES (?, ?, ?)",
+                [(run_id, name, value) for name, value in flatten_report_metrics(report).items()],
+            )
+        return run_id
+
+    def recent(self, n: int = 5, before_id: Optional[int] = None) -> List[Dict]:
+        """
+        Devuelve las últimas n ejecuciones (más reciente primero).
+
+        Args:
+            n: Número de ejecuciones
+            before_id: Solo ejecuciones anteriores a este id
+        """
+        query = "SELECT * FROM runs"
+        params: List = []
+        if before_id is not None:
+            query += " WHERE id < ?"
+            params.append(before_id)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(n)
+
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+            runs = []
+            for row in rows:
+                run = dict(row)
+                run["aggregate_metrics"] = json.loads(run["aggregate_metrics"])
+                run["latency_ms"] = json.loads(run["latency_ms"])
+                run["metrics"] = {
+                    m["name"]: m["value"]
+                    for m in conn.execute(
+                        "SELECT name, value FROM run_metrics WHERE run_id = ?", (run["id"],)
+                    )
+                }
+                runs.append(run)
+        return runs
+
+    def latest(self) -> Optional[Dict]:
+        runs = self.recent(1)
+        return runs[0] if runs else None
+
+
+def compare_runs(
+    current: Dict[str, float],
+    previous: List[Dict[str, float]],
+    relevance_tolerance: float = 0.02,
+    latency_tolerance: float = 0.20,
+) -> List[Regression]:
+    """
+    Compara una ejecución con las anteriores.
+
+    Relevancia: regresión si el valor actual cae más de ``relevance_tolerance``
+    (absoluto) por debajo de la media de las ejecuciones anteriores.
+    Latencia: regresión si supera la mediana anterior en más de
+    ``latency_tolerance`` (relativo).
+
+    Args:
+        current: Métricas aplanadas de la ejecución actual
+        previous: Métricas aplanadas de las ejecuciones anteriores
+
+    Returns:
+        Lista de regresiones (vacía si no hay)
+    """
+    regressions: List[Regression] = []
+    if not previous:
+        return regressions
+
+    for metric in RELEVANCE_METRICS:
+        history = [p[metric] for p in previous if metric in p]
+        if metric not in current or not history:
+            continue
+        baseline = mean(history)
+        if current[metric] < baseline - relevance_tolerance:
+            regressions.append(
+                Regression(metric, current[metric], baseline, relevance_tolerance, "relevance")
+            )
+
+    for section, key in LATENCY_METRICS:
+        metric = f"latency.{section}.{key}"
+        history = [p[metric] for p in previous if metric in p]
+        if metric not in current or not history:
+            continue
+        baseline = median(history)
+        if baseline > 0 and current[metric] > baseline * (1 + latency_tolerance):
+            regressions.append(
+                Regression(metric, current[metric], baseline, latency_tolerance, "latency")
+            )
+
+    return regressions
@@ -0,0 +1,156 @@
+"""
+Módulo de métricas de rendimiento (latencia y throughput).
+
+Utilidades compartidas por los benchmarks de carga y de relevancia:
+- Percentiles con interpolación lineal
+- Resumen de latencias (p50/p90/p95/p99)
+- Parseo de cabeceras Server-Timing
+- Frontera de Pareto (ej: recall vs latencia en barridos de índices ANN)
+"""
+import math
+from typing import Dict, List, Optional, Sequence
+
+
+def percentile(values: Sequence[float], p: float) -> float:
+    """
+    Calcula el percentil p (0-100) con interpolación lineal.
+
+    Args:
+        values: Muestras (no necesitan estar ordenadas)
+        p: Percentil en [0, 100]
+
+    Returns:
+        Valor del percentil (0.0 si no hay muestras)
+
+    Example:
+        >>> percentile([10, 20, 30, 40], 50)
+        25.0
+    """
+    if not values:
+        return 0.0
+    if not 0 <= p <= 100:
+        raise ValueError(f"Percentil fuera de rango: {p}")
+
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    if lower == upper:
+        return float(ordered[lower])
+    weight = rank - lower
+    return float(ordered[lower] * (1 - weight) + ordered[upper] * weight)
+
+
+def summarize_latencies(values_ms: Sequence[float]) -> Dict[str, float]:
+    """
+    Resume una serie de latencias en milisegundos.
+
+    Args:
+        values_ms: Latencias en ms
+
+    Returns:
+        Dict con count, mean, min, p50, p90, p95, p99 y max
+    """
+    if not values_ms:
+        return {
+            "count": 0,
+            "mean": 0.0,
+            "min": 0.0,
+            "p50": 0.0,
+            "p90": 0.0,
+            "p95": 0.0,
+            "p99": 0.0,
+            "max": 0.0,
+        }
+
+    return {
+        "count": len(values_ms),
+        "mean": sum(values_ms) / len(values_ms),
+        "min": float(min(values_ms)),
+        "p50": percentile(values_ms, 50),
+        "p90": percentile(values_ms, 90),
+        "p95": percentile(values_ms, 95),
+        "p99": percentile(values_ms, 99),
+        "max": float(max(values_ms)),
+    }
+
+
+def summarize_phases(phase_samples: List[Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    """
+    Resume latencias por fase a partir de una lista de timings por petición.
+
+    Args:
+        phase_samples: Lista de dicts {fase: ms}
+
+    Returns:
+        Dict {fase: resumen de latencias}
+    """
+    by_phase: Dict[str, List[float]] = {}
+    for sample in phase_samples:
+        for phase, value in sample.items():
+            by_phase.setdefault(phase, []).append(value)
+
+    return {phase: summarize_latencies(values) for phase, values in sorted(by_phase.items())}
+
+
+def parse_server_timing(header: Optional[str]) -> Dict[str, float]:
+    """
+    Parsea una cabecera Server-Timing a {métrica: ms}.
+
+    Example:
+        >>> parse_server_timing("embed;dur=120.0, db;dur=30.5")
+        {'embed': 120.0, 'db': 30.5}
+    """
+    timings: Dict[str, float] = {}
+    if not header:
+        return timings
+
+    for entry in header.split(","):
+        parts = [part.strip() for part in entry.split(";")]
+        name = parts[0]
+        if not name:
+            continue
+        for param in parts[1:]:
+            key, _, value = param.partition("=")
+            if key.strip() == "dur":
+                try:
+                    timings[name] = float(value)
+                except ValueError:
+                    pass
+    return timings
+
+
+def pareto_frontier(
+    points: List[Dict],
+    maximize: str,
+    minimize: str,
+) -> List[Dict]:
+    """
+    Devuelve los puntos no dominados (frontera de Pareto).
+
+    Un punto domina a otro si es al menos igual de bueno en ambos ejes y
+    estrictamente mejor en uno.
+
+    Args:
+        points: Lista de dicts con las dos métricas
+        maximize: Clave a maximizar (ej: "recall@10")
+        minimize: Clave a minimizar (ej: "p99_ms")
+
+    Returns:
+        Puntos de la frontera ordenados por ``minimize`` ascendente
+
+    Example:
+        >>> pareto_frontier(
+        ...     [{"r": 0.9, "ms": 5}, {"r": 0.8, "ms": 6}, {"r": 0.99, "ms": 9}],
+        ...     maximize="r", minimize="ms",
+        ... )
+        [{'r': 0.9, 'ms': 5}, {'r': 0.99, 'ms': 9}]
+    """
+    ordered = sorted(points, key=lambda p: (p[minimize], -p[maximize]))
+    frontier: List[Dict] = []
+    best = -math.inf
+    for point in ordered:
+        if point[maximize] > best:
+            frontier.append(point)
+            best = point[maximize]
+    return frontier
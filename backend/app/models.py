@@ -1,7 +1,20 @@
 from datetime import datetime
 
 from pgvector.sqlalchemy import Vector
-from sqlalchemy import ARRAY, Column, DateTime, Integer, String, Text
+from sqlalchemy import (
+    ARRAY,
+    Column,
+    JSON,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    UniqueConstraint,
+    text,
+)
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -9,6 +22,11 @@ Base = declarative_base()
 
 class OdooModule(Base):
     __tablename__ = "odoo_modules"
+    __table_args__ = (
+        UniqueConstraint(
+            "technical_name", "version", "repo_name", name="uq_odoo_modules_name_version_repo"
+        ),
+    )
 
     # Identificadores
     id = Column(Integer, primary_key=True, index=True)
@@ -21,10 +39,9 @@ class OdooModule(Base):
     author = Column(String)
     license = Column(String, default="AGPL-3")
 
-    # Descripciones
+    # Descripciones (los textos completos están en odoo_module_docs)
     summary = Column(String)
-    description = Column(Text)
-    readme = Column(Text)  # Contenido del README.md/README.rst
+    description = Column(Text)  # extracto; la descripción completa está en OdooModuleDoc
 
     # GitHub info
     repo_name = Column(String, nullable=False)
@@ -36,6 +53,12 @@ class OdooModule(Base):
     github_issues_open = Column(Integer, default=0)
     last_commit_date = Column(DateTime)
 
+    # Estado incremental del ETL (SHAs de git)
+    manifest_sha = Column(String(40))
+    readme_sha = Column(String(40))
+    source_commit = Column(String(40))  # commit de cabeza de la rama indexada
+    removed_at = Column(DateTime, index=True)  # tombstone: ya no existe en la rama
+
     # Embedding (vector de 2560 dimensiones para Qwen3-Embedding 4B)
     embedding = Column(Vector(2560))
 
@@ -47,3 +70,120 @@ class OdooModule(Base):
         return f"<OdooModule {self.technical_name} v{self.version}>"
 
 
+class OdooModuleDoc(Base):
+    """
+    Textos largos de un módulo (descripción completa y README), fuera de la
+    tabla que recorre la búsqueda. Solo los lee el detalle de un módulo.
+    """
+
+    __tablename__ = "odoo_module_docs"
+
+    module_id = Column(Integer, ForeignKey("odoo_modules.id", ondelete="CASCADE"), primary_key=True)
+    codec = Column(String(8), nullable=False, default="none")  # none | zstd
+    description = Column(LargeBinary)  # UTF-8, comprimido según codec
+    readme = Column(LargeBinary)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<OdooModuleDoc {self.module_id} {self.codec}>"
+
+
+class EmbeddingCacheEntry(Base):
+    """Embedding cacheado por sha256(modelo + texto normalizado)."""
+
+    __tablename__ = "embedding_cache"
+
+    key = Column(String(64), primary_key=True)
+    model = Column(String, nullable=False)
+    dimensions = Column(Integer, nullable=False)
+    embedding = Column(LargeBinary, nullable=False)  # float32 little-endian
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<EmbeddingCacheEntry {self.key[:12]} {self.model}>"
+
+
+class ReindexJob(Base):
+    """
+    Trabajo de re-indexado encolado por el webhook de GitHub.
+
+    ``technical_name`` es el módulo afectado, o ``*`` para toda la rama. Solo
+    puede haber un trabajo pendiente por (repo, versión, módulo): los
+    duplicados se fusionan al encolar.
+    """
+
+    __tablename__ = "reindex_jobs"
+    __table_args__ = (
+        Index(
+            "uq_reindex_jobs_pending",
+            "repo_name", "version", "technical_name",
+            unique=True,
+            postgresql_where=text("status = 'pending'"),
+            sqlite_where=text("status = 'pending'"),
+        ),
+        Index("ix_reindex_jobs_status_id", "status", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    repo_name = Column(String, nullable=False)
+    version = Column(String, nullable=False)
+    technical_name = Column(String, nullable=False)
+    commit = Column(String(40))  # último commit del push que lo encoló
+    status = Column(String(16), nullable=False, default="pending")  # pending | running | done | failed
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    locked_at = Column(DateTime)
+
+    def __repr__(self):
+        return f"<ReindexJob {self.repo_name}@{self.version}:{self.technical_name} {self.status}>"
+
+
+class EtlRun(Base):
+    """Una ejecución del ETL; sus tareas forman el ledger para reanudarla."""
+
+    __tablename__ = "etl_runs"
+
+    id = Column(Integer, primary_key=True)
+    status = Column(String(16), nullable=False, default="running")  # running | done | failed
+    options = Column(JSON)  # repos, versiones, fuente y --full con que se lanzó
+    started_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime)
+
+    def __repr__(self):
+        return f"<EtlRun #{self.id} {self.status}>"
+
+
+class EtlTask(Base):
+    """
+    Progreso de una ejecución del ETL por (repo, versión, módulo).
+
+    ``technical_name`` es ``*`` para la tarea de la rama (descubrir sus
+    módulos); los módulos nuevos o cambiados tienen una fila propia. Las
+    tareas ``running`` llevan un lease (``locked_by`` / ``locked_at``) para
+    que varios procesos compartan la ejecución sin solaparse.
+    """
+
+    __tablename__ = "etl_tasks"
+    __table_args__ = (
+        UniqueConstraint(
+            "run_id", "repo_name", "version", "technical_name", name="uq_etl_tasks_run_module"
+        ),
+        Index("ix_etl_tasks_run_status", "run_id", "status"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    run_id = Column(Integer, ForeignKey("etl_runs.id", ondelete="CASCADE"), nullable=False)
+    repo_name = Column(String, nullable=False)
+    version = Column(String, nullable=False)
+    technical_name = Column(String, nullable=False)
+    status = Column(String(16), nullable=False, default="pending")  # pending | running | done | failed
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(Text)
+    locked_by = Column(String)  # host:pid del proceso que la tiene
+    locked_at = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<EtlTask #{self.run_id} {self.repo_name}@{self.version}:{self.technical_name} {self.status}>"
@@ -0,0 +1,106 @@
+"""
+Ingesta de una rama completa desde su tarball.
+
+En lugar de una petición a la API de contenidos por fichero (y hasta cinco
+por README), se descarga un único ``.tar.gz`` por (repo, rama) y se lee en
+streaming con ``tarfile`` (modo ``r|gz``, sin extraer a disco ni hacer seek).
+Del stream solo se conservan los ``__manifest__.py`` y los README; de cada uno
+se calcula su SHA de blob git, así que el estado incremental del ETL
+(manifest_sha / readme_sha) es el mismo que con el árbol de la API.
+
+Sirve igual para archivos locales (``<repo>-<rama>.tar.gz``), lo que permite
+ejecutar el ETL y los tests sin red.
+"""
+import hashlib
+import tarfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional
+
+from .module_index import MANIFEST_NAME, README_NAMES, ModuleFiles, index_modules
+
+_WANTED_NAMES = {MANIFEST_NAME, *README_NAMES}
+
+
+def git_blob_sha(data: bytes) -> str:
+    """SHA-1 de un blob git (el mismo que devuelve el árbol de la API)."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def local_archive_path(directory: str, repo_name: str, version: str) -> Path:
+    """Ruta de un archivo local: ``<directory>/<repo>-<version>.tar.gz``."""
+    return Path(directory) / f"{repo_name}-{version}.tar.gz"
+
+
+@dataclass
+class ArchiveModule:
+    """Un módulo leído del tarball (ficheros y contenido)."""
+
+    files: ModuleFiles
+    manifest_content: str
+    readme_content: Optional[str] = None
+
+
+@dataclass
+class ArchiveBranch:
+    """
+    Contenido útil de una rama.
+
+    Attributes:
+        commit: Commit del archivo (cabecera pax ``comment`` que escribe
+            ``git archive``), o None si el archivo no la trae
+        modules: {module_dir: ArchiveModule}
+        members: Entradas del tar recorridas
+        bytes_read: Bytes de manifests y README leídos
+    """
+
+    commit: Optional[str]
+    modules: Dict[str, ArchiveModule] = field(default_factory=dict)
+    members: int = 0
+    bytes_read: int = 0
+
+
+def _strip_root(name: str) -> Optional[str]:
+    # GitHub envuelve todo en "<owner>-<repo>-<sha>/"
+    parts = name.split("/", 1)
+    return parts[1] if len(parts) == 2 and parts[1] else None
+
+
+def read_archive(fileobj: BinaryIO) -> ArchiveBranch:
+    """
+    Lee en streaming un tarball de rama y agrupa manifests y README por módulo.
+
+    Args:
+        fileobj: Stream ``.tar.gz`` (fichero local o ``response.raw``)
+
+    Returns:
+        ArchiveBranch con un ArchiveModule por cada directorio con manifest
+    """
+    blobs: Dict[str, str] = {}
+    contents: Dict[str, bytes] = {}
+    members = 0
+
+    with tarfile.open(fileobj=fileobj, mode="r|gz") as tar:
+        for member in tar:
+            members += 1
+            if not member.isfile():
+                continue
+            path = _strip_root(member.name)
+            if path is None or path.rsplit("/", 1)[-1] not in _WANTED_NAMES:
+                continue
+            data = tar.extractfile(member).read()
+            blobs[path] = git_blob_sha(data)
+            contents[path] = data
+        commit = tar.pax_headers.get("comment")
+
+    branch = ArchiveBranch(commit=commit, members=members)
+    for module_dir, files in index_modules(blobs).items():
+        manifest = contents[files.manifest_path]
+        readme = contents[files.readme_path] if files.readme_path else None
+        branch.bytes_read += len(manifest) + len(readme or b"")
+        branch.modules[module_dir] = ArchiveModule(
+            files,
+            manifest.decode("utf-8", errors="ignore"),
+            readme.decode("utf-8", errors="ignore") if readme is not None else None,
+        )
+    return branch
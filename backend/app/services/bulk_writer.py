@@ -0,0 +1,319 @@
+"""
+Escritura masiva de módulos: COPY binario + INSERT ... ON CONFLICT.
+
+En lugar de un SELECT + INSERT + commit por módulo, las filas se acumulan en
+memoria y cada lote se vuelca con ``COPY ... (FORMAT binary)`` a una tabla
+temporal y se fusiona con ``INSERT ... ON CONFLICT (technical_name, version,
+repo_name) DO UPDATE``: un commit por lote. Los vectores viajan en el formato
+binario de pgvector (sin serializar 2560 floats como texto).
+
+Los textos largos (descripción completa y README) van por el mismo camino a
+``odoo_module_docs``; en ``odoo_modules`` solo se escribe el extracto de la
+descripción.
+"""
+import io
+import struct
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import ARRAY, DateTime, Integer, LargeBinary, String, Text
+
+from ..core.logging import get_logger
+from ..models import OdooModule, OdooModuleDoc
+from .module_docs import CODEC_PLAIN, description_excerpt, encode_doc, resolve_codec
+
+logger = get_logger(__name__)
+
+# Clave natural de un módulo (constraint uq_odoo_modules_name_version_repo)
+CONFLICT_KEY = ("technical_name", "version", "repo_name")
+STAGE_TABLE = "odoo_modules_stage"
+DOCS_STAGE_TABLE = "odoo_module_docs_stage"
+# Campos de los valores de un módulo que van a odoo_module_docs
+DOC_FIELDS = ("description", "readme")
+
+PGCOPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+PGCOPY_TRAILER = struct.pack(">h", -1)
+POSTGRES_EPOCH = datetime(2000, 1, 1)
+VARCHAR_OID = 1043
+
+
+def encode_text(value) -> bytes:
+    return str(value).encode("utf-8")
+
+
+def encode_bytes(value) -> bytes:
+    return bytes(value)
+
+
+def encode_int4(value) -> bytes:
+    return struct.pack(">i", int(value))
+
+
+def encode_timestamp(value: datetime) -> bytes:
+    """timestamp without time zone: microsegundos desde 2000-01-01 (UTC si es aware)."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    delta = value - POSTGRES_EPOCH
+    micros = (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+    return struct.pack(">q", micros)
+
+
+def encode_varchar_array(values: Iterable[str]) -> bytes:
+    """varchar[] de una dimensión (sin NULLs)."""
+    items = [encode_text(v) for v in values]
+    if not items:
+        return struct.pack(">iii", 0, 0, VARCHAR_OID)
+    parts = [struct.pack(">iiiii", 1, 0, VARCHAR_OID, len(items), 1)]
+    for item in items:
+        parts.append(struct.pack(">i", len(item)))
+        parts.append(item)
+    return b"".join(parts)
+
+
+def encode_vector(values) -> bytes:
+    """Formato binario de pgvector: dims (int16), reservado (int16), float32 big-endian."""
+    values = list(values)
+    return struct.pack(f">hh{len(values)}f", len(values), 0, *values)
+
+
+def _encoder_for(column) -> Callable:
+    column_type = column.type
+    if isinstance(column_type, Vector):
+        return encode_vector
+    if isinstance(column_type, ARRAY):
+        return encode_varchar_array
+    if isinstance(column_type, DateTime):
+        return encode_timestamp
+    if isinstance(column_type, Integer):
+        return encode_int4
+    if isinstance(column_type, LargeBinary):
+        return encode_bytes
+    if isinstance(column_type, (String, Text)):
+        return encode_text
+    raise TypeError(f"Tipo no soportado en COPY binario: {column.name} ({column_type})")
+
+
+def module_columns() -> List[str]:
+    """Columnas que escribe el writer (todas menos el id serial)."""
+    return [c.name for c in OdooModule.__table__.columns if c.name != "id"]
+
+
+def doc_columns() -> Dict:
+    """Columnas de la tabla temporal de textos: clave natural + odoo_module_docs."""
+    columns = {name: OdooModule.__table__.columns[name] for name in CONFLICT_KEY}
+    for column in OdooModuleDoc.__table__.columns:
+        if column.name not in ("module_id", "updated_at"):
+            columns[column.name] = column
+    return columns
+
+
+class BinaryCopyEncoder:
+    """Codifica filas (dicts) en el formato binario de COPY."""
+
+    def __init__(self, columns: List[str], table_columns=None):
+        if table_columns is None:
+            table_columns = OdooModule.__table__.columns
+        self.columns = columns
+        self._encoders = [_encoder_for(table_columns[name]) for name in columns]
+
+    def encode(self, rows: Iterable[Dict]) -> bytes:
+        buffer = io.BytesIO()
+        buffer.write(PGCOPY_HEADER)
+        field_count = struct.pack(">h", len(self.columns))
+        for row in rows:
+            buffer.write(field_count)
+            for name, encoder in zip(self.columns, self._encoders):
+                value = row.get(name)
+                if value is None:
+                    buffer.write(struct.pack(">i", -1))
+                    continue
+                data = encoder(value)
+                buffer.write(struct.pack(">i", len(data)))
+                buffer.write(data)
+        buffer.write(PGCOPY_TRAILER)
+        return buffer.getvalue()
+
+
+def _default_connection():
+    from ..database import engine
+
+    return engine.raw_connection()
+
+
+class BulkModuleWriter:
+    """
+    Acumula módulos y los vuelca por lotes (un commit por lote).
+
+    Args:
+        connection_factory: Devuelve una conexión DBAPI (psycopg2); por
+            defecto ``engine.raw_connection()``
+        batch_size: Filas por lote
+        codec: Compresión de los textos de odoo_module_docs ("none" | "zstd")
+
+    Example:
+        >>> with BulkModuleWriter(batch_size=500) as writer:
+        ...     for values in modules:
+        ...         writer.add(values)
+    """
+
+    def __init__(
+        self,
+        connection_factory: Optional[Callable] = None,
+        batch_size: int = 500,
+        codec: str = CODEC_PLAIN,
+    ):
+        self.batch_size = batch_size
+        self.codec = resolve_codec(codec)
+        self.columns = module_columns()
+        self.encoder = BinaryCopyEncoder(self.columns)
+        doc_types = doc_columns()
+        self.doc_columns = list(doc_types)
+        self.doc_encoder = BinaryCopyEncoder(self.doc_columns, doc_types)
+        self._connection_factory = connection_factory or _default_connection
+        self._connection = None
+        self._pending: Dict[Tuple, Dict] = {}
+        self._pending_docs: Dict[Tuple, Dict] = {}
+        self.rows = 0
+        self.batches = 0
+        self.seconds = 0.0
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            self._connection = self._connection_factory()
+            self._create_stage_table()
+        return self._connection
+
+    def _create_stage_table(self) -> None:
+        columns = ", ".join(self.columns)
+        with self._connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMP TABLE IF NOT EXISTS {STAGE_TABLE} ON COMMIT DELETE ROWS "
+                f"AS SELECT {columns} FROM odoo_modules WITH NO DATA"
+            )
+            doc_select = ", ".join(
+                f"m.{name}" if name in CONFLICT_KEY else f"d.{name}" for name in self.doc_columns
+            )
+            cursor.execute(
+                f"CREATE TEMP TABLE IF NOT EXISTS {DOCS_STAGE_TABLE} ON COMMIT DELETE ROWS "
+                f"AS SELECT {doc_select} FROM odoo_modules m, odoo_module_docs d WITH NO DATA"
+            )
+        self._connection.commit()
+
+    def _upsert_sql(self) -> str:
+        columns = ", ".join(self.columns)
+        updates = ", ".join(
+            f"{name} = EXCLUDED.{name}"
+            for name in self.columns
+            if name not in CONFLICT_KEY and name != "created_at"
+        )
+        return (
+            f"INSERT INTO odoo_modules ({columns}) "
+            f"SELECT {columns} FROM {STAGE_TABLE} "
+            f"ON CONFLICT ({', '.join(CONFLICT_KEY)}) DO UPDATE SET {updates}"
+        )
+
+    def _docs_upsert_sql(self) -> str:
+        """Textos de la tabla temporal -> odoo_module_docs (id por la clave natural)."""
+        values = [name for name in self.doc_columns if name not in CONFLICT_KEY]
+        join = " AND ".join(f"m.{name} = s.{name}" for name in CONFLICT_KEY)
+        updates = ", ".join(f"{name} = EXCLUDED.{name}" for name in values + ["updated_at"])
+        return (
+            f"INSERT INTO odoo_module_docs (module_id, {', '.join(values)}, updated_at) "
+            f"SELECT m.id, {', '.join(f's.{name}' for name in values)}, now() "
+            f"FROM {DOCS_STAGE_TABLE} s JOIN odoo_modules m ON {join} "
+            f"ON CONFLICT (module_id) DO UPDATE SET {updates}"
+        )
+
+    def _split(self, row: Dict) -> Optional[Dict]:
+        """Separa los textos largos de la fila (que se queda con el extracto)."""
+        if not any(field in row for field in DOC_FIELDS):
+            return None
+        doc = {name: row[name] for name in CONFLICT_KEY}
+        doc["codec"] = self.codec
+        doc["description"] = encode_doc(row.get("description"), self.codec)
+        doc["readme"] = encode_doc(row.pop("readme", None), self.codec)
+        row["description"] = description_excerpt(row.get("description"))
+        return doc
+
+    def add(self, values: Dict) -> int:
+        """
+        Añade un módulo al lote (el último gana si la clave se repite).
+
+        Returns:
+            Filas escritas si el lote se ha vaciado, 0 si no
+        """
+        now = datetime.utcnow()
+        row = {"created_at": now, "updated_at": now, **values}
+        key = tuple(row[k] for k in CONFLICT_KEY)
+        doc = self._split(row)
+        self._pending[key] = row
+        if doc is not None:
+            self._pending_docs[key] = doc
+        if len(self._pending) >= self.batch_size:
+            return self.flush()
+        return 0
+
+    def write(self, rows: Iterable[Dict]) -> int:
+        """Añade varias filas y vuelca lo pendiente."""
+        written = 0
+        for values in rows:
+            written += self.add(values)
+        return written + self.flush()
+
+    def flush(self) -> int:
+        """Vuelca el lote pendiente: COPY a la tabla temporal + upsert + commit."""
+        if not self._pending:
+            return 0
+
+        rows = list(self._pending.values())
+        docs = list(self._pending_docs.values())
+        self._pending.clear()
+        self._pending_docs.clear()
+        conn = self.connection
+        start = time.perf_counter()
+        try:
+            with conn.cursor() as cursor:
+                cursor.copy_expert(
+                    f"COPY {STAGE_TABLE} ({', '.join(self.columns)}) FROM STDIN WITH (FORMAT binary)",
+                    io.BytesIO(self.encoder.encode(rows)),
+                )
+                cursor.execute(self._upsert_sql())
+                written = cursor.rowcount
+                if docs:
+                    cursor.copy_expert(
+                        f"COPY {DOCS_STAGE_TABLE} ({', '.join(self.doc_columns)}) "
+                        f"FROM STDIN WITH (FORMAT binary)",
+                        io.BytesIO(self.doc_encoder.encode(docs)),
+                    )
+                    cursor.execute(self._docs_upsert_sql())
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.seconds += time.perf_counter() - start
+
+        self.rows += written
+        self.batches += 1
+        logger.info(f"Lote de {len(rows)} módulos escrito ({written} filas)")
+        return written
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def __enter__(self) -> "BulkModuleWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self._pending.clear()
+            self._pending_docs.clear()
+        self.close()
@@ -1,11 +1,15 @@
+from ..core.telemetry import record_cache_lookup
+
+
 class SimpleCache:
-    def __init__(self):
+    def __init__(self, name: str = "default"):
+        self.name = name
         self._data: dict[str, object] = {}
 
     def get(self, key: str):
-        return self._data.get(key)
+        value = self._data.get(key)
+        record_cache_lookup(self.name, value is not None)
+        return value
 
     def set(self, key: str, value: object):
         self._data[key] = value
-
-
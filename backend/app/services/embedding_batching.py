@@ -0,0 +1,179 @@
+"""
+Planificación y ejecución de embeddings por lotes.
+
+Agrupa textos en lotes limitados por presupuesto de tokens y número de items,
+ejecuta los lotes en paralelo (con un límite de concurrencia) y, si un lote
+falla tras sus reintentos, reintenta sus textos uno a uno para aislar el que
+falla. Los fallos se devuelven de forma explícita: nunca se sustituyen por
+vectores nulos.
+"""
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Estimación conservadora (texto multilingüe / markdown)
+CHARS_PER_TOKEN = 3
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimación barata del número de tokens de un texto."""
+    return max(1, math.ceil(len(text) / CHARS_PER_TOKEN))
+
+
+@dataclass
+class BatchEmbeddingResult:
+    """
+    Resultado de un embedding por lotes.
+
+    Attributes:
+        embeddings: Un embedding por texto de entrada (None si falló)
+        failures: {índice del texto: error}
+        requests: Peticiones realizadas al proveedor
+    """
+
+    embeddings: List[Optional[List[float]]]
+    failures: Dict[int, str] = field(default_factory=dict)
+    requests: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+    def succeeded(self) -> List[int]:
+        """Índices de los textos con embedding."""
+        return [i for i, emb in enumerate(self.embeddings) if emb is not None]
+
+
+def plan_batches(
+    texts: Sequence[str],
+    max_tokens: int,
+    max_items: int,
+    indices: Optional[Sequence[int]] = None,
+) -> List[List[int]]:
+    """
+    Agrupa textos en lotes respetando el presupuesto de tokens.
+
+    Un texto que por sí solo supera el presupuesto va en un lote propio.
+
+    Args:
+        texts: Textos
+        max_tokens: Tokens (estimados) máximos por lote
+        max_items: Textos máximos por lote
+        indices: Subconjunto de índices a planificar (por defecto todos)
+
+    Returns:
+        Lista de lotes (listas de índices en el orden original)
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+
+    for i in (range(len(texts)) if indices is None else indices):
+        tokens = estimate_tokens(texts[i])
+        if current and (current_tokens + tokens > max_tokens or len(current) >= max_items):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += tokens
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _is_retryable(error: Exception) -> bool:
+    # ValueError: entrada inválida o respuesta mal formada -> reintentar no ayuda
+    if isinstance(error, ValueError):
+        return False
+    # Errores HTTP 4xx (salvo 429) tampoco son transitorios
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    return status is None or status >= 500 or status == 429
+
+
+def run_batches(
+    texts: Sequence[str],
+    embed_batch: Callable[[List[str]], List[List[float]]],
+    max_tokens: int = 16000,
+    max_items: int = 64,
+    concurrency: int = 4,
+    max_retries: int = 3,
+    backoff: float = 1.0,
+    sleep: Callable[[float], None] = time.sleep,
+) -> BatchEmbeddingResult:
+    """
+    Genera embeddings para ``texts`` con llamadas por lotes.
+
+    Args:
+        texts: Textos a vectorizar
+        embed_batch: Llamada al proveedor: lista de textos -> lista de embeddings
+        max_tokens: Presupuesto de tokens por petición
+        max_items: Textos máximos por petición
+        concurrency: Peticiones simultáneas
+        max_retries: Reintentos por petición (errores transitorios)
+        backoff: Espera base entre reintentos (exponencial)
+        sleep: Función de espera (inyectable en tests)
+
+    Returns:
+        BatchEmbeddingResult con un embedding (o fallo) por texto
+    """
+    result = BatchEmbeddingResult(embeddings=[None] * len(texts))
+    lock = threading.Lock()
+
+    valid = []
+    for i, text in enumerate(texts):
+        if not text or not text.strip():
+            result.failures[i] = "El texto no puede estar vacío"
+        else:
+            valid.append(i)
+
+    def call(batch_texts: List[str]) -> List[List[float]]:
+        for attempt in range(max_retries + 1):
+            with lock:
+                result.requests += 1
+            try:
+                vectors = embed_batch(batch_texts)
+                if len(vectors) != len(batch_texts):
+                    raise ValueError(
+                        f"El proveedor devolvió {len(vectors)} embeddings para {len(batch_texts)} textos"
+                    )
+                return vectors
+            except Exception as e:
+                if attempt == max_retries or not _is_retryable(e):
+                    raise
+                sleep(backoff * (2 ** attempt))
+        raise RuntimeError("unreachable")
+
+    def run(batch: List[int]) -> None:
+        try:
+            vectors = call([texts[i] for i in batch])
+            for i, vector in zip(batch, vectors):
+                result.embeddings[i] = vector
+            return
+        except Exception as e:
+            if len(batch) == 1:
+                result.failures[batch[0]] = f"{type(e).__name__}: {e}"
+                return
+            logger.warning(f"Lote de {len(batch)} textos falló ({e}); reintentando uno a uno")
+
+        for i in batch:
+            try:
+                result.embeddings[i] = call([texts[i]])[0]
+            except Exception as e:
+                result.failures[i] = f"{type(e).__name__}: {e}"
+
+    batches = plan_batches(texts, max_tokens, max_items, indices=valid)
+    if len(batches) <= 1 or concurrency <= 1:
+        for batch in batches:
+            run(batch)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(run, batches))
+
+    return result
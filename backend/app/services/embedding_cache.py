@@ -0,0 +1,175 @@
+"""
+Cache persistente de embeddings direccionada por contenido.
+
+La clave es ``sha256(modelo + texto normalizado)``: el mismo texto de un
+módulo en 16.0, 17.0 y 18.0, o en re-ejecuciones del ETL, se vectoriza una
+sola vez. Los vectores se guardan como float32 en la tabla
+``embedding_cache`` (compartida por el ETL, los jobs de re-embedding y la
+API). Un fallo de la cache nunca rompe el embedding: se trata como fallo de
+cache y se registra en el log.
+"""
+import hashlib
+import re
+import threading
+import unicodedata
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..core.logging import get_logger
+from ..core.telemetry import record_cache_lookup
+from ..models import EmbeddingCacheEntry
+from .embedding_batching import estimate_tokens
+
+logger = get_logger(__name__)
+
+# Claves por query en las lecturas (límite de parámetros de un IN)
+LOOKUP_CHUNK = 500
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Normalización previa al hash: NFC, espacios colapsados y sin bordes."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def cache_key(model: str, text: str) -> str:
+    """Clave de cache (sha256 hex) de un texto para un modelo."""
+    return hashlib.sha256(f"{model}\n{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+def encode_embedding(embedding: Sequence[float]) -> bytes:
+    return np.asarray(embedding, dtype="<f4").tobytes()
+
+
+def decode_embedding(data: bytes) -> List[float]:
+    return np.frombuffer(data, dtype="<f4").tolist()
+
+
+def _insert_ignore(dialect: str):
+    """INSERT ... ON CONFLICT DO NOTHING del dialecto (None si no lo soporta)."""
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert(EmbeddingCacheEntry).on_conflict_do_nothing(index_elements=["key"])
+
+
+class EmbeddingCache:
+    """
+    Cache de embeddings en base de datos.
+
+    Args:
+        session_factory: Crea sesiones SQLAlchemy (ej: SessionLocal)
+        model: Modelo de embeddings (forma parte de la clave)
+        name: Nombre de la cache en las métricas
+    """
+
+    def __init__(self, session_factory: Callable, model: str, name: str = "embedding"):
+        self.session_factory = session_factory
+        self.model = model
+        self.name = name
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved_tokens = 0
+        self.stored = 0
+
+    def key(self, text: str) -> str:
+        return cache_key(self.model, text)
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """
+        Embeddings cacheados de ``texts`` (None si no están o el texto es vacío).
+        """
+        keys = [self.key(text) if text and text.strip() else None for text in texts]
+        wanted = sorted({key for key in keys if key is not None})
+        found: Dict[str, List[float]] = {}
+
+        if wanted:
+            try:
+                with self.session_factory() as session:
+                    for start in range(0, len(wanted), LOOKUP_CHUNK):
+                        chunk = wanted[start:start + LOOKUP_CHUNK]
+                        rows = session.query(
+                            EmbeddingCacheEntry.key, EmbeddingCacheEntry.embedding
+                        ).filter(EmbeddingCacheEntry.key.in_(chunk))
+                        found.update((key, decode_embedding(data)) for key, data in rows)
+            except Exception as e:
+                logger.warning(f"Cache de embeddings no disponible (lectura): {e}")
+
+        results = [found.get(key) if key is not None else None for key in keys]
+        hits = 0
+        saved = 0
+        for text, key, embedding in zip(texts, keys, results):
+            if key is None:
+                continue
+            record_cache_lookup(self.name, embedding is not None)
+            if embedding is not None:
+                hits += 1
+                saved += estimate_tokens(text)
+        with self._lock:
+            self.hits += hits
+            self.misses += sum(1 for key in keys if key is not None) - hits
+            self.saved_tokens += saved
+        return results
+
+    def get(self, text: str) -> Optional[List[float]]:
+        return self.get_many([text])[0]
+
+    def put_many(self, items: Sequence[Tuple[str, Sequence[float]]]) -> int:
+        """
+        Guarda pares (texto, embedding); las claves existentes no se tocan.
+
+        Returns:
+            Entradas enviadas a la base de datos
+        """
+        rows: Dict[str, Dict] = {}
+        now = datetime.utcnow()
+        for text, embedding in items:
+            key = self.key(text)
+            rows[key] = dict(
+                key=key,
+                model=self.model,
+                dimensions=len(embedding),
+                embedding=encode_embedding(embedding),
+                created_at=now,
+            )
+        if not rows:
+            return 0
+
+        try:
+            with self.session_factory() as session:
+                statement = _insert_ignore(session.get_bind().dialect.name)
+                if statement is not None:
+                    session.execute(statement, list(rows.values()))
+                else:
+                    for row in rows.values():
+                        session.merge(EmbeddingCacheEntry(**row))
+                session.commit()
+        except Exception as e:
+            logger.warning(f"Cache de embeddings no disponible (escritura): {e}")
+            return 0
+
+        with self._lock:
+            self.stored += len(rows)
+        return len(rows)
+
+    def put(self, text: str, embedding: Sequence[float]) -> int:
+        return self.put_many([(text, embedding)])
+
+    def stats(self) -> Dict:
+        """Aciertos, fallos y tokens ahorrados (estimados) desde el arranque."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "saved_tokens": self.saved_tokens,
+                "stored": self.stored,
+            }
@@ -0,0 +1,154 @@
+"""
+Cassettes de embeddings para benchmarks deterministas y offline.
+
+Un cassette guarda los embeddings de las queries en un fichero binario
+compacto (float32, indexado por sha256 del texto) para reproducirlos en
+ejecuciones posteriores sin llamar al proveedor.
+
+Formato del fichero (little-endian):
+    cabecera: b"AOFC" | versión (uint8) | dims (uint32) | len(modelo) (uint16) | modelo (utf-8)
+    entradas: sha256(texto) (32 bytes) | dims * float32
+"""
+import hashlib
+import struct
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+MAGIC = b"AOFC"
+FORMAT_VERSION = 1
+MODES = ("record", "replay", "auto")
+
+
+def text_key(text: str) -> bytes:
+    """Clave de un texto en el cassette: sha256 del texto normalizado."""
+    return hashlib.sha256(text.strip().encode("utf-8")).digest()
+
+
+class CassetteMissError(KeyError):
+    """El texto no está en el cassette y el modo es replay."""
+
+
+class EmbeddingCassette:
+    """
+    Almacén de embeddings grabados.
+
+    Modos:
+        record: siempre llama al proveedor y graba (sobrescribe entradas)
+        replay: solo reproduce; un texto no grabado es un error
+        auto: reproduce si existe, si no llama al proveedor y graba
+    """
+
+    def __init__(self, path: str, mode: str = "replay", model: str = "", dimensions: int = 0):
+        if mode not in MODES:
+            raise ValueError(f"Modo de cassette inválido: {mode} (use {', '.join(MODES)})")
+
+        self.path = Path(path)
+        self.mode = mode
+        self.model = model
+        self.dimensions = dimensions
+        self._entries: Dict[bytes, np.ndarray] = {}
+        self._dirty = False
+
+        if self.path.exists():
+            self._load()
+        elif mode == "replay":
+            raise FileNotFoundError(f"Cassette {self.path} no existe (grabar con mode=record)")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self) -> None:
+        data = self.path.read_bytes()
+        if data[:4] != MAGIC:
+            raise ValueError(f"{self.path} no es un cassette de embeddings")
+
+        version, dims, model_len = struct.unpack_from("<BIH", data, 4)
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Versión de cassette no soportada: {version}")
+        offset = 4 + struct.calcsize("<BIH")
+        model = data[offset:offset + model_len].decode("utf-8")
+        offset += model_len
+
+        if self.model and model and self.model != model:
+            raise ValueError(
+                f"Cassette grabado con modelo '{model}', configurado '{self.model}'"
+            )
+        self.model = self.model or model
+        self.dimensions = dims
+
+        record = np.dtype([("key", "S32"), ("vector", "<f4", (dims,))])
+        entries = np.frombuffer(data, dtype=record, offset=offset)
+        self._entries = {bytes(e["key"]): e["vector"] for e in entries}
+
+    def get(self, text: str) -> Optional[List[float]]:
+        vector = self._entries.get(text_key(text))
+        return vector.tolist() if vector is not None else None
+
+    def put(self, text: str, embedding: List[float]) -> None:
+        vector = np.asarray(embedding, dtype="<f4")
+        if not self.dimensions:
+            self.dimensions = len(vector)
+        if len(vector) != self.dimensions:
+            raise ValueError(
+                f"Embedding con {len(vector)} dimensiones, cassette de {self.dimensions}"
+            )
+        self._entries[text_key(text)] = vector
+        self._dirty = True
+
+    def save(self) -> None:
+        """Escribir el cassette completo a disco (si hubo cambios)."""
+        if not self._dirty:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        model = self.model.encode("utf-8")
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<BIH", FORMAT_VERSION, self.dimensions, len(model)))
+            f.write(model)
+            for key, vector in self._entries.items():
+                f.write(key)
+                f.write(vector.astype("<f4").tobytes())
+        tmp_path.replace(self.path)
+        self._dirty = False
+
+
+class CassetteEmbeddingService:
+    """
+    Envuelve un EmbeddingService para grabar/reproducir desde un cassette.
+
+    Mide aparte el tiempo gastado en el proveedor (``last_provider_ms``,
+    0 cuando el embedding se reproduce) para separarlo del tiempo del motor.
+    """
+
+    def __init__(self, inner, cassette: EmbeddingCassette):
+        self.inner = inner
+        self.cassette = cassette
+        self.last_provider_ms = 0.0
+        self.last_source = None
+        self.hits = 0
+        self.misses = 0
+
+    def get_embedding(self, text: str) -> List[float]:
+        self.last_provider_ms = 0.0
+
+        if self.cassette.mode != "record":
+            cached = self.cassette.get(text)
+            if cached is not None:
+                self.hits += 1
+                self.last_source = "cassette"
+                return cached
+            if self.cassette.mode == "replay":
+                raise CassetteMissError(f"Texto no grabado en el cassette: {text[:50]!r}")
+
+        self.misses += 1
+        start = time.perf_counter()
+        embedding = self.inner.get_embedding(text)
+        self.last_provider_ms = (time.perf_counter() - start) * 1000
+        self.last_source = "live"
+        self.cassette.put(text, embedding)
+        return embedding
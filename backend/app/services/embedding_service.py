@@ -1,23 +1,45 @@
+import time
+
 import requests
-from typing import List
+from typing import Dict, List, Optional
 
 from ..config import get_settings
+from ..core.logging import get_logger
+from ..core.telemetry import EMBEDDING_ERRORS_TOTAL, EMBEDDING_REQUEST_SECONDS
+from .embedding_batching import BatchEmbeddingResult, run_batches
+from .embedding_cache import EmbeddingCache
 
 settings = get_settings()
+logger = get_logger(__name__)
 
 
 class EmbeddingService:
-    def __init__(self):
+    def __init__(self, model: Optional[str] = None, dimensions: Optional[int] = None):
+        """
+        Args:
+            model: Modelo de embeddings (por defecto EMBEDDING_MODEL)
+            dimensions: Dimensiones esperadas (por defecto EMBEDDING_DIMENSIONS)
+        """
         self.api_key = settings.openrouter_api_key
-        self.model = settings.embedding_model
+        self.model = model or settings.embedding_model
+        self.dimensions = dimensions or settings.embedding_dimensions
         self.base_url = "https://openrouter.ai/api/v1"
+        self.session = requests.Session()
+        self.cache: Optional[EmbeddingCache] = None
+        if settings.embedding_cache_enabled:
+            from ..database import SessionLocal
+
+            self.cache = EmbeddingCache(SessionLocal, self.model)
 
-    def get_embedding(self, text: str) -> List[float]:
+    def get_embedding(self, text: str, store: bool = False) -> List[float]:
         """
         Generar embedding para un texto usando Qwen3-Embedding.
 
         Args:
             text: Texto a vectorizar
+            store: Guardar en la cache el embedding si no estaba. Por defecto
+                la cache solo se consulta: las queries de búsqueda son
+                ilimitadas y la tabla no tiene expiración
 
         Returns:
             Lista de floats (384 dimensiones)
@@ -25,50 +47,116 @@ class EmbeddingService:
         if not text or not text.strip():
             raise ValueError("El texto no puede estar vacío")
 
-        response = requests.post(
-            f"{self.base_url}/embeddings",
-            headers={
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": self.model,
-                "input": text
-            }
-        )
+        if self.cache is not None:
+            cached = self.cache.get(text)
+            if cached is not None:
+                return cached
 
-        response.raise_for_status()
-        data = response.json()
+        embedding = self._request_embeddings([text])[0]
+        if store and self.cache is not None:
+            self.cache.put(text, embedding)
+        return embedding
 
-        embedding = data['data'][0]['embedding']
+    def _request_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Una petición al proveedor con ``input: [...]``.
+
+        Returns:
+            Embeddings en el mismo orden que ``texts``
+        """
+        start = time.perf_counter()
+        try:
+            response = self.session.post(
+                f"{self.base_url}/embeddings",
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "model": self.model,
+                    "input": texts if len(texts) > 1 else texts[0]
+                },
+                timeout=120
+            )
+
+            response.raise_for_status()
+            data = response.json()
+        except Exception as e:
+            EMBEDDING_ERRORS_TOTAL.labels(model=self.model, error=type(e).__name__).inc()
+            raise
+        finally:
+            EMBEDDING_REQUEST_SECONDS.labels(model=self.model).observe(
+                time.perf_counter() - start
+            )
+
+        # El proveedor indica la posición de cada embedding en "index"
+        items = sorted(data['data'], key=lambda item: item.get('index', 0))
+        embeddings = [item['embedding'] for item in items]
 
         # Verificar dimensiones
-        if len(embedding) != settings.embedding_dimensions:
-            raise ValueError(f"Embedding tiene {len(embedding)} dimensiones, esperadas {settings.embedding_dimensions}")
+        for embedding in embeddings:
+            if len(embedding) != self.dimensions:
+                raise ValueError(f"Embedding tiene {len(embedding)} dimensiones, esperadas {self.dimensions}")
 
-        return embedding
+        return embeddings
 
-    def get_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+    def get_embeddings_batch(self, texts: List[str]) -> BatchEmbeddingResult:
         """
-        Generar embeddings para múltiples textos.
+        Generar embeddings para múltiples textos con peticiones por lotes.
+
+        Los textos se agrupan por presupuesto de tokens
+        (EMBEDDING_BATCH_MAX_TOKENS / EMBEDDING_BATCH_MAX_ITEMS) y los lotes se
+        envían en paralelo (EMBEDDING_MAX_CONCURRENCY). Si un lote falla, sus
+        textos se reintentan uno a uno. Solo se piden al proveedor los textos
+        que no están en la cache, y cada texto distinto una sola vez.
 
         Args:
             texts: Lista de textos
 
         Returns:
-            Lista de embeddings
+            BatchEmbeddingResult: un embedding por texto (None si falló) y los
+            fallos por índice; nunca se devuelven vectores nulos
         """
-        embeddings = []
-        for text in texts:
-            try:
-                emb = self.get_embedding(text)
-                embeddings.append(emb)
-            except Exception as e:
-                print(f"❌ Error generando embedding: {e}")
-                # Embedding nulo (todos ceros)
-                embeddings.append([0.0] * settings.embedding_dimensions)
+        if self.cache is not None:
+            embeddings = self.cache.get_many(texts)
+        else:
+            embeddings = [None] * len(texts)
+
+        # Textos pendientes, deduplicados por clave (el mismo texto en varias versiones)
+        pending: Dict[str, List[int]] = {}
+        for index, embedding in enumerate(embeddings):
+            if embedding is None:
+                key = self.cache.key(texts[index]) if self.cache is not None else texts[index]
+                pending.setdefault(key, []).append(index)
+        groups = list(pending.values())
+
+        fetched = run_batches(
+            [texts[group[0]] for group in groups],
+            self._request_embeddings,
+            max_tokens=settings.embedding_batch_max_tokens,
+            max_items=settings.embedding_batch_max_items,
+            concurrency=settings.embedding_max_concurrency,
+            max_retries=settings.embedding_max_retries,
+        )
 
-        return embeddings
+        result = BatchEmbeddingResult(embeddings=embeddings, requests=fetched.requests)
+        for position, group in enumerate(groups):
+            for index in group:
+                embeddings[index] = fetched.embeddings[position]
+                if position in fetched.failures:
+                    result.failures[index] = fetched.failures[position]
+
+        if self.cache is not None:
+            self.cache.put_many([
+                (texts[group[0]], fetched.embeddings[position])
+                for position, group in enumerate(groups)
+                if fetched.embeddings[position] is not None
+            ])
+
+        for index, error in result.failures.items():
+            logger.warning(f"Error generando embedding del texto {index}: {error}")
+
+        return result
 
 
 # Singleton
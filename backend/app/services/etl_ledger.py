@@ -0,0 +1,360 @@
+"""
+Ledger de ejecuciones del ETL (``etl_runs`` / ``etl_tasks``).
+
+Cada ejecución siembra una tarea por rama (repo, versión). Al descubrir una
+rama se registra una tarea por módulo nuevo o cambiado, que pasa a ``done``
+cuando el módulo se escribe y a ``failed`` si se descarta por el camino.
+
+Así una ejecución interrumpida se puede reanudar (``--resume``) sin volver a
+recorrer lo ya hecho, y varios procesos o máquinas pueden compartirla: las
+tareas se reclaman con un ``UPDATE`` condicional y un lease; si el proceso
+que tenía una tarea muere, otro la recupera cuando el lease caduca.
+"""
+import os
+import socket
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, func, or_
+
+from ..core.logging import get_logger
+from ..models import EtlRun, EtlTask
+
+logger = get_logger(__name__)
+
+# Tarea de la rama (descubrir sus módulos)
+BRANCH = "*"
+
+
+def worker_id() -> str:
+    """Identificador del proceso que tiene una tarea (host:pid)."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _insert_ignore(dialect: str):
+    """INSERT ... ON CONFLICT DO NOTHING del dialecto (None si no lo soporta)."""
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert(EtlTask).on_conflict_do_nothing(
+        index_elements=["run_id", "repo_name", "version", "technical_name"]
+    )
+
+
+@dataclass
+class BranchClaim:
+    """Rama reclamada: ``modules`` son los módulos pendientes (None = todos)."""
+
+    modules: Optional[Set[str]] = None
+
+
+class EtlLedger:
+    """
+    Progreso de una ejecución del ETL.
+
+    Args:
+        session_factory: Crea sesiones SQLAlchemy (ej: SessionLocal)
+        run_id: Ejecución
+        lease_seconds: Una tarea ``running`` sin terminar tras este tiempo
+            (proceso caído) vuelve a poder reclamarse
+        worker: Identificador de este proceso (por defecto host:pid)
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable,
+        run_id: int,
+        lease_seconds: int = 1800,
+        worker: Optional[str] = None,
+    ):
+        self.session_factory = session_factory
+        self.run_id = run_id
+        self.lease_seconds = lease_seconds
+        self.worker = worker or worker_id()
+
+    @classmethod
+    def create(
+        cls,
+        session_factory: Callable,
+        branches: Iterable[Tuple[str, str]],
+        options: Optional[Dict] = None,
+        **kwargs,
+    ) -> "EtlLedger":
+        """Nueva ejecución con una tarea pendiente por rama (repo, versión)."""
+        now = datetime.utcnow()
+        with session_factory() as session:
+            run = EtlRun(status="running", options=options or {}, started_at=now)
+            session.add(run)
+            session.flush()
+            session.add_all(
+                EtlTask(
+                    run_id=run.id, repo_name=repo_name, version=version,
+                    technical_name=BRANCH, status="pending", attempts=0, updated_at=now,
+                )
+                for repo_name, version in dict.fromkeys(branches)
+            )
+            session.commit()
+            run_id = run.id
+        return cls(session_factory, run_id, **kwargs)
+
+    @classmethod
+    def open(
+        cls, session_factory: Callable, run_id: Optional[int] = None, **kwargs
+    ) -> Optional["EtlLedger"]:
+        """Ejecución existente (por defecto la última sin terminar), o None."""
+        with session_factory() as session:
+            query = session.query(EtlRun.id)
+            if run_id:
+                query = query.filter(EtlRun.id == run_id)
+            else:
+                query = query.filter(EtlRun.status != "done").order_by(EtlRun.id.desc())
+            row = query.first()
+        return cls(session_factory, row[0], **kwargs) if row else None
+
+    @property
+    def options(self) -> Dict:
+        with self.session_factory() as session:
+            run = session.get(EtlRun, self.run_id)
+            return dict(run.options or {}) if run else {}
+
+    def _tasks(self, session, repo_name: str, version: str):
+        return session.query(EtlTask).filter(
+            EtlTask.run_id == self.run_id,
+            EtlTask.repo_name == repo_name,
+            EtlTask.version == version,
+        )
+
+    def reopen(self, retry_failed: bool = False) -> int:
+        """
+        Prepara la ejecución para reanudarla.
+
+        Devuelve a ``pending`` las tareas con el lease caducado (y las
+        fallidas si ``retry_failed``), y reabre las ramas que tienen módulos
+        pendientes.
+
+        Returns:
+            Tareas reabiertas
+        """
+        now = datetime.utcnow()
+        expired = now - timedelta(seconds=self.lease_seconds)
+        reopen = (EtlTask.status == "running") & (EtlTask.locked_at < expired)
+        if retry_failed:
+            reopen = reopen | (EtlTask.status == "failed")
+
+        with self.session_factory() as session:
+            reopened = session.query(EtlTask).filter(EtlTask.run_id == self.run_id, reopen).update(
+                {EtlTask.status: "pending", EtlTask.locked_by: None,
+                 EtlTask.locked_at: None, EtlTask.updated_at: now},
+                synchronize_session=False,
+            )
+            branches = session.query(EtlTask.repo_name, EtlTask.version).filter(
+                EtlTask.run_id == self.run_id,
+                EtlTask.technical_name != BRANCH,
+                EtlTask.status == "pending",
+            ).distinct().all()
+            for repo_name, version in branches:
+                reopened += self._tasks(session, repo_name, version).filter(
+                    EtlTask.technical_name == BRANCH, EtlTask.status == "done"
+                ).update(
+                    {EtlTask.status: "pending", EtlTask.updated_at: now},
+                    synchronize_session=False,
+                )
+            session.query(EtlRun).filter(EtlRun.id == self.run_id).update(
+                {EtlRun.status: "running", EtlRun.finished_at: None}, synchronize_session=False
+            )
+            session.commit()
+        logger.info(f"Ejecución #{self.run_id}: {reopened} tareas reabiertas")
+        return reopened
+
+    def claim_branch(self, repo_name: str, version: str) -> Optional[BranchClaim]:
+        """
+        Reclama una rama si está pendiente (o su lease caducó).
+
+        El ``UPDATE`` condicional es atómico: si dos procesos la piden a la
+        vez, solo uno la obtiene.
+
+        Returns:
+            BranchClaim, o None si la tiene otro proceso o ya está hecha
+        """
+        now = datetime.utcnow()
+        expired = now - timedelta(seconds=self.lease_seconds)
+        with self.session_factory() as session:
+            claimed = self._tasks(session, repo_name, version).filter(
+                EtlTask.technical_name == BRANCH,
+                or_(
+                    EtlTask.status == "pending",
+                    and_(EtlTask.status == "running", EtlTask.locked_at < expired),
+                ),
+            ).update(
+                {EtlTask.status: "running", EtlTask.attempts: EtlTask.attempts + 1,
+                 EtlTask.locked_by: self.worker, EtlTask.locked_at: now,
+                 EtlTask.updated_at: now},
+                synchronize_session=False,
+            )
+            session.commit()
+            if not claimed:
+                return None
+
+            modules = self._tasks(session, repo_name, version).with_entities(
+                EtlTask.technical_name, EtlTask.status
+            ).filter(EtlTask.technical_name != BRANCH).all()
+        if not modules:
+            return BranchClaim()  # primera vez: descubrir la rama entera
+        return BranchClaim({name for name, status in modules if status == "pending"})
+
+    def _finish_branch(self, repo_name: str, version: str, status: str, error: Optional[str]) -> None:
+        with self.session_factory() as session:
+            self._tasks(session, repo_name, version).filter(
+                EtlTask.technical_name == BRANCH, EtlTask.locked_by == self.worker
+            ).update(
+                {EtlTask.status: status, EtlTask.error: error[:2000] if error else None,
+                 EtlTask.locked_at: None, EtlTask.updated_at: datetime.utcnow()},
+                synchronize_session=False,
+            )
+            session.commit()
+
+    def complete_branch(self, repo_name: str, version: str) -> None:
+        self._finish_branch(repo_name, version, "done", None)
+
+    def fail_branch(self, repo_name: str, version: str, error: str) -> None:
+        self._finish_branch(repo_name, version, "failed", error)
+
+    def start_modules(
+        self, repo_name: str, version: str, started: Iterable[str], unchanged: Iterable[str] = ()
+    ) -> None:
+        """
+        Registra los módulos de una rama que entran en el pipeline
+        (``running`` con lease de este proceso) y da por hechos los pendientes
+        que resultaron no tener cambios.
+        """
+        started = sorted(set(started))
+        unchanged = sorted(set(unchanged))
+        now = datetime.utcnow()
+        with self.session_factory() as session:
+            if started:
+                statement = _insert_ignore(session.get_bind().dialect.name)
+                rows = [
+                    dict(run_id=self.run_id, repo_name=repo_name, version=version,
+                         technical_name=name, status="pending", attempts=0, updated_at=now)
+                    for name in started
+                ]
+                if statement is not None:
+                    session.execute(statement, rows)
+                else:
+                    known = {
+                        name for (name,) in self._tasks(session, repo_name, version)
+                        .with_entities(EtlTask.technical_name)
+                        .filter(EtlTask.technical_name.in_(started))
+                    }
+                    session.add_all(EtlTask(**row) for row in rows if row["technical_name"] not in known)
+                    session.flush()
+                self._tasks(session, repo_name, version).filter(
+                    EtlTask.technical_name.in_(started)
+                ).update(
+                    {EtlTask.status: "running", EtlTask.attempts: EtlTask.attempts + 1,
+                     EtlTask.error: None, EtlTask.locked_by: self.worker,
+                     EtlTask.locked_at: now, EtlTask.updated_at: now},
+                    synchronize_session=False,
+                )
+            if unchanged:
+                self._tasks(session, repo_name, version).filter(
+                    EtlTask.technical_name.in_(unchanged)
+                ).update(
+                    {EtlTask.status: "done", EtlTask.locked_at: None, EtlTask.updated_at: now},
+                    synchronize_session=False,
+                )
+            session.commit()
+
+    def complete_modules(self, modules: Iterable[Tuple[str, str, str]]) -> None:
+        """Marca como hechos módulos (repo, versión, technical_name) ya escritos."""
+        by_branch: Dict[Tuple[str, str], List[str]] = {}
+        for repo_name, version, name in modules:
+            by_branch.setdefault((repo_name, version), []).append(name)
+        if not by_branch:
+            return
+        now = datetime.utcnow()
+        with self.session_factory() as session:
+            for (repo_name, version), names in by_branch.items():
+                self._tasks(session, repo_name, version).filter(
+                    EtlTask.technical_name.in_(names)
+                ).update(
+                    {EtlTask.status: "done", EtlTask.error: None,
+                     EtlTask.locked_at: None, EtlTask.updated_at: now},
+                    synchronize_session=False,
+                )
+            session.commit()
+
+    def fail_module(self, repo_name: str, version: str, technical_name: str, error: str) -> None:
+        with self.session_factory() as session:
+            self._tasks(session, repo_name, version).filter(
+                EtlTask.technical_name == technical_name
+            ).update(
+                {EtlTask.status: "failed", EtlTask.error: error[:2000],
+                 EtlTask.locked_at: None, EtlTask.updated_at: datetime.utcnow()},
+                synchronize_session=False,
+            )
+            session.commit()
+
+    def release(self, error: Optional[str] = None) -> int:
+        """
+        Suelta las tareas que este proceso aún tiene ``running``.
+
+        Args:
+            error: Si se indica, quedan ``failed`` con este error (se
+                perdieron por el camino); si no, vuelven a ``pending``
+                (interrupción) para que otro proceso o un ``--resume`` las recoja
+
+        Returns:
+            Tareas soltadas
+        """
+        with self.session_factory() as session:
+            released = session.query(EtlTask).filter(
+                EtlTask.run_id == self.run_id,
+                EtlTask.status == "running",
+                EtlTask.locked_by == self.worker,
+            ).update(
+                {EtlTask.status: "failed" if error else "pending", EtlTask.error: error,
+                 EtlTask.locked_by: None, EtlTask.locked_at: None,
+                 EtlTask.updated_at: datetime.utcnow()},
+                synchronize_session=False,
+            )
+            session.commit()
+        return released
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Tareas por estado: {"branches": {...}, "modules": {...}}."""
+        with self.session_factory() as session:
+            is_branch = EtlTask.technical_name == BRANCH
+            rows = session.query(is_branch, EtlTask.status, func.count()).filter(
+                EtlTask.run_id == self.run_id
+            ).group_by(is_branch, EtlTask.status)
+            stats: Dict[str, Dict[str, int]] = {"branches": {}, "modules": {}}
+            for branch, status, count in rows:
+                stats["branches" if branch else "modules"][status] = count
+        return stats
+
+    def finish(self) -> Dict[str, Dict[str, int]]:
+        """
+        Cierra la ejecución si ya no quedan tareas pendientes ni en curso
+        (``failed`` si alguna falló).
+
+        Returns:
+            stats()
+        """
+        stats = self.stats()
+        counts = {**stats["branches"]}
+        for status, count in stats["modules"].items():
+            counts[status] = counts.get(status, 0) + count
+        if not counts.get("pending") and not counts.get("running"):
+            with self.session_factory() as session:
+                session.query(EtlRun).filter(EtlRun.id == self.run_id).update(
+                    {EtlRun.status: "failed" if counts.get("failed") else "done",
+                     EtlRun.finished_at: datetime.utcnow()},
+                    synchronize_session=False,
+                )
+                session.commit()
+        return stats
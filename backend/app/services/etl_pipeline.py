@@ -0,0 +1,177 @@
+"""
+Pipeline por etapas con colas acotadas para el ETL.
+
+Cada etapa tiene su propio pool de threads y lee de una cola acotada; lo que
+devuelve se encola para la etapa siguiente. Las colas acotadas dan
+backpressure: si la escritura va lenta, los fetchers se bloquean en lugar de
+acumular módulos en memoria.
+
+Example:
+    >>> results = []
+    >>> pipeline = Pipeline([
+    ...     Stage("double", lambda x: [x * 2], workers=2),
+    ...     Stage("collect", results.append),
+    ... ])
+    >>> pipeline.run([1, 2, 3])
+"""
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Marca de fin de stream para los workers de una etapa
+_DONE = object()
+
+
+@dataclass
+class Stage:
+    """
+    Etapa del pipeline.
+
+    Args:
+        name: Nombre (para logs y estadísticas)
+        func: Procesa un item; devuelve un iterable de items para la etapa
+            siguiente (None o vacío = no emite nada)
+        workers: Threads de la etapa
+        batch_size: Si > 1, ``func`` recibe listas de hasta ``batch_size``
+            items (ej: embeddings o escrituras por lotes)
+        batch_wait: Segundos que se espera a completar un lote antes de
+            procesarlo incompleto
+    """
+
+    name: str
+    func: Callable[[Any], Optional[Iterable[Any]]]
+    workers: int = 1
+    batch_size: int = 1
+    batch_wait: float = 0.5
+
+
+@dataclass
+class StageStats:
+    processed: int = 0
+    emitted: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0
+    error_samples: List[str] = field(default_factory=list)
+
+
+class Pipeline:
+    """
+    Ejecuta etapas encadenadas por colas acotadas.
+
+    Los errores en un item se registran en las estadísticas de la etapa y no
+    detienen el pipeline.
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: int = 100, max_error_samples: int = 20):
+        if not stages:
+            raise ValueError("El pipeline necesita al menos una etapa")
+        self.stages = stages
+        self.queue_size = queue_size
+        self.max_error_samples = max_error_samples
+        self.stats: Dict[str, StageStats] = {stage.name: StageStats() for stage in stages}
+        self._lock = threading.Lock()
+
+    def run(self, items: Iterable[Any]) -> Dict[str, StageStats]:
+        """
+        Procesa ``items`` a través de todas las etapas y espera a que terminen.
+
+        Returns:
+            Estadísticas por etapa
+        """
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        remaining = [max(1, stage.workers) for stage in self.stages]
+        threads: List[threading.Thread] = []
+
+        for index, stage in enumerate(self.stages):
+            for n in range(max(1, stage.workers)):
+                thread = threading.Thread(
+                    target=self._worker,
+                    args=(index, queues, remaining),
+                    name=f"etl-{stage.name}-{n}",
+                    daemon=True,
+                )
+                thread.start()
+                threads.append(thread)
+
+        try:
+            for item in items:
+                queues[0].put(item)
+        finally:
+            for _ in range(max(1, self.stages[0].workers)):
+                queues[0].put(_DONE)
+
+        for thread in threads:
+            thread.join()
+        return self.stats
+
+    @staticmethod
+    def _collect_batch(first: Any, inbox: queue.Queue, stage: Stage):
+        """
+        Agrupa hasta ``batch_size`` items esperando como mucho ``batch_wait``.
+
+        Returns:
+            Tupla (lote, fin_de_stream)
+        """
+        batch = [first]
+        deadline = time.monotonic() + stage.batch_wait
+        while len(batch) < stage.batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                item = inbox.get(timeout=timeout) if timeout > 0 else inbox.get_nowait()
+            except queue.Empty:
+                break
+            if item is _DONE:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _worker(self, index: int, queues: List[queue.Queue], remaining: List[int]) -> None:
+        stage = self.stages[index]
+        stats = self.stats[stage.name]
+        inbox = queues[index]
+        outbox = queues[index + 1] if index + 1 < len(queues) else None
+
+        done = False
+        while not done:
+            item = inbox.get()
+            if item is _DONE:
+                break
+
+            size = 1
+            if stage.batch_size > 1:
+                item, done = self._collect_batch(item, inbox, stage)
+                size = len(item)
+
+            start = time.perf_counter()
+            try:
+                outputs = stage.func(item)
+                emitted = 0
+                if outputs is not None and outbox is not None:
+                    for output in outputs:
+                        outbox.put(output)
+                        emitted += 1
+                with self._lock:
+                    stats.processed += size
+                    stats.emitted += emitted
+                    stats.busy_seconds += time.perf_counter() - start
+            except Exception as e:
+                logger.error(f"Etapa {stage.name}: {e}")
+                with self._lock:
+                    stats.errors += size
+                    stats.busy_seconds += time.perf_counter() - start
+                    if len(stats.error_samples) < self.max_error_samples:
+                        stats.error_samples.append(str(e))
+
+        # El último worker de la etapa cierra la cola de la siguiente
+        with self._lock:
+            remaining[index] -= 1
+            last = remaining[index] == 0
+        if last and outbox is not None:
+            for _ in range(max(1, self.stages[index + 1].workers)):
+                outbox.put(_DONE)
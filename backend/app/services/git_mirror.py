@@ -0,0 +1,230 @@
+"""
+Lectura de módulos desde mirrors git locales (``git clone --mirror``).
+
+Alternativa a la API REST sin red ni rate limit:
+
+- los módulos se listan con ``git ls-tree -r`` (path + SHA de blob, igual
+  que el árbol recursivo de la API, así que el estado incremental es el mismo)
+- manifests y README se leen por un único proceso ``git cat-file --batch``
+  de larga duración por repo (un proceso, muchas lecturas por stdin/stdout)
+- la fecha de último commit es por módulo, de una sola pasada de ``git log``
+  por rama (en lugar del ``pushed_at`` global del repo)
+"""
+import subprocess
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Marca de inicio de commit en la salida de git log
+_COMMIT_MARK = "\x01"
+
+
+class GitError(RuntimeError):
+    """Un comando git ha fallado."""
+
+
+class CatFileBatch:
+    """
+    Proceso ``git cat-file --batch`` de larga duración.
+
+    Cada petición escribe un SHA en stdin y lee ``<sha> <tipo> <tamaño>\\n``
+    seguido del contenido. Un lock serializa las peticiones de varios threads.
+    """
+
+    def __init__(self, repo_path: str, git: str = "git"):
+        self._process = subprocess.Popen(
+            [git, "-C", repo_path, "cat-file", "--batch"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        self._lock = threading.Lock()
+        self.reads = 0
+
+    def read(self, sha: str) -> Optional[bytes]:
+        """Contenido de un objeto, o None si no existe."""
+        with self._lock:
+            if self._process.poll() is not None:
+                raise GitError("git cat-file --batch ha terminado")
+            self._process.stdin.write(sha.encode("ascii") + b"\n")
+            self._process.stdin.flush()
+
+            header = self._process.stdout.readline().decode("ascii").split()
+            if len(header) != 3:
+                return None  # "<sha> missing" / "<sha> ambiguous"
+            size = int(header[2])
+            data = self._process.stdout.read(size)
+            self._process.stdout.read(1)  # "\n" final
+            self.reads += 1
+            return data
+
+    def close(self) -> None:
+        with self._lock:
+            if self._process.poll() is None:
+                self._process.stdin.close()
+                self._process.wait(timeout=10)
+            self._process.stdout.close()
+
+
+class GitMirror:
+    """
+    Un repositorio local (bare o no).
+
+    Args:
+        path: Ruta del repositorio
+        git: Ejecutable de git
+    """
+
+    def __init__(self, path: str, git: str = "git"):
+        self.path = str(path)
+        self.git = git
+        self._batch: Optional[CatFileBatch] = None
+        self._lock = threading.Lock()
+
+    def _run(self, *args: str) -> bytes:
+        result = subprocess.run(
+            [self.git, "-C", self.path, *args], capture_output=True
+        )
+        if result.returncode != 0:
+            raise GitError(
+                f"git {' '.join(args)}: {result.stderr.decode('utf-8', errors='ignore').strip()}"
+            )
+        return result.stdout
+
+    def head(self, branch: str) -> Optional[str]:
+        """SHA del commit de cabeza de una rama, o None si no existe."""
+        try:
+            return self._run(
+                "rev-parse", "--verify", "--quiet", f"refs/heads/{branch}^{{commit}}"
+            ).decode("ascii").strip() or None
+        except GitError:
+            return None
+
+    def ls_tree(self, ref: str) -> Dict[str, str]:
+        """Blobs de un commit: {path: sha} (``git ls-tree -r``)."""
+        blobs: Dict[str, str] = {}
+        for entry in self._run("ls-tree", "-r", "-z", "--full-tree", ref).split(b"\0"):
+            if not entry:
+                continue
+            meta, path = entry.split(b"\t", 1)
+            _mode, kind, sha = meta.split()
+            if kind == b"blob":
+                blobs[path.decode("utf-8", errors="surrogateescape")] = sha.decode("ascii")
+        return blobs
+
+    @property
+    def batch(self) -> CatFileBatch:
+        with self._lock:
+            if self._batch is None:
+                self._batch = CatFileBatch(self.path, self.git)
+            return self._batch
+
+    def read_blob(self, sha: str) -> Optional[bytes]:
+        return self.batch.read(sha)
+
+    def read_text(self, sha: Optional[str]) -> Optional[str]:
+        """Contenido de un blob como texto (None si no hay SHA o no existe)."""
+        if not sha:
+            return None
+        data = self.read_blob(sha)
+        return data.decode("utf-8", errors="ignore") if data is not None else None
+
+    def last_commit_dates(self, ref: str, module_dirs: Iterable[str]) -> Dict[str, datetime]:
+        """
+        Fecha del último commit que tocó cada directorio de módulo.
+
+        Una sola pasada de ``git log --name-only`` desde ``ref`` que se corta en
+        cuanto todos los módulos tienen fecha.
+
+        Returns:
+            {module_dir: fecha} (los módulos sin historia no aparecen)
+        """
+        pending = set(module_dirs)
+        dates: Dict[str, datetime] = {}
+        if not pending:
+            return dates
+
+        process = subprocess.Popen(
+            [self.git, "-C", self.path, "-c", "core.quotePath=false", "log",
+             f"--format={_COMMIT_MARK}%cI", "--name-only", ref, "--"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            date: Optional[datetime] = None
+            for raw in process.stdout:
+                line = raw.decode("utf-8", errors="surrogateescape").rstrip("\n")
+                if line.startswith(_COMMIT_MARK):
+                    date = datetime.fromisoformat(line[1:])
+                    continue
+                if not line or date is None:
+                    continue
+                module_dir = _owning_dir(line, pending)
+                if module_dir is not None:
+                    dates[module_dir] = date
+                    pending.discard(module_dir)
+                    if not pending:
+                        break
+        finally:
+            process.kill()
+            process.stdout.close()
+            process.wait()
+        return dates
+
+    def close(self) -> None:
+        with self._lock:
+            if self._batch is not None:
+                self._batch.close()
+                self._batch = None
+
+
+def _owning_dir(path: str, module_dirs: set) -> Optional[str]:
+    """Directorio de ``module_dirs`` que contiene ``path`` (el más externo)."""
+    parts = path.split("/")
+    for end in range(1, len(parts)):
+        candidate = "/".join(parts[:end])
+        if candidate in module_dirs:
+            return candidate
+    return None
+
+
+class MirrorPool:
+    """
+    Mirrors de un directorio: ``<directory>/<repo>.git`` o ``<directory>/<repo>``.
+
+    Mantiene un GitMirror (y su proceso cat-file) por repo.
+    """
+
+    def __init__(self, directory: str, git: str = "git"):
+        self.directory = Path(directory)
+        self.git = git
+        self._mirrors: Dict[str, Optional[GitMirror]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, repo_name: str) -> Optional[GitMirror]:
+        with self._lock:
+            if repo_name not in self._mirrors:
+                path = next(
+                    (
+                        candidate
+                        for candidate in (
+                            self.directory / f"{repo_name}.git",
+                            self.directory / repo_name,
+                        )
+                        if candidate.is_dir()
+                    ),
+                    None,
+                )
+                self._mirrors[repo_name] = GitMirror(path, self.git) if path else None
+            return self._mirrors[repo_name]
+
+    def close(self) -> None:
+        with self._lock:
+            mirrors: List[GitMirror] = [m for m in self._mirrors.values() if m is not None]
+        for mirror in mirrors:
+            mirror.close()
@@ -1,49 +1,89 @@
-import ast
 import base64
-from typing import Any, Dict, List, Optional
+from typing import Dict, List, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from ..config import get_settings
+from ..utils.parsers import parse_manifest
+from .graphql_blobs import GraphQLBlobFetcher
+from .http_cache import HttpCache, replay_response
+from .module_index import README_NAMES
+from .rate_limit import RateLimitGovernor
 
 settings = get_settings()
 
 
-def _safe_ast_eval(node: ast.AST) -> Any:
-    """Evaluar nodos AST permitiendo solo estructuras de datos literales."""
-    if isinstance(node, ast.Constant):
-        return node.value
-    if isinstance(node, ast.List):
-        return [_safe_ast_eval(elt) for elt in node.elts]
-    if isinstance(node, ast.Tuple):
-        return tuple(_safe_ast_eval(elt) for elt in node.elts)
-    if isinstance(node, ast.Dict):
-        return {
-            _safe_ast_eval(key): _safe_ast_eval(value)
-            for key, value in zip(node.keys, node.values)
-        }
-    if isinstance(node, ast.Set):
-        return {_safe_ast_eval(elt) for elt in node.elts}
-    if isinstance(node, ast.NameConstant):  # Py<3.8 compatibility
-        return node.value
-    if isinstance(node, ast.Name):
-        if node.id in {"True", "False", "None"}:
-            return eval(node.id)  # noqa: PGH001
-        raise ValueError(f"Nombre no permitido en manifest: {node.id}")
-    if isinstance(node, ast.Call):
-        # Soportar traducciones tipo _("texto")
-        if isinstance(node.func, ast.Name) and node.func.id == "_":
-            if node.args:
-                return _safe_ast_eval(node.args[0])
-        raise ValueError("Llamadas a funciones no permitidas en manifest")
-    raise ValueError(f"Tipo de nodo no soportado: {type(node).__name__}")
-
-
 class GitHubService:
-    def __init__(self):
+    def __init__(
+        self,
+        governor: Optional[RateLimitGovernor] = None,
+        max_retries: int = 3,
+        http_cache: Optional[HttpCache] = None,
+    ):
         self.token = settings.gh_token
         self.headers = {"Authorization": f"token {self.token}"}
         self.base_url = "https://api.github.com"
+        self.max_retries = max_retries
+
+        # Governor global: compartido por todos los threads que usen el servicio
+        self.governor = governor or RateLimitGovernor(
+            max_concurrency=settings.github_max_concurrency,
+            reserve=settings.github_rate_limit_reserve,
+        )
+
+        # Sesión con pool de conexiones (keep-alive) dimensionado a la concurrencia
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=max(10, settings.github_max_concurrency))
+        self.session.mount("https://", adapter)
+        self.session.headers.update(self.headers)
+
+        # Cache de respuestas con ETag / Last-Modified (peticiones condicionales)
+        self.http_cache = http_cache
+        if self.http_cache is None and settings.github_cache_enabled:
+            self.http_cache = HttpCache(
+                settings.github_cache_dir, max_bytes=settings.github_cache_max_bytes
+            )
+
+        # Descarga de ficheros por lotes con GraphQL (cupo de puntos propio)
+        self.graphql = GraphQLBlobFetcher(
+            self.session,
+            f"{self.base_url}/graphql",
+            batch_size=settings.github_graphql_batch_size,
+            governor=self.governor,
+        )
+
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        """
+        GET a la API respetando el rate limit global.
+
+        Reintenta (tras la pausa que indique GitHub) las respuestas de rate limit.
+        Con la cache HTTP activa envía ``If-None-Match`` / ``If-Modified-Since``
+        y un 304 se resuelve con el cuerpo guardado.
+        """
+        kwargs.setdefault("timeout", 30)
+
+        # Las descargas en streaming (tarballs) no pasan por la cache
+        cache = self.http_cache if not kwargs.get("stream") else None
+        entry = cache.get(url) if cache is not None else None
+        if entry is not None:
+            kwargs["headers"] = {**kwargs.get("headers", {}), **cache.conditional_headers(entry)}
+
+        for attempt in range(self.max_retries + 1):
+            with self.governor.slot():
+                response = self.session.get(url, **kwargs)
+            wait = self.governor.update(response.status_code, response.headers)
+            if wait is None or attempt == self.max_retries:
+                break
+
+        if cache is not None:
+            if entry is not None and response.status_code == 304:
+                cache.record(hit=True)
+                cache.touch(url)
+                return replay_response(entry, response)
+            cache.record(hit=False)
+            cache.store(url, response)
+        return response
 
     def get_repo_metadata(self, repo_name: str) -> Dict:
         """
@@ -56,7 +96,7 @@ class GitHubService:
             Dict con stars, issues, última actualización
         """
         url = f"{self.base_url}/repos/OCA/{repo_name}"
-        response = requests.get(url, headers=self.headers)
+        response = self._get(url)
         response.raise_for_status()
 
         data = response.json()
@@ -79,7 +119,7 @@ class GitHubService:
             Lista de versiones (ej: ["16.0", "17.0", "18.0"])
         """
         url = f"{self.base_url}/repos/OCA/{repo_name}/branches"
-        response = requests.get(url, headers=self.headers)
+        response = self._get(url)
         response.raise_for_status()
 
         branches = response.json()
@@ -104,7 +144,7 @@ class GitHubService:
             Lista de paths a manifests (ej: ["module_name/__manifest__.py"])
         """
         url = f"{self.base_url}/repos/OCA/{repo_name}/git/trees/{version}?recursive=1"
-        response = requests.get(url, headers=self.headers)
+        response = self._get(url)
 
         if response.status_code != 200:
             return []
@@ -118,6 +158,74 @@ class GitHubService:
 
         return manifests
 
+    def get_branch_head(self, repo_name: str, version: str) -> Optional[str]:
+        """
+        Obtener el SHA del commit de cabeza de una rama.
+
+        Args:
+            repo_name: Nombre del repo
+            version: Versión de Odoo (branch)
+
+        Returns:
+            SHA del commit, o None si la rama no existe
+        """
+        response = self._get(f"{self.base_url}/repos/OCA/{repo_name}/branches/{version}")
+        if response.status_code != 200:
+            return None
+        return response.json()["commit"]["sha"]
+
+    def get_tree_blobs(self, repo_name: str, ref: str) -> Optional[Dict]:
+        """
+        Listar los blobs del árbol recursivo de un commit o rama.
+
+        Es la misma petición que hace ``find_manifests``, pero conservando
+        el SHA de cada fichero para poder detectar cambios sin descargarlos.
+
+        Args:
+            repo_name: Nombre del repo
+            ref: SHA de commit o nombre de rama
+
+        Returns:
+            Dict con blobs ({path: sha}) y truncated (la API corta árboles
+            muy grandes), o None si el ref no existe
+        """
+        url = f"{self.base_url}/repos/OCA/{repo_name}/git/trees/{ref}?recursive=1"
+        response = self._get(url)
+        if response.status_code != 200:
+            return None
+
+        data = response.json()
+        return {
+            "truncated": data.get("truncated", False),
+            "blobs": {
+                item["path"]: item["sha"]
+                for item in data.get("tree", [])
+                if item.get("type") == "blob"
+            },
+        }
+
+    def get_tarball(self, repo_name: str, version: str) -> Optional[requests.Response]:
+        """
+        Abrir en streaming el tarball de una rama (una sola petición a la API).
+
+        Args:
+            repo_name: Nombre del repo
+            version: Versión de Odoo (branch)
+
+        Returns:
+            Respuesta en streaming (leer de ``response.raw`` y cerrarla), o
+            None si la rama no existe
+        """
+        url = f"{self.base_url}/repos/OCA/{repo_name}/tarball/{version}"
+        response = self._get(url, stream=True, timeout=120)
+        if response.status_code != 200:
+            response.close()
+            return None
+
+        # Deshacer un posible Content-Encoding; el gzip del .tar.gz lo lee tarfile
+        response.raw.decode_content = True
+        return response
+
     def get_manifest_content(self, repo_name: str, version: str, manifest_path: str) -> Optional[Dict]:
         """
         Obtener y parsear el contenido de un __manifest__.py
@@ -130,8 +238,26 @@ class GitHubService:
         Returns:
             Dict con el contenido del manifest parseado
         """
-        url = f"{self.base_url}/repos/OCA/{repo_name}/contents/{manifest_path}?ref={version}"
-        response = requests.get(url, headers=self.headers)
+        content = self.get_file_content(repo_name, version, manifest_path)
+        if content is None:
+            return None
+
+        return self.parse_manifest(content, manifest_path)
+
+    def get_file_content(self, repo_name: str, version: str, path: str) -> Optional[str]:
+        """
+        Obtener el contenido (texto) de un fichero del repo.
+
+        Args:
+            repo_name: Nombre del repo
+            version: Versión de Odoo (branch)
+            path: Path del fichero en el repo
+
+        Returns:
+            Contenido decodificado, o None si no existe
+        """
+        url = f"{self.base_url}/repos/OCA/{repo_name}/contents/{path}?ref={version}"
+        response = self._get(url)
 
         if response.status_code != 200:
             return None
@@ -139,31 +265,37 @@ class GitHubService:
         data = response.json()
 
         # Decodificar contenido (está en base64)
-        content = base64.b64decode(data['content']).decode('utf-8')
-
-        # Parsear el manifest (es código Python)
-        try:
-            tree = ast.parse(content)
-
-            for node in tree.body:
-                if isinstance(node, ast.Assign):
-                    try:
-                        return _safe_ast_eval(node.value)
-                    except Exception:
-                        continue
-
-            # Fallback: primer dict literal encontrado
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Dict):
-                    try:
-                        return _safe_ast_eval(node)
-                    except Exception:
-                        continue
-        except Exception as e:
-            print(f"❌ Error parseando {manifest_path}: {e}")
-            return None
+        return base64.b64decode(data['content']).decode('utf-8', errors='ignore')
 
-        return None
+    def get_files_content(
+        self, repo_name: str, ref: str, paths: List[str]
+    ) -> Dict[str, Optional[str]]:
+        """
+        Obtener el contenido de muchos ficheros con queries GraphQL por lotes.
+
+        Los lotes que GraphQL no puede servir se descargan por REST
+        (``get_file_content``).
+
+        Args:
+            repo_name: Nombre del repo
+            ref: Rama o SHA de commit
+            paths: Paths de los ficheros
+
+        Returns:
+            Dict {path: contenido}, None si el fichero no existe
+        """
+        return self.graphql.fetch(
+            "OCA",
+            repo_name,
+            ref,
+            paths,
+            fallback=lambda path: self.get_file_content(repo_name, ref, path),
+        )
+
+    @staticmethod
+    def parse_manifest(content: str, manifest_path: str = "") -> Optional[Dict]:
+        """Parsear el contenido de un __manifest__.py (ver ``utils.parsers``)."""
+        return parse_manifest(content, manifest_path)
 
     def get_readme_content(self, repo_name: str, version: str, module_path: str) -> Optional[str]:
         """
@@ -180,15 +312,14 @@ class GitHubService:
         # Extraer el directorio del módulo
         module_dir = module_path.rsplit('/', 1)[0] if '/' in module_path else module_path.replace('__manifest__.py', '')
 
-        # Probar diferentes nombres de README
-        readme_names = ['README.md', 'README.rst', 'README.MD', 'README.RST', 'readme.md']
-
-        for readme_name in readme_names:
+        # Probar diferentes nombres de README (una petición por nombre; el ETL
+        # evita esto resolviendo el README desde el índice del árbol)
+        for readme_name in README_NAMES:
             readme_path = f"{module_dir}/{readme_name}"
             url = f"{self.base_url}/repos/OCA/{repo_name}/contents/{readme_path}?ref={version}"
 
             try:
-                response = requests.get(url, headers=self.headers, timeout=10)
+                response = self._get(url, timeout=10)
 
                 if response.status_code == 200:
                     data = response.json()
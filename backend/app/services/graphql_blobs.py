@@ -0,0 +1,253 @@
+"""
+Descarga de muchos ficheros por petición con la API GraphQL de GitHub.
+
+Una sola query pide N ficheros con campos con alias::
+
+    f0: object(expression: $e0) { ... on Blob { text isBinary } }
+
+donde ``$e0 = "<ref>:<path>"``. Son 50-100 ficheros por petición en lugar
+de una llamada REST por fichero.
+
+El tamaño de lote se adapta: crece mientras las queries van bien y se
+reduce a la mitad cuando GitHub rechaza la query por límites de recursos
+(nodos, tiempo, tamaño de respuesta). Si un lote falla por otro motivo, o
+ya no se puede reducir más, o se agotan los puntos de GraphQL, esos
+ficheros se piden por REST (``fallback``).
+"""
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence
+
+import requests
+
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Errores de GraphQL que indican que la query es demasiado grande
+LIMIT_ERROR_TYPES = {"MAX_NODE_LIMIT_EXCEEDED", "RESOURCE_LIMITS_EXCEEDED", "TIMEOUT"}
+# Respuestas HTTP de GitHub cuando una query tarda o pesa demasiado
+LIMIT_STATUS_CODES = {502, 504}
+
+
+class GraphQLError(RuntimeError):
+    """La query ha fallado; ``limit`` indica que un lote menor puede funcionar."""
+
+    def __init__(self, message: str, limit: bool = False):
+        super().__init__(message)
+        self.limit = limit
+
+
+def build_query(count: int) -> str:
+    """Query con ``count`` campos ``object`` con alias (f0..fN) y variables e0..eN."""
+    variables = "".join(f", $e{i}: String!" for i in range(count))
+    fields = "\n".join(
+        f"    f{i}: object(expression: $e{i}) {{ ... on Blob {{ text isBinary }} }}"
+        for i in range(count)
+    )
+    return (
+        f"query($owner: String!, $name: String!{variables}) {{\n"
+        f"  repository(owner: $owner, name: $name) {{\n{fields}\n  }}\n"
+        f"  rateLimit {{ cost remaining resetAt }}\n"
+        f"}}"
+    )
+
+
+class GraphQLBlobFetcher:
+    """
+    Descarga ficheros de un repo en lotes con GraphQL.
+
+    Args:
+        session: Sesión HTTP con la autenticación ya configurada
+        url: Endpoint GraphQL (https://api.github.com/graphql)
+        batch_size: Ficheros por query al empezar
+        min_batch_size: Por debajo de este tamaño se usa REST
+        max_batch_size: Tope al que puede crecer el lote
+        growth: Ficheros que se añaden al lote tras una query correcta
+        timeout: Timeout por petición
+        governor: RateLimitGovernor cuyo límite de concurrencia se comparte
+            con REST (GraphQL tiene su propio cupo de puntos)
+    """
+
+    def __init__(
+        self,
+        session: requests.Session,
+        url: str,
+        batch_size: int = 50,
+        min_batch_size: int = 5,
+        max_batch_size: int = 100,
+        growth: int = 10,
+        timeout: float = 60,
+        governor=None,
+    ):
+        self.session = session
+        self.url = url
+        self.batch_size = batch_size
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.growth = growth
+        self.timeout = timeout
+        self.governor = governor
+        self._lock = threading.Lock()
+        self._exhausted_until = 0.0
+        self.requests = 0
+        self.files = 0
+        self.fallbacks = 0
+        self.shrinks = 0
+        self.last_cost: Optional[int] = None
+        self.remaining: Optional[int] = None
+
+    @property
+    def exhausted(self) -> bool:
+        """Sin puntos de GraphQL hasta el reset de la ventana."""
+        with self._lock:
+            return time.time() < self._exhausted_until
+
+    def _resize(self, ok: bool) -> None:
+        with self._lock:
+            if ok:
+                self.batch_size = min(self.max_batch_size, self.batch_size + self.growth)
+            else:
+                self.batch_size = max(self.min_batch_size, self.batch_size // 2)
+                self.shrinks += 1
+
+    def query(self, owner: str, name: str, ref: str, paths: Sequence[str]) -> Dict[str, Optional[str]]:
+        """
+        Una query para ``paths``.
+
+        Returns:
+            {path: texto}; None si el fichero no existe o es binario. Los
+            ficheros que GraphQL no pudo resolver no aparecen.
+
+        Raises:
+            GraphQLError: si la query falla entera
+        """
+        variables = {"owner": owner, "name": name}
+        variables.update({f"e{i}": f"{ref}:{path}" for i, path in enumerate(paths)})
+
+        with self._lock:
+            self.requests += 1
+        slot = self.governor.slot() if self.governor is not None else nullcontext()
+        try:
+            with slot:
+                response = self.session.post(
+                    self.url,
+                    json={"query": build_query(len(paths)), "variables": variables},
+                    timeout=self.timeout,
+                )
+        except requests.Timeout as e:
+            raise GraphQLError(f"timeout: {e}", limit=True)
+        except requests.RequestException as e:
+            raise GraphQLError(str(e))
+
+        if response.status_code in LIMIT_STATUS_CODES:
+            raise GraphQLError(f"HTTP {response.status_code}", limit=True)
+        if response.status_code != 200:
+            raise GraphQLError(f"HTTP {response.status_code}")
+
+        payload = response.json()
+        errors = payload.get("errors") or []
+        if any(error.get("type") in LIMIT_ERROR_TYPES for error in errors):
+            raise GraphQLError(errors[0].get("message", "límite de recursos"), limit=True)
+
+        data = payload.get("data") or {}
+        repository = data.get("repository")
+        if repository is None:
+            message = errors[0].get("message") if errors else "respuesta sin datos"
+            raise GraphQLError(message)
+
+        rate = data.get("rateLimit") or {}
+        with self._lock:
+            self.last_cost = rate.get("cost", self.last_cost)
+            self.remaining = rate.get("remaining", self.remaining)
+            if self.remaining is not None and self.last_cost is not None:
+                if self.remaining < self.last_cost and rate.get("resetAt"):
+                    reset = datetime.fromisoformat(rate["resetAt"].replace("Z", "+00:00"))
+                    self._exhausted_until = reset.timestamp()
+                    logger.warning(f"GraphQL sin puntos hasta {rate['resetAt']}; usando REST")
+
+        # Alias con error propio (ej: expresión inválida): se omiten -> fallback
+        failed = {
+            error["path"][1]
+            for error in errors
+            if isinstance(error.get("path"), list) and len(error["path"]) > 1
+        }
+
+        results: Dict[str, Optional[str]] = {}
+        for i, path in enumerate(paths):
+            alias = f"f{i}"
+            if alias in failed or alias not in repository:
+                continue
+            blob = repository[alias]
+            if blob is None or blob.get("isBinary") or blob.get("text") is None:
+                results[path] = None
+            else:
+                results[path] = blob["text"]
+        return results
+
+    def fetch(
+        self,
+        owner: str,
+        name: str,
+        ref: str,
+        paths: Sequence[str],
+        fallback: Callable[[str], Optional[str]],
+    ) -> Dict[str, Optional[str]]:
+        """
+        Descarga ``paths`` (en ``ref``) en lotes adaptativos.
+
+        Args:
+            owner: Organización (ej: "OCA")
+            name: Repo
+            ref: Rama o SHA de commit
+            paths: Ficheros a descargar
+            fallback: Descarga REST de un fichero (para lotes fallidos)
+
+        Returns:
+            {path: texto o None si no existe}
+        """
+        results: Dict[str, Optional[str]] = {}
+        pending: List[str] = list(dict.fromkeys(paths))
+
+        while pending:
+            size = self.batch_size
+            batch = pending[:size]
+            retry = False
+            if not self.exhausted:
+                try:
+                    fetched = self.query(owner, name, ref, batch)
+                    results.update(fetched)
+                    with self._lock:
+                        self.files += len(fetched)
+                    self._resize(ok=True)
+                    batch = [path for path in batch if path not in fetched]
+                except GraphQLError as e:
+                    if e.limit and size > self.min_batch_size:
+                        logger.info(f"GraphQL: lote de {size} rechazado ({e}), reduciendo")
+                        self._resize(ok=False)
+                        retry = True
+                    else:
+                        logger.warning(f"GraphQL: lote de {size} falló ({e}), usando REST")
+            if retry:
+                continue
+
+            pending = pending[size:]
+            for path in batch:
+                results[path] = fallback(path)
+            with self._lock:
+                self.fallbacks += len(batch)
+
+        return results
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "files": self.files,
+                "fallbacks": self.fallbacks,
+                "batch_size": self.batch_size,
+                "shrinks": self.shrinks,
+                "remaining": self.remaining,
+            }
@@ -0,0 +1,208 @@
+"""
+Cache HTTP en disco para peticiones condicionales a GitHub.
+
+Guarda el cuerpo y las cabeceras ``ETag`` / ``Last-Modified`` de cada
+respuesta 200 (un fichero por URL). La siguiente petición a la misma URL
+envía ``If-None-Match`` / ``If-Modified-Since``; si GitHub responde 304 se
+sirve el cuerpo guardado. Los 304 no cuentan contra el rate limit, así que
+las re-ejecuciones nocturnas del ETL son casi gratis.
+
+Formato de cada entrada (``<sha256(url)>.cache``): una línea JSON con los
+metadatos seguida del cuerpo en bruto. La evicción es por tamaño total,
+eliminando primero las entradas usadas hace más tiempo (mtime).
+"""
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from ..core.logging import get_logger
+from ..core.telemetry import record_cache_lookup
+
+logger = get_logger(__name__)
+
+# Cabeceras de la respuesta original que se conservan con el cuerpo
+STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Link")
+
+# Tras superar el límite se libera hasta este porcentaje (evita evictar en cada escritura)
+EVICT_TARGET = 0.9
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    status_code: int
+    headers: Dict[str, str]
+    body: bytes
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.headers.get("ETag")
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self.headers.get("Last-Modified")
+
+
+class HttpCache:
+    """
+    Cache de respuestas en un directorio.
+
+    Args:
+        directory: Directorio de la cache (ej: data/cache/github)
+        max_bytes: Tamaño máximo en disco antes de evictar
+        name: Nombre de la cache en las métricas
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 500_000_000, name: str = "github_http"):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.name = name
+        self._lock = threading.Lock()
+        self.size = sum(path.stat().st_size for path in self.directory.glob("*.cache"))
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def _path(self, url: str) -> Path:
+        return self.directory / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.cache"
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        path = self._path(url)
+        try:
+            with open(path, "rb") as handle:
+                meta = json.loads(handle.readline())
+                body = handle.read()
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Entrada de cache corrupta {path.name}: {e}")
+            return None
+        if meta.get("url") != url:
+            return None
+        return CacheEntry(url, meta["status_code"], meta["headers"], body)
+
+    def conditional_headers(self, entry: Optional[CacheEntry]) -> Dict[str, str]:
+        """Cabeceras ``If-None-Match`` / ``If-Modified-Since`` para una entrada."""
+        headers: Dict[str, str] = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def store(self, url: str, response: requests.Response) -> bool:
+        """Guarda una respuesta 200 con validadores (ETag o Last-Modified)."""
+        if response.status_code != 200:
+            return False
+        headers = {
+            name: response.headers[name] for name in STORED_HEADERS if name in response.headers
+        }
+        if "ETag" not in headers and "Last-Modified" not in headers:
+            return False
+
+        meta = json.dumps({"url": url, "status_code": 200, "headers": headers}).encode("utf-8")
+        data = meta + b"\n" + response.content
+        path = self._path(url)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            previous = path.stat().st_size if path.exists() else 0
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"No se pudo escribir la cache {path.name}: {e}")
+            tmp.unlink(missing_ok=True)
+            return False
+
+        with self._lock:
+            self.stores += 1
+            self.size += len(data) - previous
+            over = self.size > self.max_bytes
+        if over:
+            self.evict()
+        return True
+
+    def touch(self, url: str) -> None:
+        """Marca una entrada como usada (orden de evicción)."""
+        try:
+            os.utime(self._path(url))
+        except OSError:
+            pass
+
+    def evict(self) -> int:
+        """Elimina las entradas menos usadas hasta bajar del límite."""
+        with self._lock:
+            target = self.max_bytes * EVICT_TARGET
+            entries = []
+            for path in self.directory.glob("*.cache"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+            self.size = sum(size for _, size, _ in entries)
+
+            removed = 0
+            for _, size, path in sorted(entries):
+                if self.size <= target:
+                    break
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                self.size -= size
+                removed += 1
+            self.evictions += removed
+        if removed:
+            logger.info(f"Cache HTTP: {removed} entradas evictadas ({self.size} bytes)")
+        return removed
+
+    def record(self, hit: bool) -> None:
+        record_cache_lookup(self.name, hit)
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "bytes": self.size,
+            }
+
+
+def replay_response(entry: CacheEntry, not_modified: requests.Response) -> requests.Response:
+    """
+    Respuesta 200 construida desde la cache para un 304.
+
+    Las cabeceras del 304 (rate limit, fecha...) tienen prioridad sobre las
+    guardadas.
+    """
+    response = requests.Response()
+    response.status_code = entry.status_code
+    response.headers = CaseInsensitiveDict({**entry.headers, **not_modified.headers})
+    response._content = entry.body
+    response.url = not_modified.url
+    response.request = not_modified.request
+    response.encoding = "utf-8"
+    response.reason = "OK (cached)"
+    response.elapsed = not_modified.elapsed
+    return response
+
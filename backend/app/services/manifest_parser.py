@@ -0,0 +1,253 @@
+"""
+Parseo de manifests con cache persistente y pool de procesos.
+
+Un manifest con el mismo SHA de blob git siempre da el mismo resultado, y la
+mayoría no cambian entre ejecuciones del ETL ni entre ramas. Los resultados
+se guardan en un SQLite local (``manifests``, clave ``(sha, parser)``) como
+JSON; también los manifests que no se pudieron parsear, para no reintentarlos.
+``PARSER_VERSION`` forma parte de la clave: al cambiar el parser las entradas
+antiguas dejan de usarse.
+
+En ingestas grandes los fallos de cache se parsean en un pool de procesos
+(el parseo es CPU puro y con threads lo serializa el GIL).
+"""
+import json
+import multiprocessing
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..core.logging import get_logger
+from ..core.telemetry import record_cache_lookup
+from ..utils.parsers import parse_manifest
+from .archive_ingest import git_blob_sha
+
+logger = get_logger(__name__)
+
+# Cambiar al modificar el resultado de parse_manifest (invalida la cache)
+PARSER_VERSION = "2"
+
+# SHAs por query en las lecturas (límite de parámetros de SQLite)
+LOOKUP_CHUNK = 500
+
+# (sha, contenido, path del manifest)
+ManifestItem = Tuple[Optional[str], str, str]
+
+
+def content_sha(content: str) -> str:
+    """SHA de blob git del contenido (si el índice no lo dio)."""
+    return git_blob_sha(content.encode("utf-8"))
+
+
+def _parse_item(item: Tuple[str, str]) -> Optional[Dict]:
+    """Tarea del pool (función de módulo: se serializa por nombre)."""
+    content, path = item
+    return parse_manifest(content, path)
+
+
+class ManifestCache:
+    """
+    Cache de manifests parseados en un fichero SQLite.
+
+    Args:
+        path: Fichero de la cache (se crea el directorio si no existe)
+        parser_version: Versión del parser (parte de la clave)
+    """
+
+    def __init__(self, path: str, parser_version: str = PARSER_VERSION):
+        self.path = path
+        self.parser_version = parser_version
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """Conexión compartida (se abre en el primer uso; llamar con el lock)."""
+        if self._conn is None:
+            if self.path != ":memory:":
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS manifests ("
+                "sha TEXT NOT NULL, parser TEXT NOT NULL, manifest TEXT, "
+                "PRIMARY KEY (sha, parser))"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get_many(self, shas: Iterable[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Returns:
+            ``{sha: manifest}`` solo de los SHAs en cache (manifest puede ser
+            None: ese blob no se pudo parsear)
+        """
+        shas = list(dict.fromkeys(shas))
+        found: Dict[str, Optional[Dict]] = {}
+        with self._lock:
+            conn = self._connection()
+            for start in range(0, len(shas), LOOKUP_CHUNK):
+                chunk = shas[start:start + LOOKUP_CHUNK]
+                rows = conn.execute(
+                    f"SELECT sha, manifest FROM manifests WHERE parser = ? "
+                    f"AND sha IN ({','.join('?' * len(chunk))})",
+                    [self.parser_version, *chunk],
+                ).fetchall()
+                for sha, manifest in rows:
+                    found[sha] = json.loads(manifest) if manifest is not None else None
+            self.hits += len(found)
+            self.misses += len(shas) - len(found)
+        for sha in shas:
+            record_cache_lookup("manifest", sha in found)
+        return found
+
+    def get(self, sha: str) -> Tuple[bool, Optional[Dict]]:
+        """(encontrado, manifest)"""
+        found = self.get_many([sha])
+        return sha in found, found.get(sha)
+
+    def put_many(self, manifests: Dict[str, Optional[Dict]]) -> None:
+        if not manifests:
+            return
+        rows = []
+        for sha, manifest in manifests.items():
+            try:
+                payload = json.dumps(manifest) if manifest is not None else None
+            except (TypeError, ValueError):
+                # Valores no representables en JSON (ej: sets): no se cachean
+                logger.debug(f"Manifest {sha} no cacheable")
+                continue
+            rows.append((sha, self.parser_version, payload))
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                "INSERT OR REPLACE INTO manifests (sha, parser, manifest) VALUES (?, ?, ?)", rows
+            )
+            conn.commit()
+            self.stored += len(rows)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "stored": self.stored,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class ManifestParser:
+    """
+    Parser de manifests con cache por SHA y pool de procesos opcional.
+
+    Args:
+        cache: Cache persistente (None = sin cache)
+        processes: Procesos del pool (0 = parsear en el proceso actual)
+        chunksize: Manifests por tarea enviada al pool
+    """
+
+    def __init__(
+        self,
+        cache: Optional[ManifestCache] = None,
+        processes: int = 0,
+        chunksize: int = 64,
+    ):
+        self.cache = cache
+        self.processes = processes
+        self.chunksize = chunksize
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self.parsed = 0
+
+    def start_pool(self) -> Optional[ProcessPoolExecutor]:
+        """Arranca el pool (perezoso; ``spawn`` porque el ETL tiene threads)."""
+        with self._pool_lock:
+            if self._pool is None and self.processes > 0:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    def parse(self, content: str, path: str = "", sha: Optional[str] = None) -> Optional[Dict]:
+        """Parsear un manifest (consultando la cache)."""
+        return self.parse_many([(sha, content, path)])[0]
+
+    def parse_many(self, items: List[ManifestItem]) -> List[Optional[Dict]]:
+        """
+        Parsear un lote de manifests.
+
+        Los SHAs repetidos dentro del lote se parsean una sola vez; los items
+        sin SHA usan el SHA de blob de su contenido.
+
+        Returns:
+            Un manifest (o None) por item, en el mismo orden
+        """
+        shas = [sha or content_sha(content) for sha, content, _ in items]
+        results: Dict[str, Optional[Dict]] = (
+            self.cache.get_many(shas) if self.cache is not None else {}
+        )
+
+        pending: Dict[str, Tuple[str, str]] = {}
+        for sha, (_, content, path) in zip(shas, items):
+            if sha not in results and sha not in pending:
+                pending[sha] = (content, path)
+
+        if pending:
+            pool = self.start_pool() if len(pending) > 1 else None
+            if pool is not None:
+                parsed = list(pool.map(_parse_item, pending.values(), chunksize=self.chunksize))
+            else:
+                parsed = [_parse_item(item) for item in pending.values()]
+            fresh = dict(zip(pending, parsed))
+            with self._pool_lock:
+                self.parsed += len(fresh)
+            if self.cache is not None:
+                self.cache.put_many(fresh)
+            results.update(fresh)
+
+        return [results[sha] for sha in shas]
+
+    def stats(self) -> Dict:
+        stats = {"parsed": self.parsed, "processes": self.processes}
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        return stats
+
+    def close(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+        if self.cache is not None:
+            self.cache.close()
+
+
+# Singleton
+_manifest_parser = None
+
+
+def get_manifest_parser() -> ManifestParser:
+    global _manifest_parser
+    if _manifest_parser is None:
+        from ..config import get_settings
+
+        settings = get_settings()
+        cache = (
+            ManifestCache(settings.manifest_cache_path)
+            if settings.manifest_cache_enabled else None
+        )
+        _manifest_parser = ManifestParser(cache)
+    return _manifest_parser
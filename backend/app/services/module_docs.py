@@ -0,0 +1,69 @@
+"""
+Textos largos de los módulos (``odoo_module_docs``).
+
+El README completo y la descripción completa no viven en ``odoo_modules``:
+así la tabla que recorre la búsqueda (vector + columnas de filtro) ocupa
+muchas menos páginas. En ``odoo_modules.description`` queda solo un extracto
+(lo que ya devolvía la búsqueda) y el detalle de un módulo lee el texto
+completo de la tabla lateral con un JOIN.
+
+Los textos se guardan como bytes UTF-8, opcionalmente comprimidos con zstd
+(``MODULE_DOCS_CODEC=zstd``, requiere el paquete ``zstandard``).
+"""
+from typing import Optional
+
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dependencia opcional
+    zstandard = None
+
+CODEC_PLAIN = "none"
+CODEC_ZSTD = "zstd"
+CODECS = (CODEC_PLAIN, CODEC_ZSTD)
+
+# Longitud del extracto de la descripción que se queda en odoo_modules
+EXCERPT_CHARS = 200
+
+ZSTD_LEVEL = 3
+
+
+def description_excerpt(description: Optional[str], limit: int = EXCERPT_CHARS) -> Optional[str]:
+    """Extracto de la descripción (el mismo recorte que aplica la búsqueda)."""
+    if not description:
+        return description
+    return description[:limit] + "..." if len(description) > limit else description
+
+
+def resolve_codec(codec: Optional[str]) -> str:
+    """Códec utilizable: zstd cae a texto plano si ``zstandard`` no está instalado."""
+    codec = codec or CODEC_PLAIN
+    if codec not in CODECS:
+        raise ValueError(f"Códec desconocido: {codec} (opciones: {', '.join(CODECS)})")
+    if codec == CODEC_ZSTD and zstandard is None:
+        logger.warning("zstandard no está instalado: los textos se guardan sin comprimir")
+        return CODEC_PLAIN
+    return codec
+
+
+def encode_doc(value: Optional[str], codec: str = CODEC_PLAIN) -> Optional[bytes]:
+    if value is None:
+        return None
+    data = value.encode("utf-8")
+    if codec == CODEC_ZSTD:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return data
+
+
+def decode_doc(data: Optional[bytes], codec: str = CODEC_PLAIN) -> Optional[str]:
+    if data is None:
+        return None
+    data = bytes(data)  # memoryview con psycopg2
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Texto comprimido con zstd pero zstandard no está instalado")
+        data = zstandard.ZstdDecompressor().decompress(data)
+    return data.decode("utf-8")
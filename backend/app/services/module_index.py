@@ -0,0 +1,95 @@
+"""
+Índice de módulos de una rama a partir del árbol git recursivo.
+
+El listado recursivo (``git/trees/<ref>?recursive=1``) ya incluye el path y
+el SHA de cada blob, así que con una sola petición por rama sabemos qué
+módulos existen, qué README tiene cada uno (sin probar nombres contra la
+API) y si su contenido ha cambiado desde la última ejecución (comparando
+SHAs), sin descargar ningún fichero.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+MANIFEST_NAME = "__manifest__.py"
+
+# Orden de preferencia de README (también lo usa GitHubService.get_readme_content)
+README_NAMES = ("README.md", "README.rst", "README.MD", "README.RST", "readme.md")
+
+# Otros ficheros útiles de un módulo (relativos a su directorio): fragmentos
+# del README de OCA (readme/) y la descripción de la app store
+EXTRA_FILES = (
+    "readme/DESCRIPTION.rst",
+    "readme/DESCRIPTION.md",
+    "readme/USAGE.rst",
+    "readme/USAGE.md",
+    "static/description/index.html",
+    "static/description/icon.png",
+)
+
+
+@dataclass
+class ModuleFiles:
+    """Ficheros relevantes de un módulo en una rama."""
+
+    module_dir: str
+    manifest_path: str
+    manifest_sha: str
+    readme_path: Optional[str] = None
+    readme_sha: Optional[str] = None
+    extras: Dict[str, str] = field(default_factory=dict)  # {EXTRA_FILES: sha}
+
+    @property
+    def technical_name(self) -> str:
+        return self.manifest_path.split("/")[0]
+
+
+def index_modules(blobs: Dict[str, str]) -> Dict[str, ModuleFiles]:
+    """
+    Agrupa los blobs de un árbol por módulo.
+
+    Args:
+        blobs: {path: sha} de los blobs del árbol
+
+    Returns:
+        Dict {module_dir: ModuleFiles}
+    """
+    modules: Dict[str, ModuleFiles] = {}
+    for path, sha in blobs.items():
+        if path == MANIFEST_NAME or not path.endswith("/" + MANIFEST_NAME):
+            continue
+        module_dir = path.rsplit("/", 1)[0]
+        modules[module_dir] = ModuleFiles(module_dir, path, sha)
+
+    for module in modules.values():
+        for readme_name in README_NAMES:
+            readme_path = f"{module.module_dir}/{readme_name}"
+            if readme_path in blobs:
+                module.readme_path = readme_path
+                module.readme_sha = blobs[readme_path]
+                break
+        for extra in EXTRA_FILES:
+            sha = blobs.get(f"{module.module_dir}/{extra}")
+            if sha is not None:
+                module.extras[extra] = sha
+
+    return modules
+
+
+def module_changed(
+    module: ModuleFiles,
+    manifest_sha: Optional[str],
+    readme_sha: Optional[str],
+    removed: bool = False,
+) -> bool:
+    """
+    Indica si un módulo debe re-procesarse.
+
+    Args:
+        module: Estado actual en el árbol
+        manifest_sha: SHA del manifest guardado (None si no se conoce)
+        readme_sha: SHA del README guardado
+        removed: El módulo estaba marcado como eliminado
+    """
+    if removed or manifest_sha is None:
+        return True
+    return module.manifest_sha != manifest_sha or module.readme_sha != readme_sha
@@ -0,0 +1,139 @@
+"""
+Gobernador global del rate limit de la API de GitHub.
+
+Compartido por todos los threads del ETL: limita las peticiones en vuelo y
+pausa a todos los workers cuando quedan pocas peticiones en la ventana
+(``X-RateLimit-Remaining``) o GitHub responde con un rate limit
+(403/429 con ``Retry-After`` o ``X-RateLimit-Remaining: 0``).
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Mapping, Optional
+
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Espera por defecto ante un rate limit sin cabeceras de reset
+DEFAULT_BACKOFF_SECONDS = 60.0
+
+
+class RateLimitGovernor:
+    """
+    Coordina las peticiones a GitHub entre threads.
+
+    Args:
+        max_concurrency: Peticiones simultáneas como máximo
+        reserve: Peticiones de la ventana que se dejan sin usar; al llegar a
+            este umbral se espera al reset
+        clock: Reloj en segundos epoch (inyectable en tests)
+        sleep: Función de espera (inyectable en tests)
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        reserve: int = 100,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.reserve = reserve
+        self._slots = threading.BoundedSemaphore(max(1, max_concurrency))
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._sleep = sleep
+        self._paused_until = 0.0
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None
+        self.requests = 0
+        self.throttled = 0
+        self.waited_seconds = 0.0
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Reserva un hueco de concurrencia y espera si hay una pausa activa."""
+        with self._slots:
+            self.wait()
+            with self._lock:
+                self.requests += 1
+            yield
+
+    def wait(self) -> None:
+        """Bloquea mientras dure la pausa global."""
+        while True:
+            with self._lock:
+                delay = self._paused_until - self._clock()
+            if delay <= 0:
+                return
+            with self._lock:
+                self.waited_seconds += delay
+            self._sleep(delay)
+
+    def pause(self, seconds: float) -> None:
+        """Pausa a todos los workers durante ``seconds``."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+    def update(self, status_code: int, headers: Mapping[str, str]) -> Optional[float]:
+        """
+        Actualiza el estado con las cabeceras de una respuesta.
+
+        Returns:
+            Segundos a esperar antes de reintentar si la respuesta es un rate
+            limit, None si la respuesta es utilizable
+        """
+        now = self._clock()
+        remaining = _int_header(headers, "X-RateLimit-Remaining")
+        reset = _int_header(headers, "X-RateLimit-Reset")
+        retry_after = _int_header(headers, "Retry-After")
+
+        with self._lock:
+            if remaining is not None:
+                self.remaining = remaining
+            if reset is not None:
+                self.reset_at = float(reset)
+
+        rate_limited = status_code in (403, 429) and (
+            retry_after is not None or remaining == 0
+        )
+        if rate_limited:
+            if retry_after is not None:
+                wait = float(retry_after)
+            elif reset is not None:
+                wait = max(1.0, reset - now)
+            else:
+                wait = DEFAULT_BACKOFF_SECONDS
+            with self._lock:
+                self.throttled += 1
+            logger.warning(f"Rate limit de GitHub alcanzado, pausando {wait:.0f}s")
+            self.pause(wait)
+            return wait
+
+        if remaining is not None and remaining <= self.reserve and reset is not None:
+            wait = max(0.0, reset - now)
+            if wait > 0:
+                logger.info(
+                    f"Quedan {remaining} peticiones a GitHub, esperando {wait:.0f}s al reset"
+                )
+                self.pause(wait)
+        return None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "waited_seconds": round(self.waited_seconds, 1),
+                "remaining": self.remaining,
+            }
+
+
+def _int_header(headers: Mapping[str, str], name: str) -> Optional[int]:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
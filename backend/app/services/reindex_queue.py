@@ -0,0 +1,272 @@
+"""
+Cola de re-indexado alimentada por los webhooks de GitHub.
+
+El webhook traduce un ``push`` en trabajos por módulo afectado (o por rama
+completa si el push no permite saberlo) y los encola en la tabla
+``reindex_jobs``. Un worker (``scripts/reindex_worker.py``) los reclama con
+``FOR UPDATE SKIP LOCKED``, de modo que varios workers pueden consumir la
+misma cola sin pisarse.
+
+Los duplicados se fusionan en dos puntos: al encolar (índice único parcial
+sobre los trabajos pendientes) y al reclamar (los trabajos de una misma rama
+se procesan juntos; uno de rama completa absorbe a los de módulo).
+"""
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+
+from ..core.logging import get_logger
+from ..models import ReindexJob
+
+logger = get_logger(__name__)
+
+# Trabajo que cubre toda la rama
+ALL_MODULES = "*"
+
+# Ramas de Odoo que se indexan ("17.0", "18.0"...)
+VERSION_BRANCH = re.compile(r"^refs/heads/(\d+\.0)$")
+
+# GitHub incluye como mucho 20 commits en el payload de un push
+MAX_PUSH_COMMITS = 20
+
+# Ficheros de la raíz del repo que no pertenecen a ningún módulo
+_ROOT_DIRS = {"setup", ".github"}
+
+
+@dataclass
+class PushChanges:
+    """Módulos afectados por un push."""
+
+    repo_name: str
+    version: str
+    commit: Optional[str]
+    modules: Set[str] = field(default_factory=set)
+    full: bool = False  # no se puede saber qué cambió: re-indexar la rama
+
+    def job_names(self) -> Set[str]:
+        return {ALL_MODULES} if self.full else self.modules
+
+
+def parse_push(payload: Dict, owner: str = "OCA") -> Optional[PushChanges]:
+    """
+    Extrae los módulos afectados de un evento ``push``.
+
+    Args:
+        payload: JSON del webhook
+        owner: Organización cuyos repos se indexan
+
+    Returns:
+        PushChanges, o None si el push no afecta al índice (otra organización,
+        rama que no es de versión, rama borrada)
+    """
+    repository = payload.get("repository") or {}
+    repo_owner = (repository.get("owner") or {}).get("login") or (
+        repository.get("owner") or {}
+    ).get("name")
+    if repo_owner != owner:
+        return None
+
+    match = VERSION_BRANCH.match(payload.get("ref", ""))
+    if not match or payload.get("deleted"):
+        return None
+
+    commits = payload.get("commits") or []
+    changes = PushChanges(
+        repo_name=repository.get("name", ""),
+        version=match.group(1),
+        commit=payload.get("after"),
+        # Forzado o payload recortado: no sabemos todos los ficheros tocados
+        full=bool(payload.get("forced")) or len(commits) >= MAX_PUSH_COMMITS,
+    )
+
+    for commit in commits:
+        for key in ("added", "removed", "modified"):
+            for path in commit.get(key) or []:
+                if "/" not in path:
+                    continue  # ficheros de la raíz (README del repo, etc.)
+                module = path.split("/", 1)[0]
+                if module not in _ROOT_DIRS and not module.startswith("."):
+                    changes.modules.add(module)
+    return changes
+
+
+def coalesce(jobs: Iterable[Tuple[str, str, str]]) -> Dict[Tuple[str, str], Optional[Set[str]]]:
+    """
+    Agrupa trabajos (repo, versión, módulo) por rama.
+
+    Returns:
+        {(repo, versión): módulos, o None si hay que re-indexar la rama entera}
+    """
+    branches: Dict[Tuple[str, str], Optional[Set[str]]] = {}
+    for repo_name, version, technical_name in jobs:
+        key = (repo_name, version)
+        if technical_name == ALL_MODULES:
+            branches[key] = None
+        elif key not in branches:
+            branches[key] = {technical_name}
+        elif branches[key] is not None:
+            branches[key].add(technical_name)
+    return branches
+
+
+def failed_jobs(jobs: Iterable[ReindexJob], dropped: Dict[str, str]) -> Dict[int, str]:
+    """
+    Trabajos de una rama que fallan por módulos descartados en el pipeline
+    (manifest no disponible, error de embedding...).
+
+    Args:
+        jobs: Trabajos de la rama
+        dropped: {módulo: motivo} de los descartados
+
+    Returns:
+        {id del trabajo: motivo}; uno de rama completa falla si se descartó
+        cualquier módulo
+    """
+    failed = {}
+    for job in jobs:
+        if job.technical_name == ALL_MODULES and dropped:
+            failed[job.id] = "; ".join(f"{name}: {reason}" for name, reason in sorted(dropped.items()))
+        elif job.technical_name in dropped:
+            failed[job.id] = dropped[job.technical_name]
+    return failed
+
+
+def _insert(dialect: str):
+    """INSERT del dialecto con soporte de ON CONFLICT."""
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert(ReindexJob)
+
+
+class ReindexQueue:
+    """
+    Cola durable en PostgreSQL.
+
+    Args:
+        session_factory: Crea sesiones SQLAlchemy (ej: SessionLocal)
+        lease_seconds: Un trabajo ``running`` sin terminar tras este tiempo
+            (worker caído) vuelve a poder reclamarse
+        max_attempts: Intentos antes de marcar un trabajo como ``failed``
+    """
+
+    def __init__(self, session_factory: Callable, lease_seconds: int = 900, max_attempts: int = 3):
+        self.session_factory = session_factory
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    def enqueue(self, changes: PushChanges) -> int:
+        """
+        Encola un trabajo por módulo afectado (fusionando con los pendientes).
+
+        Returns:
+            Trabajos encolados o fusionados
+        """
+        names = changes.job_names()
+        if not names:
+            return 0
+
+        now = datetime.utcnow()
+        rows = [
+            dict(
+                repo_name=changes.repo_name,
+                version=changes.version,
+                technical_name=name,
+                commit=changes.commit,
+                status="pending",
+                attempts=0,
+                created_at=now,
+                updated_at=now,
+            )
+            for name in sorted(names)
+        ]
+        with self.session_factory() as session:
+            statement = _insert(session.get_bind().dialect.name).values(rows)
+            statement = statement.on_conflict_do_update(
+                index_elements=["repo_name", "version", "technical_name"],
+                index_where=text("status = 'pending'"),
+                set_={"commit": statement.excluded.commit, "updated_at": now},
+            )
+            session.execute(statement)
+            session.commit()
+        return len(rows)
+
+    def claim(self, limit: int = 100) -> List[ReindexJob]:
+        """
+        Reclama hasta ``limit`` trabajos pendientes (o con el lease caducado).
+
+        Usa ``FOR UPDATE SKIP LOCKED``: otros workers ven las filas
+        bloqueadas como inexistentes y reclaman las siguientes.
+        """
+        now = datetime.utcnow()
+        expired = now - timedelta(seconds=self.lease_seconds)
+        with self.session_factory() as session:
+            jobs = (
+                session.query(ReindexJob)
+                .filter(
+                    (ReindexJob.status == "pending")
+                    | ((ReindexJob.status == "running") & (ReindexJob.locked_at < expired))
+                )
+                .order_by(ReindexJob.id)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            for job in jobs:
+                job.status = "running"
+                job.locked_at = now
+                job.attempts += 1
+            # Separar antes del commit: el commit expiraría los atributos y
+            # el worker los lee ya sin sesión
+            session.flush()
+            for job in jobs:
+                session.expunge(job)
+            session.commit()
+            return jobs
+
+    def complete(self, job_ids: List[int]) -> None:
+        if not job_ids:
+            return
+        with self.session_factory() as session:
+            session.query(ReindexJob).filter(ReindexJob.id.in_(job_ids)).update(
+                {ReindexJob.status: "done", ReindexJob.error: None,
+                 ReindexJob.updated_at: datetime.utcnow()},
+                synchronize_session=False,
+            )
+            session.commit()
+
+    def fail(self, jobs: List[ReindexJob], error: str) -> None:
+        """
+        Devuelve los trabajos a la cola, o los marca ``failed`` si agotaron
+        sus intentos. Si entretanto se encoló un duplicado pendiente, el
+        trabajo fallido queda absorbido por él (``done``).
+        """
+        with self.session_factory() as session:
+            for job in jobs:
+                status = "failed" if job.attempts >= self.max_attempts else "pending"
+                if status == "pending":
+                    duplicate = session.query(ReindexJob.id).filter(
+                        ReindexJob.status == "pending",
+                        ReindexJob.repo_name == job.repo_name,
+                        ReindexJob.version == job.version,
+                        ReindexJob.technical_name == job.technical_name,
+                    ).first()
+                    if duplicate is not None:
+                        status = "done"
+                session.query(ReindexJob).filter(ReindexJob.id == job.id).update(
+                    {ReindexJob.status: status, ReindexJob.error: error[:2000],
+                     ReindexJob.locked_at: None, ReindexJob.updated_at: datetime.utcnow()},
+                    synchronize_session=False,
+                )
+            session.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self.session_factory() as session:
+            rows = session.execute(
+                text("SELECT status, count(*) FROM reindex_jobs GROUP BY status")
+            )
+            return {status: count for status, count in rows}
@@ -2,21 +2,90 @@ import logging
 from typing import List, Dict, Optional
 
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func, String, cast
+from sqlalchemy import and_, func, select, String, cast
 from sqlalchemy.dialects.postgresql import ARRAY, array
+from sqlalchemy.sql import Select
 
+from ..config import get_settings
 from ..models import OdooModule
 from ..core.logging import get_logger
+from ..core.telemetry import observe_phase
 from .embedding_service import get_embedding_service
+from .shadow_embeddings import cosine_distance
+from .slow_query_service import get_slow_query_logger
 
 logger = get_logger(__name__)
 embedding_service = get_embedding_service()
 
 
+def vector_search_query(
+    query_embedding: List[float],
+    version: str,
+    dependencies: Optional[List[str]] = None,
+    limit: int = 10,
+    columns: Optional[tuple] = None,
+    exact: bool = False,
+) -> Select:
+    """
+    SELECT k-NN por distancia coseno (0 = idéntico, 2 = opuesto) con los
+    filtros de la búsqueda.
+
+    Es la query que sirven ``/search`` y MCP y la que mide
+    ``scripts/ann_sweep.py``. La distancia tiene la forma del índice ANN
+    (``cosine_distance`` de shadow_embeddings) para que el planner lo use.
+
+    Args:
+        query_embedding: Embedding de la query
+        version: Versión de Odoo
+        dependencies: Dependencias que el módulo debe tener todas (``@>``)
+        limit: Filas a devolver
+        columns: Columnas seleccionadas antes de ``distance`` (por defecto el módulo)
+        exact: Distancia sobre el vector completo (sin la expresión del
+            índice): ground truth del barrido ANN
+
+    Returns:
+        Select con las columnas y ``distance``
+    """
+    if exact:
+        distance = OdooModule.embedding.cosine_distance(query_embedding)
+    else:
+        distance = cosine_distance(
+            OdooModule.embedding, query_embedding, get_settings().embedding_dimensions
+        )
+
+    # Los módulos eliminados de su rama (tombstones del ETL) no se sirven
+    filters = [
+        OdooModule.version == version,
+        OdooModule.removed_at.is_(None),
+        OdooModule.embedding.isnot(None),
+    ]
+    # Filtrar por dependencias usando operador @> de PostgreSQL
+    # Verificar que el módulo tenga TODAS las dependencias requeridas
+    if dependencies:
+        # Usar @> (contains) - el array del módulo debe contener estas dependencias
+        # Crear array de PostgreSQL con cast explícito a VARCHAR[]
+        dep_array = cast(array(dependencies), ARRAY(String))
+        filters.append(OdooModule.depends.op("@>")(dep_array))
+
+    return (
+        select(*(columns or (OdooModule,)), distance.label("distance"))
+        .where(and_(*filters))
+        .order_by("distance")
+        .limit(limit)
+    )
+
+
 class SearchService:
+    # Modo de búsqueda expuesto como label en métricas y reportes
+    search_mode = "vector"
+
     def __init__(self, db: Session):
         self.db = db
         self.embedding_service = embedding_service
+        # Duración (segundos) de cada fase de la última búsqueda
+        self.last_timings: Dict[str, float] = {}
+        # Error de la última búsqueda (search() devuelve [] en caso de fallo)
+        self.last_error: Optional[str] = None
 
     def search(
         self,
@@ -50,6 +119,10 @@ class SearchService:
 
         query = query.strip()
         dependencies = dependencies or []
+        self.last_timings = {}
+        self.last_error = None
+        timings = self.last_timings
+        phase_labels = {"version": version, "search_mode": self.search_mode}
 
         logger.info(
             f"Búsqueda: query='{query[:50]}...', version={version}, "
@@ -57,36 +130,33 @@ class SearchService:
         )
 
         try:
-            # 1. FASE 1: Filtro determinista (SQL)
-            filters = [OdooModule.version == version]
-
-            # Filtrar por dependencias usando operador @> de PostgreSQL
-            # Verificar que el módulo tenga TODAS las dependencias requeridas
-            if dependencies:
-                # Usar @> (contains) - el array del módulo debe contener estas dependencias
-                # Crear array de PostgreSQL con cast explícito a VARCHAR[]
-                dep_array = cast(array(dependencies), ARRAY(String))
-                filters.append(OdooModule.depends.op("@>")(dep_array))
-
-            # 2. FASE 2: Generar embedding de la query
+            # 1. FASE 1: Generar embedding de la query
             try:
-                query_embedding = self.embedding_service.get_embedding(query)
+                with observe_phase(timings, "embedding", **phase_labels):
+                    query_embedding = self.embedding_service.get_embedding(query)
             except Exception as e:
                 logger.error(f"Error generando embedding: {e}")
+                self.last_error = f"embedding: {e}"
                 return []
 
-            # 3. FASE 3: Búsqueda por similitud de coseno
-            # Usar cosine_distance de pgvector (retorna 0-2, donde 0 es idéntico)
-            results = (
-                self.db.query(
-                    OdooModule,
-                    # Distancia de coseno (0 = idéntico, 2 = opuesto)
-                    OdooModule.embedding.cosine_distance(query_embedding).label("distance"),
-                )
-                .filter(and_(*filters))
-                .order_by("distance")
-                .limit(limit * 2)  # Obtener más para filtrar por min_score
-                .all()
+            # 2. FASE 2: Búsqueda por similitud de coseno; los filtros SQL
+            # (versión, tombstones, dependencias) se ejecutan en la misma query
+            # Obtener más candidatos para filtrar por min_score
+            vector_query = vector_search_query(query_embedding, version, dependencies, limit * 2)
+            with observe_phase(timings, "vector_query", **phase_labels):
+                results = self.db.execute(vector_query).all()
+
+            get_slow_query_logger().maybe_record(
+                self.db,
+                vector_query,
+                timings,
+                context={
+                    "query": query[:200],
+                    "version": version,
+                    "dependencies": dependencies,
+                    "limit": limit,
+                    "candidates": len(results),
+                },
             )
 
             if not results:
@@ -95,49 +165,9 @@ class SearchService:
 
             logger.info(f"Encontrados {len(results)} candidatos tras búsqueda vectorial")
 
-            # 4. FASE 4: Calcular scores y formatear resultados
-            output = []
-            for module, distance in results:
-                # Convertir distancia a score (0-100)
-                # distance: 0 (idéntico) a 2 (opuesto)
-                # similarity: 1 - (distance / 2) -> rango 0-1
-                similarity = max(0.0, 1.0 - (float(distance) / 2.0))
-                score = int(similarity * 100)
-
-                # Filtrar por score mínimo
-                if score < min_score:
-                    continue
-
-                # Truncar descripción si es muy larga
-                description = module.description or ""
-                if len(description) > 200:
-                    description = description[:200] + "..."
-
-                output.append(
-                    {
-                        "id": module.id,
-                        "technical_name": module.technical_name,
-                        "name": module.name,
-                        "version": module.version,
-                        "summary": module.summary or "",
-                        "description": description,
-                        "depends": module.depends or [],
-                        "author": module.author or "",
-                        "license": module.license or "AGPL-3",
-                        "repo_name": module.repo_name,
-                        "repo_url": module.repo_url or f"https://github.com/OCA/{module.repo_name}",
-                        "module_path": module.module_path,
-                        "github_stars": module.github_stars or 0,
-                        "github_issues_open": module.github_issues_open or 0,
-                        "last_commit_date": (
-                            module.last_commit_date.isoformat()
-                            if module.last_commit_date
-                            else None
-                        ),
-                        "score": score,
-                        "distance": round(float(distance), 4),
-                    }
-                )
+            # 3. FASE 3: Calcular scores y formatear resultados
+            with observe_phase(timings, "scoring", **phase_labels):
+                output = self._score_results(results, min_score)
 
             # Limitar resultados finales
             output = output[:limit]
@@ -147,6 +177,7 @@ class SearchService:
 
         except Exception as e:
             logger.error(f"Error en búsqueda: {e}", exc_info=True)
+            self.last_error = str(e)
             # Hacer rollback para evitar que la transacción quede abortada
             try:
                 self.db.rollback()
@@ -154,6 +185,62 @@ class SearchService:
                 pass
             return []
 
+    def _score_results(self, results: List, min_score: int) -> List[Dict]:
+        """
+        Convertir filas (módulo, distancia) en resultados con score.
+
+        Args:
+            results: Filas devueltas por la búsqueda vectorial
+            min_score: Score mínimo (0-100) para incluir un resultado
+
+        Returns:
+            Lista de dicts con metadata del módulo, score y distancia
+        """
+        output = []
+        for module, distance in results:
+            # Convertir distancia a score (0-100)
+            # distance: 0 (idéntico) a 2 (opuesto)
+            # similarity: 1 - (distance / 2) -> rango 0-1
+            similarity = max(0.0, 1.0 - (float(distance) / 2.0))
+            score = int(similarity * 100)
+
+            # Filtrar por score mínimo
+            if score < min_score:
+                continue
+
+            # Truncar descripción si es muy larga
+            description = module.description or ""
+            if len(description) > 200:
+                description = description[:200] + "..."
+
+            output.append(
+                {
+                    "id": module.id,
+                    "technical_name": module.technical_name,
+                    "name": module.name,
+                    "version": module.version,
+                    "summary": module.summary or "",
+                    "description": description,
+                    "depends": module.depends or [],
+                    "author": module.author or "",
+                    "license": module.license or "AGPL-3",
+                    "repo_name": module.repo_name,
+                    "repo_url": module.repo_url or f"https://github.com/OCA/{module.repo_name}",
+                    "module_path": module.module_path,
+                    "github_stars": module.github_stars or 0,
+                    "github_issues_open": module.github_issues_open or 0,
+                    "last_commit_date": (
+                        module.last_commit_date.isoformat()
+                        if module.last_commit_date
+                        else None
+                    ),
+                    "score": score,
+                    "distance": round(float(distance), 4),
+                }
+            )
+
+        return output
+
 
 def get_search_service(db: Session) -> SearchService:
     """Factory function para crear instancia de SearchService"""
@@ -0,0 +1,279 @@
+"""
+Re-vectorización de ``odoo_modules`` en una columna sombra.
+
+Cambiar de modelo de embeddings obliga a regenerar todos los vectores. Para
+no dejar de servir búsquedas mientras tanto:
+
+1. se añade ``embedding_shadow`` (vector de las nuevas dimensiones); su
+   comentario guarda el modelo y cuándo empezó el trabajo
+2. las filas se recorren con un cursor de servidor y los vectores nuevos se
+   escriben en la sombra por lotes; las filas con la sombra a NULL son las
+   pendientes, así que el trabajo se puede reanudar en cualquier momento
+3. pasadas de recuperación re-vectorizan las filas que el ETL modificó
+   (``updated_at``) desde la pasada anterior; el inicio de la última queda
+   en el comentario (``caught_up_at``)
+4. el índice ANN de la sombra se construye con ``CREATE INDEX CONCURRENTLY``
+   (no bloquea escrituras) y después se repite la recuperación
+5. en una transacción corta se intercambian columnas e índice, solo si con
+   la tabla bloqueada no hay filas sin vector nuevo ni modificadas después
+   de ``caught_up_at``
+
+Hasta el paso 5 la búsqueda sigue usando ``embedding`` con los vectores
+antiguos.
+"""
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from pgvector.sqlalchemy import HALFVEC
+from sqlalchemy import cast, text
+from sqlalchemy.engine import Engine
+
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+
+TABLE = "odoo_modules"
+SHADOW_COLUMN = "embedding_shadow"
+SHADOW_INDEX = "ix_odoo_modules_embedding_shadow"
+LIVE_INDEX = "ix_odoo_modules_embedding_ann"
+# Columna antigua durante el intercambio (se elimina en la misma transacción)
+RETIRED_COLUMN = "embedding_retired"
+
+# pgvector solo indexa ``vector`` hasta 2000 dimensiones; por encima se indexa halfvec
+MAX_VECTOR_INDEX_DIMENSIONS = 2000
+
+
+@dataclass
+class ShadowState:
+    """Trabajo en curso, guardado como comentario de la columna sombra."""
+
+    model: str
+    dimensions: int
+    started_at: datetime
+    # Inicio de la última pasada de recuperación completa: las filas con
+    # updated_at anterior tienen en la sombra el vector de su texto actual
+    caught_up_at: Optional[datetime] = None
+
+    @property
+    def synced_since(self) -> datetime:
+        """Desde cuándo hay que recuperar cambios del ETL."""
+        return self.caught_up_at or self.started_at
+
+    def to_comment(self) -> str:
+        return json.dumps({
+            "model": self.model,
+            "dimensions": self.dimensions,
+            "started_at": self.started_at.isoformat(),
+            "caught_up_at": self.caught_up_at.isoformat() if self.caught_up_at else None,
+        })
+
+    @classmethod
+    def from_comment(cls, comment: Optional[str]) -> Optional["ShadowState"]:
+        try:
+            data = json.loads(comment or "")
+            caught_up_at = data.get("caught_up_at")
+            return cls(data["model"], int(data["dimensions"]),
+                       datetime.fromisoformat(data["started_at"]),
+                       datetime.fromisoformat(caught_up_at) if caught_up_at else None)
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return None
+
+
+def vector_literal(values: Sequence[float]) -> str:
+    """Representación de texto de pgvector: ``[0.1,0.2,...]``."""
+    return "[" + ",".join(repr(float(value)) for value in values) + "]"
+
+
+def index_sql(
+    name: str,
+    column: str,
+    dimensions: int,
+    method: str = "hnsw",
+    params: Optional[Dict[str, int]] = None,
+    concurrently: bool = True,
+) -> str:
+    """
+    ``CREATE INDEX`` de similitud coseno sobre ``column``.
+
+    Por encima de 2000 dimensiones el índice es sobre la expresión
+    ``column::halfvec(N)`` (como en ``scripts/ann_sweep.py``).
+    """
+    if dimensions > MAX_VECTOR_INDEX_DIMENSIONS:
+        target = f"(({column}::halfvec({dimensions})) halfvec_cosine_ops)"
+    else:
+        target = f"({column} vector_cosine_ops)"
+    options = ", ".join(f"{key} = {int(value)}" for key, value in (params or {}).items())
+    return (
+        f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}{name} ON {TABLE} "
+        f"USING {method} {target}" + (f" WITH ({options})" if options else "")
+    )
+
+
+def cosine_distance(column, query_embedding, dimensions: int):
+    """
+    Distancia coseno de ``column`` a la query con la misma forma que el índice
+    de ``index_sql``: por encima de 2000 dimensiones sobre ``column::halfvec(N)``
+    (el planner solo usa un índice de expresión si la query repite la expresión).
+    """
+    if dimensions > MAX_VECTOR_INDEX_DIMENSIONS:
+        column = cast(column, HALFVEC(dimensions))
+    return column.cosine_distance(query_embedding)
+
+
+def _quote(value: str) -> str:
+    """Literal SQL (COMMENT ON no admite parámetros)."""
+    return "'" + value.replace("'", "''") + "'"
+
+
+class ShadowColumn:
+    """
+    Operaciones sobre la columna sombra de ``odoo_modules`` (PostgreSQL).
+
+    Args:
+        engine: Engine de SQLAlchemy
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+
+    def state(self) -> Tuple[bool, Optional[ShadowState]]:
+        """
+        Returns:
+            (existe la columna, estado guardado en su comentario)
+        """
+        with self.engine.connect() as conn:
+            row = conn.execute(text(
+                "SELECT col_description(attrelid, attnum) FROM pg_attribute "
+                "WHERE attrelid = CAST(:table AS regclass) AND attname = :column "
+                "AND NOT attisdropped"
+            ), {"table": TABLE, "column": SHADOW_COLUMN}).first()
+        if row is None:
+            return False, None
+        return True, ShadowState.from_comment(row[0])
+
+    def create(self, state: ShadowState) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(text(
+                f"ALTER TABLE {TABLE} ADD COLUMN IF NOT EXISTS "
+                f"{SHADOW_COLUMN} vector({int(state.dimensions)})"
+            ))
+            conn.execute(text(
+                f"COMMENT ON COLUMN {TABLE}.{SHADOW_COLUMN} IS {_quote(state.to_comment())}"
+            ))
+
+    def record(self, state: ShadowState) -> None:
+        """Guarda el estado (ej: ``caught_up_at``) en el comentario de la sombra."""
+        with self.engine.begin() as conn:
+            conn.execute(text(
+                f"COMMENT ON COLUMN {TABLE}.{SHADOW_COLUMN} IS {_quote(state.to_comment())}"
+            ))
+
+    def drop(self) -> None:
+        with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {SHADOW_INDEX}"))
+            conn.execute(text(f"ALTER TABLE {TABLE} DROP COLUMN IF EXISTS {SHADOW_COLUMN}"))
+
+    def pending(self) -> int:
+        """Filas con embedding pero sin vector en la sombra."""
+        with self.engine.connect() as conn:
+            return conn.execute(text(
+                f"SELECT count(*) FROM {TABLE} "
+                f"WHERE {SHADOW_COLUMN} IS NULL AND embedding IS NOT NULL"
+            )).scalar()
+
+    def write(self, rows: List[Tuple[int, Sequence[float]]]) -> int:
+        """Escribe vectores en la sombra (un commit por lote)."""
+        if not rows:
+            return 0
+        with self.engine.begin() as conn:
+            # SQL directo: no toca updated_at, que se usa para detectar cambios del ETL
+            conn.execute(
+                text(
+                    f"UPDATE {TABLE} SET {SHADOW_COLUMN} = CAST(:embedding AS vector) "
+                    f"WHERE id = :id"
+                ),
+                [{"id": row_id, "embedding": vector_literal(vector)} for row_id, vector in rows],
+            )
+        return len(rows)
+
+    def clear(self, ids: Sequence[int]) -> int:
+        """
+        Vacía la sombra de ``ids`` (filas modificadas cuyo vector nuevo falló:
+        vuelven a estar pendientes en lugar de quedarse con un vector viejo).
+        """
+        if not ids:
+            return 0
+        with self.engine.begin() as conn:
+            conn.execute(
+                text(f"UPDATE {TABLE} SET {SHADOW_COLUMN} = NULL WHERE id = :id"),
+                [{"id": row_id} for row_id in ids],
+            )
+        return len(ids)
+
+    @staticmethod
+    def unsynced(conn, since: datetime) -> Tuple[int, int]:
+        """
+        Returns:
+            (filas con embedding y sin vector en la sombra, filas modificadas
+            por el ETL después de ``since``)
+        """
+        missing = conn.execute(text(
+            f"SELECT count(*) FROM {TABLE} "
+            f"WHERE {SHADOW_COLUMN} IS NULL AND embedding IS NOT NULL"
+        )).scalar()
+        stale = conn.execute(
+            text(f"SELECT count(*) FROM {TABLE} WHERE updated_at > :since"), {"since": since}
+        ).scalar()
+        return missing, stale
+
+    def has_valid_index(self) -> bool:
+        """El índice de la sombra existe y terminó de construirse."""
+        with self.engine.connect() as conn:
+            return bool(conn.execute(text(
+                "SELECT i.indisvalid FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+                "WHERE c.relname = :name"
+            ), {"name": SHADOW_INDEX}).scalar())
+
+    def build_index(
+        self, dimensions: int, method: str = "hnsw", params: Optional[Dict[str, int]] = None
+    ) -> None:
+        """
+        ``CREATE INDEX CONCURRENTLY`` sobre la sombra. Un intento anterior
+        interrumpido deja un índice inválido, que se elimina antes.
+        """
+        with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {SHADOW_INDEX}"))
+            conn.execute(text(index_sql(SHADOW_INDEX, SHADOW_COLUMN, dimensions, method, params)))
+
+    def swap(self, since: datetime, lock_timeout: str = "5s") -> bool:
+        """
+        Intercambia la sombra con ``embedding`` en una transacción.
+
+        Con la tabla bloqueada comprueba que no quedan filas sin vector en la
+        sombra ni filas modificadas después de ``since`` (inicio de la última
+        pasada de recuperación: su vector nuevo sería el de su texto
+        anterior). Si las hay, no cambia nada.
+
+        Returns:
+            True si se hizo el intercambio
+        """
+        with self.engine.connect() as conn:
+            conn.execute(text(f"SET LOCAL lock_timeout = {_quote(lock_timeout)}"))
+            conn.execute(text(f"LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE"))
+            missing, stale = self.unsynced(conn, since)
+            if missing or stale:
+                logger.warning(f"Intercambio cancelado: {missing} filas sin vector nuevo, "
+                               f"{stale} modificadas desde {since:%Y-%m-%d %H:%M:%S}")
+                conn.rollback()
+                return False
+
+            # El índice de la columna antigua desaparece con ella
+            conn.execute(text(f"ALTER TABLE {TABLE} RENAME COLUMN embedding TO {RETIRED_COLUMN}"))
+            conn.execute(text(f"ALTER TABLE {TABLE} RENAME COLUMN {SHADOW_COLUMN} TO embedding"))
+            conn.execute(text(f"ALTER TABLE {TABLE} DROP COLUMN {RETIRED_COLUMN}"))
+            conn.execute(text(f"ALTER INDEX IF EXISTS {SHADOW_INDEX} RENAME TO {LIVE_INDEX}"))
+            conn.execute(text(f"COMMENT ON COLUMN {TABLE}.embedding IS NULL"))
+            conn.commit()
+        return True
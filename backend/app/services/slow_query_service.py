@@ -0,0 +1,240 @@
+"""
+Registro de búsquedas lentas con captura de ``EXPLAIN (ANALYZE, BUFFERS)``.
+
+Cuando las fases de base de datos de una búsqueda (``DB_PHASES``) superan
+``SLOW_QUERY_THRESHOLD_MS`` se escribe una línea JSON en un log rotativo con
+el SQL de la búsqueda vectorial, sus parámetros (con el vector de la query
+elidido), los timings por fase y el plan de ejecución. Sirve para detectar
+planes de pgvector que caen a un seq scan cuando los filtros de versión o
+``depends @>`` son muy selectivos.
+
+La fase ``embedding`` (la llamada HTTP al proveedor) no cuenta para el umbral:
+un proveedor lento dispararía un EXPLAIN ANALYZE (que vuelve a ejecutar la
+búsqueda vectorial) en cada petición sin decir nada de la base de datos.
+"""
+import json
+import logging
+import re
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..config import get_settings
+from ..core.logging import get_logger
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+# Secuencias numéricas más largas que esto se consideran vectores
+VECTOR_ELIDE_MIN_LENGTH = 16
+
+# Fases de la búsqueda que se comparan con el umbral (los filtros SQL se
+# ejecutan dentro de vector_query)
+DB_PHASES = ("vector_query",)
+
+_SEQ_SCAN_RE = re.compile(r"Seq Scan on (\S+)")
+_INDEX_SCAN_RE = re.compile(
+    r"(?:Index|Index Only|Bitmap Index) Scan (?:Backward )?(?:using|on) (\S+)"
+)
+_FILTER_RE = re.compile(r"(Filter|Index Cond|Recheck Cond|Order By): (.+)")
+
+
+def _is_vector(value: Any) -> bool:
+    if hasattr(value, "tolist"):
+        value = value.tolist()
+    if isinstance(value, (list, tuple)) and len(value) >= VECTOR_ELIDE_MIN_LENGTH:
+        return all(isinstance(v, (int, float)) for v in value[:VECTOR_ELIDE_MIN_LENGTH])
+    if isinstance(value, str) and len(value) > 64 and value.startswith("["):
+        return True
+    return False
+
+
+def elide_vectors(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Sustituir los parámetros que son vectores por un marcador.
+
+    Example:
+        >>> elide_vectors({"version_1": "17.0", "param_1": [0.1] * 2560})
+        {'version_1': '17.0', 'param_1': '<vector dim=2560 elided>'}
+    """
+    elided = {}
+    for key, value in params.items():
+        if _is_vector(value):
+            dim = len(value) if not isinstance(value, str) else value.count(",") + 1
+            elided[key] = f"<vector dim={dim} elided>"
+        else:
+            elided[key] = value
+    return elided
+
+
+def summarize_plan(plan_lines: List[str]) -> Dict[str, Any]:
+    """
+    Extraer del plan los scans y condiciones relevantes.
+
+    Returns:
+        Dict con seq_scans (tablas), index_scans (índices), conditions y
+        uses_vector_index (True si algún índice hnsw/ivfflat aparece en el plan)
+    """
+    seq_scans: List[str] = []
+    index_scans: List[str] = []
+    conditions: List[str] = []
+
+    for line in plan_lines:
+        seq = _SEQ_SCAN_RE.search(line)
+        if seq:
+            seq_scans.append(seq.group(1))
+        idx = _INDEX_SCAN_RE.search(line)
+        if idx:
+            index_scans.append(idx.group(1))
+        cond = _FILTER_RE.search(line)
+        if cond:
+            conditions.append(f"{cond.group(1)}: {cond.group(2).strip()}")
+
+    uses_vector_index = any(
+        "hnsw" in name.lower() or "ivfflat" in name.lower() or "embedding" in name.lower()
+        for name in index_scans
+    )
+
+    return {
+        "seq_scans": seq_scans,
+        "index_scans": index_scans,
+        "conditions": conditions,
+        "uses_vector_index": uses_vector_index,
+    }
+
+
+def explain_plan(connection, statement, options: Optional[str] = "ANALYZE, BUFFERS") -> List[str]:
+    """
+    Plan de ``statement`` con ``EXPLAIN`` (los parámetros se procesan como
+    al ejecutarlo, ej: los vectores de pgvector).
+
+    Args:
+        connection: Conexión SQLAlchemy (``Session.connection()`` o de un engine)
+        statement: Select a explicar
+        options: Opciones de EXPLAIN (None = solo el plan, sin ejecutar)
+
+    Returns:
+        Líneas del plan
+    """
+    dialect = connection.dialect
+    compiled = statement.compile(dialect=dialect)
+    params = {}
+    for key, value in compiled.params.items():
+        processor = compiled.binds[key].type.bind_processor(dialect)
+        params[key] = processor(value) if processor else value
+    if compiled.positional:
+        params = tuple(params[key] for key in compiled.positiontup)
+
+    prefix = f"EXPLAIN ({options})" if options else "EXPLAIN"
+    result = connection.exec_driver_sql(f"{prefix} {compiled}", params)
+    return [row[0] for row in result]
+
+
+class SlowQueryLogger:
+    def __init__(
+        self,
+        threshold_ms: float,
+        log_path: str,
+        max_bytes: int = 10_000_000,
+        backup_count: int = 5,
+        explain: bool = True,
+    ):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self._log = None
+
+        if self.enabled:
+            path = Path(log_path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            handler = RotatingFileHandler(
+                path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self._log = logging.getLogger("aiodoofinder.slow_queries")
+            self._log.handlers = [handler]
+            self._log.setLevel(logging.INFO)
+            self._log.propagate = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ms > 0
+
+    def maybe_record(
+        self,
+        db,
+        statement,
+        timings: Dict[str, float],
+        context: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """
+        Registrar la búsqueda si sus fases de base de datos superan el umbral.
+
+        Args:
+            db: Sesión de base de datos usada en la búsqueda
+            statement: Select de la fase vectorial
+            timings: Duración (segundos) de cada fase
+            context: Datos adicionales (query de usuario, versión, dependencias...)
+
+        Returns:
+            True si se registró la búsqueda
+        """
+        db_ms = sum(timings.get(phase, 0.0) for phase in DB_PHASES) * 1000
+        if not self.enabled or db_ms < self.threshold_ms:
+            return False
+        total_ms = sum(timings.values()) * 1000
+
+        try:
+            dialect = db.get_bind().dialect
+            compiled = statement.compile(dialect=dialect)
+            sql = str(compiled)
+            raw_params = dict(compiled.params)
+
+            entry = {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "db_ms": round(db_ms, 2),
+                "total_ms": round(total_ms, 2),
+                "phases_ms": {k: round(v * 1000, 2) for k, v in timings.items()},
+                "context": context or {},
+                "sql": sql,
+                "params": elide_vectors(raw_params),
+            }
+
+            if self.explain:
+                plan = self._explain(db, statement)
+                entry["plan"] = plan
+                entry["plan_summary"] = summarize_plan(plan)
+
+            self._log.info(json.dumps(entry, ensure_ascii=False, default=str))
+            logger.warning(
+                f"Búsqueda lenta (BD {db_ms:.0f}ms >= {self.threshold_ms:.0f}ms) registrada"
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Error registrando búsqueda lenta: {e}")
+            try:
+                db.rollback()
+            except Exception:
+                pass
+            return False
+
+    def _explain(self, db, statement) -> List[str]:
+        """Ejecutar EXPLAIN (ANALYZE, BUFFERS) con los mismos parámetros."""
+        return explain_plan(db.connection(), statement)
+
+
+# Singleton
+_slow_query_logger = None
+
+
+def get_slow_query_logger() -> SlowQueryLogger:
+    global _slow_query_logger
+    if _slow_query_logger is None:
+        _slow_query_logger = SlowQueryLogger(
+            threshold_ms=settings.slow_query_threshold_ms,
+            log_path=settings.slow_query_log_path,
+            max_bytes=settings.slow_query_log_max_bytes,
+            backup_count=settings.slow_query_log_backups,
+            explain=settings.slow_query_explain,
+        )
+    return _slow_query_logger
@@ -1,4 +1,21 @@
+from typing import Optional
+
+
 def sanitize_text(text: str) -> str:
     return text.strip()
 
 
+def build_embedding_text(
+    name: str,
+    summary: Optional[str] = "",
+    description: Optional[str] = "",
+    readme: Optional[str] = None,
+    readme_chars: int = 2000,
+) -> str:
+    """Texto a vectorizar de un módulo: nombre, resumen, descripción y README recortado."""
+    text_parts = [name, summary, description]
+    if readme:
+        # Limitar README para no saturar el embedding
+        text_parts.append(readme[:readme_chars])
+
+    return ". ".join(filter(None, text_parts))
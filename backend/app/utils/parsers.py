@@ -1,4 +1,224 @@
-def parse_manifest(content: str) -> dict:
-    return {}
+"""
+Parsers de ficheros de módulos Odoo.
 
+Un ``__manifest__.py`` es código Python: se parsea con ``ast`` y solo se
+evalúan estructuras literales (nunca se ejecuta el fichero).
 
+Casi todos los manifests son un único dict literal (a veces asignado a una
+variable) tras comentarios o una cabecera de licencia. La ruta rápida
+localiza ese ``{`` y lee el literal con un tokenizador de expresiones
+regulares, sin construir el AST (``ast.parse`` es casi todo el coste del
+parseo). Lo que no entiende (``_()``, escapes raros, código tras el dict...)
+pasa a ``ast`` en modo expresión y, si tampoco, al parseo completo del fichero.
+"""
+import ast
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# Inicio del dict del manifest: "{" o "nombre = {" al principio de una línea
+_MANIFEST_DICT_START = re.compile(r"^(?:[A-Za-z_]\w*\s*=\s*)?\{", re.MULTILINE)
+
+# Tokens de un literal Python. El último caso (cualquier carácter suelto)
+# garantiza que solo los espacios quedan sin tokenizar: lo que no sea un
+# literal aparece como token y hace fallar la ruta rápida.
+_LITERAL_TOKEN = re.compile(
+    r"""
+    [rRuUbB]{0,2}(?:
+        '''[^\\']*(?:(?:\\.|'(?!''))[^\\']*)*'''
+        | \"\"\"[^\\"]*(?:(?:\\.|"(?!""))[^\\"]*)*\"\"\"
+        | '[^\\'\n]*(?:\\.[^\\'\n]*)*'
+        | "[^\\"\n]*(?:\\.[^\\"\n]*)*"
+    )
+    | \#[^\n]*
+    | (?:0|[1-9]\d*)(?:\.\d*)?(?:[eE][-+]?\d+)?
+    | [A-Za-z_]\w*
+    | \S
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+_QUOTES = "'\""
+_LITERAL_NAMES = {"True": True, "False": False, "None": None}
+_CLOSING = {"{": "}", "[": "]", "(": ")"}
+
+
+def _safe_ast_eval(node: ast.AST) -> Any:
+    """Evaluar nodos AST permitiendo solo estructuras de datos literales."""
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.List):
+        return [_safe_ast_eval(elt) for elt in node.elts]
+    if isinstance(node, ast.Tuple):
+        return tuple(_safe_ast_eval(elt) for elt in node.elts)
+    if isinstance(node, ast.Dict):
+        return {
+            _safe_ast_eval(key): _safe_ast_eval(value)
+            for key, value in zip(node.keys, node.values)
+        }
+    if isinstance(node, ast.Set):
+        return {_safe_ast_eval(elt) for elt in node.elts}
+    if isinstance(node, ast.NameConstant):  # Py<3.8 compatibility
+        return node.value
+    if isinstance(node, ast.Name):
+        if node.id in {"True", "False", "None"}:
+            return eval(node.id)  # noqa: PGH001
+        raise ValueError(f"Nombre no permitido en manifest: {node.id}")
+    if isinstance(node, ast.Call):
+        # Soportar traducciones tipo _("texto")
+        if isinstance(node.func, ast.Name) and node.func.id == "_":
+            if node.args:
+                return _safe_ast_eval(node.args[0])
+        raise ValueError("Llamadas a funciones no permitidas en manifest")
+    raise ValueError(f"Tipo de nodo no soportado: {type(node).__name__}")
+
+
+def _tokenize_literal(content: str, start: int) -> List[str]:
+    """Tokens desde ``start`` hasta el final del fichero (sin comentarios)."""
+    return [token for token in _LITERAL_TOKEN.findall(content, start) if token[0] != "#"]
+
+
+def _decode_string(token: str) -> Any:
+    """Valor de un literal de cadena (los casos con escapes o prefijo van a ``ast``)."""
+    if token[0] in _QUOTES and "\\" not in token and "\r" not in token:
+        quote = 3 if token[:3] in ("'''", '"""') else 1
+        return token[quote:-quote]
+    return ast.literal_eval(token)
+
+
+def _read_literal(tokens: List[str], index: int) -> Tuple[Any, int]:
+    """
+    Lee el valor que empieza en ``tokens[index]``.
+
+    Returns:
+        (valor, índice del siguiente token)
+
+    Raises:
+        ValueError, TypeError, IndexError, SyntaxError: si no es un literal
+            soportado
+    """
+    token = tokens[index]
+    if token[-1] in _QUOTES and len(token) > 1:
+        value = _decode_string(token)
+        index += 1
+        # Concatenación implícita ("a" "b"); str + bytes da TypeError, como en Python
+        while index < len(tokens) and tokens[index][-1] in _QUOTES and len(tokens[index]) > 1:
+            value += _decode_string(tokens[index])
+            index += 1
+        return value, index
+    if token[0].isdigit():
+        return (int(token) if token.isdigit() else float(token)), index + 1
+    if token in _LITERAL_NAMES:
+        return _LITERAL_NAMES[token], index + 1
+    if token not in _CLOSING:
+        raise ValueError(f"Token no permitido en manifest: {token}")
+
+    closing = _CLOSING[token]
+    index += 1
+    items = []
+    trailing_comma = False
+    while tokens[index] != closing:
+        item, index = _read_literal(tokens, index)
+        if token == "{":
+            if tokens[index] != ":":
+                raise ValueError("Solo se admiten dicts, no sets")
+            value, index = _read_literal(tokens, index + 1)
+            item = (item, value)
+        items.append(item)
+        trailing_comma = tokens[index] == ","
+        if trailing_comma:
+            index += 1
+        elif tokens[index] != closing:
+            raise ValueError(f"Se esperaba ',' o '{closing}'")
+    index += 1
+
+    if token == "{":
+        return dict(items), index
+    if token == "[":
+        return items, index
+    # (x) es x; (x,) y () son tuplas
+    if len(items) == 1 and not trailing_comma:
+        return items[0], index
+    return tuple(items), index
+
+
+def locate_manifest_dict(content: str) -> Optional[int]:
+    """Posición del ``{`` con el que empieza el dict del manifest, o None."""
+    match = _MANIFEST_DICT_START.search(content)
+    return match.end() - 1 if match else None
+
+
+def parse_manifest_fast(content: str) -> Optional[Dict]:
+    """
+    Ruta rápida: lee solo el dict literal del manifest.
+
+    Primero con el tokenizador; si encuentra algo que no sabe leer, con
+    ``ast`` en modo expresión y ``_safe_ast_eval`` sobre el mismo fragmento.
+
+    Returns:
+        Dict con el manifest, o None si el fichero no tiene la forma habitual
+        (código tras el dict, ``{`` dentro de un docstring...) o contiene algo
+        que no es un literal
+    """
+    start = locate_manifest_dict(content)
+    if start is None:
+        return None
+    try:
+        tokens = _tokenize_literal(content, start)
+        manifest, end = _read_literal(tokens, 0)
+        if end != len(tokens):
+            raise ValueError("Código tras el dict del manifest")
+    except (ValueError, TypeError, IndexError, SyntaxError, RecursionError):
+        try:
+            expression = ast.parse(content[start:], mode="eval")
+            manifest = _safe_ast_eval(expression.body)
+        except (SyntaxError, ValueError, TypeError, RecursionError):
+            return None
+    return manifest if isinstance(manifest, dict) else None
+
+
+def parse_manifest_ast(content: str) -> Optional[Dict]:
+    """
+    Parseo completo del fichero: primera asignación evaluable o, si no hay,
+    primer dict literal del AST.
+
+    Raises:
+        SyntaxError: si el fichero no es Python válido
+    """
+    tree = ast.parse(content)
+
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            try:
+                return _safe_ast_eval(node.value)
+            except Exception:
+                continue
+
+    # Fallback: primer dict literal encontrado
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Dict):
+            try:
+                return _safe_ast_eval(node)
+            except Exception:
+                continue
+    return None
+
+
+def parse_manifest(content: str, manifest_path: str = "") -> Optional[Dict]:
+    """
+    Parsear el contenido de un __manifest__.py.
+
+    Args:
+        content: Texto del manifest
+        manifest_path: Path (solo para mensajes de error)
+
+    Returns:
+        Dict con el manifest, o None si no se puede parsear
+    """
+    manifest = parse_manifest_fast(content)
+    if manifest is not None:
+        return manifest
+    try:
+        return parse_manifest_ast(content)
+    except Exception as e:
+        print(f"❌ Error parseando {manifest_path}: {e}")
+        return None
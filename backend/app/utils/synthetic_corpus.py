@@ -0,0 +1,153 @@
+"""
+Generación de un corpus sintético a partir de módulos reales.
+
+Clona y perturba filas de ``odoo_modules`` para pruebas de escala
+(50k-500k filas):
+- Embeddings: ruido gaussiano alrededor del embedding original (se conservan
+  los clusters reales) y renormalización a la norma original
+- depends: distribución empírica de número de dependencias y de frecuencia
+  de cada dependencia por versión
+- Resto de campos: nombre técnico único, estrellas/issues con ruido log-normal
+"""
+from collections import Counter, defaultdict
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+
+class DependsDistribution:
+    """
+    Distribución empírica de ``depends`` por versión.
+
+    Muestrea primero el número de dependencias (según las longitudes reales)
+    y después las dependencias, sin reemplazo, ponderadas por su frecuencia.
+    """
+
+    def __init__(self, rows: Sequence[Dict]):
+        self._lengths: Dict[str, List[int]] = defaultdict(list)
+        counts: Dict[str, Counter] = defaultdict(Counter)
+        for row in rows:
+            depends = row.get("depends") or []
+            self._lengths[row["version"]].append(len(depends))
+            counts[row["version"]].update(depends)
+
+        self._modules: Dict[str, List[str]] = {}
+        self._weights: Dict[str, np.ndarray] = {}
+        for version, counter in counts.items():
+            modules, frequencies = zip(*counter.most_common()) if counter else ((), ())
+            self._modules[version] = list(modules)
+            total = float(sum(frequencies)) or 1.0
+            self._weights[version] = np.asarray(frequencies, dtype=np.float64) / total
+
+    def sample(self, version: str, rng: np.random.Generator) -> List[str]:
+        lengths = self._lengths.get(version)
+        modules = self._modules.get(version)
+        if not lengths or not modules:
+            return []
+
+        size = min(int(rng.choice(lengths)), len(modules))
+        if size == 0:
+            return []
+        chosen = rng.choice(len(modules), size=size, replace=False, p=self._weights[version])
+        return [modules[i] for i in chosen]
+
+
+def jitter_embeddings(
+    embeddings: np.ndarray,
+    noise: float,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """
+    Perturba embeddings con ruido gaussiano relativo a su norma.
+
+    Args:
+        embeddings: Matriz (n, dims)
+        noise: Norma del ruido relativa a la del vector (0.05 = 5%)
+        rng: Generador aleatorio
+
+    Returns:
+        Matriz float32 (n, dims) con la misma norma por fila que la original
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    dims = embeddings.shape[1]
+
+    perturbed = embeddings + rng.standard_normal(embeddings.shape, dtype=np.float32) * (
+        noise * norms / np.sqrt(dims)
+    )
+    new_norms = np.linalg.norm(perturbed, axis=1, keepdims=True)
+    np.divide(perturbed * norms, new_norms, out=perturbed, where=new_norms > 0)
+    return perturbed
+
+
+class SyntheticCorpusGenerator:
+    """
+    Genera filas sintéticas por lotes a partir de filas reales.
+
+    Args:
+        source_rows: Filas reales (dicts con las columnas de odoo_modules y
+            ``embedding`` como secuencia de floats)
+        noise: Ruido relativo de los embeddings
+        keep_depends: Probabilidad de conservar los depends de la fila original
+            (el resto se muestrean de la distribución empírica)
+        seed: Semilla para corpus reproducibles
+    """
+
+    def __init__(
+        self,
+        source_rows: Sequence[Dict],
+        noise: float = 0.05,
+        keep_depends: float = 0.5,
+        seed: Optional[int] = 0,
+    ):
+        self.source_rows = [row for row in source_rows if row.get("embedding") is not None]
+        if not self.source_rows:
+            raise ValueError("No hay filas con embedding para generar el corpus")
+
+        self.noise = noise
+        self.keep_depends = keep_depends
+        self.rng = np.random.default_rng(seed)
+        self.depends = DependsDistribution(self.source_rows)
+        self.embeddings = np.asarray(
+            [row["embedding"] for row in self.source_rows], dtype=np.float32
+        )
+
+    def generate(self, n: int, batch_size: int = 5000, start_id: int = 1) -> Iterator[List[Dict]]:
+        """
+        Genera ``n`` filas en lotes de ``batch_size``.
+
+        Yields:
+            Listas de dicts con las columnas de odoo_modules (``embedding`` como
+            fila de una matriz float32)
+        """
+        next_id = start_id
+        remaining = n
+        while remaining > 0:
+            size = min(batch_size, remaining)
+            sources = self.rng.integers(0, len(self.source_rows), size=size)
+            embeddings = jitter_embeddings(self.embeddings[sources], self.noise, self.rng)
+            multipliers = self.rng.lognormal(0.0, 0.5, size=(size, 2))
+
+            batch = []
+            for i, source_index in enumerate(sources):
+                source = self.source_rows[source_index]
+                if self.rng.random() < self.keep_depends:
+                    depends = list(source.get("depends") or [])
+                else:
+                    depends = self.depends.sample(source["version"], self.rng)
+
+                batch.append({
+                    **source,
+                    "id": next_id,
+                    "technical_name": f"{source['technical_name']}_syn{next_id}",
+                    "name": f"{source['name']} #{next_id}",
+                    "depends": depends,
+                    "module_path": f"{source.get('module_path') or source['technical_name']}_syn{next_id}",
+                    "github_stars": int((source.get("github_stars") or 0) * multipliers[i, 0]),
+                    "github_issues_open": int((source.get("github_issues_open") or 0) * multipliers[i, 1]),
+                    "embedding": embeddings[i],
+                })
+                next_id += 1
+
+            remaining -= size
+            yield batch
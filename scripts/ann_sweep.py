@@ -0,0 +1,359 @@
+#!/usr/bin/env python
+"""
+Barrido de parámetros de índices ANN (pgvector): recall vs latencia.
+
+Calcula una vez el ground truth exacto (búsqueda por fuerza bruta, sin
+índices) para las queries del benchmark y, para cada punto de la rejilla,
+reconstruye el índice (HNSW: m, ef_construction / IVFFlat: lists) y ajusta
+los parámetros de consulta (hnsw.ef_search / ivfflat.probes). Para cada
+punto registra recall@k frente a la búsqueda exacta, latencias p50/p99,
+tamaño del índice y tiempo de construcción, y genera una tabla de Pareto
+(Markdown + JSON) lista para commitear.
+
+Las queries son las que sirve la API (``vector_search_query`` de
+search_service, con los mismos filtros) y los índices se crean con
+``index_sql`` de shadow_embeddings, como el índice en producción: con más
+de 2000 dimensiones (el máximo de pgvector para ``vector``) ambos usan la
+expresión ``embedding::halfvec(N)``.
+
+Uso:
+    python scripts/ann_sweep.py --cassette tests/results/embeddings.cassette
+    python scripts/ann_sweep.py --methods hnsw --m 16,32 --ef-search 40,100,200
+    python scripts/ann_sweep.py --methods ivfflat --lists 50,100 --probes 1,5,10
+    python scripts/ann_sweep.py --schema synthetic_50k --methods hnsw
+"""
+import argparse
+import itertools
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Add parent directory to path to import backend modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+
+from backend.app.config import get_settings
+from backend.app.database import engine
+from backend.app.metrics.benchmark_metrics import (
+    DEFAULT_QUERIES_PATH,
+    MetricsCalculator,
+    load_benchmark_queries,
+)
+from backend.app.metrics.history import get_git_revision
+from backend.app.metrics.performance import pareto_frontier, summarize_latencies
+from backend.app.models import OdooModule
+from backend.app.services.embedding_cassette import CassetteEmbeddingService, EmbeddingCassette
+from backend.app.services.embedding_service import EmbeddingService
+from backend.app.services.search_service import vector_search_query
+from backend.app.services.shadow_embeddings import index_sql
+from backend.app.services.slow_query_service import explain_plan
+
+SWEEP_INDEX = "ann_sweep_embedding_idx"
+
+
+def int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+class AnnSweep:
+    """Ejecuta el barrido sobre una conexión dedicada."""
+
+    def __init__(self, connection, dimensions: int, k: int = 10, repeat: int = 3):
+        self.conn = connection
+        self.dimensions = dimensions
+        self.k = k
+        self.repeat = repeat
+
+    def _knn(self, query: Dict, exact: bool = False):
+        """La query de la API para ``query`` (solo ids)."""
+        return vector_search_query(
+            query["embedding"],
+            query["version"],
+            query.get("dependencies"),
+            limit=self.k,
+            columns=(OdooModule.id,),
+            exact=exact,
+        )
+
+    def ground_truth(self, queries: List[Dict]) -> Dict[str, List[int]]:
+        """
+        Vecinos exactos de cada query (vector completo, índices desactivados).
+
+        Returns:
+            Dict {query_id: [ids]}
+        """
+        self.drop_index()
+        self.conn.execute(text("SET enable_indexscan = off"))
+        self.conn.execute(text("SET enable_bitmapscan = off"))
+        try:
+            return {
+                q["id"]: [row[0] for row in self.conn.execute(self._knn(q, exact=True))]
+                for q in queries
+            }
+        finally:
+            self.conn.execute(text("RESET enable_indexscan"))
+            self.conn.execute(text("RESET enable_bitmapscan"))
+
+    def drop_index(self) -> None:
+        self.conn.execute(text(f"DROP INDEX IF EXISTS {SWEEP_INDEX}"))
+        self.conn.commit()
+
+    def build_index(self, method: str, params: Dict[str, int]) -> Dict:
+        """
+        (Re)construye el índice ANN de barrido.
+
+        Returns:
+            Dict con build_seconds e index_bytes
+        """
+        self.drop_index()
+        start = time.perf_counter()
+        self.conn.execute(text(index_sql(
+            SWEEP_INDEX, "embedding", self.dimensions, method, params, concurrently=False
+        )))
+        self.conn.commit()
+        build_seconds = time.perf_counter() - start
+        self.conn.execute(text("ANALYZE odoo_modules"))
+        index_bytes = self.conn.execute(
+            text("SELECT pg_relation_size(CAST(:name AS regclass))"), {"name": SWEEP_INDEX}
+        ).scalar()
+        self.conn.commit()
+        return {"build_seconds": build_seconds, "index_bytes": int(index_bytes)}
+
+    def measure(
+        self, queries: List[Dict], truth: Dict[str, List[int]], setting: str, value: int
+    ) -> Dict:
+        """
+        Mide recall@k y latencias con un parámetro de consulta.
+
+        Args:
+            setting: "hnsw.ef_search" | "ivfflat.probes"
+            value: Valor del parámetro
+        """
+        self.conn.execute(text(f"SET {setting} = {int(value)}"))
+
+        latencies: List[float] = []
+        recalls: List[float] = []
+        for query in queries:
+            statement = self._knn(query)
+            for attempt in range(self.repeat):
+                start = time.perf_counter()
+                ids = [row[0] for row in self.conn.execute(statement)]
+                latencies.append((time.perf_counter() - start) * 1000)
+            expected = truth[query["id"]]
+            if expected:
+                recalls.append(MetricsCalculator.recall_at_k(ids, expected, self.k))
+
+        self.conn.execute(text(f"RESET {setting}"))
+        latency = summarize_latencies(latencies)
+        return {
+            f"recall@{self.k}": sum(recalls) / len(recalls) if recalls else 0.0,
+            "p50_ms": latency["p50"],
+            "p99_ms": latency["p99"],
+        }
+
+    def uses_index(self, query: Dict) -> bool:
+        """Comprueba con EXPLAIN que la query ANN usa el índice de barrido."""
+        plan = "\n".join(explain_plan(self.conn, self._knn(query), options=None))
+        return SWEEP_INDEX in plan
+
+
+def build_grid(args: argparse.Namespace) -> List[Dict]:
+    """Rejilla de índices: [{method, build_params, setting, values}]."""
+    grid = []
+    if "hnsw" in args.methods:
+        for m, ef_construction in itertools.product(args.m, args.ef_construction):
+            grid.append({
+                "method": "hnsw",
+                "build_params": {"m": m, "ef_construction": ef_construction},
+                "setting": "hnsw.ef_search",
+                "values": args.ef_search,
+            })
+    if "ivfflat" in args.methods:
+        for lists in args.lists:
+            grid.append({
+                "method": "ivfflat",
+                "build_params": {"lists": lists},
+                "setting": "ivfflat.probes",
+                "values": [p for p in args.probes if p <= lists],
+            })
+    return grid
+
+
+def run_grid(
+    sweep: AnnSweep, grid: List[Dict], queries: List[Dict], truth: Dict[str, List[int]]
+) -> List[Dict]:
+    """
+    Construye cada índice de la rejilla y mide cada valor de su parámetro.
+
+    Returns:
+        Un punto por (índice, valor) con params, recall, latencias y build
+    """
+    points: List[Dict] = []
+    try:
+        for entry in grid:
+            build = sweep.build_index(entry["method"], entry["build_params"])
+            params_label = ", ".join(f"{k}={v}" for k, v in entry["build_params"].items())
+            print(f"\n🔨 {entry['method']} ({params_label}): "
+                  f"{build['build_seconds']:.1f}s, {build['index_bytes'] / 1024 / 1024:.1f} MB")
+            if queries and not sweep.uses_index(queries[0]):
+                print("   ⚠️  Planner is not using the sweep index (table too small?)")
+
+            for value in entry["values"]:
+                result = sweep.measure(queries, truth, entry["setting"], value)
+                point = {
+                    "method": entry["method"],
+                    "params": {**entry["build_params"], entry["setting"].split(".")[1]: value},
+                    **result,
+                    **build,
+                }
+                points.append(point)
+                recall = result[f"recall@{sweep.k}"]
+                print(f"   {entry['setting']}={value:<4} recall@{sweep.k}={recall:.3f} "
+                      f"p50={result['p50_ms']:.2f}ms p99={result['p99_ms']:.2f}ms")
+    finally:
+        sweep.drop_index()
+    return points
+
+
+def build_report(points: List[Dict], metadata: Dict) -> Dict:
+    """Reporte con la frontera de Pareto (recall@k vs p99) y todos los puntos."""
+    return {
+        "metadata": metadata,
+        "pareto": pareto_frontier(points, maximize=f"recall@{metadata['k']}", minimize="p99_ms"),
+        "points": points,
+    }
+
+
+def render_markdown(report: Dict) -> str:
+    """Tabla de Pareto y tabla completa en Markdown."""
+    k = report["metadata"]["k"]
+    recall_key = f"recall@{k}"
+
+    def row(point: Dict) -> str:
+        params = ", ".join(f"{key}={value}" for key, value in point["params"].items())
+        return (f"| {point['method']} | {params} | {point[recall_key]:.3f} | "
+                f"{point['p50_ms']:.2f} | {point['p99_ms']:.2f} | "
+                f"{point['index_bytes'] / 1024 / 1024:.1f} | {point['build_seconds']:.1f} |")
+
+    header = (f"| method | params | {recall_key} | p50 ms | p99 ms | index MB | build s |\n"
+              f"|---|---|---|---|---|---|---|")
+    metadata = report["metadata"]
+    lines = [
+        "# ANN parameter sweep",
+        "",
+        f"- Date: {metadata['timestamp']}",
+        f"- Revision: {(metadata['git']['revision'] or '-')[:12]}",
+        f"- Rows: {metadata['rows']} | Queries: {metadata['queries']} | "
+        f"Repeat: {metadata['repeat']}",
+        "",
+        f"## Pareto frontier ({recall_key} vs p99)",
+        "",
+        header,
+        *[row(p) for p in report["pareto"]],
+        "",
+        "## All points",
+        "",
+        header,
+        *[row(p) for p in report["points"]],
+        "",
+    ]
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Sweep pgvector ANN index parameters")
+    parser.add_argument("--queries", default=DEFAULT_QUERIES_PATH)
+    parser.add_argument("--cassette", default=None,
+                        help="Embedding cassette (replays query embeddings offline)")
+    parser.add_argument("--cassette-mode", choices=["record", "replay", "auto"], default="auto")
+    parser.add_argument("--methods", default="hnsw,ivfflat",
+                        type=lambda v: [m.strip() for m in v.split(",")])
+    parser.add_argument("--m", type=int_list, default=[8, 16, 32])
+    parser.add_argument("--ef-construction", type=int_list, default=[64, 128])
+    parser.add_argument("--ef-search", type=int_list, default=[20, 40, 80, 160])
+    parser.add_argument("--lists", type=int_list, default=[50, 100, 200])
+    parser.add_argument("--probes", type=int_list, default=[1, 5, 10, 20])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3, help="Executions per query and point")
+    parser.add_argument("--maintenance-work-mem", default="1GB",
+                        help="maintenance_work_mem used while building indexes")
+    parser.add_argument("--schema", default=None,
+                        help="Schema holding odoo_modules (e.g. a synthetic corpus)")
+    parser.add_argument("--output-dir", default="tests/results")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point."""
+    args = parse_args(argv)
+    settings = get_settings()
+    print("\n🚀 Starting ANN sweep...\n")
+
+    cassette = None
+    if args.cassette:
+        cassette = EmbeddingCassette(
+            args.cassette,
+            mode=args.cassette_mode,
+            model=settings.embedding_model,
+            dimensions=settings.embedding_dimensions,
+        )
+
+    queries = load_benchmark_queries(args.queries)
+    embedding_service = EmbeddingService()
+    if cassette is not None:
+        embedding_service = CassetteEmbeddingService(embedding_service, cassette)
+    try:
+        for query in queries:
+            query["embedding"] = embedding_service.get_embedding(query["query"])
+        print(f"📐 {len(queries)} query embeddings ready")
+    finally:
+        if cassette is not None:
+            cassette.save()
+
+    grid = build_grid(args)
+
+    with engine.connect() as conn:
+        if args.schema:
+            conn.execute(text(f"SET search_path TO {args.schema}, public"))
+        sweep = AnnSweep(conn, settings.embedding_dimensions, k=args.k, repeat=args.repeat)
+        rows = conn.execute(
+            text("SELECT count(*) FROM odoo_modules WHERE embedding IS NOT NULL")
+        ).scalar()
+        conn.execute(text(f"SET maintenance_work_mem = '{args.maintenance_work_mem}'"))
+
+        start = time.perf_counter()
+        truth = sweep.ground_truth(queries)
+        elapsed = time.perf_counter() - start
+        print(f"🎯 Exact ground truth for {len(truth)} queries in {elapsed:.1f}s")
+
+        points = run_grid(sweep, grid, queries, truth)
+
+    report = build_report(points, {
+        "timestamp": datetime.now().isoformat(),
+        "git": get_git_revision(),
+        "rows": rows,
+        "queries": len(queries),
+        "k": args.k,
+        "repeat": args.repeat,
+        "schema": args.schema or "public",
+        "embeddings": f"cassette:{args.cassette_mode}" if cassette is not None else "live",
+    })
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stem = output_dir / f"ann_sweep_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    with open(stem.with_suffix(".json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    stem.with_suffix(".md").write_text(render_markdown(report), encoding="utf-8")
+
+    print(f"\n✅ Pareto frontier: {len(report['pareto'])} of {len(points)} points")
+    print(f"   Saved to {stem}.md / .json")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+"""
+Microbenchmark del parseo de ``__manifest__.py`` sobre un corpus real.
+
+Compara, por manifest:
+
+- ``ast``: parseo completo del fichero (el parser anterior)
+- ``fast``: ruta rápida de ``parse_manifest`` (solo el dict literal)
+- ``cache frío`` / ``cache caliente``: ``ManifestParser`` con una cache
+  SQLite nueva (todo fallos) y con la misma cache ya llena (todo aciertos)
+- ``pool``: ``ManifestParser`` sin cache y con ``--processes`` procesos
+
+y comprueba que ``fast`` devuelve lo mismo que ``ast`` en todo el corpus.
+
+El corpus sale de un checkout (``--path``: todos los ``__manifest__.py``
+bajo el directorio) o de los tarballs de ramas del ETL (``--archive-dir``).
+
+Uso:
+    python scripts/bench_manifest_parser.py --path ~/src/oca
+    python scripts/bench_manifest_parser.py --archive-dir data/archives --processes 4
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Add parent directory to path to import backend modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.app.services.archive_ingest import git_blob_sha, read_archive
+from backend.app.services.manifest_parser import ManifestCache, ManifestItem, ManifestParser
+from backend.app.services.module_index import MANIFEST_NAME
+from backend.app.utils.parsers import parse_manifest, parse_manifest_ast
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark manifest parsing strategies")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--path", help="Directory searched recursively for __manifest__.py")
+    source.add_argument("--archive-dir", help="Directory with <repo>-<branch>.tar.gz archives")
+    parser.add_argument("--limit", type=int, default=0, help="Max manifests (0 = all)")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Timed runs per strategy (the median is reported)")
+    parser.add_argument("--processes", type=int, default=4,
+                        help="Processes for the pool strategy (0 = skip it)")
+    parser.add_argument("--output", default=None, help="Write the results as JSON")
+    return parser.parse_args(argv)
+
+
+def load_corpus(args: argparse.Namespace) -> List[ManifestItem]:
+    """(sha, contenido, path) de cada manifest del corpus."""
+    items: List[ManifestItem] = []
+    if args.path:
+        for path in sorted(Path(args.path).expanduser().rglob(MANIFEST_NAME)):
+            data = path.read_bytes()
+            items.append((git_blob_sha(data), data.decode("utf-8", errors="replace"), str(path)))
+    else:
+        for archive in sorted(Path(args.archive_dir).expanduser().glob("*.tar.gz")):
+            with open(archive, "rb") as fileobj:
+                branch = read_archive(fileobj)
+            for module in branch.modules.values():
+                items.append((module.files.manifest_sha, module.manifest_content,
+                              f"{archive.name}:{module.files.manifest_path}"))
+    return items[:args.limit] if args.limit else items
+
+
+def legacy_parse(content: str) -> Optional[Dict]:
+    try:
+        return parse_manifest_ast(content)
+    except SyntaxError:
+        return None
+
+
+def time_runs(run: Callable[[], None], repeat: int, setup: Callable[[], None] = None) -> float:
+    """Mediana en segundos de ``repeat`` ejecuciones (``setup`` no se cronometra)."""
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def check_equivalence(items: List[ManifestItem]) -> List[str]:
+    """Paths donde la ruta rápida no coincide con el parseo completo."""
+    return [
+        path for _, content, path in items
+        if parse_manifest(content, path) != legacy_parse(content)
+    ]
+
+
+def run_benchmark(items: List[ManifestItem], args: argparse.Namespace) -> Dict[str, float]:
+    """Segundos (mediana) por estrategia para todo el corpus."""
+    results: Dict[str, float] = {}
+    results["ast"] = time_runs(lambda: [legacy_parse(content) for _, content, _ in items],
+                               args.repeat)
+    results["fast"] = time_runs(lambda: [parse_manifest(content, path) for _, content, path in items],
+                                args.repeat)
+
+    with tempfile.TemporaryDirectory() as directory:
+        parsers: List[ManifestParser] = []
+
+        def fresh_cache():
+            path = f"{directory}/cold-{len(parsers)}.sqlite3"
+            parsers.append(ManifestParser(ManifestCache(path)))
+
+        results["cache frío"] = time_runs(lambda: parsers[-1].parse_many(items),
+                                          args.repeat, setup=fresh_cache)
+        # La última cache ya tiene todo el corpus
+        results["cache caliente"] = time_runs(lambda: parsers[-1].parse_many(items), args.repeat)
+        for parser in parsers:
+            parser.close()
+
+    if args.processes:
+        pool = ManifestParser(processes=args.processes)
+        pool.start_pool()
+        pool.parse_many(items[:args.processes * 2])  # calentar los procesos
+        results[f"pool x{args.processes}"] = time_runs(lambda: pool.parse_many(items), args.repeat)
+        pool.close()
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point."""
+    args = parse_args(argv)
+    items = load_corpus(args)
+    if not items:
+        print("❌ No se encontraron manifests")
+        return 1
+    print(f"📦 {len(items)} manifests ({len({sha for sha, _, _ in items})} SHAs distintos)")
+
+    mismatches = check_equivalence(items)
+    if mismatches:
+        print(f"⚠️  {len(mismatches)} manifests con resultado distinto al parseo completo:")
+        for path in mismatches[:10]:
+            print(f"   - {path}")
+    else:
+        print("✅ La ruta rápida coincide con el parseo completo en todo el corpus")
+
+    results = run_benchmark(items, args)
+    baseline = results["ast"]
+    print(f"\n⏱️  Mediana de {args.repeat} ejecuciones:")
+    print(f"   {'estrategia':16} {'total (ms)':>11} {'µs/manifest':>12} {'speedup':>8}")
+    for name, seconds in results.items():
+        print(f"   {name:16} {seconds * 1000:11.1f} {seconds / len(items) * 1e6:12.1f} "
+              f"{baseline / seconds if seconds else 0:7.1f}x")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({
+            "manifests": len(items),
+            "mismatches": mismatches,
+            "seconds": results,
+            "us_per_manifest": {name: seconds / len(items) * 1e6 for name, seconds in results.items()},
+        }, indent=2, ensure_ascii=False))
+        print(f"\n💾 Resultados en {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
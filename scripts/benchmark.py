@@ -1,8 +1,445 @@
-def run_benchmark():
-    print("Benchmark placeholder")
+#!/usr/bin/env python
+"""
+Generador de carga para la búsqueda de AI-OdooFinder.
 
+Reproduce las queries del benchmark (o un log de queries) contra la API HTTP
+o directamente contra SearchService, con concurrencia, duración y tasa de
+llegada configurables, y genera un reporte JSON con QPS, percentiles de
+latencia, tasa de errores y desglose por fase.
 
-if __name__ == "__main__":
-    run_benchmark()
+Modos:
+- Closed loop (por defecto): N workers lanzan la siguiente query en cuanto
+  termina la anterior.
+- Open loop (--rate): las llegadas se programan a una tasa fija (o Poisson)
+  independientemente de las respuestas; la latencia se mide desde la llegada
+  programada para no ocultar colas (coordinated omission).
+
+Uso:
+    python scripts/benchmark.py --target service --concurrency 4 --duration 30
+    python scripts/benchmark.py --target api --base-url http://localhost:8989 --rate 20
+"""
+import argparse
+import itertools
+import json
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Add parent directory to path to import backend modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.app.metrics.benchmark_metrics import load_benchmark_queries
+from backend.app.metrics.performance import (
+    parse_server_timing,
+    summarize_latencies,
+    summarize_phases,
+)
+
+
+def load_queries(queries_path: str, query_log: Optional[str] = None) -> List[Dict]:
+    """
+    Carga las queries a reproducir.
+
+    Args:
+        queries_path: JSON del benchmark (clave "benchmark_queries")
+        query_log: Log opcional en JSON Lines ({"query", "version", ...});
+            si se indica, sustituye a las queries del benchmark
+
+    Returns:
+        Lista de dicts con id, query, version y dependencies
+    """
+    if query_log:
+        queries = []
+        with open(query_log, "r", encoding="utf-8") as f:
+            for i, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                entry = json.loads(line)
+                queries.append({
+                    "id": entry.get("id", f"log_{i}"),
+                    "query": entry["query"],
+                    "version": entry["version"],
+                    "dependencies": entry.get("dependencies"),
+                })
+        return queries
+
+    return [
+        {
+            "id": q["id"],
+            "query": q["query"],
+            "version": q["version"],
+            "dependencies": q.get("dependencies"),
+        }
+        for q in load_benchmark_queries(queries_path)
+    ]
+
+
+class ServiceTarget:
+    """Ejecuta queries directamente contra SearchService (una sesión por thread)."""
+
+    name = "service"
+
+    def __init__(self, limit: int, schema: Optional[str] = None):
+        from backend.app.database import SessionLocal
+        from backend.app.services.search_service import SearchService
+
+        self._session_factory = SessionLocal
+        self.schema = schema
+        if schema:
+            # Corpus sintético: resolver odoo_modules en el schema indicado
+            from sqlalchemy import create_engine
+            from sqlalchemy.orm import sessionmaker
+
+            from backend.app.config import get_settings
+
+            schema_engine = create_engine(
+                get_settings().database_url,
+                pool_pre_ping=True,
+                connect_args={"options": f"-csearch_path={schema},public"},
+            )
+            self._session_factory = sessionmaker(
+                autocommit=False, autoflush=False, bind=schema_engine
+            )
+        self._service_cls = SearchService
+        self._local = threading.local()
+        self._sessions = []
+        self._lock = threading.Lock()
+        self.limit = limit
+
+    def _service(self):
+        service = getattr(self._local, "service", None)
+        if service is None:
+            db = self._session_factory()
+            service = self._service_cls(db)
+            self._local.service = service
+            with self._lock:
+                self._sessions.append(db)
+        return service
+
+    def execute(self, query: Dict) -> Dict:
+        service = self._service()
+        service.search(
+            query=query["query"],
+            version=query["version"],
+            dependencies=query.get("dependencies"),
+            limit=self.limit,
+        )
+        return {
+            "error": service.last_error,
+            "phases_ms": {k: v * 1000 for k, v in service.last_timings.items()},
+        }
+
+    def close(self):
+        for db in self._sessions:
+            db.close()
+
+
+class ApiTarget:
+    """Ejecuta queries contra la API HTTP (un cliente httpx por thread)."""
+
+    name = "api"
+
+    def __init__(self, base_url: str, limit: int, timeout: float = 30.0):
+        import httpx
+
+        self._httpx = httpx
+        self._local = threading.local()
+        self._clients = []
+        self._lock = threading.Lock()
+        self.base_url = base_url.rstrip("/")
+        self.limit = limit
+        self.timeout = timeout
+
+    def _client(self):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._httpx.Client(base_url=self.base_url, timeout=self.timeout)
+            self._local.client = client
+            with self._lock:
+                self._clients.append(client)
+        return client
+
+    def execute(self, query: Dict) -> Dict:
+        params = {"query": query["query"], "version": query["version"], "limit": self.limit}
+        if query.get("dependencies"):
+            params["dependencies"] = query["dependencies"]
+
+        response = self._client().get("/search", params=params)
+        error = None
+        if response.status_code >= 400:
+            error = f"HTTP {response.status_code}"
+        return {
+            "error": error,
+            "phases_ms": parse_server_timing(response.headers.get("server-timing")),
+        }
+
+    def close(self):
+        for client in self._clients:
+            client.close()
+
+
+class LoadGenerator:
+    """Genera carga closed-loop u open-loop y recoge las muestras."""
+
+    def __init__(
+        self,
+        target,
+        queries: List[Dict],
+        concurrency: int = 4,
+        duration: float = 30.0,
+        rate: Optional[float] = None,
+        poisson: bool = False,
+        max_requests: Optional[int] = None,
+        warmup: float = 0.0,
+    ):
+        self.target = target
+        self.queries = queries
+        self.concurrency = concurrency
+        self.duration = duration
+        self.rate = rate
+        self.poisson = poisson
+        self.max_requests = max_requests
+        self.warmup = warmup
+
+        self._samples: List[Dict] = []
+        self._lock = threading.Lock()
+        self._query_cycle = itertools.cycle(queries)
+        self._issued = 0
+        self._measure_from = 0.0
+
+    @property
+    def mode(self) -> str:
+        return "open" if self.rate else "closed"
+
+    def _next_query(self) -> Optional[Dict]:
+        with self._lock:
+            if self.max_requests is not None and self._issued >= self.max_requests:
+                return None
+            self._issued += 1
+            return next(self._query_cycle)
 
+    def _run_one(self, query: Dict, scheduled_at: Optional[float] = None) -> None:
+        started = time.perf_counter()
+        try:
+            outcome = self.target.execute(query)
+        except Exception as e:
+            outcome = {"error": f"{type(e).__name__}: {e}", "phases_ms": {}}
+        finished = time.perf_counter()
 
+        sample = {
+            "query_id": query["id"],
+            "start": started,
+            "latency_ms": (finished - (scheduled_at or started)) * 1000,
+            "service_ms": (finished - started) * 1000,
+            "error": outcome["error"],
+            "phases_ms": outcome["phases_ms"],
+        }
+        if started >= self._measure_from:
+            with self._lock:
+                self._samples.append(sample)
+
+    def _closed_loop(self, deadline: float) -> None:
+        def worker():
+            while time.perf_counter() < deadline:
+                query = self._next_query()
+                if query is None:
+                    return
+                self._run_one(query)
+
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(self.concurrency)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    def _open_loop(self, deadline: float) -> None:
+        interval = 1.0 / self.rate
+        next_arrival = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            while next_arrival < deadline:
+                now = time.perf_counter()
+                if next_arrival > now:
+                    time.sleep(next_arrival - now)
+                query = self._next_query()
+                if query is None:
+                    break
+                pool.submit(self._run_one, query, next_arrival)
+                next_arrival += random.expovariate(self.rate) if self.poisson else interval
+
+    def run(self) -> Dict:
+        """
+        Ejecuta la carga y devuelve el reporte.
+
+        Returns:
+            Dict con metadata, throughput, latencias y desglose por fase
+        """
+        start = time.perf_counter()
+        self._measure_from = start + self.warmup
+        deadline = start + self.warmup + self.duration
+
+        if self.rate:
+            self._open_loop(deadline)
+        else:
+            self._closed_loop(deadline)
+
+        elapsed = time.perf_counter() - self._measure_from
+        return self._build_report(max(elapsed, 1e-9))
+
+    def _build_report(self, elapsed: float) -> Dict:
+        samples = self._samples
+        ok = [s for s in samples if not s["error"]]
+        errors = [s for s in samples if s["error"]]
+
+        error_counts: Dict[str, int] = {}
+        for s in errors:
+            error_counts[s["error"]] = error_counts.get(s["error"], 0) + 1
+
+        per_query: Dict[str, List[float]] = {}
+        for s in ok:
+            per_query.setdefault(s["query_id"], []).append(s["latency_ms"])
+
+        return {
+            "metadata": {
+                "timestamp": datetime.now().isoformat(),
+                "target": self.target.name,
+                "mode": self.mode,
+                "concurrency": self.concurrency,
+                "arrival_rate": self.rate,
+                "poisson_arrivals": self.poisson if self.rate else None,
+                "duration_seconds": self.duration,
+                "warmup_seconds": self.warmup,
+                "measured_seconds": elapsed,
+                "distinct_queries": len(self.queries),
+                "schema": getattr(self.target, "schema", None),
+            },
+            "throughput": {
+                "requests": len(samples),
+                "successful": len(ok),
+                "qps": len(samples) / elapsed,
+                "successful_qps": len(ok) / elapsed,
+            },
+            "errors": {
+                "count": len(errors),
+                "rate": len(errors) / len(samples) if samples else 0.0,
+                "by_type": error_counts,
+            },
+            "latency_ms": summarize_latencies([s["latency_ms"] for s in ok]),
+            "service_time_ms": summarize_latencies([s["service_ms"] for s in ok]),
+            "phases_ms": summarize_phases([s["phases_ms"] for s in ok]),
+            "per_query_latency_ms": {
+                query_id: summarize_latencies(values)
+                for query_id, values in sorted(per_query.items())
+            },
+        }
+
+
+def save_report(report: Dict, output_dir: str) -> str:
+    """Guarda el reporte como loadtest_<timestamp>.json junto a los de relevancia."""
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    filepath = Path(output_dir) / f"loadtest_{timestamp}.json"
+
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    return str(filepath)
+
+
+def print_summary(report: Dict, output_path: str) -> None:
+    """Imprime resumen en consola."""
+    meta = report["metadata"]
+    latency = report["latency_ms"]
+
+    print("\n" + "=" * 80)
+    print("LOAD TEST COMPLETED")
+    print("=" * 80)
+    print(f"\nTarget: {meta['target']} | Mode: {meta['mode']} | "
+          f"Concurrency: {meta['concurrency']} | Rate: {meta['arrival_rate'] or '-'}")
+    print(f"Requests: {report['throughput']['requests']} in {meta['measured_seconds']:.1f}s "
+          f"→ {report['throughput']['qps']:.2f} QPS")
+    print(f"Error rate: {report['errors']['rate']:.1%}")
+
+    print("\nLATENCY (ms):")
+    print(f"  p50={latency['p50']:.1f} | p95={latency['p95']:.1f} | "
+          f"p99={latency['p99']:.1f} | max={latency['max']:.1f}")
+
+    if report["phases_ms"]:
+        print("\nPHASES (ms, p50 / p99):")
+        for phase, summary in report["phases_ms"].items():
+            print(f"  {phase:14} {summary['p50']:8.1f} / {summary['p99']:8.1f}")
+
+    print(f"\nResults saved to: {output_path}")
+    print("=" * 80)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load generator for AI-OdooFinder search")
+    parser.add_argument("--target", choices=["service", "api"], default="service")
+    parser.add_argument("--base-url", default="http://localhost:8989",
+                        help="API base URL (target=api)")
+    parser.add_argument("--queries", default="tests/benchmark_queries.json")
+    parser.add_argument("--query-log", default=None,
+                        help="JSON Lines query log to replay instead of the benchmark queries")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to measure")
+    parser.add_argument("--warmup", type=float, default=0.0, help="Seconds excluded from stats")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="Arrival rate in requests/s (open loop); omit for closed loop")
+    parser.add_argument("--poisson", action="store_true",
+                        help="Poisson inter-arrival times in open loop")
+    parser.add_argument("--requests", type=int, default=None, help="Stop after N requests")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--schema", default=None,
+                        help="Schema holding odoo_modules "
+                             "(e.g. a synthetic corpus; target=service)")
+    parser.add_argument("--output-dir", default="tests/results")
+    return parser.parse_args(argv)
+
+
+def run_benchmark(argv: Optional[List[str]] = None) -> int:
+    """Entry point."""
+    args = parse_args(argv)
+
+    queries = load_queries(args.queries, args.query_log)
+    if not queries:
+        print("❌ No queries to replay")
+        return 1
+
+    if args.target == "api":
+        target = ApiTarget(args.base_url, args.limit)
+    else:
+        target = ServiceTarget(args.limit, schema=args.schema)
+
+    print(f"\n🚀 Load test: {len(queries)} queries, target={args.target}, "
+          f"{'open loop @ %.1f req/s' % args.rate if args.rate else 'closed loop'}, "
+          f"concurrency={args.concurrency}, duration={args.duration:.0f}s\n")
+
+    generator = LoadGenerator(
+        target,
+        queries,
+        concurrency=args.concurrency,
+        duration=args.duration,
+        rate=args.rate,
+        poisson=args.poisson,
+        max_requests=args.requests,
+        warmup=args.warmup,
+    )
+    try:
+        report = generator.run()
+    finally:
+        target.close()
+
+    output_path = save_report(report, args.output_dir)
+    print_summary(report, output_path)
+    return 0 if report["errors"]["count"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_benchmark())
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+"""
+Compara la última ejecución del benchmark con las N anteriores.
+
+Lee el histórico SQLite que alimenta run_benchmark.py, imprime la tendencia
+de métricas de relevancia y latencia, y termina con código != 0 si detecta
+regresiones (para usarlo como gate de merge).
+
+Uso:
+    python scripts/compare_benchmarks.py --last 5
+    python scripts/compare_benchmarks.py --run-id 42 --last 3
+    python scripts/compare_benchmarks.py --paired baseline.json candidate.json
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+# Add parent directory to path to import backend modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.app.metrics.batch_metrics import compare_reports
+from backend.app.metrics.history import (
+    LATENCY_METRICS,
+    RELEVANCE_METRICS,
+    BenchmarkHistory,
+    compare_runs,
+)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare benchmark runs from the trend history")
+    parser.add_argument("--history", default="tests/results/history.sqlite")
+    parser.add_argument("--last", type=int, default=5, help="Number of previous runs to compare")
+    parser.add_argument("--run-id", type=int, default=None,
+                        help="Run to evaluate (defaults to the latest)")
+    parser.add_argument("--relevance-tolerance", type=float, default=0.02)
+    parser.add_argument("--latency-tolerance", type=float, default=0.20)
+    parser.add_argument("--paired", nargs=2, metavar=("BASELINE", "CANDIDATE"), default=None,
+                        help="Paired significance test between two benchmark JSON reports")
+    parser.add_argument("--resamples", type=int, default=10000,
+                        help="Resamples for the paired test and bootstrap CIs")
+    parser.add_argument("--alpha", type=float, default=0.05,
+                        help="Significance level for the paired test")
+    return parser.parse_args(argv)
+
+
+def run_paired(baseline_path: str, candidate_path: str, resamples: int, alpha: float) -> int:
+    """
+    Compara dos reportes query a query (test pareado + IC bootstrap del delta).
+
+    Returns:
+        1 si alguna métrica empeora de forma significativa, 0 si no
+    """
+    reports = []
+    for path in (baseline_path, candidate_path):
+        with open(path, 'r', encoding='utf-8') as f:
+            reports.append(json.load(f))
+
+    comparison = compare_reports(reports[0], reports[1], n_resamples=resamples)
+    queries = comparison.pop("queries")["count"]
+
+    print("=" * 80)
+    print(f"PAIRED COMPARISON ({queries} common queries)")
+    print("=" * 80)
+    print(f"{'metric':12} {'baseline':>9} {'candidate':>10} {'delta':>8} {'95% CI':>18} {'p':>7}")
+
+    significant_drops = []
+    for name, result in comparison.items():
+        marker = ""
+        if result["p_value"] < alpha:
+            marker = " ▲" if result["delta"] > 0 else " ▼"
+            if result["delta"] < 0:
+                significant_drops.append(name)
+        ci = f"[{result['ci_low']:+.3f}, {result['ci_high']:+.3f}]"
+        print(f"{name:12} {result['baseline']:>9.3f} {result['candidate']:>10.3f} "
+              f"{result['delta']:>+8.3f} {ci:>18} {result['p_value']:>7.4f}{marker}")
+
+    if significant_drops:
+        print(f"\n❌ Significant drop (p < {alpha}): {', '.join(significant_drops)}")
+        return 1
+
+    print(f"\n✅ No significant drops (p < {alpha})")
+    return 0
+
+
+def print_trend(runs: List[dict]) -> None:
+    """Imprime una tabla con las métricas de cada ejecución (más antigua primero)."""
+    columns = list(RELEVANCE_METRICS) + [f"latency.{s}.{k}" for s, k in LATENCY_METRICS]
+    header = f"{'run':>5} {'revision':10} " + " ".join(f"{c.split('.', 1)[-1]:>12}" for c in columns)
+    print(header)
+    print("-" * len(header))
+
+    for run in reversed(runs):
+        revision = (run["git_revision"] or "-")[:8] + ("*" if run["git_dirty"] else "")
+        values = []
+        for column in columns:
+            value = run["metrics"].get(column)
+            if value is None:
+                values.append(f"{'-':>12}")
+            elif column.startswith("latency."):
+                values.append(f"{value:>10.1f}ms")
+            else:
+                values.append(f"{value:>12.3f}")
+        print(f"{run['id']:>5} {revision:10} " + " ".join(values))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point."""
+    args = parse_args(argv)
+
+    if args.paired:
+        return run_paired(args.paired[0], args.paired[1], args.resamples, args.alpha)
+
+    if not Path(args.history).exists():
+        print(f"❌ History {args.history} not found (run scripts/run_benchmark.py first)")
+        return 1
+
+    history = BenchmarkHistory(args.history)
+
+    if args.run_id is not None:
+        candidates = history.recent(1, before_id=args.run_id + 1)
+        current = candidates[0] if candidates and candidates[0]["id"] == args.run_id else None
+    else:
+        current = history.latest()
+
+    if current is None:
+        print("❌ No run to evaluate")
+        return 1
+
+    previous = history.recent(args.last, before_id=current["id"])
+
+    print("=" * 80)
+    print(f"BENCHMARK TREND (run {current['id']} vs previous {len(previous)})")
+    print("=" * 80)
+    print_trend([current] + previous)
+
+    if not previous:
+        print("\nℹ️  No previous runs to compare against")
+        return 0
+
+    regressions = compare_runs(
+        current["metrics"],
+        [run["metrics"] for run in previous],
+        relevance_tolerance=args.relevance_tolerance,
+        latency_tolerance=args.latency_tolerance,
+    )
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s):")
+        for regression in regressions:
+            print(f"   - {regression.describe()}")
+        return 1
+
+    print("\n✅ No regressions")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,19 +1,39 @@
+import argparse
 import os
 import sys
+import threading
+import time
+from contextlib import closing
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 
 # Añadir backend al path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
+from backend.app.config import get_settings
 from backend.app.database import SessionLocal
 from backend.app.models import OdooModule
+from backend.app.services.archive_ingest import (
+    ArchiveBranch,
+    ArchiveModule,
+    local_archive_path,
+    read_archive,
+)
+from backend.app.services.bulk_writer import BulkModuleWriter
 from backend.app.services.embedding_service import get_embedding_service
+from backend.app.services.etl_ledger import EtlLedger
+from backend.app.services.etl_pipeline import Pipeline, Stage
+from backend.app.services.git_mirror import MirrorPool
 from backend.app.services.github_service import get_github_service
+from backend.app.services.manifest_parser import get_manifest_parser
+from backend.app.services.module_index import ModuleFiles, index_modules, module_changed
+from backend.app.utils.helpers import build_embedding_text
 
 # Servicios
 github = get_github_service()
 embedding = get_embedding_service()
+manifests = get_manifest_parser()
 
 # Configuración
 TARGET_REPOS: List[str] = [
@@ -26,168 +46,714 @@ TARGET_REPOS: List[str] = [
 
 ODOO_VERSIONS: List[str] = ["12.0", "13.0", "14.0", "15.0", "16.0", "17.0", "18.0", "19.0"]
 
+# Ledger de la ejecución en curso (lo crea main; None fuera del ETL)
+ledger: Optional[EtlLedger] = None
 
-def process_module(
-    db,
+# Módulos descartados por el pipeline: {(repo, versión, módulo): motivo}
+dropped: Dict[Tuple[str, str, str], str] = {}
+
+
+@dataclass
+class ModuleTask:
+    """Un módulo en tránsito por el pipeline."""
+
+    repo_name: str
+    version: str
+    manifest_path: str
+    repo_metadata: Dict
+    files: ModuleFiles  # entrada del índice de la rama (paths + SHAs)
+    source_commit: Optional[str] = None
+    last_commit_date: Optional[datetime] = None  # por módulo (mirror); si no, pushed_at del repo
+    manifest_content: Optional[str] = None
+    readme_content: Optional[str] = None
+    embedding_text: Optional[str] = None
+    values: Optional[Dict] = None
+
+    @property
+    def technical_name(self) -> str:
+        return self.manifest_path.split("/")[0]
+
+    @property
+    def manifest_sha(self) -> Optional[str]:
+        return self.files.manifest_sha
+
+    @property
+    def readme_sha(self) -> Optional[str]:
+        return self.files.readme_sha
+
+
+@dataclass
+class BranchTask:
+    """Una (repo, versión) pendiente de descubrir."""
+
+    repo_name: str
+    version: str
+    repo_metadata: Dict
+    modules: Optional[Set[str]] = None  # solo estos módulos (webhooks); None = todos
+
+
+# Metadata por defecto cuando se trabaja sin red (archivos locales o mirrors)
+OFFLINE_METADATA = {"stars": 0, "open_issues": 0, "last_push": None, "url": None}
+
+
+def iter_branches(
+    repos: List[str], versions: List[str], offline: bool = False
+) -> Iterator[BranchTask]:
+    """Genera las ramas a procesar (una petición de metadata por repo)."""
+    for repo_name in repos:
+        try:
+            repo_metadata = github.get_repo_metadata(repo_name)
+            print(f"📂 {repo_name}: ⭐ {repo_metadata['stars']}")
+        except Exception as e:
+            if not offline:
+                print(f"📂 {repo_name}: ❌ Error obteniendo metadata: {e}")
+                continue
+            print(f"📂 {repo_name}: sin metadata de GitHub ({type(e).__name__}), modo offline")
+            repo_metadata = OFFLINE_METADATA
+
+        for version in versions:
+            yield BranchTask(repo_name, version, repo_metadata)
+
+
+@dataclass
+class ModuleState:
+    """Estado guardado de un módulo (para decidir si ha cambiado)."""
+
+    manifest_sha: Optional[str]
+    readme_sha: Optional[str]
+    source_commit: Optional[str]
+    removed: bool
+
+
+ModuleKey = Tuple[str, str, str]
+
+
+def load_module_state(db) -> Dict[ModuleKey, ModuleState]:
+    """Estado por clave (technical_name, version, repo_name), en una sola query."""
+    rows = db.query(
+        OdooModule.technical_name,
+        OdooModule.version,
+        OdooModule.repo_name,
+        OdooModule.manifest_sha,
+        OdooModule.readme_sha,
+        OdooModule.source_commit,
+        OdooModule.removed_at,
+    )
+    return {
+        (name, version, repo): ModuleState(manifest_sha, readme_sha, commit, removed_at is not None)
+        for name, version, repo, manifest_sha, readme_sha, commit, removed_at in rows
+    }
+
+
+def branch_commits(state: Dict[ModuleKey, ModuleState]) -> Dict[Tuple[str, str], Set[str]]:
+    """Commits indexados por rama (repo, versión), solo de módulos vivos."""
+    commits: Dict[Tuple[str, str], Set[str]] = {}
+    for (_, version, repo), module in state.items():
+        if not module.removed:
+            commits.setdefault((repo, version), set()).add(module.source_commit)
+    return commits
+
+
+def sync_branch_state(
     repo_name: str,
     version: str,
-    manifest_path: str,
-    repo_metadata: Dict,
-) -> None:
+    commit: Optional[str],
+    present: Set[str],
+    unchanged: List[str],
+    tombstone: bool,
+) -> int:
     """
-    Procesar un módulo individual.
-
-    Args:
-        db: Sesión de base de datos
-        repo_name: Nombre del repositorio
-        version: Versión de Odoo
-        manifest_path: Path al __manifest__.py
-        repo_metadata: Metadata del repositorio (stars, issues, etc)
+    Marca como eliminados los módulos que ya no están en la rama y apunta
+    los módulos sin cambios al nuevo commit de cabeza.
+
+    Returns:
+        Módulos marcados como eliminados
+    """
+    db = SessionLocal()
+    try:
+        branch = db.query(OdooModule).filter(
+            OdooModule.repo_name == repo_name,
+            OdooModule.version == version,
+        )
+        removed = 0
+        if tombstone:
+            removed = branch.filter(
+                OdooModule.removed_at.is_(None),
+                OdooModule.technical_name.notin_(present),
+            ).update({OdooModule.removed_at: datetime.utcnow()}, synchronize_session=False)
+        if unchanged and commit:
+            branch.filter(OdooModule.technical_name.in_(unchanged)).update(
+                {OdooModule.source_commit: commit}, synchronize_session=False
+            )
+        db.commit()
+        return removed
+    finally:
+        db.close()
+
+
+def read_branch_archive(
+    repo_name: str, version: str, archive_dir: Optional[str] = None
+) -> Optional[ArchiveBranch]:
+    """Lee el tarball de una rama (local si hay ``archive_dir``, si no de GitHub)."""
+    if archive_dir:
+        path = local_archive_path(archive_dir, repo_name, version)
+        if not path.exists():
+            return None
+        with open(path, "rb") as stream:
+            return read_archive(stream)
+
+    response = github.get_tarball(repo_name, version)
+    if response is None:
+        return None
+    with closing(response):
+        return read_archive(response.raw)
+
+
+def make_discover(
+    state: Dict[ModuleKey, ModuleState],
+    full: bool = False,
+    source: str = "api",
+    archive_dir: Optional[str] = None,
+    mirrors: Optional[MirrorPool] = None,
+    ledger: Optional[EtlLedger] = None,
+):
     """
+    Etapa 1: listar los módulos de una rama y emitir solo los que cambiaron.
 
-    # Extraer nombre técnico del módulo
-    technical_name = manifest_path.split("/")[0]
+    Se compara el commit de cabeza con el indexado (rama sin cambios = una
+    sola consulta) y, si difiere, los SHAs de manifest y README con los
+    guardados. Según ``source``, los SHAs salen de:
 
-    # Verificar si ya existe
-    existing = (
-        db.query(OdooModule)
-        .filter(
-            OdooModule.technical_name == technical_name,
-            OdooModule.version == version,
-            OdooModule.repo_name == repo_name,
+    - api / graphql: el árbol recursivo de GitHub; el contenido se descarga
+      en fetch (un fichero por petición REST o lotes GraphQL)
+    - archive: el tarball de la rama, que ya trae el contenido
+    - mirror: ``git ls-tree`` de un mirror local; el contenido se lee con
+      ``git cat-file --batch`` y la fecha de commit es por módulo
+
+    Con ``ledger``, cada rama se reclama antes de descubrirla (otro proceso
+    puede tenerla) y los módulos emitidos quedan registrados en la ejecución.
+    """
+    known_commits = branch_commits(state)
+
+    def discover(branch: BranchTask) -> Iterator[ModuleTask]:
+        label = f"{branch.repo_name}@{branch.version}"
+        mirror = mirrors.get(branch.repo_name) if source == "mirror" else None
+        if source == "mirror" and mirror is None:
+            print(f"   ⚠️  {label}: no hay mirror local")
+            return
+
+        head = None
+        # Con archivos locales no hay forma de conocer la cabeza sin leerlos
+        if not archive_dir:
+            if mirror is not None:
+                head = mirror.head(branch.version)
+            else:
+                head = github.get_branch_head(branch.repo_name, branch.version)
+            if head is None:
+                print(f"   ⚠️  {label}: la rama no existe")
+                return
+            # Con una lista de módulos (webhook, reanudación) se miran aunque la cabeza no cambie
+            if (not full and branch.modules is None
+                    and known_commits.get((branch.repo_name, branch.version)) == {head}):
+                print(f"   💤 {label}: sin cambios ({head[:7]})")
+                return
+
+        archived: Dict[str, ArchiveModule] = {}
+        truncated = False
+        if source == "archive":
+            archive = read_branch_archive(branch.repo_name, branch.version, archive_dir)
+            if archive is None:
+                print(f"   ⚠️  {label}: archivo no disponible")
+                return
+            head = archive.commit or head
+            archived = archive.modules
+            modules = {module_dir: module.files for module_dir, module in archived.items()}
+        elif mirror is not None:
+            modules = index_modules(mirror.ls_tree(head))
+        else:
+            tree = github.get_tree_blobs(branch.repo_name, head)
+            modules = index_modules(tree["blobs"]) if tree else {}
+            truncated = bool(tree and tree["truncated"])
+
+        if not modules:
+            print(f"   ⚠️  {label}: no se encontraron módulos")
+            return
+
+        present: Set[str] = set()
+        unchanged: List[str] = []
+        tasks: Dict[str, ModuleTask] = {}
+        for module_dir, module in modules.items():
+            present.add(module.technical_name)
+            if branch.modules is not None and module.technical_name not in branch.modules:
+                continue
+            previous = state.get((module.technical_name, branch.version, branch.repo_name))
+            if previous and not module_changed(
+                module, previous.manifest_sha, previous.readme_sha, previous.removed
+            ):
+                unchanged.append(module.technical_name)
+                continue
+            task = ModuleTask(
+                branch.repo_name,
+                branch.version,
+                module.manifest_path,
+                branch.repo_metadata,
+                files=module,
+                source_commit=head,
+            )
+            if module_dir in archived:
+                task.manifest_content = archived[module_dir].manifest_content
+                task.readme_content = archived[module_dir].readme_content
+            tasks[module_dir] = task
+
+        if mirror is not None and tasks:
+            dates = mirror.last_commit_dates(head, tasks)
+            for module_dir, task in tasks.items():
+                task.manifest_content = mirror.read_text(task.manifest_sha)
+                task.readme_content = mirror.read_text(task.readme_sha)
+                task.last_commit_date = dates.get(module_dir)
+
+        if ledger is not None:
+            ledger.start_modules(
+                branch.repo_name, branch.version,
+                [task.technical_name for task in tasks.values()], unchanged,
+            )
+        yield from tasks.values()
+
+        # Con un árbol truncado no sabemos qué falta: no se marca nada como eliminado
+        if truncated:
+            print(f"   ⚠️  {label}: árbol truncado, se omite la detección de eliminados")
+        removed = sync_branch_state(
+            branch.repo_name, branch.version, head, present, unchanged,
+            tombstone=not truncated,
         )
-        .first()
-    )
+        print(f"   📦 {label}: {len(modules)} módulos, "
+              f"{len(tasks)} nuevos/cambiados, {removed} eliminados")
+
+    if ledger is None:
+        return discover
+
+    def claimed_discover(branch: BranchTask) -> Iterator[ModuleTask]:
+        claim = ledger.claim_branch(branch.repo_name, branch.version)
+        if claim is None:
+            return  # hecha, o la tiene otro proceso
+        if claim.modules is not None:
+            if not claim.modules:
+                ledger.complete_branch(branch.repo_name, branch.version)
+                return
+            print(f"   ↩️  {branch.repo_name}@{branch.version}: "
+                  f"reanudando {len(claim.modules)} módulos")
+            branch.modules = claim.modules
+        try:
+            yield from discover(branch)
+        except Exception as e:
+            ledger.fail_branch(branch.repo_name, branch.version, str(e))
+            raise
+        ledger.complete_branch(branch.repo_name, branch.version)
+
+    return claimed_discover
+
+
+def drop(task: ModuleTask, reason: str) -> None:
+    """Descarta un módulo del pipeline (fallido en el ledger, si lo hay)."""
+    print(f"    ❌ {task.technical_name}@{task.version}: {reason}")
+    dropped[(task.repo_name, task.version, task.technical_name)] = reason
+    if ledger is not None:
+        ledger.fail_module(task.repo_name, task.version, task.technical_name, reason)
+
+
+def fetch(task: ModuleTask) -> Iterator[ModuleTask]:
+    """
+    Etapa 2: descargar manifest y README (nada que hacer si vienen del tarball
+    o del mirror).
 
-    if existing:
-        print(f"    ⏭️  {technical_name} ya existe, saltando...")
+    El índice de la rama ya dice qué README existe: una petición para ese
+    path, o ninguna si el módulo no tiene README.
+    """
+    if task.manifest_content is not None:
+        yield task
         return
 
-    # Obtener manifest
-    print(f"    📄 {technical_name}...", end=" ")
-    manifest = github.get_manifest_content(repo_name, version, manifest_path)
-
-    if not manifest:
-        print("❌ No se pudo parsear")
+    # Leer del commit indexado para que el contenido cuadre con los SHAs guardados
+    ref = task.source_commit or task.version
+    task.manifest_content = github.get_file_content(task.repo_name, ref, task.manifest_path)
+    if task.manifest_content is None:
+        drop(task, "manifest no disponible")
         return
 
-    # Obtener README (si existe)
-    readme_content = github.get_readme_content(repo_name, version, manifest_path)
+    if task.files.readme_path:
+        task.readme_content = github.get_file_content(
+            task.repo_name, ref, task.files.readme_path
+        )
+    yield task
+
 
-    # Preparar texto para embedding
-    name = manifest.get("name", technical_name)
-    summary = manifest.get("summary", "")
-    description = manifest.get("description", "")
+def fetch_batch(tasks: List[ModuleTask]) -> Iterator[ModuleTask]:
+    """
+    Etapa 2 (source graphql): manifests y README de un lote con queries
+    GraphQL agrupadas por (repo, commit).
+    """
+    groups: Dict[Tuple[str, str], List[ModuleTask]] = {}
+    for task in tasks:
+        if task.manifest_content is not None:
+            yield task
+            continue
+        groups.setdefault((task.repo_name, task.source_commit or task.version), []).append(task)
+
+    for (repo_name, ref), group in groups.items():
+        paths = [task.manifest_path for task in group]
+        paths += [task.files.readme_path for task in group if task.files.readme_path]
+        contents = github.get_files_content(repo_name, ref, paths)
+
+        for task in group:
+            task.manifest_content = contents.get(task.manifest_path)
+            if task.manifest_content is None:
+                drop(task, "manifest no disponible")
+                continue
+            if task.files.readme_path:
+                task.readme_content = contents.get(task.files.readme_path)
+            yield task
 
-    # Combinar textos relevantes (incluyendo README si existe)
-    text_parts = [name, summary, description]
-    if readme_content:
-        # Limitar README a primeros 2000 caracteres para no saturar el embedding
-        readme_preview = readme_content[:2000]
-        text_parts.append(readme_preview)
 
-    text_for_embedding = ". ".join(filter(None, text_parts))
+def parse(task: ModuleTask) -> Iterator[ModuleTask]:
+    """Etapa 3: parsear el manifest y preparar el texto a vectorizar."""
+    manifest = manifests.parse(task.manifest_content, task.manifest_path, task.manifest_sha)
+    if prepare(task, manifest):
+        yield task
+
+
+def parse_batch(tasks: List[ModuleTask]) -> Iterator[ModuleTask]:
+    """
+    Etapa 3 por lotes: una consulta a la cache de manifests por lote y los
+    fallos repartidos en el pool de procesos (``--parse-processes``).
+    """
+    parsed = manifests.parse_many(
+        [(task.manifest_sha, task.manifest_content, task.manifest_path) for task in tasks]
+    )
+    for task, manifest in zip(tasks, parsed):
+        if prepare(task, manifest):
+            yield task
 
-    # Generar embedding
-    try:
-        emb = embedding.get_embedding(text_for_embedding)
-    except Exception as e:
-        print(f"❌ Error en embedding: {e}")
-        return
 
-    # Crear módulo
-    module = OdooModule(
-        technical_name=technical_name,
-        name=name,
-        version=version,
+def prepare(task: ModuleTask, manifest: Optional[Dict]) -> bool:
+    """Texto a vectorizar y valores de la fila (False si no hay manifest)."""
+    if not manifest:
+        drop(task, "no se pudo parsear")
+        return False
+
+    task.embedding_text = build_embedding_text(
+        manifest.get("name", task.technical_name),
+        manifest.get("summary", ""),
+        manifest.get("description", ""),
+        task.readme_content,
+    )
+    task.values = dict(
+        technical_name=task.technical_name,
+        name=manifest.get("name", task.technical_name),
+        version=task.version,
         depends=manifest.get("depends", []),
         author=manifest.get("author", ""),
         license=manifest.get("license", "AGPL-3"),
-        summary=summary,
-        description=description,
-        readme=readme_content,  # Guardar README completo
-        repo_name=repo_name,
-        repo_url=f"https://github.com/OCA/{repo_name}",
-        module_path=manifest_path,
-        embedding=emb,
-        github_stars=repo_metadata["stars"],
-        github_issues_open=repo_metadata["open_issues"],
-        last_commit_date=datetime.fromisoformat(
-            repo_metadata["last_push"].replace("Z", "+00:00")
+        summary=manifest.get("summary", ""),
+        description=manifest.get("description", ""),
+        readme=task.readme_content,  # README completo (va a odoo_module_docs)
+        repo_name=task.repo_name,
+        repo_url=f"https://github.com/OCA/{task.repo_name}",
+        module_path=task.manifest_path,
+        github_stars=task.repo_metadata["stars"],
+        github_issues_open=task.repo_metadata["open_issues"],
+        last_commit_date=task.last_commit_date or (
+            datetime.fromisoformat(task.repo_metadata["last_push"].replace("Z", "+00:00"))
+            if task.repo_metadata.get("last_push") else None
         ),
+        manifest_sha=task.manifest_sha,
+        readme_sha=task.readme_sha,
+        source_commit=task.source_commit,
+        removed_at=None,
     )
-
-    db.add(module)
-    db.commit()
-    print("✅")
-
-
-def main() -> None:
+    return True
+
+
+def embed(tasks: List[ModuleTask]) -> Iterator[ModuleTask]:
+    """Etapa 4: embeddings por lotes; los módulos sin embedding no se escriben."""
+    result = embedding.get_embeddings_batch([task.embedding_text for task in tasks])
+
+    for index, task in enumerate(tasks):
+        if result.embeddings[index] is None:
+            drop(task, f"error en embedding ({result.failures.get(index)})")
+            continue
+        task.values["embedding"] = result.embeddings[index]
+        yield task
+
+
+class ModuleWriter:
+    """Etapa 5: persistir módulos por lotes (un BulkModuleWriter por thread)."""
+
+    def __init__(self, ledger: Optional[EtlLedger] = None):
+        self.ledger = ledger
+        self._local = threading.local()
+        self._writers: List[BulkModuleWriter] = []
+        self._lock = threading.Lock()
+        self.written = 0
+
+    def _writer(self) -> BulkModuleWriter:
+        writer = getattr(self._local, "writer", None)
+        if writer is None:
+            writer = BulkModuleWriter(codec=get_settings().module_docs_codec)
+            self._local.writer = writer
+            with self._lock:
+                self._writers.append(writer)
+        return writer
+
+    def __call__(self, tasks: List[ModuleTask]) -> None:
+        # COPY a tabla temporal + INSERT ... ON CONFLICT, un commit por lote
+        written = self._writer().write(task.values for task in tasks)
+
+        with self._lock:
+            self.written += written
+        if self.ledger is not None:
+            self.ledger.complete_modules(
+                (task.repo_name, task.version, task.technical_name) for task in tasks
+            )
+        for task in tasks:
+            print(f"    ✅ {task.repo_name}/{task.technical_name}@{task.version}")
+
+    def close(self):
+        for writer in self._writers:
+            writer.close()
+
+
+def print_cache_savings() -> None:
+    """Ahorro de la cache de embeddings en esta ejecución."""
+    if embedding.cache is None:
+        return
+    cache = embedding.cache.stats()
+    print(f"   Cache de embeddings: {cache['hits']} aciertos / {cache['misses']} fallos "
+          f"({cache['hit_ratio']:.0%}), ~{cache['saved_tokens']} tokens ahorrados, "
+          f"{cache['stored']} nuevas entradas")
+
+
+def print_manifest_parser() -> None:
+    """Manifests parseados y uso de su cache en esta ejecución."""
+    parser = manifests.stats()
+    line = f"   Manifests: {parser['parsed']} parseados (procesos={parser['processes']})"
+    if "cache" in parser:
+        cache = parser["cache"]
+        line += (f", cache {cache['hits']} aciertos / {cache['misses']} fallos "
+                 f"({cache['hit_ratio']:.0%})")
+    print(line)
+
+
+def print_statistics(db, stats, elapsed: float, written: int) -> None:
+    """Resumen del pipeline y de la base de datos."""
+    print("\n⏱️  PIPELINE:")
+    print(f"   Tiempo total: {elapsed:.1f}s | Módulos escritos: {written} "
+          f"({written / elapsed * 60 if elapsed else 0:.0f}/min)")
+    for name, stage in stats.items():
+        print(f"   - {name:14} procesados={stage.processed:5} emitidos={stage.emitted:5} "
+              f"errores={stage.errors:3} ocupado={stage.busy_seconds:7.1f}s")
+        for sample in stage.error_samples[:3]:
+            print(f"       ❌ {sample}")
+
+    governor = github.governor.stats()
+    print(f"   GitHub: {governor['requests']} peticiones, {governor['throttled']} rate limits, "
+          f"{governor['waited_seconds']}s en pausa, quedan {governor['remaining']}")
+    if github.graphql.requests:
+        graphql = github.graphql.stats()
+        print(f"   GraphQL: {graphql['requests']} queries, {graphql['files']} ficheros, "
+              f"{graphql['fallbacks']} por REST, lote final {graphql['batch_size']}")
+    if github.http_cache is not None:
+        http = github.http_cache.stats()
+        print(f"   Cache HTTP (ETag): {http['hits']} respuestas 304 / {http['misses']} completas "
+              f"({http['hit_ratio']:.0%}), {http['stores']} guardadas, "
+              f"{http['evictions']} evictadas, {http['bytes'] / 1e6:.1f} MB en disco")
+    print_cache_savings()
+    print_manifest_parser()
+
+    active = db.query(OdooModule).filter(OdooModule.removed_at.is_(None))
+    total_db = active.count()
+    removed_db = db.query(OdooModule).filter(OdooModule.removed_at.isnot(None)).count()
+    by_version: Dict[str, int] = {}
+    for v in ODOO_VERSIONS:
+        count = active.filter(OdooModule.version == v).count()
+        by_version[v] = count
+
+    print("\n📊 ESTADÍSTICAS:")
+    print(f"   Total módulos en DB: {total_db} (+{removed_db} eliminados)")
+    for version, count in by_version.items():
+        print(f"   - Odoo {version}: {count} módulos")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Index OCA modules (concurrent ETL pipeline)")
+    parser.add_argument("--repos", default=",".join(TARGET_REPOS),
+                        type=lambda v: [r.strip() for r in v.split(",") if r.strip()])
+    parser.add_argument("--versions", default=",".join(ODOO_VERSIONS),
+                        type=lambda v: [r.strip() for r in v.split(",") if r.strip()])
+    parser.add_argument("--source", choices=["api", "graphql", "archive", "mirror"],
+                        default="api",
+                        help="api: tree listing + one request per file; "
+                             "graphql: tree listing + batched GraphQL file queries; "
+                             "archive: one streamed tarball per repo/branch; "
+                             "mirror: local git mirrors (see --mirror-dir)")
+    parser.add_argument("--archive-dir", default=None,
+                        help="Read <repo>-<version>.tar.gz from this directory instead of "
+                             "GitHub (implies --source archive; works offline)")
+    parser.add_argument("--mirror-dir", default=None,
+                        help="Directory with bare mirrors <repo>.git (git clone --mirror); "
+                             "implies --source mirror")
+    parser.add_argument("--full", action="store_true",
+                        help="Walk every branch tree even if its head commit is unchanged")
+    parser.add_argument("--resume", nargs="?", type=int, const=0, default=None,
+                        metavar="RUN_ID",
+                        help="Continue an interrupted run (the latest unfinished one if no id "
+                             "is given); several processes or hosts can share a run this way")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="Also retry failed branches and modules (implies --resume)")
+    parser.add_argument("--lease", type=int, default=1800,
+                        help="Seconds before a task claimed by a dead process can be reclaimed")
+    parser.add_argument("--discover-workers", type=int, default=2,
+                        help="Threads listing repository trees")
+    parser.add_argument("--fetch-workers", type=int, default=16,
+                        help="Threads downloading manifests and READMEs")
+    parser.add_argument("--fetch-batch-size", type=int, default=50,
+                        help="Modules per fetch batch with --source graphql")
+    parser.add_argument("--parse-workers", type=int, default=2,
+                        help="Threads parsing manifests")
+    parser.add_argument("--parse-processes", type=int, default=0,
+                        help="Processes parsing manifest cache misses (0 = in-process; "
+                             "check scripts/bench_manifest_parser.py first)")
+    parser.add_argument("--parse-batch-size", type=int, default=50,
+                        help="Manifests per parse batch (one cache lookup per batch)")
+    parser.add_argument("--embed-workers", type=int, default=2,
+                        help="Threads sending batched embedding requests")
+    parser.add_argument("--embed-batch-size", type=int, default=32,
+                        help="Modules per embedding batch (split further by token budget)")
+    parser.add_argument("--write-workers", type=int, default=1,
+                        help="Threads writing to the database (one connection each)")
+    parser.add_argument("--write-batch-size", type=int, default=200,
+                        help="Modules per COPY + upsert batch (one commit per batch)")
+    parser.add_argument("--queue-size", type=int, default=200,
+                        help="Capacity of each inter-stage queue (backpressure)")
+    args = parser.parse_args(argv)
+    if args.archive_dir:
+        args.source = "archive"
+    elif args.mirror_dir:
+        args.source = "mirror"
+    if args.source == "mirror" and not args.mirror_dir:
+        parser.error("--source mirror requires --mirror-dir")
+    if args.retry_failed and args.resume is None:
+        args.resume = 0
+    return args
+
+
+def open_ledger(args: argparse.Namespace) -> Optional[EtlLedger]:
+    """
+    Ledger de la ejecución: uno nuevo, o el de la ejecución a reanudar
+    (cuyos repos, versiones y ``--full`` prevalecen sobre los argumentos).
+    """
+    if args.resume is None:
+        run_ledger = EtlLedger.create(
+            SessionLocal,
+            [(repo_name, version) for repo_name in args.repos for version in args.versions],
+            options={"repos": args.repos, "versions": args.versions,
+                     "source": args.source, "full": args.full},
+            lease_seconds=args.lease,
+        )
+        print(f"   📒 Ejecución #{run_ledger.run_id}")
+        return run_ledger
+
+    run_ledger = EtlLedger.open(SessionLocal, args.resume or None, lease_seconds=args.lease)
+    if run_ledger is None:
+        return None
+    reopened = run_ledger.reopen(retry_failed=args.retry_failed)
+    options = run_ledger.options
+    args.repos = options.get("repos", args.repos)
+    args.versions = options.get("versions", args.versions)
+    args.full = args.full or bool(options.get("full"))
+    print(f"   📒 Reanudando ejecución #{run_ledger.run_id} ({reopened} tareas reabiertas)")
+    return run_ledger
+
+
+def print_ledger(run_ledger: EtlLedger) -> None:
+    summary = run_ledger.finish()
+    for group, label in (("branches", "Ramas"), ("modules", "Módulos")):
+        counts = ", ".join(f"{status}={count}" for status, count in sorted(summary[group].items()))
+        print(f"   {label}: {counts or '-'}")
+    failed = summary["branches"].get("failed", 0) + summary["modules"].get("failed", 0)
+    if failed:
+        print(f"   ↩️  Reintentar fallidos: --resume {run_ledger.run_id} --retry-failed")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
     """Pipeline ETL principal"""
+    global ledger
+    args = parse_args(argv)
+
     print("=" * 70)
     print("🚀 ETL - AI-OdooFinder")
     print("=" * 70)
+    location = args.archive_dir or args.mirror_dir
+    print(f"   Fuente: {args.source}" + (f" ({location})" if location else ""))
+    print(f"   Workers: discover={args.discover_workers} fetch={args.fetch_workers} "
+          f"parse={args.parse_workers}x{args.parse_batch_size}/{args.parse_processes}p embed={args.embed_workers}x{args.embed_batch_size} "
+          f"write={args.write_workers}x{args.write_batch_size} | cola={args.queue_size}")
+
+    manifests.processes = args.parse_processes
+    ledger = open_ledger(args)
+    if ledger is None:
+        print("❌ No hay ninguna ejecución que reanudar")
+        return
+    print()
 
     db = SessionLocal()
-    total_modules = 0
+    writer = ModuleWriter(ledger)
+    mirrors = MirrorPool(args.mirror_dir) if args.mirror_dir else None
+    finished = False
 
     try:
-        for repo_name in TARGET_REPOS:
-            print(f"\n📂 Repositorio: {repo_name}")
-            print("-" * 70)
-
-            # Obtener metadata del repo
-            try:
-                repo_metadata = github.get_repo_metadata(repo_name)
-                print(f"   ⭐ Stars: {repo_metadata['stars']}")
-            except Exception as e:
-                print(f"   ❌ Error obteniendo metadata: {e}")
-                continue
-
-            for version in ODOO_VERSIONS:
-                print(f"\n   📖 Versión: {version}")
+        state = load_module_state(db)
+        print(f"   {len(state)} módulos ya indexados\n")
 
-                try:
-                    # Buscar manifests
-                    manifests = github.find_manifests(repo_name, version)
-
-                    if not manifests:
-                        print("      ⚠️  No se encontraron módulos")
-                        continue
-
-                    print(f"      📦 Encontrados: {len(manifests)} módulos")
+        discover = make_discover(
+            state, full=args.full, source=args.source,
+            archive_dir=args.archive_dir, mirrors=mirrors, ledger=ledger,
+        )
+        if args.source == "graphql":
+            fetch_stage = Stage("fetch", fetch_batch, workers=args.fetch_workers,
+                                batch_size=args.fetch_batch_size)
+        else:
+            fetch_stage = Stage("fetch", fetch, workers=args.fetch_workers)
+        pipeline = Pipeline(
+            [
+                Stage("discover", discover, workers=args.discover_workers),
+                fetch_stage,
+                Stage("parse", parse_batch, workers=args.parse_workers,
+                      batch_size=args.parse_batch_size),
+                Stage("embed", embed, workers=args.embed_workers,
+                      batch_size=args.embed_batch_size),
+                Stage("write", writer, workers=args.write_workers,
+                      batch_size=args.write_batch_size, batch_wait=2.0),
+            ],
+            queue_size=args.queue_size,
+        )
 
-                    # Procesar cada módulo
-                    for manifest_path in manifests:
-                        try:
-                            process_module(
-                                db, repo_name, version, manifest_path, repo_metadata
-                            )
-                            total_modules += 1
-                        except Exception as e:
-                            print(f"      ❌ Error procesando {manifest_path}: {e}")
-                            continue
+        start = time.perf_counter()
+        branches = iter_branches(args.repos, args.versions, offline=bool(args.archive_dir or args.mirror_dir))
+        stats = pipeline.run(branches)
+        elapsed = time.perf_counter() - start
 
-                except Exception as e:
-                    print(f"      ❌ Error en versión {version}: {e}")
-                    continue
+        # Lo que sigue en curso se perdió por el camino (error en alguna etapa)
+        ledger.release(error="no completado (ver errores del pipeline)")
+        finished = True
 
         # Resumen final
         print("\n" + "=" * 70)
         print("✅ ETL COMPLETADO")
         print("=" * 70)
 
-        # Estadísticas
-        total_db = db.query(OdooModule).count()
-        by_version: Dict[str, int] = {}
-        for v in ODOO_VERSIONS:
-            count = db.query(OdooModule).filter(OdooModule.version == v).count()
-            by_version[v] = count
-
-        print("\n📊 ESTADÍSTICAS:")
-        print(f"   Total módulos en DB: {total_db}")
-        for version, count in by_version.items():
-            print(f"   - Odoo {version}: {count} módulos")
+        print_statistics(db, stats, elapsed, writer.written)
+        print(f"\n📒 LEDGER (ejecución #{ledger.run_id}):")
+        print_ledger(ledger)
 
         print("\n🎉 ¡Listo para búsquedas!")
 
@@ -195,6 +761,13 @@ def main() -> None:
         print(f"\n❌ Error fatal: {e}")
         db.rollback()
     finally:
+        writer.close()
+        manifests.close()
+        if not finished:
+            # Interrumpido: las tareas de este proceso vuelven a pending para --resume
+            ledger.release()
+        if mirrors is not None:
+            mirrors.close()
         db.close()
 
 
@@ -0,0 +1,216 @@
+#!/usr/bin/env python
+"""
+Genera un corpus sintético grande en un schema aparte para pruebas de escala.
+
+Clona y perturba los módulos reales de ``public.odoo_modules`` (embeddings con
+ruido alrededor de los clusters reales, depends con la distribución empírica)
+y los carga con COPY en ``<schema>.odoo_modules``, una copia de la tabla
+original (mismas columnas e índices). La tabla real no se modifica.
+
+Después se puede medir cómo crecen latencia, memoria y tiempo de construcción
+de índices con el tamaño del corpus:
+
+    python scripts/generate_synthetic_corpus.py --rows 50000 --schema synthetic_50k
+    python scripts/benchmark.py --schema synthetic_50k --duration 60
+    python scripts/ann_sweep.py --schema synthetic_50k --methods hnsw
+
+Uso:
+    python scripts/generate_synthetic_corpus.py --rows 500000 --schema synthetic_500k --drop
+"""
+import argparse
+import io
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Add parent directory to path to import backend modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+
+from backend.app.database import engine
+from backend.app.utils.synthetic_corpus import SyntheticCorpusGenerator
+
+COLUMNS = [
+    "id", "technical_name", "name", "version", "depends", "author", "license",
+    "summary", "description", "repo_name", "repo_url", "module_path",
+    "github_stars", "github_issues_open", "last_commit_date", "embedding",
+    "created_at", "updated_at",
+]
+
+
+def copy_text(value) -> str:
+    """Escapa un valor para COPY en formato texto (NULL = \\N)."""
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def array_literal(values: List[str]) -> str:
+    """Literal de array de PostgreSQL: {"a","b"}."""
+    escaped = ('"' + v.replace("\\", "\\\\").replace('"', '\\"') + '"' for v in values)
+    return "{" + ",".join(escaped) + "}"
+
+
+class VectorFormatter:
+    """Formatea vectores como literales de pgvector con una sola operación %."""
+
+    def __init__(self, dimensions: int):
+        self._template = "[" + ",".join(["%.6g"] * dimensions) + "]"
+
+    def __call__(self, vector) -> str:
+        return self._template % tuple(vector.tolist())
+
+
+def load_source_rows(conn, version: Optional[str]) -> List[Dict]:
+    """Lee las filas reales con embedding (opcionalmente de una versión)."""
+    sql = f"SELECT {', '.join(COLUMNS)} FROM public.odoo_modules WHERE embedding IS NOT NULL"
+    params = {}
+    if version:
+        sql += " AND version = :version"
+        params["version"] = version
+
+    rows = []
+    for row in conn.execute(text(sql), params).mappings():
+        row = dict(row)
+        embedding = row["embedding"]
+        # Sin el tipo de pgvector registrado, el driver devuelve el literal '[...]'
+        row["embedding"] = json.loads(embedding) if isinstance(embedding, str) else list(embedding)
+        rows.append(row)
+    return rows
+
+
+def create_scratch_table(conn, schema: str, drop: bool, include_source: bool) -> None:
+    """Crea <schema>.odoo_modules como copia de la tabla real."""
+    if drop:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+    conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {schema}"))
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {schema}.odoo_modules "
+        f"(LIKE public.odoo_modules INCLUDING ALL)"
+    ))
+    # Los ids los asigna el generador: no consumir la secuencia de la tabla real
+    conn.execute(text(f"ALTER TABLE {schema}.odoo_modules ALTER COLUMN id DROP DEFAULT"))
+    if include_source:
+        conn.execute(text(
+            f"INSERT INTO {schema}.odoo_modules SELECT * FROM public.odoo_modules "
+            f"ON CONFLICT DO NOTHING"
+        ))
+    conn.commit()
+
+
+def copy_batch(raw_connection, schema: str, batch: List[Dict], format_vector: VectorFormatter) -> None:
+    """Carga un lote con COPY ... FROM STDIN (formato texto)."""
+    buffer = io.StringIO()
+    for row in batch:
+        fields = []
+        for column in COLUMNS:
+            value = row.get(column)
+            if column == "embedding":
+                fields.append(format_vector(value))
+            elif column == "depends":
+                fields.append(copy_text(array_literal(value or [])))
+            else:
+                fields.append(copy_text(value))
+        buffer.write("\t".join(fields) + "\n")
+    buffer.seek(0)
+
+    with raw_connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {schema}.odoo_modules ({', '.join(COLUMNS)}) FROM STDIN", buffer
+        )
+    raw_connection.commit()
+
+
+def print_sizes(conn, schema: str) -> None:
+    """Tamaño de la tabla y de cada índice del schema sintético."""
+    rows = conn.execute(text(
+        "SELECT c.relname, pg_relation_size(c.oid) AS bytes "
+        "FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE n.nspname = :schema AND c.relkind IN ('r', 'i') ORDER BY bytes DESC"
+    ), {"schema": schema}).all()
+    total = conn.execute(
+        text("SELECT pg_total_relation_size(CAST(:table AS regclass))"),
+        {"table": f"{schema}.odoo_modules"},
+    ).scalar()
+    print(f"\n📦 {schema}.odoo_modules: {total / 1024 / 1024:.1f} MB total")
+    for name, size in rows:
+        print(f"   {name:40} {size / 1024 / 1024:10.1f} MB")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate a synthetic corpus for scale testing")
+    parser.add_argument("--rows", type=int, default=50000, help="Synthetic rows to generate")
+    parser.add_argument("--schema", default="synthetic", help="Scratch schema for the copy")
+    parser.add_argument("--version", default=None, help="Only clone modules of this Odoo version")
+    parser.add_argument("--noise", type=float, default=0.05,
+                        help="Embedding noise relative to the vector norm")
+    parser.add_argument("--keep-depends", type=float, default=0.5,
+                        help="Probability of keeping the source depends instead of sampling")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--drop", action="store_true", help="Drop the scratch schema first")
+    parser.add_argument("--no-source", action="store_true",
+                        help="Do not copy the real rows into the scratch table")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point."""
+    args = parse_args(argv)
+    if not re.fullmatch(r"[a-z_][a-z0-9_]*", args.schema) or args.schema == "public":
+        print(f"❌ Invalid scratch schema: {args.schema}")
+        return 1
+
+    print(f"\n🚀 Generating {args.rows} synthetic modules into {args.schema}...\n")
+
+    with engine.connect() as conn:
+        source_rows = load_source_rows(conn, args.version)
+        if not source_rows:
+            print("❌ No source modules with embeddings (run the ETL first)")
+            return 1
+        print(f"📥 {len(source_rows)} source modules")
+
+        create_scratch_table(conn, args.schema, args.drop, include_source=not args.no_source)
+        start_id = conn.execute(
+            text(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {args.schema}.odoo_modules")
+        ).scalar()
+        conn.commit()
+
+    generator = SyntheticCorpusGenerator(
+        source_rows, noise=args.noise, keep_depends=args.keep_depends, seed=args.seed
+    )
+    format_vector = VectorFormatter(generator.embeddings.shape[1])
+
+    raw_connection = engine.raw_connection()
+    start = time.perf_counter()
+    loaded = 0
+    try:
+        for batch in generator.generate(args.rows, batch_size=args.batch_size, start_id=start_id):
+            copy_batch(raw_connection, args.schema, batch, format_vector)
+            loaded += len(batch)
+            elapsed = time.perf_counter() - start
+            print(f"   {loaded:>8}/{args.rows} rows ({loaded / elapsed:,.0f} rows/s)")
+    finally:
+        raw_connection.close()
+
+    with engine.connect() as conn:
+        conn.execute(text(f"ANALYZE {args.schema}.odoo_modules"))
+        conn.commit()
+        print_sizes(conn, args.schema)
+
+    print(f"\n✅ Loaded {loaded} rows in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+"""
+Worker de la cola de re-indexado alimentada por los webhooks de GitHub.
+
+Reclama trabajos de ``reindex_jobs`` (``FOR UPDATE SKIP LOCKED``: se pueden
+lanzar varios workers), fusiona los de una misma rama y pasa solo los
+módulos afectados por las etapas del ETL (discover con SHAs, fetch, parse,
+embed, write). Los módulos que ya no existen en la rama se marcan como
+eliminados igual que en el ETL completo.
+
+Cada rama se procesa y se resuelve por separado: un error en una rama (o en
+los metadatos de su repo) solo devuelve a la cola los trabajos de esa rama,
+y un módulo descartado por el pipeline hace fallar solo su trabajo.
+
+Uso:
+    python scripts/reindex_worker.py           # bucle continuo
+    python scripts/reindex_worker.py --once    # vaciar la cola y salir
+"""
+import argparse
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Añadir backend al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from backend.app.database import SessionLocal
+from backend.app.models import ReindexJob
+from backend.app.services.etl_pipeline import Pipeline, Stage
+from backend.app.services.reindex_queue import ReindexQueue, coalesce, failed_jobs
+import etl_oca_modules as etl
+from etl_oca_modules import (
+    BranchTask,
+    ModuleKey,
+    ModuleState,
+    ModuleWriter,
+    embed,
+    fetch,
+    github,
+    load_module_state,
+    make_discover,
+    parse,
+)
+
+Branch = Tuple[str, str]
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Consume the webhook reindex queue")
+    parser.add_argument("--once", action="store_true",
+                        help="Process pending jobs and exit instead of polling")
+    parser.add_argument("--batch", type=int, default=200,
+                        help="Jobs claimed per iteration (coalesced by branch)")
+    parser.add_argument("--poll-interval", type=float, default=10.0,
+                        help="Seconds to wait when the queue is empty")
+    parser.add_argument("--lease", type=int, default=900,
+                        help="Seconds before a running job from a dead worker is reclaimed")
+    parser.add_argument("--fetch-workers", type=int, default=8)
+    return parser.parse_args(argv)
+
+
+def group_jobs(jobs: List[ReindexJob]) -> Dict[Branch, List[ReindexJob]]:
+    """Trabajos por (repo, versión)."""
+    groups: Dict[Branch, List[ReindexJob]] = {}
+    for job in jobs:
+        groups.setdefault((job.repo_name, job.version), []).append(job)
+    return groups
+
+
+def process_branch(
+    task: BranchTask, state: Dict[ModuleKey, ModuleState], args: argparse.Namespace
+) -> Tuple[int, Dict[str, str]]:
+    """
+    Re-indexa los módulos de una rama.
+
+    Returns:
+        (módulos escritos, {módulo: motivo} de los descartados)
+
+    Raises:
+        RuntimeError: si alguna etapa falló (los trabajos se reintentan;
+            re-indexar es idempotente)
+    """
+    etl.dropped.clear()
+    writer = ModuleWriter()
+    try:
+        pipeline = Pipeline([
+            Stage("discover", make_discover(state, full=True)),
+            Stage("fetch", fetch, workers=args.fetch_workers),
+            Stage("parse", parse),
+            Stage("embed", embed, batch_size=32),
+            Stage("write", writer, batch_size=200, batch_wait=1.0),
+        ])
+        stats = pipeline.run([task])
+    finally:
+        writer.close()
+
+    failed = {name: stage.error_samples[:3] for name, stage in stats.items() if stage.errors}
+    if failed:
+        raise RuntimeError(f"Etapas con errores: {failed}")
+    dropped = {
+        technical_name: reason
+        for (repo_name, version, technical_name), reason in etl.dropped.items()
+        if (repo_name, version) == (task.repo_name, task.version)
+    }
+    return writer.written, dropped
+
+
+def process(
+    jobs: List[ReindexJob],
+    state: Dict[ModuleKey, ModuleState],
+    queue: ReindexQueue,
+    args: argparse.Namespace,
+) -> int:
+    """
+    Procesa un lote reclamado rama a rama, completando o devolviendo a la
+    cola los trabajos de cada rama según su resultado.
+
+    Returns:
+        Módulos escritos
+    """
+    metadata: Dict[str, Dict] = {}
+    written = 0
+    for (repo_name, version), group in group_jobs(jobs).items():
+        label = f"{repo_name}@{version}"
+        try:
+            if repo_name not in metadata:
+                metadata[repo_name] = github.get_repo_metadata(repo_name)
+            modules = coalesce((job.repo_name, job.version, job.technical_name) for job in group)
+            task = BranchTask(repo_name, version, metadata[repo_name],
+                              modules=modules[(repo_name, version)])
+            branch_written, dropped = process_branch(task, state, args)
+        except Exception as e:
+            print(f"   ❌ {label}: {e}")
+            queue.fail(group, str(e))
+            continue
+
+        failures = failed_jobs(group, dropped)
+        for job in group:
+            if job.id in failures:
+                queue.fail([job], failures[job.id])
+        queue.complete([job.id for job in group if job.id not in failures])
+        written += branch_written
+        print(f"   {'⚠️ ' if failures else '✅'} {label}: {branch_written} módulos"
+              + (f", {len(failures)} trabajos fallidos" if failures else ""))
+    return written
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point."""
+    args = parse_args(argv)
+    queue = ReindexQueue(SessionLocal, lease_seconds=args.lease)
+    print(f"👷 Worker de re-indexado (lote={args.batch}, lease={args.lease}s)")
+
+    while True:
+        jobs = queue.claim(args.batch)
+        if not jobs:
+            if args.once:
+                break
+            time.sleep(args.poll_interval)
+            continue
+
+        start = time.perf_counter()
+        branches = {(job.repo_name, job.version) for job in jobs}
+        print(f"\n🔄 {len(jobs)} trabajos en {len(branches)} ramas")
+        db = SessionLocal()
+        try:
+            state = load_module_state(db)
+        except Exception as e:
+            print(f"   ❌ {e}")
+            queue.fail(jobs, str(e))
+            continue
+        finally:
+            db.close()
+
+        written = process(jobs, state, queue, args)
+        print(f"   {written} módulos re-indexados en {time.perf_counter() - start:.1f}s")
+
+    print(f"\n📊 Cola: {queue.stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
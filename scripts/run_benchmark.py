@@ -5,41 +5,100 @@ Script de ejecución de benchmark de búsqueda.
 Este script ejecuta todas las queries del benchmark, calcula métricas IR
 y genera un reporte estructurado con resultados detallados y agregados.
 """
+import argparse
 import json
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict
-from statistics import mean
+from typing import List, Dict, Optional
 
 # Add parent directory to path to import backend modules
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from backend.app.database import SessionLocal
 from backend.app.services.search_service import SearchService
-from backend.app.metrics.benchmark_metrics import MetricsCalculator, ReportAggregator
+from backend.app.metrics.batch_metrics import DEFAULT_METRICS, BatchMetricsEngine, bootstrap_ci
+from backend.app.metrics.benchmark_metrics import (
+    DEFAULT_QUERIES_PATH,
+    MetricsCalculator,
+    ReportAggregator,
+    load_benchmark_queries,
+)
+from backend.app.metrics.history import (
+    BenchmarkHistory,
+    compare_runs,
+    flatten_report_metrics,
+    get_git_revision,
+)
+from backend.app.metrics.performance import summarize_latencies
+from backend.app.services.embedding_cassette import CassetteEmbeddingService, EmbeddingCassette
 
 
 class BenchmarkRunner:
     """Ejecuta benchmark de búsqueda y genera reporte."""
 
-    def __init__(self, db_session):
+    def __init__(
+        self,
+        db_session,
+        cassette: Optional[EmbeddingCassette] = None,
+        session_factory=SessionLocal
+    ):
         """
         Inicializa el runner.
 
         Args:
             db_session: Sesión de base de datos
+            cassette: Cassette de embeddings opcional para grabar/reproducir
+                los embeddings de las queries (benchmarks offline y deterministas)
+            session_factory: Factoría de sesiones para los workers paralelos
         """
         self.db = db_session
-        self.search_service = SearchService(db_session)
         self.metrics_calculator = MetricsCalculator()
         self.report_aggregator = ReportAggregator()
+        self.cassette = cassette
+        self.session_factory = session_factory
+        self.workers = 1
+
+        self.search_service, self.cassette_service = self._build_services(db_session)
+
+        # Servicios por thread cuando se ejecuta con varios workers
+        self._local = threading.local()
+        self._worker_sessions = []
+        self._worker_lock = threading.Lock()
+
+    def _build_services(self, db_session):
+        """Crea SearchService (y su wrapper de cassette) sobre una sesión."""
+        search_service = SearchService(db_session)
+        cassette_service = None
+        if self.cassette is not None:
+            cassette_service = CassetteEmbeddingService(
+                search_service.embedding_service, self.cassette
+            )
+            search_service.embedding_service = cassette_service
+        return search_service, cassette_service
+
+    def _init_worker(self):
+        """Cada worker usa su propia sesión de base de datos."""
+        db = self.session_factory()
+        with self._worker_lock:
+            self._worker_sessions.append(db)
+        self._local.services = self._build_services(db)
+
+    def _services(self):
+        """(search_service, cassette_service) del thread actual."""
+        return getattr(self._local, 'services', None) or (
+            self.search_service, self.cassette_service
+        )
 
     def run(
         self,
         output_dir: str = "tests/results",
         limit: int = 10,
-        verbose: bool = True
+        verbose: bool = True,
+        workers: int = 1,
+        history: Optional[BenchmarkHistory] = None
     ) -> Dict:
         """
         Ejecuta el benchmark completo.
@@ -48,10 +107,13 @@ class BenchmarkRunner:
             output_dir: Directorio donde guardar resultados
             limit: Número de resultados a retornar por query (para calcular recall@10)
             verbose: Si True, imprime progreso
+            workers: Número de queries ejecutadas en paralelo (una sesión por worker)
+            history: Histórico donde añadir la ejecución (opcional)
 
         Returns:
             Dict con resultados completos del benchmark
         """
+        self.workers = max(1, workers)
         if verbose:
             print("=" * 80)
             print("AI-OdooFinder Benchmark Runner")
@@ -66,26 +128,15 @@ class BenchmarkRunner:
             print("Starting benchmark execution...\n")
 
         # Execute benchmark
-        results = []
-        for i, query_data in enumerate(queries, 1):
-            if verbose:
-                print(f"[{i}/{len(queries)}] Query: \"{query_data['query']}\"")
-                print(f"       Version: {query_data['version']} | "
-                      f"Category: {query_data['category']} | "
-                      f"Difficulty: {query_data['difficulty']}")
-                print(f"       Expected: {len(query_data['expected_modules'])} modules")
-
-            result = self._execute_query(query_data, limit)
-            results.append(result)
-
-            # Print quick metrics
-            if verbose and not result.get('error'):
-                metrics = result['metrics']
-                print(f"       ✓ Executed in {result['execution_time_ms']:.0f}ms")
-                print(f"       Metrics: P@3={metrics['precision@3']:.3f} | "
-                      f"R@10={metrics['recall@10']:.3f} | MRR={metrics['mrr']:.3f}\n")
-            elif verbose:
-                print(f"       ✗ Error: {result.get('error')}\n")
+        if self.workers > 1:
+            results = self._execute_parallel(queries, limit, verbose)
+        else:
+            results = []
+            for i, query_data in enumerate(queries, 1):
+                result = self._execute_query(query_data, limit)
+                results.append(result)
+                if verbose:
+                    self._print_query_result(i, len(queries), query_data, result)
 
         # Generate report
         execution_time = (datetime.now() - start_time).total_seconds()
@@ -94,13 +145,60 @@ class BenchmarkRunner:
         # Save results
         output_path = self._save_results(report, output_dir)
 
+        # Append to trend history
+        if history is not None:
+            report['metadata']['history_run_id'] = history.append(
+                report, report['metadata']['git'], output_path
+            )
+
         # Print summary
         if verbose:
             self._print_summary(report, output_path, execution_time)
 
         return report
 
-    def _load_queries(self, filepath: str = "tests/benchmark_queries.json") -> List[Dict]:
+    def _execute_parallel(self, queries: List[Dict], limit: int, verbose: bool) -> List[Dict]:
+        """
+        Ejecuta las queries con un pool de workers.
+
+        Returns:
+            Resultados en el mismo orden que las queries
+        """
+        try:
+            with ThreadPoolExecutor(
+                max_workers=self.workers, initializer=self._init_worker
+            ) as pool:
+                results = list(pool.map(lambda q: self._execute_query(q, limit), queries))
+        finally:
+            for db in self._worker_sessions:
+                db.close()
+            self._worker_sessions = []
+
+        if verbose:
+            for i, (query_data, result) in enumerate(zip(queries, results), 1):
+                self._print_query_result(i, len(queries), query_data, result)
+
+        return results
+
+    def _print_query_result(self, i: int, total: int, query_data: Dict, result: Dict):
+        """Imprime el progreso de una query."""
+        print(f"[{i}/{total}] Query: \"{query_data['query']}\"")
+        print(f"       Version: {query_data['version']} | "
+              f"Category: {query_data['category']} | "
+              f"Difficulty: {query_data['difficulty']}")
+        print(f"       Expected: {len(query_data['expected_modules'])} modules")
+
+        # Print quick metrics
+        if not result.get('error'):
+            metrics = result['metrics']
+            print(f"       ✓ Executed in {result['execution_time_ms']:.0f}ms")
+            print(f"       Metrics: P@3={metrics['precision@3']:.3f} | "
+                  f"R@10={metrics['recall@10']:.3f} | MRR={metrics['mrr']:.3f} | "
+                  f"NDCG@10={metrics['ndcg@10']:.3f}\n")
+        else:
+            print(f"       ✗ Error: {result.get('error')}\n")
+
+    def _load_queries(self, filepath: str = DEFAULT_QUERIES_PATH) -> List[Dict]:
         """
         Carga queries desde JSON.
 
@@ -112,9 +210,7 @@ class BenchmarkRunner:
             json.JSONDecodeError: Si JSON inválido
         """
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            return data["benchmark_queries"]
+            return load_benchmark_queries(filepath)
         except FileNotFoundError:
             print(f"ERROR: Archivo {filepath} no encontrado")
             raise
@@ -134,15 +230,20 @@ class BenchmarkRunner:
             Dict con resultados y métricas
         """
         start_time = datetime.now()
+        search_service, cassette_service = self._services()
 
         try:
             # Execute search
-            search_results = self.search_service.search(
+            search_results = search_service.search(
                 query=query_data['query'],
                 version=query_data['version'],
                 limit=limit
             )
 
+            # SearchService returns [] on failure; surface it as a query error
+            if search_service.last_error:
+                raise RuntimeError(search_service.last_error)
+
             # Extract module technical names
             returned_modules = [r['technical_name'] for r in search_results]
 
@@ -153,6 +254,7 @@ class BenchmarkRunner:
             )
 
             execution_time = (datetime.now() - start_time).total_seconds() * 1000
+            provider_time, engine_time, embedding_source = self._split_timings(search_service, cassette_service)
 
             return {
                 'query_id': query_data['id'],
@@ -167,16 +269,21 @@ class BenchmarkRunner:
                     'precision@5': metrics.precision_at_5,
                     'recall@10': metrics.recall_at_10,
                     'mrr': metrics.mrr,
+                    'ndcg@10': metrics.ndcg_at_10,
                     'hits_in_top_3': metrics.hits_in_top_3,
                     'hits_in_top_5': metrics.hits_in_top_5,
                     'first_relevant_position': metrics.first_relevant_position
                 },
                 'execution_time_ms': execution_time,
+                'provider_time_ms': provider_time,
+                'engine_time_ms': engine_time,
+                'embedding_source': embedding_source,
                 'error': None
             }
 
         except Exception as e:
             execution_time = (datetime.now() - start_time).total_seconds() * 1000
+            provider_time, engine_time, embedding_source = self._split_timings(search_service, cassette_service)
             print(f"       ERROR executing query {query_data['id']}: {e}")
 
             return {
@@ -192,14 +299,37 @@ class BenchmarkRunner:
                     'precision@5': 0.0,
                     'recall@10': 0.0,
                     'mrr': 0.0,
+                    'ndcg@10': 0.0,
                     'hits_in_top_3': 0,
                     'hits_in_top_5': 0,
                     'first_relevant_position': None
                 },
                 'execution_time_ms': execution_time,
+                'provider_time_ms': provider_time,
+                'engine_time_ms': engine_time,
+                'embedding_source': embedding_source,
                 'error': str(e)
             }
 
+    def _split_timings(self, search_service, cassette_service):
+        """
+        Separa el tiempo del proveedor de embeddings del tiempo del motor.
+
+        Returns:
+            Tupla (provider_time_ms, engine_time_ms, embedding_source)
+        """
+        timings = search_service.last_timings
+        total_ms = sum(timings.values()) * 1000
+
+        if cassette_service is not None:
+            provider_ms = cassette_service.last_provider_ms
+            source = cassette_service.last_source
+        else:
+            provider_ms = timings.get('embedding', 0.0) * 1000
+            source = 'live' if 'embedding' in timings else None
+
+        return provider_ms, max(0.0, total_ms - provider_ms), source
+
     def _generate_report(self, results: List[Dict], execution_time: float) -> Dict:
         """
         Genera reporte agregado.
@@ -216,25 +346,20 @@ class BenchmarkRunner:
 
         if not valid_results:
             print("WARNING: No valid results to aggregate")
-            aggregate = {
-                'precision@3': 0.0,
-                'precision@5': 0.0,
-                'recall@10': 0.0,
-                'mrr': 0.0
-            }
+            aggregate = {name: 0.0 for name in DEFAULT_METRICS}
+            confidence_intervals = {}
             per_category = {}
             per_difficulty = {}
         else:
-            # Aggregate metrics
-            aggregate = {
-                'precision@3': mean(r['metrics']['precision@3'] for r in valid_results),
-                'precision@5': mean(r['metrics']['precision@5'] for r in valid_results),
-                'recall@10': mean(r['metrics']['recall@10'] for r in valid_results),
-                'mrr': mean(r['metrics']['mrr'] for r in valid_results)
+            # Aggregate metrics (vectorized over all queries) with bootstrap CIs
+            per_query = BatchMetricsEngine.from_detailed_results(valid_results).compute()
+            aggregate = {name: float(values.mean()) for name, values in per_query.items()}
+            confidence_intervals = {
+                name: bootstrap_ci(values) for name, values in per_query.items()
             }
 
             # Per category metrics
-            per_category = self.report_aggregator.group_by_difficulty(valid_results)
+            per_category = self.report_aggregator.group_by_field(valid_results, 'category')
 
             # Per difficulty metrics
             per_difficulty = self.report_aggregator.group_by_difficulty(valid_results)
@@ -247,9 +372,21 @@ class BenchmarkRunner:
                 'failed_queries': len(results) - len(valid_results),
                 'search_mode': 'vector',
                 'limit': 10,
-                'execution_time_seconds': execution_time
+                'execution_time_seconds': execution_time,
+                'workers': self.workers,
+                'git': get_git_revision(),
+                'embeddings': (
+                    f"cassette:{self.cassette.mode}" if self.cassette is not None else 'live'
+                )
             },
             'aggregate_metrics': aggregate,
+            'confidence_intervals': confidence_intervals,
+            'latency_ms': {
+                'execution': summarize_latencies([r['execution_time_ms'] for r in valid_results]),
+                'engine': summarize_latencies([r['engine_time_ms'] for r in valid_results]),
+                'provider': summarize_latencies([r['provider_time_ms'] for r in valid_results])
+            },
+            'per_category': per_category,
             'per_difficulty': per_difficulty,
             'detailed_results': results
         }
@@ -302,6 +439,18 @@ class BenchmarkRunner:
         print(f"  Precision@5:  {metrics['precision@5']:.1%}  {'█' * int(metrics['precision@5'] * 24)}{'░' * (24 - int(metrics['precision@5'] * 24))}")
         print(f"  Recall@10:    {metrics['recall@10']:.1%}  {'█' * int(metrics['recall@10'] * 24)}{'░' * (24 - int(metrics['recall@10'] * 24))}")
         print(f"  Mean MRR:     {metrics['mrr']:.3f}")
+        print(f"  NDCG@10:      {metrics['ndcg@10']:.3f}")
+
+        intervals = report.get('confidence_intervals')
+        if intervals:
+            print(f"\n95% CONFIDENCE INTERVALS (bootstrap):")
+            for name, ci in intervals.items():
+                print(f"  {name:12} [{ci['low']:.3f}, {ci['high']:.3f}]")
+
+        latency = report['latency_ms']
+        print(f"\nLATENCY (p50 / p95 ms) [embeddings: {metadata['embeddings']}]:")
+        print(f"  Engine:    {latency['engine']['p50']:8.1f} / {latency['engine']['p95']:8.1f}")
+        print(f"  Provider:  {latency['provider']['p50']:8.1f} / {latency['provider']['p95']:8.1f}")
 
         # Per difficulty breakdown
         if 'per_difficulty' in report and report['per_difficulty']:
@@ -312,23 +461,99 @@ class BenchmarkRunner:
                     print(f"  {difficulty.capitalize():6} ({d['count']:2}):  "
                           f"P@3={d['precision@3']:.1%} | P@5={d['precision@5']:.1%}")
 
+        if report.get('per_category'):
+            print(f"\nBY CATEGORY:")
+            for category, c in sorted(report['per_category'].items()):
+                print(f"  {category:20} ({c['count']:2}):  "
+                      f"P@3={c['precision@3']:.1%} | MRR={c['mrr']:.3f}")
+
         print(f"\nResults saved to: {output_path}")
         print("=" * 80)
 
 
-def main():
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="AI-OdooFinder relevance benchmark")
+    parser.add_argument("--output-dir", default="tests/results")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Queries executed concurrently, each worker with its own session")
+    parser.add_argument("--cassette", default=None,
+                        help="Embedding cassette file (e.g. tests/results/embeddings.cassette)")
+    parser.add_argument("--cassette-mode", choices=["record", "replay", "auto"], default="auto",
+                        help="record: always call the provider; replay: offline only; "
+                             "auto: replay when recorded, record otherwise")
+    parser.add_argument("--history", default="tests/results/history.sqlite",
+                        help="SQLite trend history the run is appended to")
+    parser.add_argument("--no-history", action="store_true", help="Do not record this run")
+    parser.add_argument("--compare-last", type=int, default=0,
+                        help="Compare against the previous N runs and fail on regressions")
+    parser.add_argument("--relevance-tolerance", type=float, default=0.02,
+                        help="Allowed absolute drop of P@k/R@k/MRR vs previous runs")
+    parser.add_argument("--latency-tolerance", type=float, default=0.20,
+                        help="Allowed relative latency increase vs previous runs")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
     """Entry point."""
+    args = parse_args(argv)
     print("\n🚀 Starting benchmark...\n")
 
+    cassette = None
+    if args.cassette:
+        from backend.app.config import get_settings
+        settings = get_settings()
+        cassette = EmbeddingCassette(
+            args.cassette,
+            mode=args.cassette_mode,
+            model=settings.embedding_model,
+            dimensions=settings.embedding_dimensions,
+        )
+        print(f"📼 Cassette {args.cassette} ({args.cassette_mode}, {len(cassette)} embeddings)")
+
+    history = None
+    if not args.no_history:
+        Path(args.history).parent.mkdir(parents=True, exist_ok=True)
+        history = BenchmarkHistory(args.history)
+
     db = SessionLocal()
     try:
-        runner = BenchmarkRunner(db)
-        report = runner.run(verbose=True)
+        runner = BenchmarkRunner(db, cassette=cassette)
+        report = runner.run(
+            output_dir=args.output_dir,
+            limit=args.limit,
+            verbose=True,
+            workers=args.workers,
+            history=history,
+        )
+
+        exit_code = 0
+
+        # Gate on regressions against previous runs
+        if history is not None and args.compare_last > 0:
+            previous = history.recent(
+                args.compare_last, before_id=report['metadata'].get('history_run_id')
+            )
+            regressions = compare_runs(
+                flatten_report_metrics(report),
+                [run['metrics'] for run in previous],
+                relevance_tolerance=args.relevance_tolerance,
+                latency_tolerance=args.latency_tolerance,
+            )
+            if not previous:
+                print("\nℹ️  No previous runs in history to compare against")
+            elif regressions:
+                print(f"\n❌ {len(regressions)} regression(s) vs previous {len(previous)} runs:")
+                for regression in regressions:
+                    print(f"   - {regression.describe()}")
+                exit_code = 2
+            else:
+                print(f"\n✅ No regressions vs previous {len(previous)} runs")
 
         # Return exit code based on success
         if report['metadata']['failed_queries'] == 0:
             print("\n✅ Benchmark completed successfully!")
-            return 0
+            return exit_code
         else:
             print(f"\n⚠️  Benchmark completed with {report['metadata']['failed_queries']} failures")
             return 1
@@ -339,6 +564,8 @@ def main():
         traceback.print_exc()
         return 1
     finally:
+        if cassette is not None:
+            cassette.save()
         db.close()
 
 
@@ -1,8 +1,379 @@
-def update_embeddings():
-    print("Update embeddings placeholder")
+#!/usr/bin/env python
+"""
+Regenera los embeddings de los módulos con peticiones por lotes.
 
+Sin filtros, re-vectoriza toda la tabla sin cortar el servicio (ej: al
+cambiar de modelo): los vectores nuevos van a la columna sombra
+``embedding_shadow``, que se lee con un cursor de servidor (``yield_per``) y
+se escribe por lotes; después se construye su índice con
+``CREATE INDEX CONCURRENTLY`` y se intercambia con ``embedding`` en una
+transacción corta. Antes y después del índice se re-vectorizan las filas
+que el ETL modificó mientras tanto, y el intercambio se rechaza si con la
+tabla bloqueada aparece alguna modificada después de la última pasada.
+Hasta entonces la búsqueda sigue con los vectores antiguos. Si se
+interrumpe, volver a lanzarlo continúa donde lo dejó.
+
+Con ``--missing`` o ``--version`` se actualizan en su sitio solo esos
+módulos, con el modelo configurado.
+
+Uso:
+    python scripts/update_embeddings.py --model qwen/qwen3-embedding-8b --dimensions 4096
+    python scripts/update_embeddings.py --no-swap        # dejar la sombra lista, sin intercambiar
+    python scripts/update_embeddings.py --missing        # solo sin embedding (en su sitio)
+    python scripts/update_embeddings.py --version 17.0
+
+Tras el intercambio, EMBEDDING_MODEL / EMBEDDING_DIMENSIONS de la API (y
+``Vector(...)`` en models.py si cambian las dimensiones) deben apuntar al
+modelo nuevo para que las queries se vectoricen igual.
+"""
+import argparse
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+# Add parent directory to path to import backend modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.app.database import SessionLocal, engine
+from backend.app.models import OdooModule, OdooModuleDoc
+from backend.app.services.embedding_service import EmbeddingService, get_embedding_service
+from backend.app.services.module_docs import decode_doc
+from backend.app.services.shadow_embeddings import SHADOW_COLUMN, ShadowColumn, ShadowState
+from backend.app.utils.helpers import build_embedding_text
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Re-embed modules with batched requests")
+    parser.add_argument("--batch-size", type=int, default=256,
+                        help="Rows fetched from the server-side cursor and written per batch")
+    parser.add_argument("--missing", action="store_true",
+                        help="Only modules without an embedding (updated in place)")
+    parser.add_argument("--version", default=None,
+                        help="Only modules of this Odoo version (updated in place)")
+    parser.add_argument("--model", default=None,
+                        help="Embedding model for the shadow column (default: EMBEDDING_MODEL)")
+    parser.add_argument("--dimensions", type=int, default=None,
+                        help="Dimensions of --model (default: EMBEDDING_DIMENSIONS)")
+    parser.add_argument("--index-method", choices=["hnsw", "ivfflat", "none"], default="hnsw",
+                        help="ANN index built CONCURRENTLY on the shadow column")
+    parser.add_argument("--hnsw-m", type=int, default=16)
+    parser.add_argument("--hnsw-ef-construction", type=int, default=64)
+    parser.add_argument("--ivfflat-lists", type=int, default=100)
+    parser.add_argument("--catch-up-passes", type=int, default=3,
+                        help="Extra passes over rows the ETL changed while the job ran")
+    parser.add_argument("--lock-timeout", default="5s",
+                        help="Give up the swap if the table lock is not granted in this time")
+    parser.add_argument("--no-swap", action="store_true",
+                        help="Fill and index the shadow column but keep serving the old one")
+    parser.add_argument("--restart", action="store_true",
+                        help="Drop an existing shadow column and start over")
+    parser.add_argument("--abort", action="store_true",
+                        help="Drop the shadow column and its index, then exit")
+    args = parser.parse_args(argv)
+    shadow_mode = not (args.missing or args.version or args.abort)
+    if shadow_mode and args.index_method == "none" and not args.no_swap:
+        parser.error("--index-method none requires --no-swap: the swap drops the live "
+                     "ANN index with the old column and search would run without one")
+    return args
+
+
+class Progress:
+    """Filas escritas y ritmo (filas/s)."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.written = 0
+        self.failed: List[str] = []
+
+    @property
+    def rate(self) -> float:
+        elapsed = time.perf_counter() - self.start
+        return self.written / elapsed if elapsed else 0.0
+
+    def report(self, requests: int) -> None:
+        print(f"   {self.written} módulos actualizados ({self.rate:.1f} filas/s, "
+              f"{requests} peticiones en el último bloque)")
+
+
+# Textos completos del módulo (odoo_module_docs), para el LEFT JOIN
+DOC_COLUMNS = (
+    OdooModuleDoc.codec,
+    OdooModuleDoc.description.label("full_description"),
+    OdooModuleDoc.readme,
+)
+
+
+def embedding_text(name, summary, excerpt, codec, full_description, readme) -> str:
+    """Texto a vectorizar con la descripción y el README completos (si hay textos)."""
+    if codec is not None:
+        excerpt = decode_doc(full_description, codec) or excerpt
+        readme = decode_doc(readme, codec)
+    return build_embedding_text(name, summary, excerpt, readme)
+
+
+def update_in_place(args: argparse.Namespace, embedding: EmbeddingService, progress: Progress) -> None:
+    """Actualiza ``embedding`` por bloques de ids (--missing / --version)."""
+    db = SessionLocal()
+    last_id = 0
+    try:
+        while True:
+            query = (
+                db.query(OdooModule, *DOC_COLUMNS)
+                .outerjoin(OdooModuleDoc, OdooModuleDoc.module_id == OdooModule.id)
+                .filter(OdooModule.id > last_id)
+            )
+            if args.missing:
+                query = query.filter(OdooModule.embedding.is_(None))
+            if args.version:
+                query = query.filter(OdooModule.version == args.version)
+            rows = query.order_by(OdooModule.id).limit(args.batch_size).all()
+            if not rows:
+                break
+            modules = [row[0] for row in rows]
+            last_id = modules[-1].id
+
+            result = embedding.get_embeddings_batch([
+                embedding_text(module.name, module.summary, module.description, *docs)
+                for module, *docs in rows
+            ])
+            for module, vector in zip(modules, result.embeddings):
+                if vector is None:
+                    progress.failed.append(f"{module.technical_name}@{module.version}")
+                    continue
+                module.embedding = vector
+                progress.written += 1
+            db.commit()
+            progress.report(result.requests)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def stream_batches(batch_size: int, since: Optional[datetime] = None) -> Iterator[List]:
+    """
+    Filas a vectorizar, por lotes, desde un cursor de servidor.
+
+    Args:
+        since: None = filas sin vector en la sombra; si no, filas que el ETL
+            modificó después de esa fecha
+    """
+    db = SessionLocal()
+    try:
+        query = db.query(
+            OdooModule.id, OdooModule.technical_name, OdooModule.version,
+            OdooModule.name, OdooModule.summary, OdooModule.description, *DOC_COLUMNS,
+        ).outerjoin(OdooModuleDoc, OdooModuleDoc.module_id == OdooModule.id)
+        if since is None:
+            query = query.filter(text(f"{SHADOW_COLUMN} IS NULL"))
+        else:
+            query = query.filter(OdooModule.updated_at > since)
+
+        batch = []
+        for row in query.order_by(OdooModule.id).yield_per(batch_size):
+            batch.append(row)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    finally:
+        db.close()
 
-if __name__ == "__main__":
-    update_embeddings()
 
+def fill_shadow(
+    shadow: ShadowColumn,
+    embedding: EmbeddingService,
+    progress: Progress,
+    batch_size: int,
+    since: Optional[datetime] = None,
+) -> int:
+    """
+    Una pasada de escritura en la sombra (commit por lote: reanudable).
 
+    En las pasadas de recuperación (``since``) las filas cuyo vector falla
+    se vacían en la sombra: quedan pendientes y bloquean el intercambio en
+    lugar de conservar el vector de su texto anterior.
+
+    Returns:
+        Filas vistas en la pasada
+    """
+    seen = 0
+    for rows in stream_batches(batch_size, since):
+        seen += len(rows)
+        result = embedding.get_embeddings_batch([
+            embedding_text(row.name, row.summary, row.description,
+                           row.codec, row.full_description, row.readme)
+            for row in rows
+        ])
+        vectors, failed = [], []
+        for row, vector in zip(rows, result.embeddings):
+            if vector is None:
+                progress.failed.append(f"{row.technical_name}@{row.version}")
+                failed.append(row.id)
+            else:
+                vectors.append((row.id, vector))
+        progress.written += shadow.write(vectors)
+        if since is not None:
+            shadow.clear(failed)
+        progress.report(result.requests)
+    return seen
+
+
+def catch_up(
+    shadow: ShadowColumn,
+    state: ShadowState,
+    embedding: EmbeddingService,
+    progress: Progress,
+    batch_size: int,
+    passes: int,
+) -> None:
+    """
+    Pasadas sobre las filas que el ETL modificó desde la anterior (hasta que
+    una no encuentra ninguna o se agotan ``passes``, mínimo una). El inicio
+    de cada pasada completada se guarda como ``state.caught_up_at``.
+    """
+    for _ in range(max(1, passes)):
+        pass_start = datetime.utcnow()
+        changed = fill_shadow(shadow, embedding, progress, batch_size, since=state.synced_since)
+        state.caught_up_at = pass_start
+        shadow.record(state)
+        if not changed:
+            break
+
+
+def swap_shadow(
+    shadow: ShadowColumn,
+    state: ShadowState,
+    embedding: EmbeddingService,
+    progress: Progress,
+    args: argparse.Namespace,
+    attempts: int = 3,
+) -> bool:
+    """Intercambia las columnas; entre intentos recupera lo que haya escrito el ETL."""
+    for attempt in range(1, attempts + 1):
+        try:
+            if shadow.swap(state.synced_since, args.lock_timeout):
+                return True
+            print(f"   ↻ Intento {attempt}: el ETL escribió desde la última pasada")
+        except OperationalError as e:
+            print(f"   ⏳ Intento {attempt}: no se obtuvo el bloqueo ({e.orig})")
+            time.sleep(attempt * 2)
+        fill_shadow(shadow, embedding, progress, args.batch_size)
+        catch_up(shadow, state, embedding, progress, args.batch_size, passes=1)
+    return False
+
+
+def check_pending(shadow: ShadowColumn) -> bool:
+    """False (y aviso) si quedan filas sin vector nuevo."""
+    pending = shadow.pending()
+    if pending:
+        print(f"⚠️  {pending} filas sin vector nuevo; vuelve a lanzarlo para reintentarlas")
+    return not pending
+
+
+def reembed_shadow(args: argparse.Namespace, embedding: EmbeddingService, progress: Progress) -> int:
+    """Re-vectorización completa en la columna sombra. Devuelve el código de salida."""
+    shadow = ShadowColumn(engine)
+    exists, state = shadow.state()
+
+    if args.abort:
+        shadow.drop()
+        print("🗑️  Columna sombra eliminada")
+        return 0
+
+    if exists and not args.restart and (
+        state is None or (state.model, state.dimensions) != (embedding.model, embedding.dimensions)
+    ):
+        current = f"{state.model} ({state.dimensions})" if state else "desconocido"
+        print(f"❌ Ya hay una columna sombra para otro modelo: {current}. "
+              f"Usa --restart para empezar de nuevo o --abort para eliminarla")
+        return 1
+    if exists and args.restart:
+        shadow.drop()
+        exists = False
+
+    if exists:
+        print(f"↩️  Reanudando re-vectorización con {state.model} "
+              f"(empezada {state.started_at:%Y-%m-%d %H:%M})")
+    else:
+        state = ShadowState(embedding.model, embedding.dimensions, datetime.utcnow())
+        shadow.create(state)
+        print(f"🆕 Columna sombra {SHADOW_COLUMN} vector({state.dimensions}) para {state.model}")
+
+    # Pasada principal y pasadas de recuperación de lo que cambió el ETL
+    fill_shadow(shadow, embedding, progress, args.batch_size)
+    catch_up(shadow, state, embedding, progress, args.batch_size, args.catch_up_passes)
+    if not check_pending(shadow):
+        return 1
+
+    if args.index_method != "none":
+        if shadow.has_valid_index():
+            print("   Índice de la sombra ya construido")
+        else:
+            params = (
+                {"m": args.hnsw_m, "ef_construction": args.hnsw_ef_construction}
+                if args.index_method == "hnsw" else {"lists": args.ivfflat_lists}
+            )
+            print(f"🏗️  CREATE INDEX CONCURRENTLY ({args.index_method}) en la sombra...")
+            start = time.perf_counter()
+            shadow.build_index(state.dimensions, args.index_method, params)
+            print(f"   Índice construido en {time.perf_counter() - start:.1f}s")
+
+        # Lo que el ETL escribió durante la construcción (puede llevar horas)
+        catch_up(shadow, state, embedding, progress, args.batch_size, args.catch_up_passes)
+        if not check_pending(shadow):
+            return 1
+
+    if args.no_swap:
+        print("⏸️  Sombra lista; vuelve a lanzarlo sin --no-swap para intercambiar")
+        return 0
+
+    if not swap_shadow(shadow, state, embedding, progress, args):
+        print("❌ No se pudo intercambiar la columna (bloqueo o escrituras continuas del ETL)")
+        return 1
+    print(f"🔁 Columna intercambiada: la búsqueda ya usa {state.model}. "
+          f"Configura EMBEDDING_MODEL={state.model} EMBEDDING_DIMENSIONS={state.dimensions}")
+    return 0
+
+
+def update_embeddings(argv: Optional[List[str]] = None) -> int:
+    """Entry point."""
+    args = parse_args(argv)
+    if args.model or args.dimensions:
+        embedding = EmbeddingService(model=args.model, dimensions=args.dimensions)
+    else:
+        embedding = get_embedding_service()
+    progress = Progress()
+
+    try:
+        if args.missing or args.version:
+            update_in_place(args, embedding, progress)
+            code = 0
+        else:
+            code = reembed_shadow(args, embedding, progress)
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        return 1
+
+    elapsed = time.perf_counter() - progress.start
+    print(f"\n✅ {progress.written} embeddings regenerados en {elapsed:.1f}s "
+          f"({progress.rate:.1f} filas/s)")
+    if embedding.cache is not None:
+        cache = embedding.cache.stats()
+        print(f"   Cache de embeddings: {cache['hits']} aciertos ({cache['hit_ratio']:.0%}), "
+              f"~{cache['saved_tokens']} tokens ahorrados")
+    if progress.failed:
+        print(f"⚠️  {len(progress.failed)} módulos sin regenerar: {', '.join(progress.failed[:20])}")
+        return 1
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(update_embeddings())
@@ -0,0 +1,11 @@
+"""
+Configuración común de los tests.
+
+Los módulos que leen ``Settings`` al importarse (``database``, la API, los
+scripts) necesitan estas variables; los tests nunca abren esa conexión.
+"""
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
+os.environ.setdefault("GH_TOKEN", "test")
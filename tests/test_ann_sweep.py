@@ -0,0 +1,193 @@
+"""
+Tests para el barrido ANN: recall frente al ground truth, comprobación del
+plan y ensamblado de la frontera de Pareto (sin PostgreSQL).
+"""
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql import Select
+
+# Add parent directory to path to import backend modules and scripts
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import ann_sweep
+from ann_sweep import SWEEP_INDEX, AnnSweep, build_report, run_grid
+
+from backend.app.config import get_settings
+from backend.app.models import OdooModule
+from backend.app.services.search_service import vector_search_query
+from backend.app.services.shadow_embeddings import index_sql
+
+QUERIES = [
+    {"id": "q1", "version": "17.0", "embedding": [1.0, 0.0]},
+    {"id": "q2", "version": "17.0", "embedding": [2.0, 0.0], "dependencies": ["stock"]},
+]
+
+
+class FakeResult(list):
+
+    def scalar(self):
+        return 4096
+
+
+class FakeConnection:
+    """Conexión que responde a las queries k-NN con ids fijos por embedding."""
+
+    dialect = postgresql.dialect()
+
+    def __init__(self, neighbours, plan=""):
+        self.neighbours = neighbours
+        self.plan = plan
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        if not isinstance(statement, Select):
+            self.statements.append(str(statement))
+            return FakeResult()
+        compiled = statement.compile(dialect=self.dialect)
+        self.statements.append(str(compiled))
+        embedding = next(v for v in compiled.params.values() if isinstance(v, list) and v
+                         and isinstance(v[0], float))
+        limit = next(v for v in compiled.params.values() if isinstance(v, int))
+        return [(id_,) for id_ in self.neighbours[embedding[0]][:limit]]
+
+    def exec_driver_sql(self, sql, params):
+        self.statements.append(sql)
+        return [(line,) for line in self.plan.splitlines()]
+
+    def commit(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def dimensions(monkeypatch):
+    monkeypatch.setattr(get_settings(), "embedding_dimensions", 2560)
+
+
+class TestAnnSweep:
+
+    def test_ground_truth_uses_exact_distance_without_indexes(self):
+        conn = FakeConnection({1.0: [1, 2], 2.0: [3]})
+        truth = AnnSweep(conn, dimensions=2560, k=2).ground_truth(QUERIES)
+        assert truth == {"q1": [1, 2], "q2": [3]}
+        assert "SET enable_indexscan = off" in conn.statements
+        assert conn.statements[-1] == "RESET enable_bitmapscan"
+        knn = [sql for sql in conn.statements if "ORDER BY" in sql]
+        assert len(knn) == 2 and not any("HALFVEC" in sql for sql in knn)
+
+    def test_measures_the_served_query(self):
+        conn = FakeConnection({1.0: [1], 2.0: [2]})
+        AnnSweep(conn, dimensions=2560, k=5, repeat=1).measure(
+            QUERIES, {"q1": [], "q2": []}, "hnsw.ef_search", 40
+        )
+        served = vector_search_query(
+            QUERIES[1]["embedding"], "17.0", ["stock"], limit=5, columns=(OdooModule.id,)
+        )
+        assert conn.statements[2] == str(served.compile(dialect=FakeConnection.dialect))
+        assert "CAST(odoo_modules.embedding AS HALFVEC(2560)) <=>" in conn.statements[2]
+        assert "odoo_modules.depends @>" in conn.statements[2]
+
+    def test_sweep_index_matches_production_index(self):
+        conn = FakeConnection({})
+        params = {"m": 16, "ef_construction": 64}
+        build = AnnSweep(conn, dimensions=2560).build_index("hnsw", params)
+        assert build["index_bytes"] == 4096
+        expected = index_sql(SWEEP_INDEX, "embedding", 2560, "hnsw", params, concurrently=False)
+        assert expected in conn.statements
+
+    def test_recall_against_ground_truth(self):
+        conn = FakeConnection({1.0: [1, 9, 3, 8], 2.0: [5, 6, 7, 4]})
+        truth = {"q1": [1, 2, 3, 4], "q2": [4, 5, 6, 7]}
+        result = AnnSweep(conn, dimensions=2560, k=4, repeat=2).measure(
+            QUERIES, truth, "hnsw.ef_search", 40
+        )
+        assert result["recall@4"] == pytest.approx((0.5 + 1.0) / 2)
+        assert result["p99_ms"] >= result["p50_ms"] >= 0
+        assert conn.statements[0] == "SET hnsw.ef_search = 40"
+        assert sum("ORDER BY" in sql for sql in conn.statements) == 4
+
+    def test_queries_without_truth_are_not_averaged(self):
+        conn = FakeConnection({1.0: [1], 2.0: [2]})
+        result = AnnSweep(conn, dimensions=2560, k=1).measure(
+            QUERIES, {"q1": [1], "q2": []}, "ivfflat.probes", 1
+        )
+        assert result["recall@1"] == 1.0
+
+    def test_uses_index(self):
+        plan = f"Limit\n  ->  Index Scan using {SWEEP_INDEX} on odoo_modules"
+        conn = FakeConnection({}, plan)
+        assert AnnSweep(conn, dimensions=2560).uses_index(QUERIES[0])
+        assert conn.statements[0].startswith("EXPLAIN SELECT odoo_modules.id")
+        assert not AnnSweep(FakeConnection({}, "Seq Scan on odoo_modules"),
+                            dimensions=2560).uses_index(QUERIES[0])
+
+
+class StubSweep:
+    """Sweep con mediciones fijas por (método, parámetros)."""
+
+    k = 10
+
+    def __init__(self, measurements):
+        self.measurements = measurements
+        self.built = []
+        self.dropped = False
+
+    def build_index(self, method, params):
+        self.built.append((method, params))
+        return {"build_seconds": 1.0, "index_bytes": 1024}
+
+    def uses_index(self, query):
+        return True
+
+    def measure(self, queries, truth, setting, value):
+        recall, p99 = self.measurements[(self.built[-1][0], value)]
+        return {"recall@10": recall, "p50_ms": p99 / 2, "p99_ms": p99}
+
+    def drop_index(self):
+        self.dropped = True
+
+
+class TestReport:
+
+    GRID = [
+        {"method": "hnsw", "build_params": {"m": 16, "ef_construction": 64},
+         "setting": "hnsw.ef_search", "values": [40, 80]},
+        {"method": "ivfflat", "build_params": {"lists": 100},
+         "setting": "ivfflat.probes", "values": [1, 10]},
+    ]
+
+    def test_points_and_frontier(self):
+        sweep = StubSweep({
+            ("hnsw", 40): (0.90, 2.0),
+            ("hnsw", 80): (0.98, 4.0),
+            ("ivfflat", 1): (0.70, 3.0),   # dominado por hnsw ef_search=40
+            ("ivfflat", 10): (0.99, 9.0),
+        })
+        points = run_grid(sweep, self.GRID, QUERIES, {})
+        assert sweep.dropped
+        assert [point["params"] for point in points] == [
+            {"m": 16, "ef_construction": 64, "ef_search": 40},
+            {"m": 16, "ef_construction": 64, "ef_search": 80},
+            {"lists": 100, "probes": 1},
+            {"lists": 100, "probes": 10},
+        ]
+        assert points[0]["index_bytes"] == 1024
+
+        report = build_report(points, {"k": 10})
+        assert [(p["method"], p["recall@10"]) for p in report["pareto"]] == [
+            ("hnsw", 0.90), ("hnsw", 0.98), ("ivfflat", 0.99)
+        ]
+        assert "## Pareto frontier (recall@10 vs p99)" in ann_sweep.render_markdown({
+            **report,
+            "metadata": {"k": 10, "timestamp": "t", "git": {"revision": None},
+                         "rows": 4, "queries": 2, "repeat": 1},
+        })
+
+    def test_index_is_dropped_on_error(self):
+        sweep = StubSweep({})
+        with pytest.raises(KeyError):
+            run_grid(sweep, self.GRID, QUERIES, {})
+        assert sweep.dropped
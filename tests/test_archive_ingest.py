@@ -0,0 +1,103 @@
+"""
+Tests para la ingesta por tarball (lectura en streaming de archivos locales).
+"""
+import io
+import subprocess
+import sys
+import tarfile
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path to import backend modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.app.services.archive_ingest import (
+    git_blob_sha,
+    local_archive_path,
+    read_archive,
+)
+from backend.app.utils.parsers import parse_manifest
+
+COMMIT = "a" * 40
+FILES = {
+    "README.md": b"# web\n",
+    "web_a/__manifest__.py": b"{'name': 'Web A', 'depends': ['web']}\n",
+    "web_a/README.rst": b"Web A\n=====\n",
+    "web_a/static/src/js/a.js": b"console.log(1);\n",
+    "web_b/__manifest__.py": b"{'name': _('Web B')}\n",
+}
+
+
+def build_archive(path: Path, files=FILES, commit=COMMIT) -> Path:
+    """Tarball con la misma forma que el de GitHub (raíz <owner>-<repo>-<sha>/)."""
+    pax = {"comment": commit} if commit else {}
+    with tarfile.open(path, "w:gz", format=tarfile.PAX_FORMAT, pax_headers=pax) as tar:
+        for name, data in files.items():
+            info = tarfile.TarInfo(f"OCA-web-{(commit or '0')[:7]}/{name}")
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return path
+
+
+class TestReadArchive:
+
+    def test_modules_and_contents(self, tmp_path):
+        path = build_archive(local_archive_path(tmp_path, "web", "17.0"))
+        assert path.name == "web-17.0.tar.gz"
+
+        with open(path, "rb") as stream:
+            branch = read_archive(stream)
+
+        assert branch.commit == COMMIT
+        assert set(branch.modules) == {"web_a", "web_b"}
+        web_a = branch.modules["web_a"]
+        assert web_a.files.readme_path == "web_a/README.rst"
+        assert web_a.readme_content.startswith("Web A")
+        assert branch.modules["web_b"].readme_content is None
+        assert parse_manifest(web_a.manifest_content)["depends"] == ["web"]
+
+    def test_blob_shas_match_git(self, tmp_path):
+        path = build_archive(tmp_path / "web-17.0.tar.gz")
+        with open(path, "rb") as stream:
+            module = read_archive(stream).modules["web_a"]
+
+        assert module.files.manifest_sha == git_blob_sha(FILES["web_a/__manifest__.py"])
+        try:
+            expected = subprocess.run(
+                ["git", "hash-object", "--stdin"], input=FILES["web_a/README.rst"],
+                capture_output=True, check=True,
+            ).stdout.decode().strip()
+        except (OSError, subprocess.CalledProcessError):
+            pytest.skip("git no disponible")
+        assert module.files.readme_sha == expected
+
+    def test_is_streamed_without_seeking(self, tmp_path):
+        class NoSeek(io.RawIOBase):
+            def __init__(self, data):
+                self._stream = io.BytesIO(data)
+
+            def readable(self):
+                return True
+
+            def readinto(self, buffer):
+                return self._stream.readinto(buffer)
+
+        data = build_archive(tmp_path / "web-17.0.tar.gz").read_bytes()
+        branch = read_archive(NoSeek(data))
+        assert len(branch.modules) == 2
+
+    def test_archive_without_commit(self, tmp_path):
+        path = build_archive(tmp_path / "web-17.0.tar.gz", commit=None)
+        with open(path, "rb") as stream:
+            assert read_archive(stream).commit is None
+
+
+class TestParseManifest:
+
+    def test_literal_dict_with_translations(self):
+        manifest = parse_manifest("# -*- coding: utf-8 -*-\n{'name': _('X'), 'installable': True}")
+        assert manifest == {"name": "X", "installable": True}
+
+    def test_code_is_not_executed(self):
+        assert parse_manifest("{'name': __import__('os').getcwd()}") is None
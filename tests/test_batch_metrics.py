@@ -0,0 +1,124 @@
+"""
+Tests para el motor de métricas IR por lotes.
+"""
+import random
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import backend modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from backend.app.metrics.batch_metrics import (
+    BatchMetricsEngine,
+    align_runs,
+    bootstrap_ci,
+    compare_reports,
+    paired_test,
+)
+from backend.app.metrics.benchmark_metrics import MetricsCalculator
+
+
+def random_queries(n, seed=7):
+    rng = random.Random(seed)
+    vocabulary = [f"mod_{i}" for i in range(30)]
+    retrieved = [rng.choices(vocabulary, k=rng.randint(0, 12)) for _ in range(n)]
+    expected = [rng.sample(vocabulary, k=rng.randint(0, 5)) for _ in range(n)]
+    return retrieved, expected
+
+
+class TestBatchMetricsEngine:
+    """El motor vectorizado debe coincidir con MetricsCalculator."""
+
+    def test_matches_scalar_metrics(self):
+        retrieved, expected = random_queries(200)
+        engine = BatchMetricsEngine(retrieved, expected)
+
+        for k in (1, 3, 5, 10):
+            precision = engine.precision_at_k(k)
+            recall = engine.recall_at_k(k)
+            ndcg = engine.ndcg_at_k(k)
+            for i, (r, e) in enumerate(zip(retrieved, expected)):
+                assert precision[i] == pytest.approx(MetricsCalculator.precision_at_k(r, e, k))
+                assert recall[i] == pytest.approx(MetricsCalculator.recall_at_k(r, e, k))
+                assert ndcg[i] == pytest.approx(MetricsCalculator.ndcg_at_k(r, e, k))
+
+        mrr = engine.mrr()
+        for i, (r, e) in enumerate(zip(retrieved, expected)):
+            assert mrr[i] == pytest.approx(MetricsCalculator.mrr(r, e))
+
+    def test_duplicates_in_retrieved(self):
+        engine = BatchMetricsEngine([["A", "A", "B"]], [["A"]])
+        assert engine.precision_at_k(3)[0] == pytest.approx(2 / 3)
+
+    def test_metric_by_name(self):
+        engine = BatchMetricsEngine([["A"]], [["A"]])
+        assert engine.metric("ndcg@10")[0] == pytest.approx(1.0)
+        with pytest.raises(ValueError):
+            engine.metric("f1@3")
+
+    def test_length_mismatch(self):
+        with pytest.raises(ValueError):
+            BatchMetricsEngine([["A"]], [])
+
+
+class TestStatistics:
+
+    def test_bootstrap_ci_contains_mean(self):
+        values = [0.0, 1.0] * 50
+        ci = bootstrap_ci(values, n_resamples=2000)
+
+        assert ci["mean"] == pytest.approx(0.5)
+        assert ci["low"] < 0.5 < ci["high"]
+
+    def test_bootstrap_ci_constant(self):
+        ci = bootstrap_ci([0.3] * 10, n_resamples=500)
+        assert ci["low"] == pytest.approx(0.3)
+        assert ci["high"] == pytest.approx(0.3)
+
+    def test_paired_test_detects_improvement(self):
+        baseline = [0.2] * 40
+        candidate = [0.6] * 40
+        result = paired_test(baseline, candidate, n_resamples=2000)
+
+        assert result["delta"] == pytest.approx(0.4)
+        assert result["p_value"] < 0.01
+
+    def test_paired_test_identical_runs(self):
+        values = [0.1, 0.5, 0.9, 0.3]
+        result = paired_test(values, values, n_resamples=500)
+
+        assert result["delta"] == 0.0
+        assert result["p_value"] == 1.0
+
+
+class TestCompareReports:
+
+    def _result(self, query_id, returned, expected, error=None):
+        return {
+            "query_id": query_id,
+            "returned_modules": returned,
+            "expected_modules": expected,
+            "error": error,
+        }
+
+    def test_align_runs_skips_errors_and_missing(self):
+        baseline = [self._result(1, ["A"], ["A"]), self._result(2, ["B"], ["B"]),
+                    self._result(3, ["C"], ["C"])]
+        candidate = [self._result(3, ["C"], ["C"]), self._result(1, ["X"], ["A"]),
+                     self._result(2, [], ["B"], error="boom")]
+
+        a, b = align_runs(baseline, candidate)
+
+        assert [r["query_id"] for r in a] == [1, 3]
+        assert [r["query_id"] for r in b] == [1, 3]
+
+    def test_compare_reports(self):
+        baseline = {"detailed_results": [self._result(i, ["X", "A"], ["A"]) for i in range(20)]}
+        candidate = {"detailed_results": [self._result(i, ["A", "X"], ["A"]) for i in range(20)]}
+
+        comparison = compare_reports(baseline, candidate, n_resamples=500)
+
+        assert comparison["queries"]["count"] == 20
+        assert comparison["mrr"]["delta"] == pytest.approx(0.5)
+        assert comparison["mrr"]["p_value"] < 0.05
@@ -0,0 +1,86 @@
+"""
+Tests unitarios para el histórico de ejecuciones del benchmark.
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import backend modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.app.metrics.history import BenchmarkHistory, compare_runs, flatten_report_metrics
+
+
+def make_report(p3: float, engine_p95: float) -> dict:
+    return {
+        "metadata": {"timestamp": "2025-11-22T18:14:54", "search_mode": "vector", "workers": 4},
+        "aggregate_metrics": {"precision@3": p3, "precision@5": 0.2, "recall@10": 0.5, "mrr": 0.4},
+        "latency_ms": {"engine": {"count": 20, "p50": 50.0, "p95": engine_p95}},
+    }
+
+
+class TestBenchmarkHistory:
+    """Tests para el almacén SQLite."""
+
+    def test_append_and_recent(self, tmp_path):
+        """Las ejecuciones se devuelven de la más reciente a la más antigua."""
+        history = BenchmarkHistory(str(tmp_path / "history.sqlite"))
+        git = {"revision": "abc123", "dirty": False}
+
+        first = history.append(make_report(0.30, 100.0), git=git)
+        second = history.append(make_report(0.35, 110.0), git=git)
+
+        runs = history.recent(5)
+        assert [r["id"] for r in runs] == [second, first]
+        assert runs[0]["git_revision"] == "abc123"
+        assert runs[0]["metrics"]["precision@3"] == 0.35
+        assert runs[0]["metrics"]["latency.engine.p95"] == 110.0
+
+    def test_recent_before(self, tmp_path):
+        """before_id excluye la ejecución actual."""
+        history = BenchmarkHistory(str(tmp_path / "history.sqlite"))
+        git = {"revision": None, "dirty": False}
+        ids = [history.append(make_report(0.3, 100.0), git=git) for _ in range(3)]
+
+        assert [r["id"] for r in history.recent(5, before_id=ids[-1])] == ids[:2][::-1]
+
+
+class TestCompareRuns:
+    """Tests para la detección de regresiones."""
+
+    def test_flatten(self):
+        """Latencias aplanadas sin el count."""
+        flat = flatten_report_metrics(make_report(0.3, 120.0))
+
+        assert flat["latency.engine.p95"] == 120.0
+        assert "latency.engine.count" not in flat
+
+    def test_no_regression(self):
+        """Pequeñas variaciones dentro de tolerancia."""
+        previous = [flatten_report_metrics(make_report(0.30, 100.0))]
+        current = flatten_report_metrics(make_report(0.29, 110.0))
+
+        assert compare_runs(current, previous) == []
+
+    def test_relevance_regression(self):
+        """Caída de P@3 por encima de la tolerancia."""
+        previous = [flatten_report_metrics(make_report(0.40, 100.0))]
+        current = flatten_report_metrics(make_report(0.30, 100.0))
+
+        regressions = compare_runs(current, previous)
+
+        assert [r.metric for r in regressions] == ["precision@3"]
+        assert regressions[0].kind == "relevance"
+
+    def test_latency_regression(self):
+        """Latencia un 50% peor que la mediana anterior."""
+        previous = [
+            flatten_report_metrics(make_report(0.3, 100.0)),
+            flatten_report_metrics(make_report(0.3, 90.0)),
+            flatten_report_metrics(make_report(0.3, 400.0)),
+        ]
+        current = flatten_report_metrics(make_report(0.3, 150.0))
+
+        regressions = compare_runs(current, previous)
+
+        assert [r.metric for r in regressions] == ["latency.engine.p95"]
+        assert regressions[0].baseline == 100.0
@@ -114,6 +114,28 @@ class TestMRR:
         assert MetricsCalculator.mrr([], ["A"]) == 0.0
 
 
+class TestNDCG:
+    """Tests para NDCG@k."""
+
+    def test_perfect_ranking(self):
+        """Todos los relevantes en las primeras posiciones."""
+        assert MetricsCalculator.ndcg_at_k(["A", "B", "C"], ["A", "B"], k=10) == pytest.approx(1.0)
+
+    def test_relevant_in_second_position(self):
+        """Un relevante en posición 2: 1/log2(3)."""
+        assert MetricsCalculator.ndcg_at_k(["B", "A"], ["A"], k=10) == pytest.approx(0.6309, abs=1e-4)
+
+    def test_no_relevant(self):
+        assert MetricsCalculator.ndcg_at_k(["A", "B"], ["X"], k=10) == 0.0
+
+    def test_empty_expected(self):
+        assert MetricsCalculator.ndcg_at_k(["A"], [], k=10) == 0.0
+
+    def test_calculate_all_fills_ndcg(self):
+        metrics = MetricsCalculator.calculate_all(["A", "B"], ["A"])
+        assert metrics.ndcg_at_10 == pytest.approx(1.0)
+
+
 class TestCountHits:
     """Tests para count_hits."""
 
@@ -274,3 +296,23 @@ class TestReportAggregator:
         assert grouped["easy"]["precision@3"] == pytest.approx((0.67 + 0.33) / 2)
         assert grouped["hard"]["count"] == 1
         assert grouped["hard"]["precision@3"] == 0.0
+
+    def test_group_by_field_category(self):
+        """Agrupación por categoría (no por dificultad)."""
+        detailed_results = [
+            {
+                "category": "sales",
+                "difficulty": "easy",
+                "metrics": {"precision@3": 1.0, "precision@5": 0.6, "recall@10": 1.0, "mrr": 1.0}
+            },
+            {
+                "category": "stock",
+                "difficulty": "easy",
+                "metrics": {"precision@3": 0.0, "precision@5": 0.0, "recall@10": 0.0, "mrr": 0.0}
+            }
+        ]
+
+        grouped = ReportAggregator.group_by_field(detailed_results, "category")
+
+        assert set(grouped) == {"sales", "stock"}
+        assert grouped["sales"]["mrr"] == 1.0
@@ -0,0 +1,168 @@
+"""
+Tests para el writer masivo (COPY binario + upsert).
+"""
+import struct
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add parent directory to path to import backend modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.app.services.bulk_writer import (
+    PGCOPY_HEADER,
+    PGCOPY_TRAILER,
+    BinaryCopyEncoder,
+    BulkModuleWriter,
+    encode_timestamp,
+    encode_varchar_array,
+    encode_vector,
+)
+
+
+class TestBinaryEncoding:
+
+    def test_vector(self):
+        data = encode_vector([1.0, -2.5])
+        assert data == struct.pack(">hhff", 2, 0, 1.0, -2.5)
+
+    def test_varchar_array(self):
+        data = encode_varchar_array(["base", "sale"])
+        ndim, has_null, oid, size, lower = struct.unpack_from(">iiiii", data)
+        assert (ndim, has_null, oid, size, lower) == (1, 0, 1043, 2, 1)
+        assert data[20:] == struct.pack(">i", 4) + b"base" + struct.pack(">i", 4) + b"sale"
+
+    def test_empty_array(self):
+        assert encode_varchar_array([]) == struct.pack(">iii", 0, 0, 1043)
+
+    def test_timestamp(self):
+        assert encode_timestamp(datetime(2000, 1, 1)) == struct.pack(">q", 0)
+        assert encode_timestamp(datetime(2000, 1, 2, 0, 0, 1)) == struct.pack(">q", 86_401_000_000)
+
+    def test_aware_timestamp_converted_to_utc(self):
+        aware = datetime(2000, 1, 1, 2, 0, tzinfo=timezone(timedelta(hours=2)))
+        assert encode_timestamp(aware) == struct.pack(">q", 0)
+
+    def test_row_layout_with_nulls(self):
+        encoder = BinaryCopyEncoder(["technical_name", "github_stars", "summary"])
+
+        data = encoder.encode([{"technical_name": "sale_x", "github_stars": 5}])
+
+        assert data.startswith(PGCOPY_HEADER)
+        assert data.endswith(PGCOPY_TRAILER)
+        body = data[len(PGCOPY_HEADER):-len(PGCOPY_TRAILER)]
+        assert body == (
+            struct.pack(">h", 3)
+            + struct.pack(">i", 6) + b"sale_x"
+            + struct.pack(">i", 4) + struct.pack(">i", 5)
+            + struct.pack(">i", -1)
+        )
+
+
+class FakeCursor:
+    def __init__(self, log):
+        self.log = log
+        self.rowcount = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def execute(self, sql):
+        self.log.append(("execute", sql))
+        self.rowcount = 1
+
+    def copy_expert(self, sql, buffer):
+        self.log.append(("copy", sql, buffer.read()))
+
+
+class FakeConnection:
+    def __init__(self):
+        self.log = []
+        self.commits = 0
+        self.closed = False
+
+    def cursor(self):
+        return FakeCursor(self.log)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.log.append(("rollback",))
+
+    def close(self):
+        self.closed = True
+
+
+def module(name, version="17.0"):
+    return {
+        "technical_name": name,
+        "name": name.title(),
+        "version": version,
+        "repo_name": "sale-workflow",
+        "depends": ["base"],
+        "embedding": [0.1, 0.2],
+    }
+
+
+class TestBulkModuleWriter:
+
+    def _writer(self, batch_size=2):
+        connection = FakeConnection()
+        writer = BulkModuleWriter(lambda: connection, batch_size=batch_size)
+        return writer, connection
+
+    def test_upsert_sql(self):
+        writer, _ = self._writer()
+        sql = writer._upsert_sql()
+
+        assert "ON CONFLICT (technical_name, version, repo_name) DO UPDATE" in sql
+        assert "embedding = EXCLUDED.embedding" in sql
+        assert "created_at = EXCLUDED" not in sql
+        assert "technical_name = EXCLUDED" not in sql
+
+    def test_commits_once_per_batch(self):
+        writer, connection = self._writer(batch_size=2)
+
+        with writer:
+            for name in ("a", "b", "c"):
+                writer.add(module(name))
+
+        copies = [entry for entry in connection.log if entry[0] == "copy"]
+        assert len(copies) == 2
+        assert "FORMAT binary" in copies[0][1]
+        # 1 commit al crear la tabla temporal + 1 por lote
+        assert connection.commits == 3
+        assert writer.batches == 2
+        assert connection.closed
+
+    def test_duplicate_keys_in_batch_are_merged(self):
+        writer, connection = self._writer(batch_size=10)
+
+        writer.add(module("a"))
+        writer.add({**module("a"), "name": "Updated"})
+        writer.add(module("a", version="16.0"))
+
+        assert len(writer._pending) == 2
+        assert writer._pending[("a", "17.0", "sale-workflow")]["name"] == "Updated"
+
+    def test_long_texts_go_to_module_docs(self):
+        writer, connection = self._writer(batch_size=10)
+        values = {**module("a"), "description": "x" * 300, "readme": "Readme"}
+
+        with writer:
+            writer.add(values)
+            row = writer._pending[("a", "17.0", "sale-workflow")]
+            assert "readme" not in row
+            assert row["description"] == "x" * 200 + "..."
+
+        copies = [entry[1] for entry in connection.log if entry[0] == "copy"]
+        assert [sql.split()[1] for sql in copies] == ["odoo_modules_stage", "odoo_module_docs_stage"]
+        upserts = [entry[1] for entry in connection.log if entry[0] == "execute"]
+        assert any(
+            sql.startswith("INSERT INTO odoo_module_docs") and "ON CONFLICT (module_id)" in sql
+            for sql in upserts
+        )
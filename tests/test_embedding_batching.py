@@ -0,0 +1,112 @@
+"""
+Tests para la planificación y ejecución de embeddings por lotes.
+"""
+import sys
+import threading
+from pathlib import Path
+
+# Add parent directory to path to import backend modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.app.services.embedding_batching import (
+    estimate_tokens,
+    plan_batches,
+    run_batches,
+)
+
+
+class FakeProvider:
+    """Proveedor falso: embedding = [len(texto)]; puede fallar por texto."""
+
+    def __init__(self, fail_on=(), transient_failures=0):
+        self.fail_on = set(fail_on)
+        self.transient_failures = transient_failures
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, texts):
+        with self._lock:
+            self.calls.append(list(texts))
+            if self.transient_failures:
+                self.transient_failures -= 1
+                raise ConnectionError("timeout")
+        if self.fail_on & set(texts):
+            raise RuntimeError("provider rejected input")
+        return [[float(len(t))] for t in texts]
+
+
+class TestPlanBatches:
+
+    def test_respects_item_limit(self):
+        texts = ["abc"] * 10
+        assert [len(b) for b in plan_batches(texts, max_tokens=1000, max_items=4)] == [4, 4, 2]
+
+    def test_respects_token_budget(self):
+        texts = ["x" * 30, "x" * 30, "x" * 30]  # 10 tokens cada uno
+        assert plan_batches(texts, max_tokens=20, max_items=10) == [[0, 1], [2]]
+
+    def test_oversized_text_goes_alone(self):
+        texts = ["a", "x" * 300, "b"]
+        assert plan_batches(texts, max_tokens=10, max_items=10) == [[0], [1], [2]]
+
+    def test_estimate_tokens(self):
+        assert estimate_tokens("") == 1
+        assert estimate_tokens("x" * 9) == 3
+
+
+class TestRunBatches:
+
+    def test_one_request_per_batch(self):
+        provider = FakeProvider()
+        texts = [f"text {i}" for i in range(10)]
+
+        result = run_batches(texts, provider, max_items=5, concurrency=2)
+
+        assert result.ok
+        assert len(provider.calls) == 2
+        assert result.embeddings == [[float(len(t))] for t in texts]
+
+    def test_failed_item_is_isolated_not_zeroed(self):
+        provider = FakeProvider(fail_on={"bad"})
+        texts = ["good 1", "bad", "good 2"]
+
+        result = run_batches(texts, provider, max_retries=0, sleep=lambda s: None)
+
+        assert result.embeddings[0] == [6.0]
+        assert result.embeddings[1] is None
+        assert result.embeddings[2] == [6.0]
+        assert set(result.failures) == {1}
+        assert result.succeeded() == [0, 2]
+
+    def test_empty_text_is_a_failure(self):
+        result = run_batches(["", "ok"], FakeProvider())
+
+        assert result.embeddings[0] is None
+        assert 0 in result.failures
+        assert result.embeddings[1] == [2.0]
+
+    def test_transient_errors_are_retried(self):
+        provider = FakeProvider(transient_failures=2)
+        sleeps = []
+
+        result = run_batches(["a", "b"], provider, max_retries=3, sleep=sleeps.append)
+
+        assert result.ok
+        assert len(provider.calls) == 3
+        assert sleeps == [1.0, 2.0]
+
+    def test_value_errors_are_not_retried(self):
+        def bad_dimensions(texts):
+            raise ValueError("Embedding tiene 3 dimensiones")
+
+        result = run_batches(["a"], bad_dimensions, max_retries=3, sleep=lambda s: None)
+
+        assert result.requests == 1
+        assert "ValueError" in result.failures[0]
+
+    def test_wrong_number_of_embeddings_falls_back_to_single_items(self):
+        result = run_batches(["a", "b"], lambda texts: [[1.0]], max_retries=0)
+
+        assert result.ok
+        assert result.embeddings == [[1.0], [1.0]]
+        assert result.requests == 3
@@ -0,0 +1,104 @@
+"""
+Tests para la cache de embeddings direccionada por contenido.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add parent directory to path to import backend modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.app.models import EmbeddingCacheEntry
+from backend.app.services.embedding_cache import (
+    EmbeddingCache,
+    cache_key,
+    decode_embedding,
+    encode_embedding,
+    normalize_text,
+)
+from backend.app.services.embedding_service import EmbeddingService
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    EmbeddingCacheEntry.__table__.create(engine)
+    return sessionmaker(bind=engine)
+
+
+class TestKeys:
+
+    def test_normalization(self):
+        assert normalize_text("  Sale\n\n order\ttype ") == "Sale order type"
+        assert cache_key("m", "Sale  order") == cache_key("m", " Sale order\n")
+
+    def test_model_is_part_of_key(self):
+        assert cache_key("model-a", "text") != cache_key("model-b", "text")
+
+    def test_float32_roundtrip(self):
+        assert decode_embedding(encode_embedding([0.5, -1.25, 2.0])) == [0.5, -1.25, 2.0]
+
+
+class TestEmbeddingCache:
+
+    def test_miss_then_hit(self, session_factory):
+        cache = EmbeddingCache(session_factory, "m")
+        assert cache.get_many(["a", "b"]) == [None, None]
+
+        assert cache.put_many([("a", [1.0, 2.0])]) == 1
+        assert cache.get_many(["a", "b", " a "]) == [[1.0, 2.0], None, [1.0, 2.0]]
+
+        stats = cache.stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 3
+        assert stats["saved_tokens"] > 0
+
+    def test_existing_keys_are_kept(self, session_factory):
+        cache = EmbeddingCache(session_factory, "m")
+        cache.put("a", [1.0])
+        cache.put("a", [9.0])
+        assert cache.get("a") == [1.0]
+
+    def test_other_model_does_not_hit(self, session_factory):
+        EmbeddingCache(session_factory, "m1").put("a", [1.0])
+        assert EmbeddingCache(session_factory, "m2").get("a") is None
+
+    def test_empty_text_is_not_looked_up(self, session_factory):
+        cache = EmbeddingCache(session_factory, "m")
+        assert cache.get_many(["", "  "]) == [None, None]
+        assert cache.stats()["misses"] == 0
+
+    def test_unavailable_store_degrades_to_miss(self):
+        def broken():
+            raise RuntimeError("sin conexión")
+
+        cache = EmbeddingCache(broken, "m")
+        assert cache.get("a") is None
+        assert cache.put("a", [1.0]) == 0
+
+
+class TestEmbeddingServiceCache:
+
+    @pytest.fixture
+    def service(self, session_factory, monkeypatch):
+        service = EmbeddingService(model="m", dimensions=2)
+        service.cache = EmbeddingCache(session_factory, "m")
+        monkeypatch.setattr(service, "_request_embeddings",
+                            lambda texts: [[float(len(text)), 0.0] for text in texts])
+        return service
+
+    def test_query_path_only_reads_the_cache(self, service):
+        service.cache.put("cached", [1.0, 2.0])
+        assert service.get_embedding("cached") == [1.0, 2.0]
+        assert service.get_embedding("nueva query") == [11.0, 0.0]
+        assert service.cache.get("nueva query") is None
+
+    def test_store_writes_misses(self, service):
+        service.get_embedding("texto", store=True)
+        assert service.cache.get("texto") == [5.0, 0.0]
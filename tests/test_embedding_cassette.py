@@ -0,0 +1,100 @@
+"""
+Tests unitarios para los cassettes de embeddings.
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import backend modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from backend.app.services.embedding_cassette import (
+    CassetteEmbeddingService,
+    CassetteMissError,
+    EmbeddingCassette,
+)
+
+
+class FakeEmbeddingService:
+    """Proveedor falso que cuenta llamadas."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_embedding(self, text):
+        self.calls += 1
+        return [float(len(text)), 0.5, -0.25, 1.0]
+
+
+class TestEmbeddingCassette:
+    """Tests para grabar y reproducir embeddings."""
+
+    def test_record_then_replay(self, tmp_path):
+        """Lo grabado se reproduce sin llamar al proveedor."""
+        path = tmp_path / "queries.cassette"
+        provider = FakeEmbeddingService()
+
+        cassette = EmbeddingCassette(str(path), mode="record", model="qwen")
+        service = CassetteEmbeddingService(provider, cassette)
+        recorded = service.get_embedding("sales subscriptions")
+        cassette.save()
+
+        replay = EmbeddingCassette(str(path), mode="replay", model="qwen")
+        replay_service = CassetteEmbeddingService(provider, replay)
+
+        assert replay_service.get_embedding("sales subscriptions") == recorded
+        assert replay_service.last_source == "cassette"
+        assert replay_service.last_provider_ms == 0.0
+        assert provider.calls == 1
+
+    def test_file_is_float32(self, tmp_path):
+        """Cada entrada ocupa 32 bytes de clave + 4 bytes por dimensión."""
+        path = tmp_path / "queries.cassette"
+        cassette = EmbeddingCassette(str(path), mode="record", model="m")
+        cassette.put("a", [1.0, 2.0, 3.0, 4.0])
+        cassette.put("b", [1.0, 2.0, 3.0, 4.0])
+        cassette.save()
+
+        header = 4 + 7 + len("m")
+        assert path.stat().st_size == header + 2 * (32 + 4 * 4)
+
+    def test_replay_miss_raises(self, tmp_path):
+        """En modo replay un texto no grabado es un error."""
+        path = tmp_path / "queries.cassette"
+        cassette = EmbeddingCassette(str(path), mode="record", model="m")
+        cassette.put("known", [0.0, 1.0])
+        cassette.save()
+
+        service = CassetteEmbeddingService(
+            FakeEmbeddingService(), EmbeddingCassette(str(path), mode="replay")
+        )
+
+        with pytest.raises(CassetteMissError):
+            service.get_embedding("unknown")
+
+    def test_auto_records_misses(self, tmp_path):
+        """En modo auto los fallos se graban y luego se reproducen."""
+        provider = FakeEmbeddingService()
+        cassette = EmbeddingCassette(str(tmp_path / "c.cassette"), mode="auto")
+        service = CassetteEmbeddingService(provider, cassette)
+
+        service.get_embedding("stock")
+        service.get_embedding("stock")
+
+        assert provider.calls == 1
+        assert (service.hits, service.misses) == (1, 1)
+
+    def test_model_mismatch(self, tmp_path):
+        """Un cassette de otro modelo no se reutiliza."""
+        path = tmp_path / "c.cassette"
+        cassette = EmbeddingCassette(str(path), mode="record", model="model-a")
+        cassette.put("x", [1.0])
+        cassette.save()
+
+        with pytest.raises(ValueError):
+            EmbeddingCassette(str(path), mode="replay", model="model-b")
+
+    def test_replay_requires_file(self, tmp_path):
+        """Replay sin fichero grabado."""
+        with pytest.raises(FileNotFoundError):
+            EmbeddingCassette(str(tmp_path / "missing.cassette"), mode="replay")
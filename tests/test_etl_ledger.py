@@ -0,0 +1,138 @@
+"""
+Tests para el ledger de ejecuciones del ETL (reanudación y leases).
+"""
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add parent directory to path to import backend modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.app.models import EtlRun, EtlTask
+from backend.app.services.etl_ledger import BRANCH, EtlLedger
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    EtlRun.__table__.create(engine)
+    EtlTask.__table__.create(engine)
+    return sessionmaker(bind=engine)
+
+
+def new_run(session_factory, worker="host-a:1"):
+    return EtlLedger.create(
+        session_factory,
+        [("web", "17.0"), ("web", "16.0"), ("web", "17.0")],
+        options={"repos": ["web"], "versions": ["17.0", "16.0"]},
+        worker=worker,
+    )
+
+
+def expire_leases(session_factory):
+    """Simula un proceso caído hace horas."""
+    with session_factory() as session:
+        session.query(EtlTask).filter(EtlTask.status == "running").update(
+            {EtlTask.locked_at: datetime(2000, 1, 1)}
+        )
+        session.commit()
+
+
+def statuses(session_factory, run_id):
+    with session_factory() as session:
+        return {
+            name: status
+            for name, status in session.query(EtlTask.technical_name, EtlTask.status).filter(
+                EtlTask.run_id == run_id, EtlTask.version == "17.0"
+            )
+        }
+
+
+class TestClaims:
+
+    def test_create_seeds_one_task_per_branch(self, session_factory):
+        ledger = new_run(session_factory)
+        assert ledger.stats() == {"branches": {"pending": 2}, "modules": {}}
+        assert ledger.options["versions"] == ["17.0", "16.0"]
+
+    def test_branch_is_claimed_once(self, session_factory):
+        first = new_run(session_factory)
+        second = EtlLedger.open(session_factory, first.run_id, worker="host-b:2")
+
+        claim = first.claim_branch("web", "17.0")
+        assert claim is not None and claim.modules is None
+        assert second.claim_branch("web", "17.0") is None
+        assert second.claim_branch("web", "16.0") is not None
+
+    def test_expired_lease_can_be_reclaimed(self, session_factory):
+        first = new_run(session_factory)
+        first.claim_branch("web", "17.0")
+        expire_leases(session_factory)
+
+        second = EtlLedger.open(session_factory, first.run_id, worker="host-b:2")
+        assert second.claim_branch("web", "17.0") is not None
+
+
+class TestProgress:
+
+    def test_modules_and_run_completion(self, session_factory):
+        ledger = new_run(session_factory)
+        for version in ("17.0", "16.0"):
+            ledger.claim_branch("web", version)
+            ledger.complete_branch("web", version)
+        ledger.start_modules("web", "17.0", ["web_a", "web_b", "web_c"])
+        ledger.complete_modules([("web", "17.0", "web_a"), ("web", "17.0", "web_b")])
+        ledger.fail_module("web", "17.0", "web_c", "no se pudo parsear")
+
+        stats = ledger.finish()
+        assert stats["modules"] == {"done": 2, "failed": 1}
+        with session_factory() as session:
+            assert session.get(EtlRun, ledger.run_id).status == "failed"
+        assert EtlLedger.open(session_factory).run_id == ledger.run_id
+
+    def test_release(self, session_factory):
+        ledger = new_run(session_factory)
+        ledger.claim_branch("web", "17.0")
+        ledger.start_modules("web", "17.0", ["web_a"])
+        assert ledger.release() == 2
+        assert statuses(session_factory, ledger.run_id) == {BRANCH: "pending", "web_a": "pending"}
+
+
+class TestResume:
+
+    def crashed_run(self, session_factory):
+        """Proceso A descubre la rama, escribe un módulo y muere."""
+        ledger = new_run(session_factory)
+        ledger.claim_branch("web", "17.0")
+        ledger.start_modules("web", "17.0", ["web_a", "web_b", "web_c"])
+        ledger.complete_branch("web", "17.0")
+        ledger.complete_modules([("web", "17.0", "web_a")])
+        ledger.fail_module("web", "17.0", "web_c", "error en embedding")
+        expire_leases(session_factory)
+        return ledger
+
+    def test_resume_only_pending_modules(self, session_factory):
+        run_id = self.crashed_run(session_factory).run_id
+        resumed = EtlLedger.open(session_factory, worker="host-b:2")
+        assert resumed.run_id == run_id
+        assert resumed.reopen() == 2  # web_b y su rama
+
+        claim = resumed.claim_branch("web", "17.0")
+        assert claim.modules == {"web_b"}
+        resumed.start_modules("web", "17.0", [], unchanged=["web_b"])
+        assert statuses(session_factory, run_id) == {
+            BRANCH: "running", "web_a": "done", "web_b": "done", "web_c": "failed",
+        }
+
+    def test_retry_failed(self, session_factory):
+        self.crashed_run(session_factory)
+        resumed = EtlLedger.open(session_factory, worker="host-b:2")
+        resumed.reopen(retry_failed=True)
+        assert resumed.claim_branch("web", "17.0").modules == {"web_b", "web_c"}
@@ -0,0 +1,150 @@
+"""
+Tests para el pipeline por etapas del ETL y el gobernador de rate limit.
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path to import backend modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.app.services.etl_pipeline import Pipeline, Stage
+from backend.app.services.rate_limit import RateLimitGovernor
+
+
+class TestPipeline:
+
+    def test_items_flow_through_all_stages(self):
+        results = []
+        lock = threading.Lock()
+
+        def collect(item):
+            with lock:
+                results.append(item)
+
+        pipeline = Pipeline([
+            Stage("expand", lambda x: [x, x + 100], workers=3),
+            Stage("double", lambda x: [x * 2], workers=2),
+            Stage("collect", collect),
+        ], queue_size=2)
+
+        stats = pipeline.run(range(10))
+
+        assert sorted(results) == sorted([x * 2 for i in range(10) for x in (i, i + 100)])
+        assert stats["expand"].processed == 10
+        assert stats["expand"].emitted == 20
+        assert stats["collect"].processed == 20
+
+    def test_errors_are_counted_and_do_not_stop_pipeline(self):
+        results = []
+
+        def fail_on_odd(x):
+            if x % 2:
+                raise ValueError(f"odd {x}")
+            return [x]
+
+        stats = Pipeline([
+            Stage("check", fail_on_odd, workers=2),
+            Stage("collect", results.append),
+        ]).run(range(6))
+
+        assert sorted(results) == [0, 2, 4]
+        assert stats["check"].errors == 3
+        assert len(stats["check"].error_samples) == 3
+
+    def test_none_output_filters_item(self):
+        results = []
+        Pipeline([
+            Stage("drop", lambda x: None),
+            Stage("collect", results.append),
+        ]).run([1, 2])
+
+        assert results == []
+
+    def test_batched_stage_receives_lists(self):
+        batches = []
+        results = []
+
+        def embed(items):
+            batches.append(list(items))
+            return [x * 10 for x in items]
+
+        stats = Pipeline([
+            Stage("embed", embed, batch_size=4, batch_wait=0.05),
+            Stage("collect", results.append),
+        ]).run(range(10))
+
+        assert sorted(results) == [x * 10 for x in range(10)]
+        assert all(1 <= len(b) <= 4 for b in batches)
+        assert sum(len(b) for b in batches) == 10
+        assert stats["embed"].processed == 10
+
+    def test_stage_workers_run_concurrently(self):
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def slow(x):
+            with lock:
+                active.append(x)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.remove(x)
+
+        Pipeline([Stage("slow", slow, workers=4)]).run(range(8))
+
+        assert max(peak) > 1
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class TestRateLimitGovernor:
+
+    def test_retry_after_pauses_and_requests_retry(self):
+        clock = FakeClock()
+        governor = RateLimitGovernor(clock=clock, sleep=clock.sleep)
+
+        wait = governor.update(403, {"Retry-After": "30", "X-RateLimit-Remaining": "10"})
+
+        assert wait == 30
+        with governor.slot():
+            pass
+        assert clock.slept == [30]
+        assert governor.stats()["throttled"] == 1
+
+    def test_low_remaining_waits_for_reset(self):
+        clock = FakeClock()
+        governor = RateLimitGovernor(reserve=50, clock=clock, sleep=clock.sleep)
+
+        wait = governor.update(200, {"X-RateLimit-Remaining": "40", "X-RateLimit-Reset": "1120"})
+
+        assert wait is None
+        governor.wait()
+        assert clock.slept == [120]
+
+    def test_healthy_response_does_not_pause(self):
+        clock = FakeClock()
+        governor = RateLimitGovernor(reserve=50, clock=clock, sleep=clock.sleep)
+
+        assert governor.update(200, {"X-RateLimit-Remaining": "4000", "X-RateLimit-Reset": "2000"}) is None
+        governor.wait()
+
+        assert clock.slept == []
+        assert governor.remaining == 4000
+
+    def test_forbidden_without_rate_limit_headers_is_not_throttled(self):
+        governor = RateLimitGovernor()
+        assert governor.update(403, {}) is None
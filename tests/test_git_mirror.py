@@ -0,0 +1,119 @@
+"""
+Tests para la lectura desde mirrors git locales (repos fixture en tmp_path).
+"""
+import shutil
+import subprocess
+import sys
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path to import backend modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.app.services.git_mirror import GitMirror, MirrorPool
+from backend.app.services.module_index import index_modules
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git no disponible")
+
+
+def git(cwd, *args, date=None):
+    env = {
+        "GIT_AUTHOR_NAME": "t", "GIT_AUTHOR_EMAIL": "t@t", "GIT_COMMITTER_NAME": "t",
+        "GIT_COMMITTER_EMAIL": "t@t", "HOME": str(cwd), "PATH": "/usr/bin:/bin",
+    }
+    if date:
+        env["GIT_AUTHOR_DATE"] = env["GIT_COMMITTER_DATE"] = date
+    return subprocess.run(
+        ["git", *args], cwd=cwd, env=env, check=True, capture_output=True
+    ).stdout.decode().strip()
+
+
+def write(root: Path, path: str, content: str) -> None:
+    target = root / path
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text(content)
+
+
+@pytest.fixture(scope="module")
+def mirror_dir(tmp_path_factory):
+    """Mirror bare de 'web' con la rama 17.0: web_a (2023) y web_b (2024)."""
+    base = tmp_path_factory.mktemp("mirrors")
+    work = base / "work"
+    work.mkdir()
+    git(work, "init", "-q", "-b", "17.0")
+
+    write(work, "web_a/__manifest__.py", "{'name': 'Web A'}\n")
+    write(work, "web_a/README.rst", "Web A\n")
+    write(work, "web_b/__manifest__.py", "{'name': 'Web B'}\n")
+    git(work, "add", ".")
+    git(work, "commit", "-q", "-m", "init", date="2023-01-01T10:00:00+00:00")
+
+    write(work, "web_b/models/b.py", "x = 1\n")
+    git(work, "add", ".")
+    git(work, "commit", "-q", "-m", "b", date="2024-06-01T12:00:00+02:00")
+
+    git(base, "clone", "-q", "--mirror", str(work), str(base / "web.git"))
+    return base
+
+
+class TestGitMirror:
+
+    def test_head_and_tree(self, mirror_dir):
+        mirror = GitMirror(mirror_dir / "web.git")
+        head = mirror.head("17.0")
+        assert head is not None and len(head) == 40
+        assert mirror.head("16.0") is None
+
+        modules = index_modules(mirror.ls_tree(head))
+        assert set(modules) == {"web_a", "web_b"}
+        assert modules["web_a"].readme_path == "web_a/README.rst"
+
+    def test_cat_file_batch(self, mirror_dir):
+        mirror = GitMirror(mirror_dir / "web.git")
+        modules = index_modules(mirror.ls_tree(mirror.head("17.0")))
+        try:
+            assert mirror.read_text(modules["web_a"].manifest_sha) == "{'name': 'Web A'}\n"
+            assert mirror.read_text(modules["web_a"].readme_sha) == "Web A\n"
+            assert mirror.read_blob("0" * 40) is None
+            # Un único proceso para todas las lecturas
+            assert mirror.batch.reads == 2
+        finally:
+            mirror.close()
+
+    def test_concurrent_reads(self, mirror_dir):
+        mirror = GitMirror(mirror_dir / "web.git")
+        sha = index_modules(mirror.ls_tree("17.0"))["web_b"].manifest_sha
+        results = []
+
+        def read():
+            for _ in range(20):
+                results.append(mirror.read_text(sha))
+
+        threads = [threading.Thread(target=read) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        mirror.close()
+        assert results == ["{'name': 'Web B'}\n"] * 80
+
+    def test_last_commit_dates_per_module(self, mirror_dir):
+        mirror = GitMirror(mirror_dir / "web.git")
+        dates = mirror.last_commit_dates("17.0", ["web_a", "web_b"])
+
+        assert dates["web_a"] == datetime(2023, 1, 1, 10, tzinfo=timezone.utc)
+        assert dates["web_b"].astimezone(timezone.utc) == datetime(
+            2024, 6, 1, 10, tzinfo=timezone.utc
+        )
+
+
+class TestMirrorPool:
+
+    def test_lookup(self, mirror_dir):
+        pool = MirrorPool(mirror_dir)
+        assert pool.get("web") is pool.get("web")
+        assert pool.get("server-tools") is None
+        pool.close()
@@ -0,0 +1,140 @@
+"""
+Tests para la descarga de ficheros por lotes con GraphQL (stub HTTP local).
+"""
+import json
+import re
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+import requests
+
+# Add parent directory to path to import backend modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.app.services.graphql_blobs import GraphQLBlobFetcher, build_query
+
+FILES = {f"mod_{i}/__manifest__.py": f"{{'name': 'Mod {i}'}}" for i in range(30)}
+FILES["icon.png"] = None  # binario
+
+
+class GitHubStub(BaseHTTPRequestHandler):
+    """Endpoint GraphQL mínimo: resuelve ``object(expression)`` con FILES."""
+
+    max_fields = 100
+    status = 200
+    queries = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        aliases = re.findall(r"(f\d+): object", body["query"])
+        type(self).queries.append(len(aliases))
+
+        if self.status != 200:
+            return self._reply(self.status, {"message": "boom"})
+        if len(aliases) > self.max_fields:
+            # Lo que hace GitHub cuando la query tarda demasiado
+            return self._reply(502, {"message": "timeout"})
+
+        repository = {}
+        errors = []
+        for alias in aliases:
+            ref, path = body["variables"]["e" + alias[1:]].split(":", 1)
+            if path == "broken.py":
+                errors.append({"path": ["repository", alias], "message": "oops"})
+                repository[alias] = None
+            elif path not in FILES:
+                repository[alias] = None
+            else:
+                text = FILES[path]
+                repository[alias] = {"text": text, "isBinary": text is None}
+        data = {"repository": repository,
+                "rateLimit": {"cost": 1, "remaining": 4000, "resetAt": "2030-01-01T00:00:00Z"}}
+        self._reply(200, {"data": data, "errors": errors} if errors else {"data": data})
+
+    def _reply(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    GitHubStub.max_fields = 100
+    GitHubStub.status = 200
+    GitHubStub.queries = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), GitHubStub)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/graphql"
+    server.shutdown()
+    server.server_close()
+
+
+def fetcher(url, **kwargs):
+    return GraphQLBlobFetcher(requests.Session(), url, **kwargs)
+
+
+class TestGraphQLBlobFetcher:
+
+    def test_query_uses_aliases_and_variables(self):
+        query = build_query(2)
+        assert "$e1: String!" in query
+        assert "f1: object(expression: $e1)" in query
+
+    def test_fetches_in_batches(self, stub):
+        rest = []
+        client = fetcher(stub, batch_size=10, growth=5)
+        paths = list(FILES)[:25] + ["missing/__manifest__.py"]
+
+        result = client.fetch("OCA", "web", "17.0", paths, fallback=rest.append)
+
+        assert result["mod_3/__manifest__.py"] == "{'name': 'Mod 3'}"
+        assert result["missing/__manifest__.py"] is None
+        assert rest == []
+        assert GitHubStub.queries == [10, 15, 1]
+        assert client.stats()["files"] == 26
+
+    def test_binary_is_none(self, stub):
+        result = fetcher(stub).fetch("OCA", "web", "17.0", ["icon.png"], fallback=lambda p: "rest")
+        assert result == {"icon.png": None}
+
+    def test_shrinks_batch_on_limits(self, stub):
+        GitHubStub.max_fields = 8
+        client = fetcher(stub, batch_size=32, min_batch_size=2, growth=0)
+
+        result = client.fetch("OCA", "web", "17.0", list(FILES)[:20], fallback=lambda p: "rest")
+
+        assert GitHubStub.queries[:3] == [20, 16, 8]
+        assert all(value != "rest" for value in result.values())
+        assert client.batch_size == 8
+        assert client.stats()["shrinks"] == 2
+
+    def test_falls_back_to_rest_on_errors(self, stub):
+        GitHubStub.status = 500
+        rest = []
+        result = fetcher(stub, batch_size=5).fetch(
+            "OCA", "web", "17.0", list(FILES)[:7], fallback=lambda p: rest.append(p) or "rest"
+        )
+        assert len(rest) == 7
+        assert set(result.values()) == {"rest"}
+
+    def test_falls_back_when_batch_cannot_shrink(self, stub):
+        GitHubStub.max_fields = 1
+        client = fetcher(stub, batch_size=4, min_batch_size=2)
+        result = client.fetch("OCA", "web", "17.0", list(FILES)[:4], fallback=lambda p: "rest")
+        assert set(result.values()) == {"rest"}
+        assert GitHubStub.queries == [4, 2, 2]
+
+    def test_partial_errors_use_rest_for_those_files(self, stub):
+        paths = ["mod_1/__manifest__.py", "broken.py"]
+        result = fetcher(stub).fetch("OCA", "web", "17.0", paths, fallback=lambda p: "rest")
+        assert result == {"mod_1/__manifest__.py": "{'name': 'Mod 1'}", "broken.py": "rest"}
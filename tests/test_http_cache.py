@@ -0,0 +1,83 @@
+"""
+Tests para la cache HTTP en disco (peticiones condicionales con ETag).
+"""
+import os
+import sys
+from pathlib import Path
+
+import requests
+
+# Add parent directory to path to import backend modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.app.services.http_cache import HttpCache, replay_response
+
+URL = "https://api.github.com/repos/OCA/web"
+
+
+def make_response(status=200, body=b'{"stargazers_count": 10}', headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.headers.update(headers or {})
+    response.url = URL
+    return response
+
+
+class TestHttpCache:
+
+    def test_store_and_conditional_headers(self, tmp_path):
+        cache = HttpCache(tmp_path)
+        assert cache.get(URL) is None
+        assert cache.conditional_headers(None) == {}
+
+        assert cache.store(URL, make_response(headers={"ETag": 'W/"abc"', "X-Other": "1"}))
+        entry = cache.get(URL)
+        assert entry.body == b'{"stargazers_count": 10}'
+        assert entry.headers == {"ETag": 'W/"abc"'}
+        assert cache.conditional_headers(entry) == {"If-None-Match": 'W/"abc"'}
+
+    def test_only_cacheable_responses_are_stored(self, tmp_path):
+        cache = HttpCache(tmp_path)
+        assert not cache.store(URL, make_response(status=404, headers={"ETag": "x"}))
+        assert not cache.store(URL, make_response())  # sin validadores
+        assert cache.get(URL) is None
+
+    def test_replay_304(self, tmp_path):
+        cache = HttpCache(tmp_path)
+        cache.store(URL, make_response(headers={"ETag": "x", "Content-Type": "application/json"}))
+
+        not_modified = make_response(status=304, body=b"",
+                                     headers={"X-RateLimit-Remaining": "4999"})
+        response = replay_response(cache.get(URL), not_modified)
+
+        assert response.status_code == 200
+        assert response.json() == {"stargazers_count": 10}
+        assert response.headers["X-RateLimit-Remaining"] == "4999"
+
+    def test_size_eviction_removes_least_recently_used(self, tmp_path):
+        cache = HttpCache(tmp_path, max_bytes=1300)
+        body = b"x" * 300
+        for i in range(3):
+            cache.store(f"{URL}/{i}", make_response(body=body, headers={"ETag": str(i)}))
+            os.utime(cache._path(f"{URL}/{i}"), (1000 + i, 1000 + i))
+        cache.touch(f"{URL}/0")  # la más antigua pasa a ser la más reciente
+
+        cache.store(f"{URL}/3", make_response(body=body, headers={"ETag": "3"}))
+
+        assert cache.get(f"{URL}/1") is None
+        assert cache.get(f"{URL}/0") is not None
+        assert cache.get(f"{URL}/3") is not None
+        assert cache.size <= 1300
+        assert cache.stats()["evictions"] >= 1
+
+    def test_size_survives_restart(self, tmp_path):
+        cache = HttpCache(tmp_path)
+        cache.store(URL, make_response(headers={"ETag": "x"}))
+        assert HttpCache(tmp_path).size == cache.size > 0
+
+    def test_stats(self, tmp_path):
+        cache = HttpCache(tmp_path)
+        cache.record(hit=True)
+        cache.record(hit=False)
+        assert cache.stats()["hit_ratio"] == 0.5
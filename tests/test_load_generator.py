@@ -0,0 +1,99 @@
+"""
+Tests para el generador de carga: bucle cerrado, llegadas abiertas
+(Poisson), exclusión del warmup y contabilidad de errores.
+"""
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path to import backend modules and scripts
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from benchmark import LoadGenerator
+
+QUERIES = [{"id": f"q{i}", "query": f"query {i}", "version": "17.0"} for i in range(3)]
+
+
+class FakeTarget:
+    """Target en memoria: q1 devuelve un error HTTP y q2 lanza una excepción."""
+
+    name = "fake"
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def execute(self, query):
+        with self._lock:
+            self.calls.append(query["id"])
+        if self.delay:
+            time.sleep(self.delay)
+        if query["id"] == "q1":
+            return {"error": "HTTP 500", "phases_ms": {}}
+        if query["id"] == "q2":
+            raise ValueError("boom")
+        return {"error": None, "phases_ms": {"vector_query": 1.0}}
+
+
+class TestClosedLoop:
+
+    def test_request_count_and_errors(self):
+        target = FakeTarget()
+        report = LoadGenerator(target, QUERIES, concurrency=3, duration=10, max_requests=30).run()
+
+        assert len(target.calls) == 30
+        assert report["metadata"]["mode"] == "closed"
+        assert report["throughput"]["requests"] == 30
+        assert report["throughput"]["successful"] == 10
+        assert report["errors"]["count"] == 20
+        assert report["errors"]["rate"] == pytest.approx(2 / 3)
+        assert report["errors"]["by_type"] == {"HTTP 500": 10, "ValueError: boom": 10}
+        assert list(report["per_query_latency_ms"]) == ["q0"]
+        assert report["phases_ms"]["vector_query"]["count"] == 10
+
+    def test_warmup_samples_are_excluded(self):
+        target = FakeTarget(delay=0.01)
+        generator = LoadGenerator(target, QUERIES[:1], concurrency=1, duration=0.1, warmup=0.1)
+        report = generator.run()
+
+        measured = report["throughput"]["requests"]
+        assert 0 < measured < len(target.calls)
+        assert all(sample["start"] >= generator._measure_from for sample in generator._samples)
+        assert report["metadata"]["warmup_seconds"] == 0.1
+
+
+class TestOpenLoop:
+
+    def test_fixed_rate(self):
+        target = FakeTarget()
+        report = LoadGenerator(target, QUERIES[:1], concurrency=2, duration=10,
+                               rate=500, max_requests=20).run()
+        assert report["metadata"]["mode"] == "open"
+        assert report["metadata"]["poisson_arrivals"] is False
+        assert report["throughput"]["requests"] == 20
+        assert report["errors"]["count"] == 0
+
+    def test_poisson_arrivals_stop_at_deadline(self):
+        random.seed(7)
+        target = FakeTarget()
+        report = LoadGenerator(target, QUERIES[:1], concurrency=4, duration=0.2,
+                               rate=100, poisson=True).run()
+        assert report["metadata"]["poisson_arrivals"] is True
+        # ~20 llegadas esperadas en 0.2s a 100/s
+        assert 5 <= report["throughput"]["requests"] <= 60
+        assert report["throughput"]["requests"] == len(target.calls)
+
+    def test_latency_includes_queueing(self):
+        # Un solo worker y llegadas más rápidas que el servicio: las peticiones esperan
+        target = FakeTarget(delay=0.02)
+        generator = LoadGenerator(target, QUERIES[:1], concurrency=1, duration=10,
+                                  rate=1000, max_requests=5)
+        generator.run()
+        last = max(generator._samples, key=lambda sample: sample["start"])
+        assert last["latency_ms"] > last["service_ms"] + 20
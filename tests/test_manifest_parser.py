@@ -0,0 +1,141 @@
+"""
+Tests para la ruta rápida de parseo de manifests y su cache por SHA.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path to import backend modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.app.services.manifest_parser import ManifestCache, ManifestParser, content_sha
+from backend.app.utils.parsers import (
+    locate_manifest_dict,
+    parse_manifest,
+    parse_manifest_ast,
+    parse_manifest_fast,
+)
+
+OCA_MANIFEST = '''# Copyright 2020 Tecnativa - Pedro M. Baeza
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+{
+    "name": "Sale order type",
+    "summary": "Types for sale orders",
+    "version": "16.0.1.2.0",
+    "author": "Odoo Community Association (OCA)",
+    "website": "https://github.com/OCA/sale-workflow",
+    "license": "AGPL-3",
+    "depends": ["sale_stock", "account"],
+    "data": [
+        "security/ir.model.access.csv",  # permisos
+        "views/sale_order_type_view.xml",
+    ],
+    "assets": {"web.assets_backend": ["sale_order_type/static/src/**/*"]},
+    "installable": True,
+    "auto_install": False,
+}
+'''
+
+LEGACY_MANIFEST = '''# -*- coding: utf-8 -*-
+"""
+Cabecera antigua con un { suelto
+"""
+manifest = {
+    'name': u'Contrato',
+    'description': \'\'\'
+Línea "uno"
+    línea 'dos'
+\'\'\',
+    'summary': 'Partido '
+               'en dos',
+    'sequence': 10,
+    'price': 1.5,
+    'external_dependencies': {'python': ('lxml',)},
+    'demo': [],
+}
+# fin
+'''
+
+
+class TestFastPath:
+
+    @pytest.mark.parametrize("content", [OCA_MANIFEST, LEGACY_MANIFEST])
+    def test_same_result_as_full_parse(self, content):
+        manifest = parse_manifest_fast(content)
+        assert manifest is not None
+        assert manifest == parse_manifest_ast(content)
+
+    def test_locates_dict_after_header(self):
+        start = locate_manifest_dict(LEGACY_MANIFEST)
+        assert LEGACY_MANIFEST[start:].startswith("{\n    'name'")
+
+    def test_translations_use_ast_fallback(self):
+        assert parse_manifest_fast("{'name': _('X')}") == {"name": "X"}
+
+    def test_code_after_dict_falls_back_to_full_parse(self):
+        content = "{'name': 'X'}\nimport os\n"
+        assert parse_manifest_fast(content) is None
+        assert parse_manifest(content) == {"name": "X"}
+
+    @pytest.mark.parametrize("content", [
+        "{'name': __import__('os').getcwd()}",
+        "{'name': 'X'.upper()}",
+        "{'name': 'a' + 'b'}",
+    ])
+    def test_code_is_not_executed(self, content):
+        assert parse_manifest(content) is None
+
+    def test_mixed_str_and_bytes_is_rejected(self):
+        assert parse_manifest("{'name': 'a' b'b'}") is None
+
+
+class TestManifestCache:
+
+    def test_roundtrip_persists_across_instances(self, tmp_path):
+        path = str(tmp_path / "manifests.sqlite3")
+        cache = ManifestCache(path)
+        cache.put_many({"a" * 40: {"name": "X", "depends": ["base"]}, "b" * 40: None})
+        cache.close()
+
+        cache = ManifestCache(path)
+        found = cache.get_many(["a" * 40, "b" * 40, "c" * 40])
+        assert found == {"a" * 40: {"name": "X", "depends": ["base"]}, "b" * 40: None}
+        assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 1
+
+    def test_parser_version_is_part_of_key(self, tmp_path):
+        path = str(tmp_path / "manifests.sqlite3")
+        ManifestCache(path, parser_version="1").put_many({"a" * 40: {"name": "X"}})
+        assert ManifestCache(path, parser_version="2").get_many(["a" * 40]) == {}
+
+
+class TestManifestParser:
+
+    def test_parse_many_uses_cache_and_deduplicates(self, tmp_path):
+        parser = ManifestParser(ManifestCache(str(tmp_path / "manifests.sqlite3")))
+        items = [("s1", OCA_MANIFEST, "a/__manifest__.py"),
+                 ("s1", OCA_MANIFEST, "b/__manifest__.py"),
+                 (None, "{'name': 'Y'}", "c/__manifest__.py")]
+
+        first = parser.parse_many(items)
+        assert first[0] == first[1] == parse_manifest_ast(OCA_MANIFEST)
+        assert first[2] == {"name": "Y"}
+        assert parser.parsed == 2
+
+        assert parser.parse_many(items) == first
+        assert parser.parsed == 2
+        assert parser.cache.get_many([content_sha("{'name': 'Y'}")])
+
+    def test_unparseable_manifest_is_cached_as_none(self, tmp_path):
+        parser = ManifestParser(ManifestCache(str(tmp_path / "manifests.sqlite3")))
+        assert parser.parse("no es un manifest", sha="s1") is None
+        assert parser.cache.get("s1") == (True, None)
+
+    def test_process_pool(self):
+        parser = ManifestParser(processes=2, chunksize=2)
+        try:
+            contents = [f"{{'name': 'M{i}', 'depends': ['base']}}" for i in range(6)]
+            results = parser.parse_many([(None, content, "") for content in contents])
+        finally:
+            parser.close()
+        assert [manifest["name"] for manifest in results] == [f"M{i}" for i in range(6)]
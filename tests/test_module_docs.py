@@ -0,0 +1,54 @@
+"""
+Tests para los textos largos de los módulos (odoo_module_docs).
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path to import backend modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.app.services import module_docs
+from backend.app.services.module_docs import (
+    CODEC_PLAIN,
+    CODEC_ZSTD,
+    decode_doc,
+    description_excerpt,
+    encode_doc,
+    resolve_codec,
+)
+
+
+class TestExcerpt:
+
+    def test_short_description_is_kept(self):
+        assert description_excerpt("Ventas") == "Ventas"
+        assert description_excerpt(None) is None
+
+    def test_long_description_is_truncated(self):
+        assert description_excerpt("a" * 250) == "a" * 200 + "..."
+
+
+class TestCodecs:
+
+    def test_plain_roundtrip(self):
+        data = encode_doc("Módulo de ventas ✓", CODEC_PLAIN)
+        assert data == "Módulo de ventas ✓".encode("utf-8")
+        assert decode_doc(memoryview(data), CODEC_PLAIN) == "Módulo de ventas ✓"
+        assert encode_doc(None) is None and decode_doc(None) is None
+
+    def test_unknown_codec(self):
+        with pytest.raises(ValueError):
+            resolve_codec("gzip")
+
+    def test_zstd_falls_back_without_package(self, monkeypatch):
+        monkeypatch.setattr(module_docs, "zstandard", None)
+        assert resolve_codec(CODEC_ZSTD) == CODEC_PLAIN
+
+    def test_zstd_roundtrip(self):
+        pytest.importorskip("zstandard")
+        readme = "Usage\n=====\n" + "Configure the sale order type. " * 200
+        data = encode_doc(readme, CODEC_ZSTD)
+        assert len(data) < len(readme) / 10
+        assert decode_doc(data, CODEC_ZSTD) == readme
@@ -0,0 +1,71 @@
+"""
+Tests para el índice de módulos construido desde el árbol git.
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import backend modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.app.services.module_index import index_modules, module_changed
+
+BLOBS = {
+    "README.md": "r0",
+    "setup/sale_a/setup.py": "s0",
+    "sale_a/__manifest__.py": "m1",
+    "sale_a/README.rst": "r1",
+    "sale_a/readme.md": "r1b",
+    "sale_a/models/sale.py": "p1",
+    "sale_b/__manifest__.py": "m2",
+    "sale_b/readme/DESCRIPTION.rst": "d2",
+    "sale_b/static/description/icon.png": "i2",
+}
+
+
+class TestIndexModules:
+
+    def test_finds_modules_and_readmes(self):
+        modules = index_modules(BLOBS)
+
+        assert set(modules) == {"sale_a", "sale_b"}
+        assert modules["sale_a"].manifest_sha == "m1"
+        assert modules["sale_a"].technical_name == "sale_a"
+        assert modules["sale_b"].readme_path is None
+        assert modules["sale_b"].readme_sha is None
+
+    def test_readme_preference_order(self):
+        module = index_modules(BLOBS)["sale_a"]
+        assert module.readme_path == "sale_a/README.rst"
+        assert module.readme_sha == "r1"
+
+    def test_extra_files(self):
+        modules = index_modules(BLOBS)
+        assert modules["sale_b"].extras == {
+            "readme/DESCRIPTION.rst": "d2",
+            "static/description/icon.png": "i2",
+        }
+        assert modules["sale_a"].extras == {}
+
+    def test_ignores_root_manifest(self):
+        assert index_modules({"__manifest__.py": "x"}) == {}
+
+
+class TestModuleChanged:
+
+    def test_unchanged(self):
+        module = index_modules(BLOBS)["sale_a"]
+        assert not module_changed(module, "m1", "r1")
+
+    def test_manifest_or_readme_changed(self):
+        module = index_modules(BLOBS)["sale_a"]
+        assert module_changed(module, "old", "r1")
+        assert module_changed(module, "m1", "old")
+
+    def test_readme_removed(self):
+        module = index_modules({"sale_a/__manifest__.py": "m1"})["sale_a"]
+        assert module_changed(module, "m1", "r1")
+
+    def test_unknown_sha_or_tombstone_reprocesses(self):
+        module = index_modules(BLOBS)["sale_a"]
+        assert module_changed(module, None, None)
+        assert module_changed(module, "m1", "r1", removed=True)
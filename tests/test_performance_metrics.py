@@ -0,0 +1,105 @@
+"""
+Tests unitarios para las métricas de rendimiento (latencias).
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import backend modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from backend.app.metrics.performance import (
+    pareto_frontier,
+    parse_server_timing,
+    percentile,
+    summarize_latencies,
+    summarize_phases,
+)
+
+
+class TestPercentile:
+    """Tests para percentiles."""
+
+    def test_interpolates(self):
+        """Interpolación lineal entre muestras."""
+        assert percentile([10, 20, 30, 40], 50) == 25.0
+        assert percentile([10, 20, 30, 40], 0) == 10.0
+        assert percentile([10, 20, 30, 40], 100) == 40.0
+
+    def test_unsorted_input(self):
+        """No requiere muestras ordenadas."""
+        assert percentile([40, 10, 30, 20], 50) == 25.0
+
+    def test_empty(self):
+        """Sin muestras retorna 0."""
+        assert percentile([], 99) == 0.0
+
+    def test_out_of_range(self):
+        """Percentil fuera de [0, 100]."""
+        with pytest.raises(ValueError):
+            percentile([1.0], 101)
+
+
+class TestSummaries:
+    """Tests para resúmenes de latencia."""
+
+    def test_summarize_latencies(self):
+        """Resumen con percentiles y extremos."""
+        summary = summarize_latencies([float(i) for i in range(1, 101)])
+
+        assert summary["count"] == 100
+        assert summary["min"] == 1.0
+        assert summary["max"] == 100.0
+        assert summary["p50"] == pytest.approx(50.5)
+        assert summary["p99"] == pytest.approx(99.01)
+
+    def test_summarize_empty(self):
+        """Resumen vacío con ceros."""
+        assert summarize_latencies([])["count"] == 0
+
+    def test_summarize_phases(self):
+        """Agrupa muestras por fase."""
+        phases = summarize_phases([{"embed": 10.0, "db": 2.0}, {"embed": 20.0}])
+
+        assert phases["embed"]["count"] == 2
+        assert phases["embed"]["mean"] == 15.0
+        assert phases["db"]["count"] == 1
+
+
+class TestParseServerTiming:
+    """Tests para el parseo de Server-Timing."""
+
+    def test_parse(self):
+        """Extrae dur por métrica."""
+        assert parse_server_timing("embed;dur=120.0, db;dur=30.5, score;desc=x;dur=1") == {
+            "embed": 120.0,
+            "db": 30.5,
+            "score": 1.0,
+        }
+
+    def test_missing_header(self):
+        """Cabecera ausente."""
+        assert parse_server_timing(None) == {}
+
+
+class TestParetoFrontier:
+
+    def test_dominated_points_removed(self):
+        points = [
+            {"recall": 0.90, "p99": 5.0},
+            {"recall": 0.80, "p99": 6.0},
+            {"recall": 0.99, "p99": 9.0},
+            {"recall": 0.95, "p99": 9.5},
+        ]
+
+        frontier = pareto_frontier(points, maximize="recall", minimize="p99")
+
+        assert frontier == [{"recall": 0.90, "p99": 5.0}, {"recall": 0.99, "p99": 9.0}]
+
+    def test_ties_on_latency_keep_best_recall(self):
+        points = [{"recall": 0.5, "p99": 1.0}, {"recall": 0.7, "p99": 1.0}]
+
+        assert pareto_frontier(points, "recall", "p99") == [{"recall": 0.7, "p99": 1.0}]
+
+    def test_empty(self):
+        assert pareto_frontier([], "recall", "p99") == []
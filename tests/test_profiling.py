@@ -0,0 +1,108 @@
+"""
+Tests para el profiler de muestreo, su retención y el acceso de
+administrador a ``/search?profile=1``.
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Add parent directory to path to import backend modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.app.config import get_settings
+from backend.app.core import profiling
+from backend.app.core.profiling import maybe_profile, prune_profiles, should_profile
+from backend.app.core.security import verify_token
+
+
+class TestShouldProfile:
+
+    def test_rate_zero_never_profiles(self):
+        assert not any(should_profile(sample_rate=0) for _ in range(100))
+
+    def test_rate_one_always_profiles(self):
+        assert all(should_profile(sample_rate=1) for _ in range(100))
+
+    def test_force_overrides_rate(self):
+        assert should_profile(force=True, sample_rate=0)
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "profiling_output_dir", str(tmp_path))
+    monkeypatch.setattr(get_settings(), "profiling_sample_rate", 0.0)
+    monkeypatch.setattr(profiling, "_PyinstrumentProfiler", None)
+    return tmp_path
+
+
+class TestMaybeProfile:
+
+    def test_inactive_writes_nothing(self, profile_dir):
+        with maybe_profile("search") as run:
+            sum(range(100))
+        assert not run.active and run.path is None
+        assert list(profile_dir.iterdir()) == []
+
+    def test_cprofile_fallback_writes_prof(self, profile_dir):
+        with maybe_profile("mcp search", force=True) as run:
+            sum(range(100))
+        assert run.active
+        path = Path(run.path)
+        assert path.parent == profile_dir
+        assert path.name.startswith("mcp_search_") and path.suffix == ".prof"
+        assert path.stat().st_size > 0
+
+    def test_old_profiles_are_pruned(self, profile_dir, monkeypatch):
+        monkeypatch.setattr(get_settings(), "profiling_max_files", 2)
+        for i in range(3):
+            old = profile_dir / f"old_{i}.prof"
+            old.write_text("x")
+            os.utime(old, (1000 + i, 1000 + i))
+        with maybe_profile("search", force=True) as run:
+            pass
+        assert sorted(path.name for path in profile_dir.iterdir()) == sorted(
+            ["old_2.prof", Path(run.path).name]
+        )
+
+    def test_no_limit(self, tmp_path):
+        for i in range(3):
+            (tmp_path / f"p{i}.prof").write_text("x")
+        assert prune_profiles(tmp_path, 0) == 0
+        assert len(list(tmp_path.iterdir())) == 3
+
+
+class TestAdminToken:
+
+    def test_empty_admin_token_rejects_everything(self, monkeypatch):
+        monkeypatch.setattr(get_settings(), "admin_token", "")
+        assert not verify_token("")
+        assert not verify_token("anything")
+
+    def test_token_must_match(self, monkeypatch):
+        monkeypatch.setattr(get_settings(), "admin_token", "s3cret")
+        assert verify_token("s3cret")
+        assert not verify_token("other")
+        assert not verify_token("")
+
+
+class TestSearchProfileAccess:
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        from backend.app import main
+        from backend.app.database import get_db
+
+        monkeypatch.setattr(get_settings(), "admin_token", "s3cret")
+        main.app.dependency_overrides[get_db] = lambda: None
+        yield TestClient(main.app)
+        main.app.dependency_overrides.clear()
+
+    @pytest.mark.parametrize("headers", [{}, {"X-Admin-Token": "other"}])
+    def test_profile_requires_admin_token(self, client, headers):
+        response = client.get(
+            "/search", params={"query": "stock", "version": "17.0", "profile": 1}, headers=headers
+        )
+        assert response.status_code == 403
@@ -0,0 +1,239 @@
+"""
+Tests para el webhook de GitHub: firma, parseo de pushes, fusión de trabajos,
+la cola (SQLite) y el endpoint.
+"""
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add parent directory to path to import backend modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.app.api.endpoints import webhooks
+from backend.app.config import get_settings
+from backend.app.core.security import compute_signature, verify_signature
+from backend.app.models import ReindexJob
+from backend.app.services.reindex_queue import (
+    ALL_MODULES,
+    PushChanges,
+    ReindexQueue,
+    coalesce,
+    failed_jobs,
+    parse_push,
+)
+
+
+def push(ref="refs/heads/17.0", commits=None, **extra):
+    payload = {
+        "ref": ref,
+        "after": "b" * 40,
+        "repository": {"name": "web", "owner": {"login": "OCA"}},
+        "commits": commits if commits is not None else [
+            {"added": ["web_a/models/a.py"], "removed": [], "modified": ["web_b/README.rst"]},
+            {"added": [], "removed": ["web_c/__manifest__.py"], "modified": ["README.md"]},
+            {"added": [".github/workflows/test.yml", "setup/web_a/setup.py"]},
+        ],
+    }
+    payload.update(extra)
+    return payload
+
+
+class TestSignature:
+
+    def test_valid_signature(self):
+        body = b'{"zen": "Keep it logically awesome."}'
+        signature = compute_signature("secret", body)
+        assert signature.startswith("sha256=")
+        assert verify_signature("secret", body, signature)
+
+    def test_invalid_or_missing(self):
+        body = b"{}"
+        assert not verify_signature("secret", body, compute_signature("other", body))
+        assert not verify_signature("secret", body + b" ", compute_signature("secret", body))
+        assert not verify_signature("", body, compute_signature("", body))
+        assert not verify_signature("secret", body, "")
+
+
+class TestParsePush:
+
+    def test_changed_modules(self):
+        changes = parse_push(push())
+        assert (changes.repo_name, changes.version) == ("web", "17.0")
+        assert changes.commit == "b" * 40
+        assert changes.modules == {"web_a", "web_b", "web_c"}
+        assert not changes.full
+        assert changes.job_names() == {"web_a", "web_b", "web_c"}
+
+    def test_ignored_pushes(self):
+        assert parse_push(push(ref="refs/heads/feature-x")) is None
+        assert parse_push(push(ref="refs/tags/17.0.1")) is None
+        assert parse_push(push(deleted=True)) is None
+        assert parse_push(push(repository={"name": "web", "owner": {"login": "someone"}})) is None
+
+    def test_forced_or_truncated_push_reindexes_branch(self):
+        assert parse_push(push(forced=True)).job_names() == {ALL_MODULES}
+        many = [{"modified": [f"m{i}/x.py"]} for i in range(20)]
+        assert parse_push(push(commits=many)).full
+
+
+class TestCoalesce:
+
+    def test_groups_by_branch(self):
+        jobs = [
+            ("web", "17.0", "web_a"),
+            ("web", "17.0", "web_b"),
+            ("web", "17.0", "web_a"),
+            ("web", "16.0", "web_a"),
+        ]
+        assert coalesce(jobs) == {
+            ("web", "17.0"): {"web_a", "web_b"},
+            ("web", "16.0"): {"web_a"},
+        }
+
+    def test_branch_job_absorbs_module_jobs(self):
+        jobs = [("web", "17.0", "web_a"), ("web", "17.0", ALL_MODULES), ("web", "17.0", "web_b")]
+        assert coalesce(jobs) == {("web", "17.0"): None}
+
+
+class TestFailedJobs:
+
+    def jobs(self, *names):
+        return [SimpleNamespace(id=i, technical_name=name) for i, name in enumerate(names)]
+
+    def test_only_dropped_modules_fail(self):
+        jobs = self.jobs("web_a", "web_b")
+        assert failed_jobs(jobs, {"web_b": "manifest no disponible"}) == {1: "manifest no disponible"}
+        assert failed_jobs(jobs, {}) == {}
+
+    def test_branch_job_fails_on_any_drop(self):
+        failures = failed_jobs(self.jobs(ALL_MODULES), {"web_b": "error en embedding"})
+        assert failures == {0: "web_b: error en embedding"}
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    ReindexJob.__table__.create(engine)
+    return sessionmaker(bind=engine)
+
+
+def changes(*modules, commit="a" * 40, full=False):
+    return PushChanges("web", "17.0", commit, set(modules), full=full)
+
+
+def jobs_by_status(session_factory):
+    with session_factory() as session:
+        return sorted(
+            (job.technical_name, job.status, job.commit)
+            for job in session.query(ReindexJob).all()
+        )
+
+
+class TestReindexQueue:
+
+    def test_pending_duplicates_are_merged(self, session_factory):
+        queue = ReindexQueue(session_factory)
+        assert queue.enqueue(changes("web_a", "web_b")) == 2
+        queue.enqueue(changes("web_a", commit="c" * 40))
+        assert jobs_by_status(session_factory) == [
+            ("web_a", "pending", "c" * 40),
+            ("web_b", "pending", "a" * 40),
+        ]
+
+    def test_running_job_does_not_absorb_new_push(self, session_factory):
+        queue = ReindexQueue(session_factory)
+        queue.enqueue(changes("web_a"))
+        queue.claim()
+        queue.enqueue(changes("web_a", commit="c" * 40))
+        assert [status for _, status, _ in jobs_by_status(session_factory)] == ["pending", "running"]
+
+    def test_claim_marks_running(self, session_factory):
+        queue = ReindexQueue(session_factory)
+        queue.enqueue(changes("web_a", "web_b"))
+        jobs = queue.claim(limit=1)
+        assert [(job.technical_name, job.status, job.attempts) for job in jobs] == [
+            ("web_a", "running", 1)
+        ]
+        assert [job.technical_name for job in queue.claim()] == ["web_b"]
+        assert queue.claim() == []
+
+    def test_expired_lease_is_reclaimed(self, session_factory):
+        queue = ReindexQueue(session_factory, lease_seconds=60)
+        queue.enqueue(changes("web_a"))
+        queue.claim()
+        assert queue.claim() == []
+        with session_factory() as session:
+            session.query(ReindexJob).update({ReindexJob.locked_at: datetime(2000, 1, 1)})
+            session.commit()
+        reclaimed = queue.claim()
+        assert [(job.technical_name, job.attempts) for job in reclaimed] == [("web_a", 2)]
+
+    def test_fail_retries_then_gives_up(self, session_factory):
+        queue = ReindexQueue(session_factory, max_attempts=2)
+        queue.enqueue(changes("web_a"))
+        queue.fail(queue.claim(), "timeout")
+        assert jobs_by_status(session_factory)[0][1] == "pending"
+        queue.fail(queue.claim(), "timeout")
+        assert jobs_by_status(session_factory)[0][1] == "failed"
+        assert queue.stats() == {"failed": 1}
+
+    def test_failed_job_is_absorbed_by_pending_duplicate(self, session_factory):
+        queue = ReindexQueue(session_factory)
+        queue.enqueue(changes("web_a"))
+        jobs = queue.claim()
+        queue.enqueue(changes("web_a", commit="c" * 40))
+        queue.fail(jobs, "timeout")
+        assert queue.stats() == {"done": 1, "pending": 1}
+
+    def test_complete(self, session_factory):
+        queue = ReindexQueue(session_factory)
+        queue.enqueue(changes(full=True))
+        queue.complete([job.id for job in queue.claim()])
+        assert jobs_by_status(session_factory) == [(ALL_MODULES, "done", "a" * 40)]
+
+
+@pytest.fixture
+def client(session_factory, monkeypatch):
+    monkeypatch.setattr(get_settings(), "github_webhook_secret", "secret")
+    monkeypatch.setattr(webhooks, "queue", ReindexQueue(session_factory))
+    app = FastAPI()
+    app.include_router(webhooks.router)
+    return TestClient(app)
+
+
+def post(client, payload, event="push", secret="secret"):
+    body = json.dumps(payload).encode("utf-8")
+    return client.post("/webhooks/github", content=body, headers={
+        "X-GitHub-Event": event,
+        "X-Hub-Signature-256": compute_signature(secret, body),
+        "Content-Type": "application/json",
+    })
+
+
+class TestWebhookEndpoint:
+
+    def test_push_enqueues_modules(self, client, session_factory):
+        response = post(client, push())
+        assert response.status_code == 200
+        assert response.json()["queued"] == 3
+        assert [name for name, _, _ in jobs_by_status(session_factory)] == ["web_a", "web_b", "web_c"]
+
+    def test_bad_signature_is_rejected(self, client, session_factory):
+        assert post(client, push(), secret="other").status_code == 401
+        assert jobs_by_status(session_factory) == []
+
+    def test_ping_and_ignored_pushes(self, client, session_factory):
+        assert post(client, {"zen": "x"}, event="ping").json() == {"received": "ping"}
+        assert post(client, push(ref="refs/heads/main")).json()["ignored"]
+        assert jobs_by_status(session_factory) == []
@@ -0,0 +1,247 @@
+"""
+Tests para la re-vectorización en columna sombra (SQL, estado, recuperación
+de cambios del ETL y decisión de intercambio, con SQLite o una sombra falsa).
+"""
+import sys
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.pool import StaticPool
+
+# Add parent directory to path to import backend modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import update_embeddings
+
+from backend.app.config import get_settings
+from backend.app.services.search_service import vector_search_query
+from backend.app.services.shadow_embeddings import (
+    SHADOW_COLUMN,
+    SHADOW_INDEX,
+    ShadowColumn,
+    ShadowState,
+    index_sql,
+    vector_literal,
+)
+
+
+class TestShadowState:
+
+    def test_comment_roundtrip(self):
+        state = ShadowState("qwen/qwen3-embedding-8b", 4096, datetime(2026, 10, 19, 8, 30))
+        assert ShadowState.from_comment(state.to_comment()) == state
+
+    def test_unknown_comment(self):
+        assert ShadowState.from_comment(None) is None
+        assert ShadowState.from_comment("columna creada a mano") is None
+        assert ShadowState.from_comment('{"model": "m"}') is None
+
+
+class TestSql:
+
+    def test_vector_literal(self):
+        assert vector_literal([0.5, -1, 2.25]) == "[0.5,-1.0,2.25]"
+
+    def test_large_vectors_are_indexed_as_halfvec(self):
+        sql = index_sql(SHADOW_INDEX, SHADOW_COLUMN, 2560, "hnsw", {"m": 16, "ef_construction": 64})
+        assert sql == (
+            f"CREATE INDEX CONCURRENTLY {SHADOW_INDEX} ON odoo_modules USING hnsw "
+            f"(({SHADOW_COLUMN}::halfvec(2560)) halfvec_cosine_ops) "
+            f"WITH (m = 16, ef_construction = 64)"
+        )
+
+    def test_small_vectors_use_vector_ops(self):
+        sql = index_sql("ix", "embedding", 1024, "ivfflat", concurrently=False)
+        assert sql == "CREATE INDEX ix ON odoo_modules USING ivfflat (embedding vector_cosine_ops)"
+
+
+class TestSearchUsesIndexShape:
+
+    def compile_search(self):
+        statement = vector_search_query([0.1] * 4, "17.0", limit=20)
+        return str(statement.compile(dialect=postgresql.dialect()))
+
+    def test_large_vectors_order_by_halfvec(self, monkeypatch):
+        monkeypatch.setattr(get_settings(), "embedding_dimensions", 2560)
+        sql = self.compile_search()
+        assert "CAST(odoo_modules.embedding AS HALFVEC(2560)) <=> %(param_1)s AS distance" in sql
+        assert "ORDER BY distance" in sql
+
+    def test_small_vectors_order_by_vector(self, monkeypatch):
+        monkeypatch.setattr(get_settings(), "embedding_dimensions", 1024)
+        sql = self.compile_search()
+        assert "odoo_modules.embedding <=> %(embedding_1)s AS distance" in sql
+        assert "HALFVEC" not in sql
+
+
+class TestResumeState:
+
+    def test_caught_up_roundtrip(self):
+        state = ShadowState("m", 1024, datetime(2026, 10, 1), datetime(2026, 10, 2, 12))
+        restored = ShadowState.from_comment(state.to_comment())
+        assert restored.caught_up_at == datetime(2026, 10, 2, 12)
+        assert restored.synced_since == datetime(2026, 10, 2, 12)
+
+    def test_comment_without_caught_up(self):
+        comment = '{"model": "m", "dimensions": 1024, "started_at": "2026-10-01T00:00:00"}'
+        state = ShadowState.from_comment(comment)
+        assert state.caught_up_at is None
+        assert state.synced_since == datetime(2026, 10, 1)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool,
+                           connect_args={"check_same_thread": False})
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE TABLE odoo_modules (id INTEGER PRIMARY KEY, embedding TEXT, "
+            f"{SHADOW_COLUMN} TEXT, updated_at DATETIME)"
+        ))
+        conn.execute(text(
+            f"INSERT INTO odoo_modules (id, embedding, {SHADOW_COLUMN}, updated_at) VALUES "
+            f"(1, 'old', 'new', '2026-10-01 00:00:00'), "
+            f"(2, 'old', NULL, '2026-10-01 00:00:00'), "
+            f"(3, NULL, NULL, '2026-10-01 00:00:00'), "
+            f"(4, 'old', 'new', '2026-10-03 00:00:00')"
+        ))
+    return engine
+
+
+class TestUnsynced:
+
+    def test_counts_missing_and_stale_rows(self, engine):
+        with engine.connect() as conn:
+            assert ShadowColumn.unsynced(conn, datetime(2026, 10, 2)) == (1, 1)
+            assert ShadowColumn.unsynced(conn, datetime(2026, 10, 4)) == (1, 0)
+
+    def test_clear_makes_rows_pending_again(self, engine):
+        shadow = ShadowColumn(engine)
+        assert shadow.pending() == 1
+        shadow.clear([4])
+        assert shadow.pending() == 2
+
+
+class FakeShadow:
+    """ShadowColumn en memoria que registra las llamadas."""
+
+    def __init__(self, state=None, swaps=(True,), pending=0, index=False):
+        self._state = state
+        self.swaps = list(swaps)
+        self._pending = pending
+        self.index = index
+        self.calls = []
+
+    def state(self):
+        return self._state is not None, self._state
+
+    def create(self, state):
+        self._state = state
+
+    def drop(self):
+        self.calls.append("drop")
+        self._state = None
+
+    def record(self, state):
+        self.calls.append(("record", state.caught_up_at))
+
+    def pending(self):
+        return self._pending
+
+    def has_valid_index(self):
+        return self.index
+
+    def build_index(self, dimensions, method, params):
+        self.calls.append("build_index")
+
+    def swap(self, since, lock_timeout):
+        self.calls.append(("swap", since))
+        return self.swaps.pop(0)
+
+
+@pytest.fixture
+def reembed(monkeypatch):
+    """Ejecuta reembed_shadow con una sombra falsa; fill_shadow devuelve ``changed``."""
+
+    def run(shadow, argv=(), changed=()):
+        changed = list(changed)
+
+        def fake_fill(shadow_column, embedding, progress, batch_size, since=None):
+            shadow_column.calls.append(("fill", since))
+            return changed.pop(0) if since is not None and changed else 0
+
+        monkeypatch.setattr(update_embeddings, "ShadowColumn", lambda engine: shadow)
+        monkeypatch.setattr(update_embeddings, "fill_shadow", fake_fill)
+        monkeypatch.setattr(update_embeddings.time, "sleep", lambda seconds: None)
+        embedding = SimpleNamespace(model="m", dimensions=1024)
+        args = update_embeddings.parse_args(list(argv))
+        return update_embeddings.reembed_shadow(args, embedding, update_embeddings.Progress())
+
+    return run
+
+
+def fills(shadow):
+    return [call[1] for call in shadow.calls if call[0] == "fill"]
+
+
+class TestReembedShadow:
+
+    def test_resume_catches_up_from_recorded_pass(self, reembed):
+        caught_up = datetime(2026, 10, 2)
+        shadow = FakeShadow(ShadowState("m", 1024, datetime(2026, 10, 1), caught_up))
+        assert reembed(shadow, ["--no-swap", "--index-method", "none"]) == 0
+        assert fills(shadow)[:2] == [None, caught_up]
+
+    def test_catch_up_stops_when_nothing_changed(self, reembed):
+        shadow = FakeShadow(index=True)
+        assert reembed(shadow, ["--no-swap", "--catch-up-passes", "3"], changed=[5, 0]) == 0
+        # Dos pasadas antes del índice (la segunda sin cambios) y una después
+        assert len([since for since in fills(shadow) if since is not None]) == 3
+
+    def test_catch_up_runs_after_index_build(self, reembed):
+        shadow = FakeShadow()
+        assert reembed(shadow) == 0
+        built = shadow.calls.index("build_index")
+        after = shadow.calls[built + 1:]
+        assert after[0][0] == "fill" and after[0][1] is not None
+        recorded = [call[1] for call in after if call[0] == "record"]
+        assert after[-1] == ("swap", recorded[-1])
+
+    def test_refused_swap_catches_up_and_retries(self, reembed):
+        shadow = FakeShadow(swaps=[False, True], index=True)
+        assert reembed(shadow) == 0
+        swaps = [i for i, call in enumerate(shadow.calls) if call[0] == "swap"]
+        assert len(swaps) == 2
+        between = shadow.calls[swaps[0] + 1:swaps[1]]
+        assert any(call[0] == "fill" and call[1] is not None for call in between)
+        recorded = [call[1] for call in between if call[0] == "record"]
+        assert shadow.calls[swaps[1]] == ("swap", recorded[-1])
+
+    def test_gives_up_after_repeated_refusals(self, reembed):
+        shadow = FakeShadow(swaps=[False, False, False], index=True)
+        assert reembed(shadow) == 1
+
+    def test_pending_rows_block_the_swap(self, reembed):
+        shadow = FakeShadow(pending=3)
+        assert reembed(shadow) == 1
+        assert not any(call[0] == "swap" for call in shadow.calls)
+        assert "build_index" not in shadow.calls
+
+    def test_shadow_for_another_model_is_kept(self, reembed):
+        shadow = FakeShadow(ShadowState("other", 4096, datetime(2026, 10, 1)))
+        assert reembed(shadow) == 1
+        assert shadow.calls == []
+
+
+class TestArgs:
+
+    def test_index_method_none_requires_no_swap(self):
+        with pytest.raises(SystemExit):
+            update_embeddings.parse_args(["--index-method", "none"])
+        assert update_embeddings.parse_args(["--index-method", "none", "--no-swap"]).no_swap
+        assert update_embeddings.parse_args(["--index-method", "none", "--missing"]).missing
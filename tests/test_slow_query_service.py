@@ -0,0 +1,128 @@
+"""
+Tests para el log de búsquedas lentas: elisión de vectores, resumen del plan
+y umbral sobre las fases de base de datos.
+"""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add parent directory to path to import backend modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.app.models import ReindexJob
+from backend.app.services.slow_query_service import (
+    SlowQueryLogger,
+    elide_vectors,
+    explain_plan,
+    summarize_plan,
+)
+
+PLAN = [
+    "Limit  (cost=10.00..20.00 rows=20 width=100) (actual time=1.0..2.0 rows=20 loops=1)",
+    "  ->  Index Scan using idx_odoo_modules_embedding_hnsw on odoo_modules  (cost=...)",
+    "        Order By: (embedding <=> '[0.1,0.2]'::vector)",
+    "        Filter: ((version)::text = '17.0'::text)",
+    "  ->  Seq Scan on odoo_module_docs  (cost=...)",
+]
+
+
+class TestHelpers:
+
+    def test_vectors_are_elided(self):
+        params = {
+            "version_1": "17.0",
+            "param_1": [0.1] * 32,
+            "param_2": "[" + ",".join(["0.5"] * 40) + "]",
+            "depends": ["base", "sale"],
+        }
+        assert elide_vectors(params) == {
+            "version_1": "17.0",
+            "param_1": "<vector dim=32 elided>",
+            "param_2": "<vector dim=40 elided>",
+            "depends": ["base", "sale"],
+        }
+
+    def test_plan_summary(self):
+        summary = summarize_plan(PLAN)
+        assert summary["index_scans"] == ["idx_odoo_modules_embedding_hnsw"]
+        assert summary["seq_scans"] == ["odoo_module_docs"]
+        assert summary["conditions"][1] == "Filter: ((version)::text = '17.0'::text)"
+        assert summary["uses_vector_index"]
+
+    def test_seq_scan_plan_does_not_use_vector_index(self):
+        summary = summarize_plan(["Sort", "  ->  Seq Scan on odoo_modules  (cost=...)"])
+        assert summary == {
+            "seq_scans": ["odoo_modules"],
+            "index_scans": [],
+            "conditions": [],
+            "uses_vector_index": False,
+        }
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    ReindexJob.__table__.create(engine)
+    with sessionmaker(bind=engine)() as session:
+        yield session
+
+
+def read_entries(path):
+    if not path.exists():
+        return []
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+class TestExplainPlan:
+
+    def test_plan_without_analyze(self, db):
+        statement = select(ReindexJob.id).where(ReindexJob.version == "17.0").limit(5)
+        plan = explain_plan(db.connection(), statement, options=None)
+        assert plan  # SQLite devuelve su programa; PostgreSQL, las líneas del plan
+
+
+class TestMaybeRecord:
+
+    @pytest.fixture
+    def slow_log(self, tmp_path, monkeypatch):
+        slow_log = SlowQueryLogger(threshold_ms=100, log_path=str(tmp_path / "slow.log"))
+        self.explained = 0
+
+        def explain(*args):
+            self.explained += 1
+            return PLAN
+
+        monkeypatch.setattr(slow_log, "_explain", explain)
+        return slow_log
+
+    def record(self, slow_log, db, **timings):
+        statement = select(ReindexJob).where(ReindexJob.version == "17.0")
+        return slow_log.maybe_record(db, statement, timings, context={"query": "stock"})
+
+    def test_slow_db_phases_are_recorded(self, slow_log, db, tmp_path):
+        assert self.record(slow_log, db, embedding=0.5, vector_query=0.2, scoring=0.01)
+        entry, = read_entries(tmp_path / "slow.log")
+        assert entry["db_ms"] == 200.0
+        assert entry["total_ms"] == 710.0
+        assert entry["phases_ms"]["embedding"] == 500.0
+        assert entry["params"] == {"version_1": "17.0"}
+        assert entry["plan_summary"]["uses_vector_index"]
+        assert self.explained == 1
+
+    def test_slow_provider_alone_does_not_explain(self, slow_log, db, tmp_path):
+        assert not self.record(slow_log, db, embedding=2.0, vector_query=0.05)
+        assert self.explained == 0
+        assert read_entries(tmp_path / "slow.log") == []
+
+    def test_disabled_logger(self, tmp_path, db):
+        slow_log = SlowQueryLogger(threshold_ms=0, log_path=str(tmp_path / "slow.log"))
+        assert not slow_log.enabled
+        assert not self.record(slow_log, db, vector_query=10.0)
+        assert not (tmp_path / "slow.log").exists()
@@ -0,0 +1,97 @@
+"""
+Tests para el generador de corpus sintético.
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import backend modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import pytest
+from backend.app.utils.synthetic_corpus import (
+    DependsDistribution,
+    SyntheticCorpusGenerator,
+    jitter_embeddings,
+)
+
+
+def source_rows(dims=16):
+    rng = np.random.default_rng(1)
+    rows = []
+    for i, depends in enumerate([["base"], ["base", "sale"], ["base", "stock"], []]):
+        embedding = rng.standard_normal(dims)
+        rows.append({
+            "id": i + 1,
+            "technical_name": f"mod_{i}",
+            "name": f"Module {i}",
+            "version": "17.0",
+            "depends": depends,
+            "github_stars": 10,
+            "github_issues_open": 2,
+            "embedding": (embedding / np.linalg.norm(embedding)).tolist(),
+        })
+    return rows
+
+
+class TestJitterEmbeddings:
+
+    def test_preserves_norm_and_stays_close(self):
+        rng = np.random.default_rng(0)
+        base = rng.standard_normal((50, 64)).astype(np.float32)
+
+        jittered = jitter_embeddings(base, noise=0.05, rng=rng)
+
+        np.testing.assert_allclose(
+            np.linalg.norm(jittered, axis=1), np.linalg.norm(base, axis=1), rtol=1e-5
+        )
+        cosine = (jittered * base).sum(axis=1) / np.linalg.norm(base, axis=1) ** 2
+        assert cosine.min() > 0.99
+
+    def test_zero_noise_is_identity(self):
+        rng = np.random.default_rng(0)
+        base = rng.standard_normal((3, 8)).astype(np.float32)
+
+        np.testing.assert_allclose(jitter_embeddings(base, 0.0, rng), base, rtol=1e-6)
+
+
+class TestDependsDistribution:
+
+    def test_samples_known_modules(self):
+        distribution = DependsDistribution(source_rows())
+        rng = np.random.default_rng(0)
+
+        for _ in range(50):
+            depends = distribution.sample("17.0", rng)
+            assert len(depends) <= 2
+            assert len(set(depends)) == len(depends)
+            assert set(depends) <= {"base", "sale", "stock"}
+
+    def test_unknown_version(self):
+        distribution = DependsDistribution(source_rows())
+        assert distribution.sample("12.0", np.random.default_rng(0)) == []
+
+
+class TestSyntheticCorpusGenerator:
+
+    def test_generates_unique_rows_in_batches(self):
+        generator = SyntheticCorpusGenerator(source_rows(), seed=3)
+
+        batches = list(generator.generate(25, batch_size=10, start_id=100))
+
+        assert [len(b) for b in batches] == [10, 10, 5]
+        rows = [row for batch in batches for row in batch]
+        assert [row["id"] for row in rows] == list(range(100, 125))
+        assert len({row["technical_name"] for row in rows}) == 25
+        assert all(row["embedding"].shape == (16,) for row in rows)
+
+    def test_reproducible_with_seed(self):
+        first = next(SyntheticCorpusGenerator(source_rows(), seed=5).generate(5))
+        second = next(SyntheticCorpusGenerator(source_rows(), seed=5).generate(5))
+
+        assert [r["technical_name"] for r in first] == [r["technical_name"] for r in second]
+        np.testing.assert_array_equal(first[0]["embedding"], second[0]["embedding"])
+
+    def test_requires_embeddings(self):
+        with pytest.raises(ValueError):
+            SyntheticCorpusGenerator([{"technical_name": "x", "version": "17.0", "embedding": None}])
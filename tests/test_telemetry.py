@@ -0,0 +1,113 @@
+"""
+Tests unitarios para la instrumentación Prometheus.
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import backend modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from backend.app.core.telemetry import Counter, Gauge, Histogram, Registry, observe_phase
+from backend.app.core.tracing import format_server_timing, timed_span
+
+
+class TestMetricsRendering:
+    """Tests para el formato de exposición."""
+
+    def test_counter_with_labels(self):
+        """Counter renderiza sufijo _total y labels."""
+        counter = Counter("hits", "Hits", ["transport"])
+        counter.labels(transport="mcp").inc()
+        counter.labels(transport="mcp").inc(2)
+
+        lines = counter.render()
+
+        assert "# TYPE aiodoofinder_hits_total counter" in lines
+        assert 'aiodoofinder_hits_total{transport="mcp"} 3.0' in lines
+
+    def test_counter_rejects_unknown_labels(self):
+        """Labels distintas de las declaradas lanzan error."""
+        counter = Counter("hits", "Hits", ["transport"])
+
+        with pytest.raises(ValueError):
+            counter.labels(endpoint="search")
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Buckets acumulativos con +Inf, _sum y _count."""
+        histogram = Histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(5.0)
+
+        lines = histogram.render()
+
+        assert 'aiodoofinder_latency_seconds_bucket{le="0.1"} 1.0' in lines
+        assert 'aiodoofinder_latency_seconds_bucket{le="1.0"} 2.0' in lines
+        assert 'aiodoofinder_latency_seconds_bucket{le="+Inf"} 3.0' in lines
+        assert "aiodoofinder_latency_seconds_sum 5.55" in lines
+        assert "aiodoofinder_latency_seconds_count 3.0" in lines
+
+    def test_gauge_callback_evaluated_on_render(self):
+        """Gauge con callback se calcula en cada scrape."""
+        gauge = Gauge("pool", "Pool", ["state"])
+        gauge.set_function(lambda: {("checked_out",): 4})
+
+        registry = Registry()
+        registry.register(gauge)
+
+        assert 'aiodoofinder_pool{state="checked_out"} 4.0' in registry.render()
+
+
+class TestObservePhase:
+    """Tests para la medición de fases de búsqueda."""
+
+    def test_accumulates_timings(self):
+        """Cada fase se acumula en el dict de timings."""
+        timings = {}
+
+        with observe_phase(timings, "embedding", version="17.0", search_mode="vector"):
+            pass
+        with observe_phase(timings, "embedding", version="17.0", search_mode="vector"):
+            pass
+
+        assert set(timings) == {"embedding"}
+        assert timings["embedding"] >= 0.0
+
+    def test_records_on_exception(self):
+        """La fase se registra aunque falle."""
+        timings = {}
+
+        with pytest.raises(RuntimeError):
+            with observe_phase(timings, "vector_query"):
+                raise RuntimeError("boom")
+
+        assert "vector_query" in timings
+
+
+class TestServerTiming:
+    """Tests para la cabecera Server-Timing."""
+
+    def test_groups_phases(self):
+        """vector_query se publica como db."""
+        header = format_server_timing({
+            "embedding": 0.120,
+            "vector_query": 0.030,
+            "scoring": 0.002,
+            "serialization": 0.0005,
+        })
+
+        assert header == "embed;dur=120.0, db;dur=30.0, score;dur=2.0, serialize;dur=0.5"
+
+    def test_empty_timings(self):
+        """Sin fases medidas la cabecera queda vacía."""
+        assert format_server_timing({}) == ""
+
+    def test_timed_span_without_exporter(self):
+        """Sin exportador configurado los spans son no-ops pero se mide la fase."""
+        timings = {}
+
+        with timed_span(timings, "db"):
+            pass
+
+        assert format_server_timing(timings).startswith("db;dur=")